@@ -0,0 +1,234 @@
+"""Transaction rollup cube: per-user (UTC day, category) spending aggregates.
+
+- transaction_daily_rollups holds count / sum / sum of squares / min / max
+  of live transactions per (user_id, day, category), so the analytics
+  endpoints read a handful of rows with a range on day instead of
+  re-aggregating transactions with extract(year/month) filters.
+- Statement-level triggers on transactions keep it current for inserts,
+  updates (including soft deletes and restores) and deletes.
+- Existing transactions are backfilled once here; afterwards
+  scripts/rebuild_transaction_rollups.py can rebuild it on demand.
+
+Revision ID: 0036
+Revises: 0035
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0036"
+down_revision = "0035"
+branch_labels = None
+depends_on = None
+
+
+MAINTAIN_ROLLUPS_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_transaction_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    cell_users uuid[];
+    cell_days date[];
+    cell_categories text[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_advisory_xact_lock(hashtext('transaction_daily_rollups'), cell)
+        FROM (
+            SELECT DISTINCT hashtext(user_id::text
+                || (spent_at AT TIME ZONE 'UTC')::date::text || category) AS cell
+            FROM new_rows
+            WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+            ORDER BY cell
+        ) locks;
+        INSERT INTO transaction_daily_rollups AS r (
+            user_id, day, category, txn_count, amount_sum, amount_sumsq,
+            amount_min, amount_max, updated_at
+        )
+        SELECT user_id, (spent_at AT TIME ZONE 'UTC')::date, category,
+               count(*), sum(amount), sum(amount * amount),
+               min(amount), max(amount), now()
+        FROM new_rows
+        WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, day, category) DO UPDATE SET
+            txn_count = r.txn_count + EXCLUDED.txn_count,
+            amount_sum = r.amount_sum + EXCLUDED.amount_sum,
+            amount_sumsq = r.amount_sumsq + EXCLUDED.amount_sumsq,
+            amount_min = LEAST(r.amount_min, EXCLUDED.amount_min),
+            amount_max = GREATEST(r.amount_max, EXCLUDED.amount_max),
+            updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        SELECT array_agg(user_id), array_agg(day), array_agg(category)
+        INTO cell_users, cell_days, cell_categories
+        FROM (
+            SELECT DISTINCT user_id, (spent_at AT TIME ZONE 'UTC')::date AS day,
+                   category
+            FROM old_rows
+            WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+        ) cells;
+    ELSE
+        SELECT array_agg(user_id), array_agg(day), array_agg(category)
+        INTO cell_users, cell_days, cell_categories
+        FROM (
+            SELECT o.user_id, (o.spent_at AT TIME ZONE 'UTC')::date AS day,
+                   o.category
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.deleted_at IS NULL AND o.spent_at IS NOT NULL
+              AND (o.user_id, o.category, o.amount, o.spent_at, n.deleted_at IS NULL)
+                  IS DISTINCT FROM (n.user_id, n.category, n.amount, n.spent_at, true)
+            UNION
+            SELECT n.user_id, (n.spent_at AT TIME ZONE 'UTC')::date, n.category
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE n.deleted_at IS NULL AND n.spent_at IS NOT NULL
+              AND (n.user_id, n.category, n.amount, n.spent_at, o.deleted_at IS NULL)
+                  IS DISTINCT FROM (o.user_id, o.category, o.amount, o.spent_at, true)
+        ) cells;
+    END IF;
+
+    IF cell_users IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Under READ COMMITTED the recompute cannot see a concurrent insert into
+    -- the same cell, and would overwrite its merge. Both paths lock their
+    -- cells (in one order, so they cannot deadlock each other) until commit;
+    -- the recompute is a new statement, so its snapshot sees whatever the
+    -- lock holder committed.
+    PERFORM pg_advisory_xact_lock(hashtext('transaction_daily_rollups'), cell)
+    FROM (
+        SELECT DISTINCT hashtext(c.user_id::text || c.day::text || c.category)
+            AS cell
+        FROM unnest(cell_users, cell_days, cell_categories)
+            AS c(user_id, day, category)
+        ORDER BY cell
+    ) locks;
+
+    WITH cells AS (
+        SELECT * FROM unnest(cell_users, cell_days, cell_categories)
+            AS c(user_id, day, category)
+    ),
+    fresh AS (
+        SELECT c.user_id, c.day, c.category,
+               count(t.id) AS txn_count,
+               coalesce(sum(t.amount), 0) AS amount_sum,
+               coalesce(sum(t.amount * t.amount), 0) AS amount_sumsq,
+               min(t.amount) AS amount_min,
+               max(t.amount) AS amount_max
+        FROM cells c
+        LEFT JOIN transactions t
+          ON t.user_id = c.user_id
+         AND t.category = c.category
+         AND t.deleted_at IS NULL
+         AND t.spent_at >= c.day::timestamp AT TIME ZONE 'UTC'
+         AND t.spent_at < (c.day + 1)::timestamp AT TIME ZONE 'UTC'
+        GROUP BY c.user_id, c.day, c.category
+    ),
+    emptied AS (
+        DELETE FROM transaction_daily_rollups r
+        USING fresh f
+        WHERE f.txn_count = 0
+          AND r.user_id = f.user_id AND r.day = f.day AND r.category = f.category
+    )
+    INSERT INTO transaction_daily_rollups AS r (
+        user_id, day, category, txn_count, amount_sum, amount_sumsq,
+        amount_min, amount_max, updated_at
+    )
+    SELECT user_id, day, category, txn_count, amount_sum, amount_sumsq,
+           amount_min, amount_max, now()
+    FROM fresh
+    WHERE txn_count > 0
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        txn_count = EXCLUDED.txn_count,
+        amount_sum = EXCLUDED.amount_sum,
+        amount_sumsq = EXCLUDED.amount_sumsq,
+        amount_min = EXCLUDED.amount_min,
+        amount_max = EXCLUDED.amount_max,
+        updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+MAINTAIN_ROLLUPS_TRIGGERS = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'transactions_rollup_insert'
+          AND tgrelid = 'transactions'::regclass
+    ) THEN
+        CREATE TRIGGER transactions_rollup_insert
+            AFTER INSERT ON transactions
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+        CREATE TRIGGER transactions_rollup_update
+            AFTER UPDATE ON transactions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+        CREATE TRIGGER transactions_rollup_delete
+            AFTER DELETE ON transactions
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+    END IF;
+END;
+$$;
+"""
+
+
+def upgrade():
+    op.create_table(
+        "transaction_daily_rollups",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("category", sa.String(50), primary_key=True),
+        sa.Column("txn_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("amount_sum", sa.Numeric(16, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "amount_sumsq", sa.Numeric(28, 4), nullable=False, server_default="0"
+        ),
+        sa.Column("amount_min", sa.Numeric(12, 2), nullable=True),
+        sa.Column("amount_max", sa.Numeric(12, 2), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    op.execute(MAINTAIN_ROLLUPS_FUNCTION)
+    op.execute(MAINTAIN_ROLLUPS_TRIGGERS)
+
+    # CREATE TRIGGER locks transactions against writes until this migration
+    # commits, so the backfill cannot miss or double count a concurrent write.
+    op.execute(
+        """
+        INSERT INTO transaction_daily_rollups (
+            user_id, day, category, txn_count, amount_sum, amount_sumsq,
+            amount_min, amount_max, updated_at
+        )
+        SELECT user_id, (spent_at AT TIME ZONE 'UTC')::date, category,
+               count(*), sum(amount), sum(amount * amount),
+               min(amount), max(amount), now()
+        FROM transactions
+        WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS transactions_rollup_insert ON transactions")
+    op.execute("DROP TRIGGER IF EXISTS transactions_rollup_update ON transactions")
+    op.execute("DROP TRIGGER IF EXISTS transactions_rollup_delete ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS maintain_transaction_rollups()")
+    op.drop_table("transaction_daily_rollups")
@@ -0,0 +1,198 @@
+"""Monthly range partitioning for append-heavy log tables.
+
+- notification_logs (created_at), feature_usage_logs, feature_access_logs,
+  paywall_impression_logs and audit_logs (timestamp) become tables
+  partitioned by month, so retention drops whole partitions instead of
+  deleting rows. The partition key joins each primary key and is NOT NULL.
+- Each table gets monthly partitions from its oldest row (at most two years
+  back) through three months ahead, plus a DEFAULT partition for rows outside
+  them. app/services/partition_maintenance.py keeps creating and dropping
+  partitions from then on.
+- Existing rows are copied across. The copy holds an exclusive lock on each
+  table for its duration; run it in a maintenance window on large tables.
+- audit_logs used to be created on first write by app/core/audit_logging.py;
+  it is created here (partitioned) when missing.
+
+Revision ID: 0037
+Revises: 0036
+"""
+
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0037"
+down_revision = "0036"
+branch_labels = None
+depends_on = None
+
+
+MONTHS_AHEAD = 3
+MAX_MONTHS_BACK = 24
+
+# table -> (partition column, {index name: column}, references users.id)
+TABLES = {
+    "notification_logs": (
+        "created_at",
+        {"ix_notification_logs_user_id": "user_id"},
+        False,
+    ),
+    "feature_usage_logs": (
+        "timestamp",
+        {
+            "ix_feature_usage_logs_user_id": "user_id",
+            "ix_feature_usage_logs_feature": "feature",
+            "ix_feature_usage_logs_screen": "screen",
+            "ix_feature_usage_logs_session_id": "session_id",
+            "ix_feature_usage_logs_timestamp": "timestamp",
+        },
+        True,
+    ),
+    "feature_access_logs": (
+        "timestamp",
+        {
+            "ix_feature_access_logs_user_id": "user_id",
+            "ix_feature_access_logs_feature": "feature",
+            "ix_feature_access_logs_timestamp": "timestamp",
+        },
+        True,
+    ),
+    "paywall_impression_logs": (
+        "timestamp",
+        {
+            "ix_paywall_impression_logs_user_id": "user_id",
+            "ix_paywall_impression_logs_screen": "screen",
+            "ix_paywall_impression_logs_timestamp": "timestamp",
+        },
+        True,
+    ),
+    "audit_logs": (
+        "timestamp",
+        {
+            "idx_audit_logs_timestamp": "timestamp",
+            "idx_audit_logs_user_id": "user_id",
+            "idx_audit_logs_endpoint": "endpoint",
+            "idx_audit_logs_event_type": "event_type",
+            "idx_audit_logs_client_ip": "client_ip",
+        },
+        False,
+    ),
+}
+
+AUDIT_LOGS_TABLE = """
+CREATE TABLE audit_logs (
+    id VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    user_id VARCHAR(255),
+    session_id VARCHAR(255),
+    client_ip VARCHAR(45) NOT NULL,
+    user_agent TEXT,
+    endpoint VARCHAR(500) NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    status_code INTEGER,
+    response_time_ms FLOAT,
+    request_size INTEGER DEFAULT 0,
+    response_size INTEGER,
+    sensitivity_level VARCHAR(20) NOT NULL,
+    success BOOLEAN NOT NULL,
+    error_message TEXT,
+    additional_context JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _months(oldest):
+    today = datetime.now(timezone.utc).date()
+    current = date(today.year, today.month, 1)
+    first = _add_months(current, -MAX_MONTHS_BACK)
+    if oldest is not None:
+        first = max(first, date(oldest.year, oldest.month, 1))
+    month = first
+    while month <= _add_months(current, MONTHS_AHEAD):
+        yield month
+        month = _add_months(month, 1)
+
+
+def _finish(table, column, indexes, references_users):
+    """Primary key, foreign key and indexes on a fresh parent table"""
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})")
+    if references_users:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey "
+            f"FOREIGN KEY (user_id) REFERENCES users (id)"
+        )
+    for name, indexed in indexes.items():
+        op.execute(f"CREATE INDEX {name} ON {table} ({indexed})")
+
+
+def _partition(table, column, indexes, references_users, exists):
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+    oldest = None
+    if exists:
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"UPDATE {legacy} SET {column} = now() WHERE {column} IS NULL")
+        oldest = bind.execute(sa.text(f"SELECT min({column}) FROM {legacy}")).scalar()
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+    else:
+        # Only audit_logs can be missing; the app used to create it lazily
+        op.execute(AUDIT_LOGS_TABLE + " PARTITION BY RANGE (timestamp)")
+
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT now()")
+    for month in _months(oldest):
+        op.execute(
+            f"CREATE TABLE {table}_p{month.year:04d}{month.month:02d} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})"
+        )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    if exists:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        # Dropping first frees the constraint and index names for the new table
+        op.execute(f"DROP TABLE {legacy}")
+    _finish(table, column, indexes, references_users)
+
+
+def _unpartition(table, column, indexes, references_users):
+    partitioned = f"{table}_partitioned"
+    op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+    op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+    op.execute(f"DROP TABLE {partitioned}")  # drops its partitions with it
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    if references_users:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey "
+            f"FOREIGN KEY (user_id) REFERENCES users (id)"
+        )
+    for name, indexed in indexes.items():
+        op.execute(f"CREATE INDEX {name} ON {table} ({indexed})")
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, (column, indexes, references_users) in TABLES.items():
+        _partition(table, column, indexes, references_users, table in existing)
+
+
+def downgrade():
+    for table, (column, indexes, references_users) in TABLES.items():
+        _unpartition(table, column, indexes, references_users)
@@ -0,0 +1,42 @@
+"""Indexes for keyset notification listing and cached unread counts.
+
+- ix_notifications_user_created (user_id, created_at DESC, id DESC) serves
+  /api/notifications/list, which now pages with a (created_at, id) cursor
+  instead of OFFSET.
+- ix_notifications_user_unread is the same key restricted to unread rows;
+  it serves unread-only listing and the unread counter's reconciliation
+  count, both of which only ever visit unread notifications.
+
+Revision ID: 0038
+Revises: 0037
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0038"
+down_revision = "0037"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_notifications_user_created",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_notifications_user_unread",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notifications_user_unread", table_name="notifications")
+    op.drop_index("ix_notifications_user_created", table_name="notifications")
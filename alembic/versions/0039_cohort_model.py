@@ -0,0 +1,64 @@
+"""Persisted cohort cluster model.
+
+- cohort_centroids holds one row per cluster: its centre in the model's
+  feature space and the number of users labelled into it.
+- user_cohort_labels holds each user's cluster and a fingerprint of the
+  features it was assigned from, so training can find changed users.
+
+Both are filled by the nightly cohort training job
+(app/services/core/engine/cron_task_cohort_model.py).
+
+Revision ID: 0039
+Revises: 0038
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0039"
+down_revision = "0038"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cohort_centroids",
+        sa.Column("cluster_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("centroid", sa.JSON(), nullable=False),
+        sa.Column("member_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_table(
+        "user_cohort_labels",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("cluster_id", sa.Integer(), nullable=False),
+        sa.Column("feature_hash", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_user_cohort_labels_cluster_id", "user_cohort_labels", ["cluster_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_user_cohort_labels_cluster_id", table_name="user_cohort_labels")
+    op.drop_table("user_cohort_labels")
+    op.drop_table("cohort_centroids")
@@ -0,0 +1,269 @@
+"""Change feed for /api/sync.
+
+- transactions, daily_plan, goals and notifications get a change_seq
+  column and a (user_id, change_seq) index; row triggers stamp every
+  insert and real update with the next value of the sync_change_seq
+  sequence, and statement triggers lock the users changed, in user_id
+  order, to advance user_sync_state.last_seq (see
+  app/db/models/sync_state.py).
+- Hard deletes of those rows leave a sync_tombstones row carrying the
+  sequence number of the delete (soft deletes are ordinary updates);
+  user_sync_state.pruned_seq records the newest one retention removed.
+- daily_plan gets the updated_at column the other synced tables have.
+- Existing rows are numbered once here, per user, in order of last change.
+
+Revision ID: 0040
+Revises: 0039
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0040"
+down_revision = "0039"
+branch_labels = None
+depends_on = None
+
+# (table, when a row last changed), numbered in this order
+SYNCED_TABLES = (
+    ("transactions", "coalesce(updated_at, created_at)"),
+    ("daily_plan", "created_at"),
+    ("goals", "coalesce(last_updated, created_at)"),
+    ("notifications", "coalesce(updated_at, created_at)"),
+)
+
+NEXT_CHANGE_SEQ_FUNCTIONS = """
+CREATE SEQUENCE IF NOT EXISTS sync_change_seq;
+
+CREATE OR REPLACE FUNCTION assign_sync_change_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_seq := nextval('sync_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION publish_sync_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    row_ids uuid[];
+    row_users uuid[];
+    users uuid[];
+    lows bigint[];
+    highs bigint[];
+    committed bigint;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(id), array_agg(user_id)
+        INTO row_ids, row_users
+        FROM new_rows;
+    ELSE
+        -- Rows the statement left unchanged kept their number
+        SELECT array_agg(n.id), array_agg(n.user_id)
+        INTO row_ids, row_users
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.change_seq IS DISTINCT FROM o.change_seq;
+    END IF;
+
+    IF row_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT array_agg(user_id ORDER BY user_id),
+           array_agg(lo ORDER BY user_id),
+           array_agg(hi ORDER BY user_id)
+    INTO users, lows, highs
+    FROM (
+        SELECT c.user_id, min(t.change_seq) AS lo, max(t.change_seq) AS hi
+        FROM unnest(row_ids, row_users) AS c(id, user_id)
+        JOIN new_rows t ON t.id = c.id
+        GROUP BY c.user_id
+    ) per_user;
+
+    -- One lock order for every statement, so multi-user writes cannot
+    -- deadlock each other here
+    INSERT INTO user_sync_state (user_id, last_seq)
+    SELECT u, 0 FROM unnest(users) AS u ORDER BY u
+    ON CONFLICT (user_id) DO NOTHING;
+    PERFORM 1 FROM user_sync_state
+    WHERE user_id = ANY(users)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    FOR i IN 1 .. array_length(users, 1) LOOP
+        SELECT last_seq INTO committed
+        FROM user_sync_state WHERE user_id = users[i];
+        IF committed >= lows[i] THEN
+            -- A concurrent write for this user took later numbers and
+            -- committed first. Renumber under the lock; the nested
+            -- statement's triggers advance last_seq.
+            EXECUTE 'UPDATE ' || quote_ident(TG_TABLE_NAME)
+                || ' SET change_seq = NULL WHERE id = ANY($1)'
+            USING ARRAY(
+                SELECT c.id FROM unnest(row_ids, row_users) AS c(id, user_id)
+                WHERE c.user_id = users[i]
+            );
+        ELSE
+            UPDATE user_sync_state SET last_seq = highs[i]
+            WHERE user_id = users[i];
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_sync_state (user_id, last_seq)
+    SELECT DISTINCT user_id, 0 FROM old_rows ORDER BY user_id
+    ON CONFLICT (user_id) DO NOTHING;
+    PERFORM 1 FROM user_sync_state
+    WHERE user_id IN (SELECT user_id FROM old_rows)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    -- Numbered after the locks, so above anything these users committed
+    WITH tombstones AS (
+        INSERT INTO sync_tombstones (user_id, change_seq, entity, entity_id, deleted_at)
+        SELECT user_id, nextval('sync_change_seq'), TG_TABLE_NAME, id, now()
+        FROM old_rows
+        RETURNING user_id, change_seq
+    )
+    UPDATE user_sync_state s SET last_seq = t.hi
+    FROM (
+        SELECT user_id, max(change_seq) AS hi FROM tombstones GROUP BY user_id
+    ) t
+    WHERE s.user_id = t.user_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHANGE_SEQ_TRIGGERS_TEMPLATE = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = '{table}_sync_seq_insert'
+          AND tgrelid = '{table}'::regclass
+    ) THEN
+        CREATE TRIGGER {table}_sync_seq_insert
+            BEFORE INSERT ON {table}
+            FOR EACH ROW EXECUTE FUNCTION assign_sync_change_seq();
+        CREATE TRIGGER {table}_sync_seq_update
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW WHEN (ROW(OLD.*)::text IS DISTINCT FROM ROW(NEW.*)::text)
+            EXECUTE FUNCTION assign_sync_change_seq();
+        CREATE TRIGGER {table}_sync_publish_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION publish_sync_changes();
+        CREATE TRIGGER {table}_sync_publish_update
+            AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION publish_sync_changes();
+        CREATE TRIGGER {table}_sync_tombstone
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_sync_tombstone();
+    END IF;
+END;
+$$;
+"""
+
+
+def upgrade():
+    # No writes between numbering existing rows and the triggers taking over
+    op.execute(
+        "LOCK TABLE "
+        + ", ".join(table for table, _ in SYNCED_TABLES)
+        + " IN SHARE ROW EXCLUSIVE MODE"
+    )
+
+    op.create_table(
+        "user_sync_state",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("last_seq", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("pruned_seq", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("change_seq", sa.BigInteger(), primary_key=True),
+        sa.Column("entity", sa.String(50), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.add_column(
+        "daily_plan",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    # The backfill below is not a spending change for the rollup triggers
+    op.execute("ALTER TABLE transactions DISABLE TRIGGER transactions_rollup_update")
+    for table, changed_at in SYNCED_TABLES:
+        op.add_column(table, sa.Column("change_seq", sa.BigInteger(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} t
+            SET change_seq = coalesce(s.last_seq, 0) + n.rn
+            FROM (
+                SELECT id, user_id,
+                       row_number() OVER (
+                           PARTITION BY user_id ORDER BY {changed_at}, id
+                       ) AS rn
+                FROM {table}
+            ) n
+            LEFT JOIN user_sync_state s ON s.user_id = n.user_id
+            WHERE t.id = n.id
+            """
+        )
+        op.execute(
+            f"""
+            INSERT INTO user_sync_state AS s (user_id, last_seq)
+            SELECT user_id, max(change_seq) FROM {table} GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET last_seq = EXCLUDED.last_seq
+            """
+        )
+        op.create_index(f"ix_{table}_user_change_seq", table, ["user_id", "change_seq"])
+    op.execute("ALTER TABLE transactions ENABLE TRIGGER transactions_rollup_update")
+
+    op.execute(NEXT_CHANGE_SEQ_FUNCTIONS)
+    # Continue above every number handed out per user by the backfill
+    op.execute(
+        "SELECT setval('sync_change_seq', "
+        "coalesce((SELECT max(last_seq) FROM user_sync_state), 0) + 1, false)"
+    )
+    for table, _ in SYNCED_TABLES:
+        op.execute(CHANGE_SEQ_TRIGGERS_TEMPLATE.format(table=table))
+
+
+def downgrade():
+    for table, _ in reversed(SYNCED_TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_seq_insert ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_seq_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_publish_insert ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_publish_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+        op.drop_index(f"ix_{table}_user_change_seq", table_name=table)
+        op.drop_column(table, "change_seq")
+    op.execute("DROP FUNCTION IF EXISTS assign_sync_change_seq()")
+    op.execute("DROP FUNCTION IF EXISTS publish_sync_changes()")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_tombstone()")
+    op.execute("DROP SEQUENCE IF EXISTS sync_change_seq")
+    op.drop_column("daily_plan", "updated_at")
+    op.drop_table("sync_tombstones")
+    op.drop_table("user_sync_state")
@@ -0,0 +1,43 @@
+"""Precomputed AI insight snapshots.
+
+- ai_analysis_snapshots.kind tells the monthly GPT-rated profiles
+  ("profile", every existing row) from the nightly analyzer snapshots
+  ("insights") that the /api/ai insight endpoints serve.
+- ix_ai_analysis_snapshots_user_kind_created serves "latest snapshot of
+  this kind for this user" with one index probe.
+
+Revision ID: 0041
+Revises: 0040
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0041"
+down_revision = "0040"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "ai_analysis_snapshots",
+        sa.Column(
+            "kind", sa.String(length=20), nullable=False, server_default="profile"
+        ),
+    )
+    op.create_index(
+        "ix_ai_analysis_snapshots_user_kind_created",
+        "ai_analysis_snapshots",
+        ["user_id", "kind", "created_at"],
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM ai_analysis_snapshots WHERE kind <> 'profile'")
+    op.drop_index(
+        "ix_ai_analysis_snapshots_user_kind_created",
+        table_name="ai_analysis_snapshots",
+    )
+    op.drop_column("ai_analysis_snapshots", "kind")
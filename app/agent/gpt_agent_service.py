@@ -1,10 +1,12 @@
 """GPTAgentService for analysing financial data using OpenAI."""
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from openai import OpenAI, OpenAIError
-from openai.types.chat import ChatCompletionMessageParam
+from app.services.llm_cache import cache_key, get_llm_cache
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +15,28 @@ class GPTAgentService:
     """Use OpenAI to derive insights for analytics and notifications."""
 
     def __init__(
-        self, api_key: str, model: str = "gpt-4o", system_prompt: Optional[str] = None
+        self,
+        api_key: str,
+        model: str = "gpt-4o",
+        system_prompt: Optional[str] = None,
+        client=None,
+        cache=None,
     ):
         """
         Initialize the GPT agent.
 
         :param api_key: Your OpenAI API key.
         :param model: The model to use, e.g., 'gpt-4o' or 'gpt-3.5-turbo'.
+        :param client: Chat completions client; defaults to OpenAI(api_key).
+        :param cache: LLM response cache; defaults to the shared one.
         """
-        self.client = OpenAI(api_key=api_key)
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=api_key)
+        self.client = client
         self.model = model
+        self.cache = cache or get_llm_cache()
         self.system_prompt = system_prompt or (
             "You are a professional financial assistant. "
             "You help users manage their budgets and categorize expenses. "
@@ -30,21 +44,30 @@ class GPTAgentService:
             "Be concise, clear, and supportive."
         )
 
-    def ask(self, user_messages: list[ChatCompletionMessageParam]) -> str:
-        """Send prompts to OpenAI and return the generated advice."""
+    def ask(self, user_messages: "list[ChatCompletionMessageParam]") -> str:
+        """Send prompts to OpenAI and return the generated advice.
+
+        Identical prompts are answered from the shared LLM cache.
+        """
+        from openai import OpenAIError
+
         try:
             messages = [
                 {"role": "system", "content": self.system_prompt}
             ] + user_messages
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-                max_tokens=600,
-            )
+            def _request() -> str:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=600,
+                )
+                self.cache.record_usage("agent", getattr(response, "usage", None))
+                return response.choices[0].message.content.strip()
 
-            return response.choices[0].message.content.strip()
+            key = cache_key(self.model, messages, temperature=0.3, max_tokens=600)
+            return self.cache.get_or_call_sync("agent", key, _request)
 
         except OpenAIError as e:
             logger.error("OpenAI API error: %s", e)
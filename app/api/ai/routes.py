@@ -7,6 +7,7 @@ import logging
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -18,15 +19,31 @@ from app.api.ai.schemas import (
 from app.api.dependencies import get_current_user
 from app.core.async_session import get_async_db
 from app.db.models import AIAnalysisSnapshot
+from app.db.models.ai_analysis_snapshot import PROFILE_KIND
 from app.services.ai_financial_analyzer import AIFinancialAnalyzer
+from app.services.ai_insight_snapshots import get_insight, request_insight_refresh
 from app.services.core.engine.ai_snapshot_service import save_ai_snapshot
-from app.utils.response_wrapper import success_response
+from app.utils.response_wrapper import StandardizedResponse, success_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
 
+async def _insight_response(db: AsyncSession, user, section: str):
+    """Serve a section of the user's precomputed insight snapshot
+
+    The snapshot's age and staleness go in meta.snapshot. get_insight is
+    sync (it may compute a missing snapshot) — bridged via run_sync. The
+    refresh of a stale snapshot talks to Redis, so it runs in the
+    threadpool rather than on the event loop.
+    """
+    data, meta = await db.run_sync(lambda s: get_insight(s, user.id, section))
+    if meta["snapshot"]["stale"]:
+        await run_in_threadpool(request_insight_refresh, user.id)
+    return StandardizedResponse.success(data, message="Request successful", meta=meta)
+
+
 @router.get("/latest-snapshots")
 async def get_latest_ai_snapshots(
     user=Depends(get_current_user),
@@ -35,6 +52,7 @@ async def get_latest_ai_snapshots(
     result = await db.execute(
         select(AIAnalysisSnapshot)
         .filter_by(user_id=user.id)
+        .filter_by(kind=PROFILE_KIND)
         .order_by(AIAnalysisSnapshot.created_at.desc())
     )
     snapshot = result.scalars().first()
@@ -75,13 +93,7 @@ async def get_spending_patterns(
 ):
     """Get AI-analyzed spending patterns for the user"""
     try:
-        # AIFinancialAnalyzer is sync (self.db.query in __init__) — bridge via
-        # run_sync; passing the raw AsyncSession raised on every call and the
-        # broad except silently served the empty fallback.
-        patterns_data = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).analyze_spending_patterns()
-        )
-        return success_response(patterns_data)
+        return await _insight_response(db, user, "spending_patterns")
     except Exception:
         logger.exception("spending-patterns analysis failed for user %s", user.id)
         # Fallback to basic response if analysis fails
@@ -104,10 +116,7 @@ async def get_personalized_feedback(
 ):
     """Get personalized AI feedback for the user"""
     try:
-        feedback_data = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).generate_personalized_feedback()
-        )
-        return success_response(feedback_data)
+        return await _insight_response(db, user, "personalized_feedback")
     except Exception:
         logger.exception("personalized-feedback failed for user %s", user.id)
         # Fallback response
@@ -132,10 +141,7 @@ async def get_weekly_insights(
 ):
     """Get weekly AI insights for the user"""
     try:
-        insights_data = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).generate_weekly_insights()
-        )
-        return success_response(insights_data)
+        return await _insight_response(db, user, "weekly_insights")
     except Exception:
         logger.exception("weekly-insights failed for user %s", user.id)
         # Fallback response
@@ -182,10 +188,7 @@ async def get_financial_health_score(
 ):
     """Get AI-calculated financial health score"""
     try:
-        score_data = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).calculate_financial_health_score()
-        )
-        return success_response(score_data)
+        return await _insight_response(db, user, "financial_health_score")
     except Exception:
         logger.exception("financial-health-score failed for user %s", user.id)
         # Fallback response
@@ -216,10 +219,7 @@ async def get_spending_anomalies(
 ):
     """Get detected spending anomalies"""
     try:
-        anomalies = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).detect_spending_anomalies()
-        )
-        return success_response(anomalies)
+        return await _insight_response(db, user, "spending_anomalies")
     except Exception:
         logger.exception("spending-anomalies failed for user %s", user.id)
         # Fallback response
@@ -233,10 +233,7 @@ async def get_savings_optimization(
 ):
     """Get AI-powered savings optimization suggestions"""
     try:
-        optimization_data = await db.run_sync(
-            lambda s: AIFinancialAnalyzer(s, user.id).generate_savings_optimization()
-        )
-        return success_response(optimization_data)
+        return await _insight_response(db, user, "savings_optimization")
     except Exception:
         logger.exception("savings-optimization failed for user %s", user.id)
         # Fallback response
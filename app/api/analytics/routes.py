@@ -3,7 +3,6 @@ from decimal import Decimal
 from typing import Any, Dict
 
 from fastapi import APIRouter, Body, Depends
-from sqlalchemy import and_, extract, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
@@ -30,6 +29,12 @@ from app.services.analytics_service import (
     get_monthly_category_totals,
     get_monthly_trend,
 )
+from app.services.transaction_rollups import (
+    RollupStats,
+    cells_query,
+    monthly_totals_query,
+    trailing_days,
+)
 from app.utils.response_wrapper import success_response
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -82,24 +87,11 @@ async def get_behavioral_insights(
     db: AsyncSession = Depends(get_async_db),
 ):
     """Get behavioral insights from analytics"""
-    from datetime import datetime, timedelta, timezone
-
-    from app.db.models import Transaction
-
-    # Calculate behavioral insights from real transaction data
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    # Last 30 UTC days of the rollup cube: one row per active (day, category)
+    start, end = trailing_days(30)
+    cells = (await db.execute(cells_query(user.id, start, end))).all()
 
-    # Get transactions from last 30 days
-    result = await db.execute(
-        select(Transaction).filter(
-            and_(
-                Transaction.user_id == user.id, Transaction.spent_at >= thirty_days_ago
-            )
-        )
-    )
-    transactions = result.scalars().all()
-
-    if not transactions:
+    if not cells:
         return success_response(
             {
                 "spending_behavior": "consistent",
@@ -116,31 +108,24 @@ async def get_behavioral_insights(
             }
         )
 
-    # Calculate insights from real data
-    total_spending = sum(
-        t.amount for t in transactions if t.amount is not None
-    ) or Decimal("0")
-    transaction_count = len(transactions)
-    avg_transaction = (
-        total_spending / transaction_count if transaction_count > 0 else Decimal("0")
-    )
+    # Calculate insights from the rolled-up real data
+    stats = RollupStats()
+    weekend_spending = Decimal("0")
+    category_spending = {}
+    for day, category, count, amount_sum, amount_sumsq in cells:
+        stats.count += count
+        stats.total += amount_sum
+        stats.sum_squares += amount_sumsq
+        if day.weekday() >= 5:
+            weekend_spending += amount_sum
+        category_spending[category] = (
+            category_spending.get(category, Decimal("0")) + amount_sum
+        )
 
-    # Weekend vs weekday spending
-    weekend_spending = sum(
-        t.amount
-        for t in transactions
-        if t.spent_at.weekday() >= 5 and t.amount is not None
-    ) or Decimal("0")
+    total_spending = stats.total
+    avg_transaction = total_spending / stats.count if stats.count else Decimal("0")
     weekday_spending = total_spending - weekend_spending
 
-    # Category analysis
-    category_spending = {}
-    for t in transactions:
-        if t.amount is not None:
-            category_spending[t.category] = (
-                category_spending.get(t.category, Decimal("0")) + t.amount
-            )
-
     top_category = (
         max(category_spending.items(), key=lambda x: x[1])[0]
         if category_spending
@@ -162,12 +147,8 @@ async def get_behavioral_insights(
         recommendations.append("Consider meal planning to reduce food costs")
 
     # Risk score based on spending volatility (using float for statistical calculations)
-    amounts = [float(t.amount) for t in transactions if t.amount is not None]
-    avg_amount = sum(amounts) / len(amounts) if amounts else 0
-    variance = (
-        sum((x - avg_amount) ** 2 for x in amounts) / len(amounts) if amounts else 0
-    )
-    risk_score = min(1.0, variance / (avg_amount**2) if avg_amount > 0 else 0)
+    avg_amount = stats.mean
+    risk_score = min(1.0, stats.variance / (avg_amount**2) if avg_amount > 0 else 0)
 
     return success_response(
         {
@@ -354,22 +335,9 @@ async def get_seasonal_patterns(
     from collections import defaultdict
     from datetime import datetime, timezone
 
-    from app.db.models import Transaction
-
-    # Analyze historical data for seasonal trends
-    # Get all transactions grouped by month
-    result = await db.execute(
-        select(
-            extract("month", Transaction.spent_at).label("month"),
-            extract("year", Transaction.spent_at).label("year"),
-            func.sum(Transaction.amount).label("total"),
-        )
-        .filter(Transaction.user_id == user.id)
-        .group_by(
-            extract("month", Transaction.spent_at),
-            extract("year", Transaction.spent_at),
-        )
-    )
+    # Analyze historical data for seasonal trends: monthly totals come
+    # straight from the rollup cube (a primary key range per user)
+    result = await db.execute(monthly_totals_query(user.id))
     monthly_spending = result.all()
 
     if not monthly_spending or len(monthly_spending) < 3:
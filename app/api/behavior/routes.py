@@ -20,6 +20,12 @@ from app.engine.behavior.spending_pattern_extractor import extract_patterns
 # Import behavioral services
 from app.services.core.behavior.behavior_service import analyze_user_behavior
 from app.services.core.engine.user_behavior_predictor import predict_spending_behavior
+from app.services.transaction_rollups import (
+    RollupStats,
+    day_start_utc,
+    month_range,
+    stats_query,
+)
 from app.utils.response_wrapper import success_response
 
 router = APIRouter(prefix="/behavior", tags=["behavior"])
@@ -106,33 +112,20 @@ def get_behavioral_anomalies(
     db: Session = Depends(get_db),
 ):
     """Get spending anomalies and unusual patterns"""
-    import statistics
-    from datetime import datetime
-
     from app.db.models import Transaction
 
     now = datetime.now(timezone.utc)
     year = year or now.year
     month = month or now.month
 
-    # Get transactions for the month
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1)
-    else:
-        end_date = datetime(year, month + 1, 1)
-
-    transactions = (
-        db.query(Transaction)
-        .filter(
-            Transaction.user_id == user.id,
-            Transaction.spent_at >= start_date,
-            Transaction.spent_at < end_date,
-        )
-        .all()
+    # Mean and spread of the month come from the rollup cube; only the
+    # transactions above the threshold are loaded
+    start_day, end_day = month_range(year, month)
+    stats = RollupStats.from_row(
+        db.execute(stats_query(user.id, start_day, end_day)).one()
     )
 
-    if len(transactions) < 5:
+    if stats.count < 5:
         return success_response(
             {
                 "anomalies": [],
@@ -143,38 +136,47 @@ def get_behavioral_anomalies(
         )
 
     # Calculate statistical anomalies (using float for statistics)
-    amounts = [float(t.amount) for t in transactions if t.amount is not None]
-    mean_amount = statistics.mean(amounts)
-    stdev_amount = statistics.stdev(amounts) if len(amounts) > 1 else 0
+    mean_amount = stats.mean
+    stdev_amount = stats.sample_stdev
     threshold = mean_amount + (2.5 * stdev_amount)
 
+    transactions = (
+        db.query(Transaction)
+        .filter(
+            Transaction.user_id == user.id,
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= day_start_utc(start_day),
+            Transaction.spent_at < day_start_utc(end_day),
+            Transaction.amount > threshold,
+        )
+        .order_by(Transaction.spent_at)
+        .all()
+    )
+
     anomalies = []
     unusual_transactions = []
 
     for txn in transactions:
-        if txn.amount is None:
-            continue
         amount = float(txn.amount)
-        if amount > threshold:
-            anomalies.append(
-                {
-                    "type": "high_spending",
-                    "severity": "warning" if amount < threshold * 1.5 else "critical",
-                    "amount": amount,
-                    "category": txn.category or "uncategorized",
-                    "date": txn.spent_at.isoformat(),
-                    "description": f"Spending {amount:.2f} is {((amount/mean_amount - 1) * 100):.0f}% above your average",
-                }
-            )
-            unusual_transactions.append(
-                {
-                    "id": str(txn.id),
-                    "amount": amount,
-                    "category": txn.category,
-                    "merchant": txn.merchant_name,
-                    "date": txn.spent_at.isoformat(),
-                }
-            )
+        anomalies.append(
+            {
+                "type": "high_spending",
+                "severity": "warning" if amount < threshold * 1.5 else "critical",
+                "amount": amount,
+                "category": txn.category or "uncategorized",
+                "date": txn.spent_at.isoformat(),
+                "description": f"Spending {amount:.2f} is {((amount/mean_amount - 1) * 100):.0f}% above your average",
+            }
+        )
+        unusual_transactions.append(
+            {
+                "id": str(txn.id),
+                "amount": amount,
+                "category": txn.category,
+                "merchant": txn.merchant,
+                "date": txn.spent_at.isoformat(),
+            }
+        )
 
     # Generate alerts
     alerts = []
@@ -1,14 +1,16 @@
 import inspect
 import logging
+import zlib
 from calendar import monthrange
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 logger = logging.getLogger(__name__)
 
-from fastapi import APIRouter, Body, Depends
-from sqlalchemy import func, select
+from fastapi import APIRouter, Body, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user
@@ -28,15 +30,19 @@ from app.services.core.engine.budget_forecast_engine import (
     DailyPlanData,
     GoalData,
     compute_forecast,
+    compute_probabilistic_forecast,
 )
 from app.services.core.engine.budget_logic import generate_budget_from_answers
 from app.services.core.engine.budget_mode_selector import resolve_budget_mode
 from app.services.core.engine.budget_suggestion_engine import suggest_budget_adjustments
+from app.services.core.engine.expense_tracker import local_day_of
 from app.services.core.income_classification_service import IncomeClassificationService
 from app.utils.response_wrapper import success_response
 
 from app.api.budget.services import fetch_remaining_budget  # isort:skip
 from app.api.budget.services import fetch_spent_by_category  # isort:skip
+from app.api.budget.services import compute_live_budget_status  # isort:skip
+from app.api.budget.services import fetch_daily_spend_history  # isort:skip
 
 
 router = APIRouter(prefix="/budget", tags=["budget"])
@@ -348,6 +354,7 @@ async def get_redistribution_history(
 async def get_budget_forecast(
     year: Optional[int] = None,
     month: Optional[int] = None,
+    mode: Literal["linear", "probabilistic"] = "linear",
     user: User = Depends(get_current_user),  # noqa: B008
     db: AsyncSession = Depends(get_async_db),  # noqa: B008
 ):
@@ -362,6 +369,10 @@ async def get_budget_forecast(
     - categories_at_risk: categories burning > 120% of planned daily rate
     - all_categories: full per-category breakdown
     - goals: projection for each active savings goal
+
+    mode=probabilistic adds "simulation": 10,000 month-end trajectories
+    bootstrapped from the user's last 90 days of spending, with P10/P50/P90
+    balances and overshoot probabilities overall, per category and per goal.
     """
     now = datetime.now(timezone.utc)
     target_year = year or now.year
@@ -431,6 +442,23 @@ async def get_budget_forecast(
     ]
 
     # ── Run pure computation ──────────────────────────────────────────────────
+    if mode == "probabilistic":
+        # The user's calendar day — history days are local days too
+        today = local_day_of(now, user.timezone)
+        history = await fetch_daily_spend_history(db, user.id, user.timezone, today)
+        # Seeded per user and day: polling the endpoint gives stable numbers
+        seed = zlib.crc32(f"{user.id}:{today.isoformat()}".encode())
+        simulated = compute_probabilistic_forecast(
+            daily_plans=plan_data,
+            goals=goal_data,
+            history=history,
+            year=target_year,
+            month=target_month,
+            today=today,
+            seed=seed,
+        )
+        return success_response(simulated.to_dict())
+
     forecast = compute_forecast(
         daily_plans=plan_data,
         goals=goal_data,
@@ -663,89 +691,50 @@ async def get_live_budget_status(
     db: AsyncSession = Depends(get_async_db),  # noqa: B008
 ):
     """Get real-time budget status"""
-    from app.core.date_utils import day_to_range
-    from app.db.models import Transaction
-    from app.services.core.engine.expense_tracker import (
-        local_day_of,
-        local_day_utc_window,
+    status_data = await compute_live_budget_status(
+        db, user.id, user.timezone, user.monthly_income
     )
+    return success_response(status_data)
 
-    now = datetime.now(timezone.utc)
-    # "Today" is the USER's calendar day, not the UTC date — at 01:00 in
-    # Sofia the UTC date is still yesterday and every daily figure was off.
-    today_local = local_day_of(now, user.timezone)
-
-    # Get today's plan rows. There is one DailyPlan row PER CATEGORY per day,
-    # so scalar_one_or_none() raised MultipleResultsFound -> 500 on every
-    # onboarded user. Aggregate across categories over the full day range
-    # (DailyPlan.date is timestamptz; an equality against a date misses rows
-    # stored at non-midnight times).
-    day_start, day_end = day_to_range(today_local)
-    result = await db.execute(
-        select(
-            func.coalesce(func.sum(DailyPlan.daily_budget), 0),
-            func.coalesce(func.sum(DailyPlan.spent_amount), 0),
-        ).where(
-            DailyPlan.user_id == user.id,
-            DailyPlan.date >= day_start,
-            DailyPlan.date <= day_end,
-        )
-    )
-    daily_budget_total, spent_today_total = result.one()
-    daily_budget_val = float(daily_budget_total or 0)
-    spent_today_val = float(spent_today_total or 0)
 
-    # Overall day status: worst category status for today (over > warning > good)
-    status_result = await db.execute(
-        select(DailyPlan.status).where(
-            DailyPlan.user_id == user.id,
-            DailyPlan.date >= day_start,
-            DailyPlan.date <= day_end,
-        )
-    )
-    statuses = [s for (s,) in status_result.all() if s]
-    if "over" in statuses or "red" in statuses:
-        day_status = "over"
-    elif "warning" in statuses or "yellow" in statuses:
-        day_status = "warning"
-    elif statuses:
-        day_status = "good"
-    else:
-        day_status = "neutral"
+@router.get("/live_status/stream")
+async def stream_live_budget_status(
+    request: Request,
+    user: User = Depends(get_current_user),  # noqa: B008
+    db: AsyncSession = Depends(get_async_db),  # noqa: B008
+):
+    """Server-Sent Events stream of the live budget status
 
-    # Calculate monthly spending from transactions (exclude soft-deleted).
-    # Month boundary follows the user's local calendar month, expressed as
-    # the UTC instant that local month began.
-    month_start, _ = local_day_utc_window(
-        today_local.replace(day=1), user.timezone
-    )
-    result = await db.execute(
-        select(func.coalesce(func.sum(Transaction.amount), 0)).where(
-            Transaction.user_id == user.id,
-            Transaction.deleted_at.is_(None),
-            Transaction.spent_at >= month_start,
-        )
-    )
-    monthly_spent = Decimal(result.scalar() or 0)
-    monthly_budget = float(user.monthly_income) if user.monthly_income else 0.0
-    on_track = (
-        float(monthly_spent) <= (monthly_budget * (today_local.day / 30.0))
-        if monthly_budget > 0
-        else True
-    )
+    Sends the full live_status payload as a `status` event, then a `delta`
+    event with only the changed fields whenever the user's transactions or
+    daily plan change. Idle connections receive a keepalive comment. Clients
+    can stop polling /live_status, /dashboard and /forecast and refetch those
+    only when a delta arrives.
+    """
+    from app.core.async_session import get_async_session_factory
+    from app.services.budget_live_updates import live_status_events
 
-    status_data = {
-        "date": today_local.isoformat(),
-        "daily_budget": daily_budget_val,
-        "spent_today": spent_today_val,
-        "remaining_today": daily_budget_val - spent_today_val,
-        "status": day_status,
-        "monthly_budget": monthly_budget,
-        "monthly_spent": round(float(monthly_spent), 2),
-        "on_track": on_track,
-    }
+    user_id, user_timezone, monthly_income = (
+        user.id,
+        user.timezone,
+        user.monthly_income,
+    )
+    # Give the auth session's connection back to the pool: the stream can
+    # stay open for hours and each recompute opens its own short session
+    await db.close()
+    session_factory = get_async_session_factory()
+
+    async def load_status():
+        async with session_factory() as session:
+            return await compute_live_budget_status(
+                session, user_id, user_timezone, monthly_income
+            )
 
-    return success_response(status_data)
+    return StreamingResponse(
+        live_status_events(user_id, load_status, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.patch("/automation_settings")
@@ -1,12 +1,21 @@
 import logging
-from typing import Any, Dict
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.error_handler import MITAException
+from app.db.models.daily_plan import DailyPlan
+from app.db.models.transaction import Transaction
+from app.services.core.engine.budget_forecast_engine import HISTORY_DAYS, DailySpendData
 from app.services.core.engine.budget_tracker import BudgetTracker
+from app.services.core.engine.expense_tracker import local_day_of, local_day_utc_window
 
 logger = logging.getLogger(__name__)
 
@@ -95,3 +104,122 @@ def fetch_remaining_budget(
             message="Failed to fetch budget data",
             details={"user_id": user_id, "year": year, "month": month},
         )
+
+
+async def compute_live_budget_status(
+    db: AsyncSession,
+    user_id: UUID,
+    user_timezone: Optional[str],
+    monthly_income: Optional[Decimal],
+) -> Dict[str, Any]:
+    """Today's plan totals and month-to-date spending for the live status views"""
+    from app.core.date_utils import day_to_range
+    from app.db.models import Transaction
+    from app.services.core.engine.expense_tracker import (
+        local_day_of,
+        local_day_utc_window,
+    )
+
+    now = datetime.now(timezone.utc)
+    # "Today" is the USER's calendar day, not the UTC date — at 01:00 in
+    # Sofia the UTC date is still yesterday and every daily figure was off.
+    today_local = local_day_of(now, user_timezone)
+
+    # Get today's plan rows. There is one DailyPlan row PER CATEGORY per day,
+    # so scalar_one_or_none() raised MultipleResultsFound -> 500 on every
+    # onboarded user. Aggregate across categories over the full day range
+    # (DailyPlan.date is timestamptz; an equality against a date misses rows
+    # stored at non-midnight times).
+    day_start, day_end = day_to_range(today_local)
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(DailyPlan.daily_budget), 0),
+            func.coalesce(func.sum(DailyPlan.spent_amount), 0),
+        ).where(
+            DailyPlan.user_id == user_id,
+            DailyPlan.date >= day_start,
+            DailyPlan.date <= day_end,
+        )
+    )
+    daily_budget_total, spent_today_total = result.one()
+    daily_budget_val = float(daily_budget_total or 0)
+    spent_today_val = float(spent_today_total or 0)
+
+    # Overall day status: worst category status for today (over > warning > good)
+    status_result = await db.execute(
+        select(DailyPlan.status).where(
+            DailyPlan.user_id == user_id,
+            DailyPlan.date >= day_start,
+            DailyPlan.date <= day_end,
+        )
+    )
+    statuses = [s for (s,) in status_result.all() if s]
+    if "over" in statuses or "red" in statuses:
+        day_status = "over"
+    elif "warning" in statuses or "yellow" in statuses:
+        day_status = "warning"
+    elif statuses:
+        day_status = "good"
+    else:
+        day_status = "neutral"
+
+    # Calculate monthly spending from transactions (exclude soft-deleted).
+    # Month boundary follows the user's local calendar month, expressed as
+    # the UTC instant that local month began.
+    month_start, _ = local_day_utc_window(today_local.replace(day=1), user_timezone)
+    result = await db.execute(
+        select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= month_start,
+        )
+    )
+    monthly_spent = Decimal(result.scalar() or 0)
+    monthly_budget = float(monthly_income) if monthly_income else 0.0
+    on_track = (
+        float(monthly_spent) <= (monthly_budget * (today_local.day / 30.0))
+        if monthly_budget > 0
+        else True
+    )
+
+    return {
+        "date": today_local.isoformat(),
+        "daily_budget": daily_budget_val,
+        "spent_today": spent_today_val,
+        "remaining_today": daily_budget_val - spent_today_val,
+        "status": day_status,
+        "monthly_budget": monthly_budget,
+        "monthly_spent": round(float(monthly_spent), 2),
+        "on_track": on_track,
+    }
+
+
+async def fetch_daily_spend_history(
+    db: AsyncSession, user_id: UUID, user_timezone: Optional[str], today: date
+) -> List[DailySpendData]:
+    """Spend per local day and category over the HISTORY_DAYS before today.
+
+    Days are the user's calendar days: the UTC window is bounded by local
+    midnights and each transaction is bucketed by local_day_of, so a late
+    evening purchase east of UTC is not booked on the next day.
+    """
+    window_start, _ = local_day_utc_window(
+        today - timedelta(days=HISTORY_DAYS), user_timezone
+    )
+    window_end, _ = local_day_utc_window(today, user_timezone)
+    result = await db.execute(
+        select(Transaction.spent_at, Transaction.category, Transaction.amount).where(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= window_start,
+            Transaction.spent_at < window_end,
+        )
+    )
+    totals: Dict[tuple, Decimal] = defaultdict(Decimal)
+    for spent_at, category, amount in result.all():
+        day = local_day_of(spent_at, user_timezone)
+        totals[(day, category or "other")] += Decimal(str(amount or 0))
+    return [
+        DailySpendData(date=day, category=category, amount=amount)
+        for (day, category), amount in totals.items()
+    ]
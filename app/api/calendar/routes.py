@@ -2,7 +2,7 @@ import logging
 from collections import defaultdict
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
 from sqlalchemy import extract
 from sqlalchemy.orm import Session
 
@@ -42,6 +42,7 @@ from app.services.calendar_service import (
     generate_shell_calendar,
     update_day,
 )
+from app.services.sync_feed import etag_by_sync_version
 from app.utils.response_wrapper import success_response
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
@@ -280,7 +281,9 @@ def get_current_month_calendar(
 
 
 @router.get("/saved/{year}/{month}")
+@etag_by_sync_version
 def get_saved_calendar(
+    request: Request,
     year: int,
     month: int,
     user=Depends(get_current_user),  # noqa: B008
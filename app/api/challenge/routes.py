@@ -5,8 +5,8 @@ Connects challenge services to mobile app
 
 from typing import Any, Dict, List
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
-from sqlalchemy import and_, desc, func, select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -23,6 +23,7 @@ from app.api.dependencies import get_current_user
 from app.core.async_session import get_async_db
 from app.db.models.user import User
 from app.schemas.challenge import ChallengeEligibilityRequest
+from app.services import challenge_leaderboard
 from app.services.challenge_service import check_eligibility
 from app.utils.response_wrapper import success_response
 
@@ -547,46 +548,27 @@ async def get_active_challenges(
 # be captured as a challenge_id (the leaderboard was unreachable).
 @router.get("/leaderboard")
 async def get_challenge_leaderboard(
+    period: str = Query("all_time", description="all_time, month (current) or YYYY-MM"),
+    limit: int = Query(10, ge=1, le=100),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db),
 ):
-    """Get challenge leaderboard"""
-    from app.db.models import ChallengeParticipation
-
-    # Count completed challenges per user
-    result = await db.execute(
-        select(
-            ChallengeParticipation.user_id,
-            func.count(ChallengeParticipation.id).label("completed_count"),
-        )
-        .filter(ChallengeParticipation.status == "completed")
-        .group_by(ChallengeParticipation.user_id)
-        .order_by(desc("completed_count"))
-        .limit(10)
-    )
-    leaderboard_query = result.all()
+    """Get challenge leaderboard
 
-    top_users = []
-    user_rank = None
-    for idx, (uid, count) in enumerate(leaderboard_query, 1):
-        top_users.append(
-            {"rank": idx, "user_id": str(uid), "completed_challenges": count}
+    Served from the sorted-set leaderboards: top users plus the caller's
+    exact rank and percentile, whether or not they made the top list.
+    """
+    try:
+        board = challenge_leaderboard.resolve_period(period)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="period must be all_time, month or YYYY-MM",
         )
-        if uid == user.id:
-            user_rank = idx
 
-    # Total participants
-    result = await db.execute(
-        select(func.count(func.distinct(ChallengeParticipation.user_id)))
+    leaderboard = await challenge_leaderboard.get_challenge_leaderboard().standings(
+        db, user.id, period=board, limit=limit
     )
-    total_participants = result.scalar() or 0
-
-    leaderboard = {
-        "top_users": top_users,
-        "user_rank": user_rank,
-        "total_participants": total_participants,
-        "period": "all_time",
-    }
     return success_response(leaderboard)
 
 
@@ -1,44 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_user
+from app.core.session import get_db
 from app.schemas.cluster import FitRequest, LabelResult
-from app.services.cluster_service import get_user_cluster_label
+from app.services.cluster_service import get_cluster_centroids, get_user_cluster
 from app.utils.response_wrapper import success_response
 
 router = APIRouter(prefix="/cluster", tags=["cluster"])
 
-_DEFERRED_DETAIL = (
-    "Cohort clustering is a deferred feature and is not implemented yet: the "
-    "mounted request schema (a list of feature rows) has never matched the "
-    "in-memory KMeans engine input (a dict of per-user profile/calendar/mood "
-    "blobs), and per-process in-memory model state cannot serve a "
-    "multi-worker deployment."
+_FIT_DETAIL = (
+    "Cohort clusters are trained from the database by the nightly cohort "
+    "model job (see cron_task_cohort_model); client-supplied feature rows "
+    "are not a training input."
 )
 
 
 @router.post("/fit", deprecated=True)
 async def fit_model(request: FitRequest, user=Depends(get_current_user)):  # noqa: B008
-    """DEFERRED — no backing implementation (answered 500 on every call).
+    """DEFERRED — training runs server-side on a schedule.
 
     Per the TASK-15 policy, a deferred feature answers 501 explicitly
     instead of a permanent 500.
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=_DEFERRED_DETAIL
-    )
+    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=_FIT_DETAIL)
 
 
 @router.post("/label", response_model=LabelResult)
-async def get_user_label(user=Depends(get_current_user)):
-    """Best-effort cluster label; 'Unknown Cluster' until a model exists."""
-    result = get_user_cluster_label(user.id)
-    return success_response(result)
-
-
-@router.get("/centroids", deprecated=True)
-async def get_centroids():
-    """DEFERRED — the in-memory model is never fitted (see /fit), so centroid
-    access raised AttributeError -> 500 on every call."""
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=_DEFERRED_DETAIL
-    )
+def get_user_label(
+    user=Depends(get_current_user),  # noqa: B008
+    db: Session = Depends(get_db),  # noqa: B008
+):
+    """The user's persisted cohort; assigned by nearest centroid on first
+    request, 'Unknown Cluster' (-1) until a model has been trained."""
+    return success_response(get_user_cluster(db, user.id))
+
+
+@router.get("/centroids")
+def get_centroids(db: Session = Depends(get_db)):  # noqa: B008
+    """Centroids (in the model's log-scaled feature space) and sizes of the
+    persisted cohort model; empty until the first training run."""
+    return success_response(get_cluster_centroids(db))
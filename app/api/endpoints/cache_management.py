@@ -301,8 +301,7 @@ async def clear_all_cache(
 
     try:
         # Clear memory cache
-        get_cache_manager().memory_cache.cache.clear()
-        get_cache_manager().memory_cache.access_order.clear()
+        get_cache_manager().memory_cache.clear()
 
         # Clear Redis cache (if available)
         if get_cache_manager().redis_cache.redis_client:
@@ -340,10 +339,10 @@ async def get_top_cache_keys(
     try:
         # Get top keys from memory cache
         memory_entries = []
-        for key, entry in get_cache_manager().memory_cache.cache.items():
+        for entry in get_cache_manager().memory_cache.entries():
             memory_entries.append(
                 {
-                    "key": key,
+                    "key": entry.key,
                     "access_count": entry.access_count,
                     "size_bytes": entry.size_bytes,
                     "created_at": entry.created_at.isoformat(),
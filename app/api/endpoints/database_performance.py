@@ -15,6 +15,7 @@ from app.core.database_monitoring import (
     db_engine,
     get_database_performance_stats,
 )
+from app.core.query_budget import get_query_budget_report
 from app.db.models import User
 
 router = APIRouter(prefix="/database", tags=["database_performance"])
@@ -271,6 +272,32 @@ async def get_connection_pool_status(
         )
 
 
+@router.get("/queries/by-route", summary="Per-Route Query Budget")
+async def get_queries_by_route(
+    limit: int = Query(20, description="Number of routes to return", ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_admin_access),
+):
+    """
+    Get per-route SQL query counts and database time
+
+    Requires admin access. Returns, for each route seen by this process:
+    - p50/p95/max queries per request
+    - p95 database time per request
+    - Number of requests over the configured query budget
+    """
+    try:
+        report = get_query_budget_report(limit=limit)
+        report["generated_at"] = datetime.now().isoformat()
+        return report
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting per-route query statistics: {str(e)}",
+        )
+
+
 @router.get("/optimization-report", summary="Database Optimization Report")
 async def get_optimization_report(
     days: int = Query(7, description="Number of days to analyze", ge=1, le=30),
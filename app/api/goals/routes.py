@@ -8,9 +8,9 @@ from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field, validator
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.base_crud import AsyncCRUDHelper
@@ -22,8 +22,10 @@ from app.services.core.engine.goal_budget_sync import (
     sync_goal_to_daily_plan,
 )
 from app.services.goal_budget_integration import get_goal_budget_integration
+from app.services.goal_statistics import get_goal_statistics_cache
 from app.services.notification_integration import get_notification_integration
 from app.services.smart_goal_advisor import get_smart_goal_advisor
+from app.services.sync_feed import etag_by_sync_version
 from app.utils.response_wrapper import success_response
 
 router = APIRouter(prefix="/goals", tags=["goals"])
@@ -222,6 +224,7 @@ async def create_goal(
     db.add(goal)
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Reserve daily savings in DailyPlan (SACRED rows) for this goal.
     # Non-blocking: budget sync failure must not prevent goal creation.
@@ -257,7 +260,9 @@ async def create_goal(
 
 
 @router.get("/", response_model=List[GoalOut])
+@etag_by_sync_version
 async def list_goals(
+    request: Request,
     status: Optional[str] = Query(
         None, description="Filter by status: active, completed, paused"
     ),
@@ -286,107 +291,8 @@ async def get_statistics(
     db: AsyncSession = Depends(get_db),  # noqa: B008
 ):
     """Get comprehensive goal statistics for the user"""
-
-    # Count goals by status
-    total_goals = (
-        await db.execute(select(func.count(Goal.id)).where(Goal.user_id == user.id))
-    ).scalar() or 0
-    active_goals = (
-        await db.execute(
-            select(func.count(Goal.id)).where(
-                and_(Goal.user_id == user.id, Goal.status == "active")
-            )
-        )
-    ).scalar() or 0
-    completed_goals = (
-        await db.execute(
-            select(func.count(Goal.id)).where(
-                and_(Goal.user_id == user.id, Goal.status == "completed")
-            )
-        )
-    ).scalar() or 0
-    paused_goals = (
-        await db.execute(
-            select(func.count(Goal.id)).where(
-                and_(Goal.user_id == user.id, Goal.status == "paused")
-            )
-        )
-    ).scalar() or 0
-
-    # Calculate averages
-    avg_progress = (
-        await db.execute(
-            select(func.avg(Goal.progress)).where(
-                and_(Goal.user_id == user.id, Goal.status == "active")
-            )
-        )
-    ).scalar() or 0.0
-
-    # Calculate totals
-    total_target = (
-        await db.execute(
-            select(func.sum(Goal.target_amount)).where(
-                and_(Goal.user_id == user.id, Goal.status == "active")
-            )
-        )
-    ).scalar() or 0.0
-    total_saved = (
-        await db.execute(
-            select(func.sum(Goal.saved_amount)).where(
-                and_(Goal.user_id == user.id, Goal.status == "active")
-            )
-        )
-    ).scalar() or 0.0
-
-    # Count overdue and due soon
-    from datetime import date, timedelta
-
-    today = date.today()
-    soon_date = today + timedelta(days=7)
-
-    overdue_count = (
-        await db.execute(
-            select(func.count(Goal.id)).where(
-                and_(
-                    Goal.user_id == user.id,
-                    Goal.status == "active",
-                    Goal.target_date < today,
-                    Goal.target_date.isnot(None),
-                )
-            )
-        )
-    ).scalar() or 0
-
-    due_soon_count = (
-        await db.execute(
-            select(func.count(Goal.id)).where(
-                and_(
-                    Goal.user_id == user.id,
-                    Goal.status == "active",
-                    Goal.target_date <= soon_date,
-                    Goal.target_date >= today,
-                    Goal.target_date.isnot(None),
-                )
-            )
-        )
-    ).scalar() or 0
-
-    completion_rate = (completed_goals / total_goals * 100) if total_goals > 0 else 0.0
-
-    return success_response(
-        {
-            "total_goals": total_goals,
-            "active_goals": active_goals,
-            "completed_goals": completed_goals,
-            "paused_goals": paused_goals,
-            "completion_rate": round(completion_rate, 2),
-            "average_progress": round(float(avg_progress), 2),
-            "total_target_amount": float(total_target),
-            "total_saved_amount": float(total_saved),
-            "overdue_goals": overdue_count,
-            "due_soon": due_soon_count,
-        }
-    )
+    statistics = await get_goal_statistics_cache().get(db, user.id)
+    return success_response(statistics)
 
 
 @router.get("/income_based_suggestions")
@@ -733,6 +639,7 @@ async def update_goal(
 
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Re-sync DailyPlan reservations when financial parameters changed.
     if needs_sync:
@@ -772,6 +679,7 @@ async def delete_goal(
     await AsyncCRUDHelper.delete_user_resource_or_404(
         db, Goal, goal_id, user.id, "Goal not found"
     )
+    await get_goal_statistics_cache().ainvalidate(user.id)
     return success_response({"status": "deleted", "id": str(goal_id)})
 
 
@@ -800,6 +708,7 @@ async def add_savings_to_goal(
 
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Send notifications based on progress
     try:
@@ -859,6 +768,7 @@ async def mark_goal_completed(
 
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Goal completed — release future daily budget reservations.
     try:
@@ -911,6 +821,7 @@ async def pause_goal(
 
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Goal paused — release future daily budget reservations.
     try:
@@ -945,6 +856,7 @@ async def resume_goal(
 
     await db.commit()
     await db.refresh(goal)
+    await get_goal_statistics_cache().ainvalidate(user.id)
 
     # Goal resumed — recreate daily budget reservations.
     try:
@@ -988,6 +900,7 @@ async def auto_transfer_to_goal(
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
 
+        await get_goal_statistics_cache().ainvalidate(user.id)
         return success_response(result)
     except HTTPException:
         raise
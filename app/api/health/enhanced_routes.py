@@ -7,34 +7,53 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Query, status
 
-from app.core.async_session import get_async_db
+# Registers the "services" probe used by /health/comprehensive
+import app.api.health.routes  # noqa: F401
 from app.core.circuit_breaker import get_circuit_breaker_manager
-from app.core.config import settings
+from app.core.health_collector import HealthProbe, get_health_collector
 from app.core.middleware_health_monitor import HealthStatus, middleware_health_monitor
-from app.services.resilient_google_auth_service import get_google_auth_service
-from app.services.resilient_gpt_service import get_gpt_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def run_middleware_health_check():
+    """Full middleware check on its own session (probe "middleware")"""
+    from app.core.async_session import get_async_db_context
+
+    async with get_async_db_context() as session:
+        return (
+            await middleware_health_monitor.run_comprehensive_middleware_health_check(
+                session
+            )
+        )
+
+
+async def _middleware_report():
+    """Latest middleware report from the background health collector"""
+    probe = await get_health_collector().get("middleware")
+    if not probe.ok:
+        raise RuntimeError(f"Middleware health probe failed: {probe.error}")
+    return probe.value
+
+
+get_health_collector().register(
+    HealthProbe("middleware", run_middleware_health_check, interval=60, timeout=20)
+)
+
+
 @router.get("/health/comprehensive", response_model=Dict[str, Any])
-async def get_comprehensive_health(session: AsyncSession = Depends(get_async_db)):
+async def get_comprehensive_health():
     """
     Get comprehensive system health status including middleware validation
     This endpoint is designed to detect issues that could cause 8-15+ second timeouts
     """
     try:
         # Run comprehensive middleware health check
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         # Get circuit breaker health (existing functionality)
         try:
@@ -45,38 +64,12 @@ async def get_comprehensive_health(session: AsyncSession = Depends(get_async_db)
             circuit_breaker_health = {"overall_health": "degraded", "error": str(e)}
 
         # Get individual service health (existing functionality)
-        external_services_health = {}
-
-        # Check GPT service health (if configured)
-        try:
-            if hasattr(settings, "OPENAI_API_KEY") and settings.OPENAI_API_KEY:
-                gpt_service = get_gpt_service(settings.OPENAI_API_KEY)
-                external_services_health["gpt_service"] = (
-                    await gpt_service.get_service_health()
-                )
-            else:
-                external_services_health["gpt_service"] = {
-                    "status": "not_configured",
-                    "message": "OpenAI API key not configured",
-                }
-        except Exception as e:
-            logger.error(f"Error checking GPT service health: {str(e)}")
-            external_services_health["gpt_service"] = {
-                "status": "error",
-                "message": str(e),
-            }
-
-        # Check Google Auth service health
-        try:
-            google_auth_service = get_google_auth_service()
-            external_services_health["google_auth_service"] = (
-                await google_auth_service.get_service_health()
-            )
-        except Exception as e:
-            logger.error(f"Error checking Google Auth service health: {str(e)}")
-            external_services_health["google_auth_service"] = {
-                "status": "error",
-                "message": str(e),
+        services_probe = await get_health_collector().get("services")
+        if services_probe.ok:
+            external_services_health = services_probe.value
+        else:
+            external_services_health = {
+                "services": {"status": "error", "message": services_probe.error}
             }
 
         # Determine overall system health
@@ -118,6 +111,7 @@ async def get_comprehensive_health(session: AsyncSession = Depends(get_async_db)
             },
             "circuit_breakers": circuit_breaker_health,
             "external_services": external_services_health,
+            "checks": get_health_collector().snapshot(["middleware", "services"]),
             "alerts": middleware_report.alerts,
             "issues_detected": middleware_report.issues_detected,
             "recommendations": middleware_report.recommendations,
@@ -154,14 +148,10 @@ async def get_comprehensive_health(session: AsyncSession = Depends(get_async_db)
 
 
 @router.get("/health/middleware", response_model=Dict[str, Any])
-async def get_middleware_health(session: AsyncSession = Depends(get_async_db)):
+async def get_middleware_health():
     """Get detailed middleware health status"""
     try:
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         # Prepare detailed middleware metrics
         detailed_metrics = {}
@@ -183,6 +173,7 @@ async def get_middleware_health(session: AsyncSession = Depends(get_async_db)):
             "metrics": detailed_metrics,
             "performance_summary": middleware_report.performance_summary,
             "response_time_ms": middleware_report.response_time_ms,
+            "checks": get_health_collector().snapshot(["middleware"]),
             "alerts": middleware_report.alerts,
             "issues_detected": middleware_report.issues_detected,
             "recommendations": middleware_report.recommendations,
@@ -215,15 +206,11 @@ async def get_middleware_health(session: AsyncSession = Depends(get_async_db)):
 
 @router.get("/health/middleware/{component}", response_model=Dict[str, Any])
 async def get_component_health(
-    component: str, session: AsyncSession = Depends(get_async_db)
+    component: str,
 ):
     """Get health status of a specific middleware component"""
     try:
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         if component not in middleware_report.metrics:
             raise HTTPException(
@@ -270,14 +257,10 @@ async def get_component_health(
 
 
 @router.get("/health/performance", response_model=Dict[str, Any])
-async def get_performance_health(session: AsyncSession = Depends(get_async_db)):
+async def get_performance_health():
     """Get performance-focused health metrics to detect timeout risks"""
     try:
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         # Extract performance metrics
         performance_metrics = {}
@@ -456,14 +439,10 @@ async def get_health_history(
 
 
 @router.get("/health/alerts", response_model=Dict[str, Any])
-async def get_current_alerts(session: AsyncSession = Depends(get_async_db)):
+async def get_current_alerts():
     """Get current health alerts and critical issues"""
     try:
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         # Categorize alerts by severity
         critical_alerts = []
@@ -529,14 +508,10 @@ async def get_current_alerts(session: AsyncSession = Depends(get_async_db)):
 
 
 @router.get("/health/metrics", response_model=Dict[str, Any])
-async def get_health_metrics(session: AsyncSession = Depends(get_async_db)):
+async def get_health_metrics():
     """Get health metrics in Prometheus format for monitoring integration"""
     try:
-        middleware_report = (
-            await middleware_health_monitor.run_comprehensive_middleware_health_check(
-                session
-            )
-        )
+        middleware_report = await _middleware_report()
 
         # Convert to Prometheus format
         metrics = []
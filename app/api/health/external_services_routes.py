@@ -17,10 +17,20 @@ from app.core.external_services import (
     get_services_health,
     validate_external_services,
 )
+from app.core.health_collector import HealthProbe, get_health_collector
 
 router = APIRouter(prefix="/health", tags=["Health Check"])
 logger = logging.getLogger(__name__)
 
+# validate_external_services() refreshes the manager's health_status, which
+# the read endpoints below serve; the admin validate/test endpoints still
+# connect on demand.
+get_health_collector().register(
+    HealthProbe(
+        "external_services", validate_external_services, interval=300, timeout=30
+    )
+)
+
 
 @router.get("/")
 async def health_check():
@@ -36,7 +46,8 @@ async def health_check():
 async def check_external_services():
     """Check health of all external services"""
     try:
-        # Get current health status
+        # Current health status, refreshed by the background probe
+        await get_health_collector().get("external_services")
         health_status = get_services_health()
 
         # Determine HTTP status code based on health
@@ -55,6 +66,7 @@ async def check_external_services():
                 "last_check": health_status["last_check"],
             },
             "services": health_status["services"],
+            "checks": get_health_collector().snapshot(["external_services"]),
         }
 
     except Exception as e:
@@ -177,6 +189,7 @@ async def validate_all_api_keys(admin_user=Depends(require_admin_role)):
 async def check_critical_services():
     """Check status of critical services only"""
     try:
+        await get_health_collector().get("external_services")
         critical_status = get_critical_services_status()
 
         all_critical_healthy = all(critical_status.values())
@@ -197,6 +210,7 @@ async def check_critical_services():
             "critical_services": critical_status,
             "healthy_count": sum(critical_status.values()),
             "total_count": len(critical_status),
+            "checks": get_health_collector().snapshot(["external_services"]),
         }
 
     except Exception as e:
@@ -219,16 +233,10 @@ async def check_specific_service(service_name: str):
 
         service = external_services.services[service_name]
 
-        # Validate connection if possible
-        connected = False
-        error = None
-        try:
-            if hasattr(service, "validate_connection"):
-                connected = await service.validate_connection()
-            else:
-                connected = service.enabled
-        except Exception as e:
-            error = str(e)
+        # Connection state from the background probe's latest validation
+        await get_health_collector().get("external_services")
+        result = external_services.health_status.get(service_name, {})
+        connected = result.get("connected", False)
 
         service_status = (
             "healthy" if connected else "unhealthy" if service.enabled else "disabled"
@@ -239,9 +247,10 @@ async def check_specific_service(service_name: str):
             "status": service_status,
             "enabled": service.enabled,
             "connected": connected,
-            "error": error,
+            "error": result.get("error"),
             "timestamp": datetime.now().isoformat(),
             "config": service.get_config(),
+            "checks": get_health_collector().snapshot(["external_services"]),
         }
 
     except HTTPException:
@@ -11,12 +11,12 @@ from typing import Any, Dict, List
 
 import psutil
 import redis.asyncio as aioredis
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.async_session import get_async_session
 from app.core.config import settings
+from app.core.health_collector import HealthProbe, get_health_collector
 
 logger = logging.getLogger(__name__)
 
@@ -436,11 +436,33 @@ class ProductionHealthChecker:
 health_checker = ProductionHealthChecker()
 
 
+async def run_production_health_check() -> Dict[str, Any]:
+    """Comprehensive check on its own session (probe "production")"""
+    from app.core.async_session import get_async_db_context
+
+    async with get_async_db_context() as session:
+        return await health_checker.run_comprehensive_health_check(session)
+
+
+async def _production_report() -> Dict[str, Any]:
+    """Latest comprehensive report from the background health collector"""
+    collector = get_health_collector()
+    probe = await collector.get("production")
+    if not probe.ok:
+        raise RuntimeError(f"Production health probe failed: {probe.error}")
+    return {**probe.value, "checks": collector.snapshot(["production"])}
+
+
+get_health_collector().register(
+    HealthProbe("production", run_production_health_check, interval=30, timeout=15)
+)
+
+
 @router.get("/health/production", response_model=Dict[str, Any])
-async def production_health_check(session: AsyncSession = Depends(get_async_session)):
+async def production_health_check():
     """Comprehensive production health check endpoint"""
     try:
-        health_report = await health_checker.run_comprehensive_health_check(session)
+        health_report = await _production_report()
 
         # Return appropriate HTTP status based on health
         if health_report["overall_status"] == "unhealthy":
@@ -488,10 +510,10 @@ async def get_health_history():
 
 
 @router.get("/metrics", response_model=Dict[str, Any])
-async def prometheus_metrics(session: AsyncSession = Depends(get_async_session)):
+async def prometheus_metrics():
     """Metrics endpoint for Prometheus scraping"""
     try:
-        health_report = await health_checker.run_comprehensive_health_check(session)
+        health_report = await _production_report()
 
         # Convert to Prometheus format
         metrics = []
@@ -11,14 +11,50 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.api.dependencies import require_admin_access
 from app.core.circuit_breaker import get_circuit_breaker_manager
 from app.core.config import settings
+from app.core.health_collector import HealthProbe, get_health_collector
 from app.services.resilient_google_auth_service import get_google_auth_service
-from app.services.resilient_gpt_service import get_gpt_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def collect_services_health() -> Dict[str, Any]:
+    """GPT and Google Auth service health (probe "services")"""
+    services_health = {}
+
+    # Check GPT service health (if configured)
+    try:
+        if hasattr(settings, "OPENAI_API_KEY") and settings.OPENAI_API_KEY:
+            from app.services.resilient_gpt_service import get_gpt_service
+
+            gpt_service = get_gpt_service(settings.OPENAI_API_KEY)
+            services_health["gpt_service"] = await gpt_service.get_service_health()
+        else:
+            services_health["gpt_service"] = {
+                "status": "not_configured",
+                "message": "OpenAI API key not configured",
+            }
+    except Exception as e:
+        logger.error(f"Error checking GPT service health: {str(e)}")
+        services_health["gpt_service"] = {"status": "error", "message": str(e)}
+
+    # Check Google Auth service health
+    try:
+        google_auth_service = get_google_auth_service()
+        services_health["google_auth_service"] = (
+            await google_auth_service.get_service_health()
+        )
+    except Exception as e:
+        logger.error(f"Error checking Google Auth service health: {str(e)}")
+        services_health["google_auth_service"] = {
+            "status": "error",
+            "message": str(e),
+        }
+
+    return services_health
+
+
 @router.get("/health", response_model=Dict[str, Any])
 async def get_system_health():
     """Get overall system health status"""
@@ -26,41 +62,21 @@ async def get_system_health():
         circuit_breaker_manager = get_circuit_breaker_manager()
         health_summary = circuit_breaker_manager.get_health_summary()
 
-        # Get individual service health
-        services_health = {}
-
-        # Check GPT service health (if configured)
-        try:
-            if hasattr(settings, "OPENAI_API_KEY") and settings.OPENAI_API_KEY:
-                gpt_service = get_gpt_service(settings.OPENAI_API_KEY)
-                services_health["gpt_service"] = await gpt_service.get_service_health()
-            else:
-                services_health["gpt_service"] = {
-                    "status": "not_configured",
-                    "message": "OpenAI API key not configured",
-                }
-        except Exception as e:
-            logger.error(f"Error checking GPT service health: {str(e)}")
-            services_health["gpt_service"] = {"status": "error", "message": str(e)}
-
-        # Check Google Auth service health
-        try:
-            google_auth_service = get_google_auth_service()
-            services_health["google_auth_service"] = (
-                await google_auth_service.get_service_health()
-            )
-        except Exception as e:
-            logger.error(f"Error checking Google Auth service health: {str(e)}")
-            services_health["google_auth_service"] = {
-                "status": "error",
-                "message": str(e),
-            }
+        # Individual service health, from the background collector
+        collector = get_health_collector()
+        probe = await collector.get("services")
+        services_health = (
+            probe.value
+            if probe.ok
+            else {"error": {"status": "error", "message": probe.error}}
+        )
 
         return {
             "status": health_summary["overall_health"],
             "timestamp": "2024-01-01T00:00:00Z",  # Use actual timestamp in production
             "circuit_breakers": health_summary,
             "services": services_health,
+            "checks": collector.snapshot(["services"]),
             "message": _get_health_message(health_summary["overall_health"]),
         }
 
@@ -161,14 +177,15 @@ async def reset_circuit_breaker(
         )
 
 
-@router.get("/health/services/test-connections")
-async def test_external_connections():
-    """Test connections to external services"""
+async def check_service_connections() -> Dict[str, Any]:
+    """Round trips to OpenAI and Google OAuth (probe "connections")"""
     results = {}
 
     # Test GPT service connection
     try:
         if hasattr(settings, "OPENAI_API_KEY") and settings.OPENAI_API_KEY:
+            from app.services.resilient_gpt_service import get_gpt_service
+
             gpt_service = get_gpt_service(settings.OPENAI_API_KEY)
             results["openai"] = {
                 "connected": await gpt_service.test_connection(),
@@ -201,6 +218,20 @@ async def test_external_connections():
             "error": str(e),
         }
 
+    return results
+
+
+@router.get("/health/services/test-connections")
+async def test_external_connections():
+    """Test connections to external services
+
+    The round trips run in the background every few minutes; this returns
+    the latest outcome.
+    """
+    collector = get_health_collector()
+    probe = await collector.get("connections")
+    results = probe.value if probe.ok else {}
+
     # Calculate overall connectivity
     connected_services = sum(
         1 for result in results.values() if result.get("connected", False)
@@ -209,6 +240,7 @@ async def test_external_connections():
 
     return {
         "services": results,
+        "checks": collector.snapshot(["connections"]),
         "summary": {
             "connected_services": connected_services,
             "total_services": total_services,
@@ -232,3 +264,11 @@ def _get_health_message(health_status: str) -> str:
         "critical": "Multiple services are down, system functionality may be impacted",
     }
     return messages.get(health_status, "Unknown health status")
+
+
+get_health_collector().register(
+    HealthProbe("services", collect_services_health, interval=30, timeout=10)
+)
+get_health_collector().register(
+    HealthProbe("connections", check_service_connections, interval=300, timeout=20)
+)
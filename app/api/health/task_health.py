@@ -3,13 +3,15 @@ Task system health checks for MITA financial platform.
 Provides comprehensive health monitoring for the async task queue system.
 """
 
+import asyncio
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.limiter_setup import optional_rate_limit
 
+from app.core.health_collector import HealthProbe, get_health_collector
+from app.core.limiter_setup import optional_rate_limit
 from app.core.logger import get_logger
 from app.core.task_queue import get_task_queue
 from app.utils.response_wrapper import success_response
@@ -19,6 +21,31 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/health", tags=["health"])
 
 
+async def collect_task_system_health() -> Dict[str, Any]:
+    """Queue statistics and a Redis round trip (probe "task_queue")"""
+
+    def collect():
+        return {
+            "queue_stats": get_task_queue().get_queue_stats(),
+            "redis": _test_redis_connectivity(),
+        }
+
+    return await asyncio.to_thread(collect)
+
+
+async def _task_system_snapshot() -> Dict[str, Any]:
+    """Latest task system probe result from the background collector"""
+    probe = await get_health_collector().get("task_queue")
+    if not probe.ok:
+        raise RuntimeError(f"Task system probe failed: {probe.error}")
+    return probe.value
+
+
+get_health_collector().register(
+    HealthProbe("task_queue", collect_task_system_health, interval=15, timeout=10)
+)
+
+
 @router.get("/tasks")
 async def task_system_health():
     """
@@ -30,15 +57,14 @@ async def task_system_health():
     try:
         start_time = time.time()
 
-        # Get queue statistics
-        queue_stats = get_task_queue().get_queue_stats()
+        # Queue statistics and Redis connectivity, from the background probe
+        snapshot = await _task_system_snapshot()
+        queue_stats = snapshot["queue_stats"]
+        redis_health = snapshot["redis"]
 
         # Calculate health metrics
         health_metrics = _calculate_health_metrics(queue_stats)
 
-        # Test Redis connectivity
-        redis_health = _test_redis_connectivity()
-
         # Test worker connectivity
         worker_health = _test_worker_health(queue_stats)
 
@@ -60,6 +86,7 @@ async def task_system_health():
                 "system_load": health_metrics["system_load"],
             },
             "statistics": queue_stats,
+            "checks": get_health_collector().snapshot(["task_queue"]),
             "alerts": overall_health["alerts"],
             "recommendations": overall_health["recommendations"],
         }
@@ -145,11 +172,10 @@ async def task_system_readiness():
         Simple ready/not ready status
     """
     try:
-        # Quick checks for system readiness
-        redis_ready = get_task_queue().redis_conn.ping()
-        workers_available = (
-            len([w for w in get_task_queue().redis_conn.smembers("rq:workers")]) > 0
-        )
+        # Quick checks for system readiness, from the background probe
+        snapshot = await _task_system_snapshot()
+        redis_ready = snapshot["redis"]["status"] == "healthy"
+        workers_available = snapshot["queue_stats"]["workers"]["total"] > 0
 
         if redis_ready and workers_available:
             return success_response(
@@ -186,8 +212,9 @@ async def task_system_liveness():
         Simple alive/dead status
     """
     try:
-        # Basic liveness indicators
-        can_connect_redis = get_task_queue().redis_conn.ping()
+        # Basic liveness indicators, from the background probe
+        snapshot = await _task_system_snapshot()
+        can_connect_redis = snapshot["redis"]["status"] == "healthy"
 
         if can_connect_redis:
             return success_response(
@@ -25,13 +25,19 @@ from app.api.installments.schemas import (
     InstallmentCalendarEvent,
     InstallmentCreate,
     InstallmentOut,
+    InstallmentScenarioBatchInput,
+    InstallmentScenarioComparison,
     InstallmentsSummary,
     InstallmentUpdate,
     MonthlyInstallmentsCalendar,
     UserFinancialProfileCreate,
     UserFinancialProfileOut,
 )
-from app.api.installments.services import calculate_installment_risk
+from app.api.installments.services import (
+    calculate_installment_risk,
+    compare_installment_scenarios,
+    invalidate_financial_snapshot,
+)
 from app.core.async_session import get_async_db
 from app.db.models.installment import (
     Installment,
@@ -86,6 +92,39 @@ async def calculate_installment(
         )
 
 
+@router.post("/calculator/compare", response_model=InstallmentScenarioComparison)
+async def compare_installment_options(
+    batch_input: InstallmentScenarioBatchInput,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Compare several installment options in one request
+
+    Takes a grid of (amount, number of payments, interest rate) scenarios,
+    computes every amortization schedule and risk score in a single pass and
+    returns them ranked by risk, then total cost. Use this instead of calling
+    /calculator once per term option; nothing is saved.
+    """
+    try:
+        return await compare_installment_scenarios(
+            db=db, user_id=user.id, batch_input=batch_input
+        )
+    except ValueError as e:
+        logger.warning(
+            f"Validation error in installment comparison for user {user.id}: {str(e)}"
+        )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(
+            f"Error comparing installment scenarios for user {user.id}: {str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compare installment scenarios",
+        )
+
+
 # ===== FINANCIAL PROFILE ENDPOINTS =====
 
 
@@ -145,6 +184,7 @@ async def create_or_update_financial_profile(
 
         await db.commit()
         await db.refresh(profile)
+        await invalidate_financial_snapshot(user.id)
 
         return profile
 
@@ -266,6 +266,99 @@ class InstallmentCalculatorOutput(BaseModel):
         json_encoders = {Decimal: lambda v: str(v)}
 
 
+# ===== SCENARIO COMPARISON SCHEMAS =====
+
+
+class InstallmentScenario(BaseModel):
+    """One purchase amount / term / rate combination to evaluate"""
+
+    purchase_amount: condecimal(max_digits=12, decimal_places=2, ge=10, le=50000) = (
+        Field(..., description="Purchase amount in USD")
+    )
+    num_payments: int = Field(..., ge=2, le=48, description="Number of payments (2-48)")
+    interest_rate: condecimal(max_digits=5, decimal_places=2, ge=0, le=50) = Field(
+        0, description="Annual interest rate percentage (0-50%)"
+    )
+
+
+class InstallmentScenarioBatchInput(BaseModel):
+    """
+    Grid of installment options evaluated in one pass
+    Shared obligations apply to every scenario
+    """
+
+    category: InstallmentCategory = Field(..., description="Purchase category")
+    scenarios: List[InstallmentScenario] = Field(
+        ..., min_length=1, max_length=100, description="Scenarios to compare"
+    )
+    include_schedules: bool = Field(
+        False, description="Include full amortization schedules in the response"
+    )
+
+    # Financial profile (if not already saved)
+    monthly_income: Optional[condecimal(max_digits=12, decimal_places=2, gt=0)] = Field(
+        None, description="Monthly income if not in profile"
+    )
+    current_balance: Optional[condecimal(max_digits=12, decimal_places=2, ge=0)] = (
+        Field(None, description="Current balance if not in profile")
+    )
+    age_group: Optional[AgeGroup] = Field(
+        None, description="Age group if not in profile"
+    )
+
+    # Existing obligations
+    active_installments_count: int = Field(
+        0, ge=0, le=20, description="Number of active installments"
+    )
+    active_installments_monthly: condecimal(max_digits=12, decimal_places=2, ge=0) = (
+        Field(0, description="Total monthly payment for active installments")
+    )
+    credit_card_debt: bool = Field(False, description="Has credit card debt?")
+    other_monthly_obligations: condecimal(max_digits=12, decimal_places=2, ge=0) = (
+        Field(0, description="Other monthly financial obligations (loans, rent, etc.)")
+    )
+    planning_mortgage: bool = Field(False, description="Planning mortgage in 6 months?")
+
+
+class InstallmentScenarioResult(BaseModel):
+    """Payment and risk outcome of a single scenario"""
+
+    rank: int = Field(..., description="1 = lowest risk, then lowest total cost")
+    purchase_amount: Decimal
+    num_payments: int
+    interest_rate: Decimal
+    monthly_payment: Decimal
+    total_interest: Decimal
+    total_cost: Decimal
+    payment_to_income_ratio: Decimal
+    dti_ratio: Decimal
+    balance_after_first_payment: Decimal
+    risk_level: RiskLevel
+    risk_score: int = Field(..., ge=0, le=100)
+    verdict: str
+    risk_factors: List[str] = Field(
+        default_factory=list, description="Identifiers of triggered risk factors"
+    )
+    payment_schedule: Optional[List[Dict]] = Field(
+        None, description="Amortization schedule (when requested)"
+    )
+
+    class Config:
+        json_encoders = {Decimal: lambda v: str(v)}
+
+
+class InstallmentScenarioComparison(BaseModel):
+    """Ranked comparison of installment scenarios"""
+
+    scenarios: List[InstallmentScenarioResult]
+    recommended: InstallmentScenarioResult
+    monthly_income: Decimal
+    current_balance: Decimal
+
+    class Config:
+        json_encoders = {Decimal: lambda v: str(v)}
+
+
 # ===== INSTALLMENT MANAGEMENT SCHEMAS =====
 
 
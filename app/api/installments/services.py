@@ -12,11 +12,14 @@ Research-based thresholds (BNPL studies 2023-2024):
 """
 
 import json
+import logging
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
+from redis.exceptions import RedisError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,8 +27,12 @@ from app.api.installments.schemas import (
     AlternativeRecommendation,
     InstallmentCalculatorInput,
     InstallmentCalculatorOutput,
+    InstallmentScenarioBatchInput,
+    InstallmentScenarioComparison,
+    InstallmentScenarioResult,
     RiskFactor,
 )
+from app.core.shared_store import key_value_store, process_singleton
 from app.db.models.installment import (
     AgeGroup,
     InstallmentAchievement,
@@ -35,6 +42,8 @@ from app.db.models.installment import (
     UserFinancialProfile,
 )
 
+logger = logging.getLogger(__name__)
+
 # ===== CONSTANTS BASED ON US FINANCIAL RESEARCH =====
 
 
@@ -697,6 +706,95 @@ class InstallmentRiskEngine:
         return warnings
 
 
+# ===== FINANCIAL PROFILE SNAPSHOT =====
+
+# Profile fields used by the calculators, cached per user so repeated
+# calculator calls in one session do not re-query the profile table. The
+# snapshot lives in Redis when it is configured so a profile update
+# invalidates it for every worker, not only the one that handled the update.
+PROFILE_SNAPSHOT_TTL = 600
+PROFILE_SNAPSHOT_PREFIX = "mita:installments:profile:"
+
+
+@process_singleton
+def get_profile_snapshot_store():
+    """Where profile snapshots are kept for every worker to share"""
+    return key_value_store(PROFILE_SNAPSHOT_PREFIX)
+
+
+async def get_financial_snapshot(
+    db: AsyncSession, user_id: UUID
+) -> Optional[Dict[str, object]]:
+    """Monthly income, balance and age group from the user's profile (cached)"""
+    store = get_profile_snapshot_store()
+    try:
+        cached = await store.aget(str(user_id))
+    except RedisError as e:
+        logger.warning(f"Installment profile cache unavailable: {e}")
+        cached = None
+    if cached is not None:
+        entry = json.loads(cached)
+        return {
+            "monthly_income": Decimal(entry["monthly_income"]),
+            "current_balance": Decimal(entry["current_balance"]),
+            "age_group": AgeGroup(entry["age_group"]),
+        }
+
+    result = await db.execute(
+        select(UserFinancialProfile).where(UserFinancialProfile.user_id == user_id)
+    )
+    profile = result.scalar_one_or_none()
+    if not profile:
+        return None
+
+    snapshot = {
+        "monthly_income": profile.monthly_income,
+        "current_balance": profile.current_balance,
+        "age_group": AgeGroup(profile.age_group),
+    }
+    entry = {
+        "monthly_income": str(profile.monthly_income),
+        "current_balance": str(profile.current_balance),
+        "age_group": snapshot["age_group"].value,
+    }
+    try:
+        await store.aset(str(user_id), json.dumps(entry), PROFILE_SNAPSHOT_TTL)
+    except RedisError as e:
+        logger.warning(f"Could not cache installment profile for {user_id}: {e}")
+    return snapshot
+
+
+async def invalidate_financial_snapshot(user_id: UUID) -> None:
+    """Drop the cached profile snapshot after the profile changes"""
+    try:
+        await get_profile_snapshot_store().adelete(str(user_id))
+    except RedisError as e:
+        logger.warning(f"Installment profile invalidate failed for {user_id}: {e}")
+
+
+async def resolve_financial_inputs(
+    db: AsyncSession, user_id: UUID, calculator_input
+) -> Tuple[Decimal, Decimal, AgeGroup]:
+    """Income, balance and age group from the request or the saved profile"""
+    if calculator_input.monthly_income is not None:
+        return (
+            calculator_input.monthly_income,
+            calculator_input.current_balance or Decimal("0"),
+            calculator_input.age_group or AgeGroup.AGE_25_34,
+        )
+
+    snapshot = await get_financial_snapshot(db, user_id)
+    if not snapshot:
+        raise ValueError(
+            "Financial profile not found. Please provide financial information."
+        )
+    return (
+        snapshot["monthly_income"],
+        snapshot["current_balance"],
+        snapshot["age_group"],
+    )
+
+
 async def calculate_installment_risk(
     db: AsyncSession, user_id: UUID, calculator_input: InstallmentCalculatorInput
 ) -> InstallmentCalculatorOutput:
@@ -707,25 +805,9 @@ async def calculate_installment_risk(
     engine = InstallmentRiskEngine()
 
     # Get or use financial profile
-    if calculator_input.monthly_income is not None:
-        monthly_income = calculator_input.monthly_income
-        current_balance = calculator_input.current_balance or Decimal("0")
-        age_group = calculator_input.age_group or AgeGroup.AGE_25_34
-    else:
-        # Fetch from database
-        result = await db.execute(
-            select(UserFinancialProfile).where(UserFinancialProfile.user_id == user_id)
-        )
-        profile = result.scalar_one_or_none()
-
-        if not profile:
-            raise ValueError(
-                "Financial profile not found. Please provide financial information."
-            )
-
-        monthly_income = profile.monthly_income
-        current_balance = profile.current_balance
-        age_group = profile.age_group
+    monthly_income, current_balance, age_group = await resolve_financial_inputs(
+        db, user_id, calculator_input
+    )
 
     # Calculate payment schedule
     monthly_payment, total_interest, payment_schedule = (
@@ -895,6 +977,334 @@ async def update_achievement_calculations(
     await db.commit()
 
 
+# ===== SCENARIO COMPARISON (VECTORIZED) =====
+
+
+class InstallmentScenarioEngine:
+    """
+    Evaluates many amount/term/rate scenarios in one numpy pass
+
+    Mirrors calculate_payment_schedule and assess_risk: the amortization
+    uses the closed-form balance B_k = P(1+r)^k - M((1+r)^k - 1)/r over a
+    padded (scenario x payment) matrix, and every risk flag is a boolean
+    column, so the cost is a handful of array operations regardless of how
+    many scenarios the UI sweeps.
+    """
+
+    @staticmethod
+    def calculate_schedules(
+        principal: np.ndarray, num_payments: np.ndarray, annual_rate: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Payments, total interest and per-payment matrices for all scenarios"""
+        monthly_rate = annual_rate / 100 / 12
+        has_interest = monthly_rate > 0
+        safe_rate = np.where(has_interest, monthly_rate, 1.0)
+
+        growth = (1 + monthly_rate) ** num_payments
+        amortized = np.round(
+            principal * safe_rate * growth / np.where(has_interest, growth - 1, 1.0),
+            2,
+        )
+        payment = np.where(has_interest, amortized, principal / num_payments)
+
+        # Remaining balance after k payments, k = 0..max_n
+        k = np.arange(num_payments.max() + 1)
+        compounded = (1 + monthly_rate)[:, None] ** k
+        balance = np.where(
+            has_interest[:, None],
+            principal[:, None] * compounded
+            - payment[:, None] * (compounded - 1) / safe_rate[:, None],
+            principal[:, None] - payment[:, None] * k,
+        )
+
+        in_term = k[1:] <= num_payments[:, None]
+        interest = np.where(in_term, balance[:, :-1] * monthly_rate[:, None], 0.0)
+        principal_paid = np.where(in_term, payment[:, None] - interest, 0.0)
+
+        return {
+            "payment": payment,
+            "total_interest": interest.sum(axis=1),
+            "interest": interest,
+            "principal": principal_paid,
+            "balance": balance[:, 1:],
+        }
+
+    @staticmethod
+    def assess_risk(
+        monthly_payment: np.ndarray,
+        num_payments: np.ndarray,
+        interest_rate: np.ndarray,
+        monthly_income: float,
+        current_balance: float,
+        category: InstallmentCategory,
+        age_group: AgeGroup,
+        credit_card_debt: bool,
+        active_installments_count: int,
+        active_installments_monthly: float,
+        other_monthly_obligations: float,
+        planning_mortgage: bool,
+    ) -> Dict[str, object]:
+        """Ratios and per-flag boolean columns for every scenario"""
+        c = InstallmentConstants
+        size = monthly_payment.shape[0]
+
+        if monthly_income > 0:
+            payment_ratio = monthly_payment / monthly_income * 100
+            dti_ratio = (
+                (
+                    monthly_payment
+                    + active_installments_monthly
+                    + other_monthly_obligations
+                )
+                / monthly_income
+                * 100
+            )
+        else:
+            payment_ratio = np.full(size, 100.0)
+            dti_ratio = np.full(size, 100.0)
+        balance_after = current_balance - monthly_payment
+
+        def const(flag: bool) -> np.ndarray:
+            return np.full(size, bool(flag))
+
+        payment_ratio_limits = (
+            float(c.IDEAL_PAYMENT_RATIO),
+            float(c.CRITICAL_PAYMENT_RATIO),
+            float(c.SAFE_PAYMENT_RATIO),
+        )
+        dti_limits = (float(c.SAFE_DTI), float(c.MODERATE_DTI), float(c.CRITICAL_DTI))
+        buffers = (
+            float(c.MIN_EMERGENCY_BUFFER),
+            float(c.SAFE_EMERGENCY_BUFFER),
+            float(c.STRONG_EMERGENCY_BUFFER),
+        )
+        balances = (
+            float(c.MIN_SAFE_BALANCE),
+            float(c.COMFORTABLE_BALANCE),
+            float(c.STRONG_BALANCE),
+        )
+
+        # Same checks and order as InstallmentRiskEngine.assess_risk
+        red = [
+            ("high_payment_ratio", payment_ratio > payment_ratio_limits[2]),
+            ("low_balance", const(current_balance < balances[0])),
+            ("critical_dti", dti_ratio > dti_limits[2]),
+            ("credit_card_debt", const(credit_card_debt)),
+            (
+                "dangerous_category",
+                const(
+                    category
+                    in [InstallmentCategory.GROCERIES, InstallmentCategory.UTILITIES]
+                ),
+            ),
+            (
+                "too_many_installments",
+                const(active_installments_count >= c.CRITICAL_INSTALLMENTS),
+            ),
+            ("mortgage_planning", const(planning_mortgage)),
+            ("no_emergency_buffer", balance_after < buffers[0]),
+        ]
+        orange = [
+            (
+                "moderate_payment_ratio",
+                (payment_ratio > payment_ratio_limits[1])
+                & (payment_ratio <= payment_ratio_limits[2]),
+            ),
+            (
+                "moderate_balance",
+                const(balances[0] <= current_balance < balances[1]),
+            ),
+            ("high_dti", (dti_ratio > dti_limits[1]) & (dti_ratio <= dti_limits[2])),
+            (
+                "multiple_installments",
+                const(active_installments_count == c.MODERATE_INSTALLMENTS),
+            ),
+            (
+                "young_age_risk",
+                const(
+                    age_group == AgeGroup.AGE_18_24 and active_installments_count >= 1
+                ),
+            ),
+            (
+                "tight_emergency_buffer",
+                (balance_after >= buffers[0]) & (balance_after < buffers[1]),
+            ),
+            ("long_term_interest", (num_payments > 12) & (interest_rate > 0)),
+        ]
+        yellow = [
+            (
+                "noticeable_payment",
+                (payment_ratio > payment_ratio_limits[0])
+                & (payment_ratio <= payment_ratio_limits[1]),
+            ),
+            (
+                "adequate_balance",
+                const(balances[1] <= current_balance < balances[2]),
+            ),
+            (
+                "moderate_dti",
+                (dti_ratio > dti_limits[0]) & (dti_ratio <= dti_limits[1]),
+            ),
+            (
+                "one_installment",
+                const(active_installments_count == c.MAX_SAFE_INSTALLMENTS),
+            ),
+            (
+                "moderate_emergency_buffer",
+                (balance_after >= buffers[1]) & (balance_after < buffers[2]),
+            ),
+            ("high_interest_rate", interest_rate > float(c.MODERATE_INTEREST)),
+        ]
+
+        red_flags = np.sum([flag for _, flag in red], axis=0)
+        orange_flags = np.sum([flag for _, flag in orange], axis=0)
+        yellow_flags = np.sum([flag for _, flag in yellow], axis=0)
+
+        return {
+            "payment_ratio": payment_ratio,
+            "dti_ratio": dti_ratio,
+            "balance_after": balance_after,
+            "red": red,
+            "orange": orange,
+            "yellow": yellow,
+            "red_flags": red_flags,
+            "orange_flags": orange_flags,
+            "yellow_flags": yellow_flags,
+        }
+
+    @staticmethod
+    def score(
+        red_flags: np.ndarray, orange_flags: np.ndarray, yellow_flags: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Risk level index (0=green..3=red) and score, as in assess_risk"""
+        conditions = [red_flags > 0, orange_flags >= 2, yellow_flags >= 2]
+        level = np.select(conditions, [3, 2, 1], default=0)
+        risk_score = np.select(
+            conditions,
+            [
+                np.minimum(90 + red_flags * 5, 100),
+                60 + orange_flags * 5,
+                30 + yellow_flags * 5,
+            ],
+            default=np.maximum(10 - yellow_flags * 3, 0),
+        )
+        return level, risk_score
+
+
+_RISK_LEVELS = (RiskLevel.GREEN, RiskLevel.YELLOW, RiskLevel.ORANGE, RiskLevel.RED)
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(float(value), 2)))
+
+
+async def compare_installment_scenarios(
+    db: AsyncSession, user_id: UUID, batch_input: InstallmentScenarioBatchInput
+) -> InstallmentScenarioComparison:
+    """
+    Evaluate a grid of installment scenarios and rank them
+
+    Read-only: unlike calculate_installment_risk nothing is persisted, since
+    the UI sweeps through options before the user picks one.
+    """
+    monthly_income, current_balance, age_group = await resolve_financial_inputs(
+        db, user_id, batch_input
+    )
+
+    scenarios = batch_input.scenarios
+    principal = np.array([float(s.purchase_amount) for s in scenarios])
+    num_payments = np.array([s.num_payments for s in scenarios])
+    interest_rate = np.array([float(s.interest_rate) for s in scenarios])
+
+    vector_engine = InstallmentScenarioEngine
+    schedules = vector_engine.calculate_schedules(
+        principal, num_payments, interest_rate
+    )
+    risk = vector_engine.assess_risk(
+        monthly_payment=schedules["payment"],
+        num_payments=num_payments,
+        interest_rate=interest_rate,
+        monthly_income=float(monthly_income),
+        current_balance=float(current_balance),
+        category=batch_input.category,
+        age_group=age_group,
+        credit_card_debt=batch_input.credit_card_debt,
+        active_installments_count=batch_input.active_installments_count,
+        active_installments_monthly=float(batch_input.active_installments_monthly),
+        other_monthly_obligations=float(batch_input.other_monthly_obligations),
+        planning_mortgage=batch_input.planning_mortgage,
+    )
+    level, risk_score = vector_engine.score(
+        risk["red_flags"], risk["orange_flags"], risk["yellow_flags"]
+    )
+
+    total_cost = principal + schedules["total_interest"]
+    # Lowest risk first, then cheapest overall
+    order = np.lexsort((total_cost, risk_score))
+
+    def factor_ids(index: int) -> List[str]:
+        return [
+            name
+            for group in ("red", "orange", "yellow")
+            for name, flag in risk[group]
+            if flag[index]
+        ]
+
+    results = []
+    for rank, index in enumerate(order.tolist(), start=1):
+        n = int(num_payments[index])
+        schedule = None
+        if batch_input.include_schedules:
+            principal_col = schedules["principal"][index, :n].copy()
+            principal_col[-1] += schedules["balance"][index, n - 1]
+            remaining = np.maximum(schedules["balance"][index, :n], 0)
+            remaining[-1] = 0.0
+            schedule = [
+                {
+                    "payment_number": i + 1,
+                    "payment_amount": round(float(schedules["payment"][index]), 2),
+                    "principal": round(p, 2),
+                    "interest": round(interest, 2),
+                    "remaining_balance": round(balance, 2),
+                }
+                for i, (p, interest, balance) in enumerate(
+                    zip(
+                        principal_col.tolist(),
+                        schedules["interest"][index, :n].tolist(),
+                        remaining.tolist(),
+                    )
+                )
+            ]
+
+        risk_level = _RISK_LEVELS[int(level[index])]
+        results.append(
+            InstallmentScenarioResult(
+                rank=rank,
+                purchase_amount=scenarios[index].purchase_amount,
+                num_payments=n,
+                interest_rate=scenarios[index].interest_rate,
+                monthly_payment=_money(schedules["payment"][index]),
+                total_interest=_money(schedules["total_interest"][index]),
+                total_cost=_money(total_cost[index]),
+                payment_to_income_ratio=_money(risk["payment_ratio"][index]),
+                dti_ratio=_money(risk["dti_ratio"][index]),
+                balance_after_first_payment=_money(risk["balance_after"][index]),
+                risk_level=risk_level,
+                risk_score=int(risk_score[index]),
+                verdict=InstallmentRiskEngine.generate_verdict_message(risk_level),
+                risk_factors=factor_ids(index),
+                payment_schedule=schedule,
+            )
+        )
+
+    return InstallmentScenarioComparison(
+        scenarios=results,
+        recommended=results[0],
+        monthly_income=monthly_income,
+        current_balance=current_balance,
+    )
+
+
 # Additional service functions for installment management will go here
 # (create_installment, get_user_installments, update_installment, etc.)
 # These will be implemented in the next section along with routes
@@ -8,7 +8,7 @@ from app.api.dependencies import get_current_user
 from app.core.session import get_db
 from app.db.models import PushToken, UserPreference
 from app.services.notification_log_service import log_notification
-from app.services.notification_service import NotificationService
+from app.services.notification_service import NotificationService, encode_cursor
 from app.services.push_service import send_apns_notification, send_push_notification
 from app.utils.email_utils import send_reminder_email
 from app.utils.response_wrapper import success_response
@@ -234,6 +234,7 @@ def update_device_patch(
 def get_notifications(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     unread_only: bool = Query(False),
     type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
@@ -241,18 +242,30 @@ def get_notifications(
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    """Get list of notifications for current user with optional filters"""
+    """Get list of notifications for current user with optional filters
+
+    Pass the previous page's next_cursor as `cursor` to page forward;
+    `offset` is still accepted for older clients.
+    """
     service = NotificationService(db)
 
-    notifications = service.get_user_notifications(
-        user_id=user.id,
-        limit=limit,
-        offset=offset,
-        unread_only=unread_only,
-        notification_type=type,
-        priority=priority,
-        category=category,
-    )
+    try:
+        # One extra row tells whether another page exists
+        notifications = service.get_user_notifications(
+            user_id=user.id,
+            limit=limit + 1,
+            offset=offset,
+            unread_only=unread_only,
+            notification_type=type,
+            priority=priority,
+            category=category,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
 
     unread_count = service.get_unread_count(user.id)
 
@@ -264,7 +277,8 @@ def get_notifications(
         notifications=notification_responses,
         total=len(notification_responses),
         unread_count=unread_count,
-        has_more=len(notifications) == limit,
+        has_more=has_more,
+        next_cursor=encode_cursor(notifications[-1]) if has_more else None,
     )
 
 
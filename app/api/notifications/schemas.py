@@ -71,6 +71,7 @@ class NotificationListResponse(BaseModel):
     total: int
     unread_count: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 class NotificationMarkReadRequest(BaseModel):
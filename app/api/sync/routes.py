@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_user
+from app.core.session import get_db
+from app.services.sync_feed import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_changes
+from app.utils.response_wrapper import success_response
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", summary="Changes since a sync cursor")
+def get_sync_changes(
+    since: int = Query(0, ge=0, description="cursor from the previous response"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user=Depends(get_current_user),  # noqa: B008
+    db: Session = Depends(get_db),  # noqa: B008
+):
+    """
+    Transactions, calendar plan rows, goals and notifications created,
+    updated or deleted after `since`, oldest change first.
+
+    Start with since=0, apply `changes` (full rows) and `deleted` (ids), then
+    call again with the returned `cursor` while `has_more` is true. When
+    `reset` is true the cursor is from a different history, or older than
+    the deletes the server still remembers: drop the local copy and sync
+    again from 0.
+    """
+    page = get_changes(db, user.id, since=since, limit=limit)
+    return success_response(page.to_dict(), message="Changes retrieved successfully")
@@ -3,8 +3,9 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from app.core.limiter_setup import optional_rate_limit
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -23,7 +24,7 @@ from app.core.standardized_error_handler import (
     validate_required_fields,
 )
 from app.ocr.ocr_receipt_service import OCRReceiptService
-from app.utils.response_wrapper import FinancialResponseHelper
+from app.utils.response_wrapper import FinancialResponseHelper, StandardizedResponse
 
 # isort: off
 from app.api.transactions.services import (
@@ -36,6 +37,8 @@ from app.api.transactions.services import (
 
 # isort: on
 from app.core.async_session import get_async_db
+from app.services.merchant_autocomplete import get_merchant_autocomplete
+from app.services.sync_feed import etag_by_sync_version
 from app.services.task_manager import task_manager
 from app.utils.response_wrapper import success_response
 
@@ -47,6 +50,9 @@ file_upload = File(...)  # noqa: B008
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+# /by-date has no row limit; longer histories are streamed in chunks
+STREAM_MIN_ROWS = 2000
+
 
 # Error handling mixin for transaction routes
 class TransactionErrorHandler(ErrorHandlingMixin):
@@ -188,6 +194,7 @@ async def create_transaction_standardized(
 
 
 @router.get("/", response_model=List[TxnOut], summary="List user transactions")
+@etag_by_sync_version
 @handle_financial_errors
 async def get_transactions_standardized(
     request: Request,
@@ -370,11 +377,83 @@ async def process_receipt(
         )
 
 
+# Statement uploads are streamed to disk in chunks of this size
+IMPORT_CHUNK_BYTES = 1024 * 1024
+MAX_IMPORT_BYTES = 50 * 1024 * 1024
+
+
+@router.post(
+    "/import",
+    dependencies=[Depends(optional_rate_limit(times=3, seconds=60))],
+)
+async def import_transactions(
+    file: UploadFile = file_upload,
+    file_format: Optional[str] = None,
+    user=current_user_dep,
+):
+    """
+    Import a bank statement file (CSV, OFX or QIF) in the background.
+    Returns task ID for tracking progress via /tasks/{task_id}.
+    """
+    import os
+    import tempfile
+
+    from app.services.transaction_import import SUPPORTED_FORMATS, detect_format
+
+    file_format = (file_format or detect_format(file.filename) or "").lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported statement format; use one of {', '.join(SUPPORTED_FORMATS)}",
+        )
+
+    temp = tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_format}")
+    try:
+        size = 0
+        while chunk := await file.read(IMPORT_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_IMPORT_BYTES:
+                raise HTTPException(
+                    status_code=413, detail="Statement file is larger than 50 MB"
+                )
+            temp.write(chunk)
+        temp.close()
+        if not size:
+            raise HTTPException(status_code=400, detail="Statement file is empty")
+
+        task_info = task_manager.submit_transaction_import_task(
+            user_id=user.id, file_path=temp.name, file_format=file_format
+        )
+
+        return success_response(
+            {
+                "task_id": task_info.task_id,
+                "status": task_info.status.value,
+                "estimated_completion": task_info.estimated_completion,
+                "message": "Import started. Use /tasks/{task_id} to check progress.",
+            }
+        )
+
+    except Exception as e:
+        temp.close()
+        try:
+            if os.path.exists(temp.name):
+                os.unlink(temp.name)
+        except Exception:
+            pass
+
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=f"Failed to start import: {str(e)}")
+
+
 # NEW ENDPOINTS for mobile app integration
 
 
 @router.get("/by-date")
+@etag_by_sync_version
 async def get_transactions_by_date(
+    request: Request,
     start_date: str = None,
     end_date: str = None,
     user=current_user_dep,
@@ -411,7 +490,7 @@ async def get_transactions_by_date(
     result = await db.execute(query_stmt.order_by(Transaction.spent_at.desc()))
     txns = result.unique().scalars().all()
 
-    transactions = [
+    transactions = (
         {
             "id": txn.id,
             "amount": float(txn.amount) if txn.amount else 0.0,
@@ -421,16 +500,18 @@ async def get_transactions_by_date(
             "created_at": txn.created_at.isoformat() if txn.created_at else None,
         }
         for txn in txns
-    ]
-
-    return success_response(
-        {
-            "transactions": transactions,
-            "start_date": start_date,
-            "end_date": end_date,
-            "count": len(transactions),
-        }
     )
+    data = {
+        "transactions": transactions,
+        "start_date": start_date,
+        "end_date": end_date,
+        "count": len(txns),
+    }
+
+    if len(txns) >= STREAM_MIN_ROWS:
+        return StandardizedResponse.stream(data)
+    data["transactions"] = list(transactions)
+    return success_response(data)
 
 
 @router.get("/merchants/suggestions")
@@ -440,30 +521,13 @@ async def get_merchant_suggestions(
     db: AsyncSession = db_dep,
 ):
     """Get merchant name suggestions based on user's history"""
-    from app.db.models.transaction import Transaction
-
-    # Query user's transaction history for merchant autocomplete
-    query_stmt = select(
-        Transaction.description,
-        Transaction.category,
-        func.count(Transaction.id).label("frequency"),
-    ).where(Transaction.user_id == user.id)
-
-    if query:
-        query_stmt = query_stmt.where(Transaction.description.ilike(f"%{query}%"))
-
-    query_stmt = (
-        query_stmt.group_by(Transaction.description, Transaction.category)
-        .order_by(func.count(Transaction.id).desc())
-        .limit(10)
-    )
-
-    result = await db.execute(query_stmt)
-    merchants = result.all()
+    # Served from the user's in-memory prefix index; the ledger is only
+    # queried to (re)build it
+    merchants = await get_merchant_autocomplete().suggest(db, user.id, query)
 
     suggestions = [
         {
-            "name": merchant.description,
+            "name": merchant.name,
             "category": merchant.category,
             "frequency": merchant.frequency,
         }
@@ -532,8 +596,9 @@ async def process_receipt_advanced(
 
     try:
         # Process receipt with REAL OCR service
+        # OCR and categorization block (Tesseract, the merchant map in Redis)
         ocr_service = OCRReceiptService()
-        result = ocr_service.process_image(temp_path)
+        result = await run_in_threadpool(ocr_service.process_image, temp_path)
 
         job_id = f"rcpt_{datetime.now().timestamp()}"
 
@@ -615,7 +680,7 @@ async def process_receipts_batch(
         try:
             # Process each receipt with OCR service
             ocr_service = OCRReceiptService()
-            result = ocr_service.process_image(temp_path)
+            result = await run_in_threadpool(ocr_service.process_image, temp_path)
 
             receipt_id = f"rcpt_{datetime.now().timestamp()}_{idx}"
             receipt_ids.append(receipt_id)
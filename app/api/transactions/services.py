@@ -12,6 +12,7 @@ from app.services.core.engine.expense_tracker import (
     local_day_of,
     recalculate_plan_spent,
 )
+from app.services.merchant_autocomplete import get_merchant_autocomplete
 from app.services.notification_integration import get_notification_integration
 from app.utils.timezone_utils import from_user_timezone, to_user_timezone
 
@@ -64,6 +65,7 @@ def add_transaction(user: User, data, db: Session):
     db.add(txn)
     db.commit()
     db.refresh(txn)
+    get_merchant_autocomplete().record(txn)
 
     # Apply transaction to budget plan
     try:
@@ -148,6 +150,7 @@ def add_transaction_background(
     db.add(txn)
     db.commit()
     db.refresh(txn)
+    get_merchant_autocomplete().record(txn)
 
     # Apply budget plan update in background
     background_tasks.add_task(apply_transaction_to_plan, db, txn)
@@ -271,6 +274,7 @@ def update_transaction(
 
     db.commit()
     db.refresh(txn)
+    get_merchant_autocomplete().invalidate(user.id)
 
     # Recompute the affected daily-plan accruals from the ledger.
     # apply_transaction_to_plan is additive (spent += amount) and would
@@ -281,9 +285,7 @@ def update_transaction(
         new_category = txn.category
         recalculate_plan_spent(db, user.id, old_day, old_category, tz=user.timezone)
         if (new_day, new_category) != (old_day, old_category):
-            recalculate_plan_spent(
-                db, user.id, new_day, new_category, tz=user.timezone
-            )
+            recalculate_plan_spent(db, user.id, new_day, new_category, tz=user.timezone)
     except Exception as e:
         from app.core.logging_config import get_logger
 
@@ -319,6 +321,7 @@ def delete_transaction(user: User, transaction_id: UUID, db: Session) -> bool:
     # Soft delete - set deleted_at timestamp
     txn.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    get_merchant_autocomplete().invalidate(user.id)
 
     # Reverse the daily-plan accrual: recompute (day, category) from the
     # remaining non-deleted transactions so spent/remaining return to the
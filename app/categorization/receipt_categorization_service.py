@@ -3,6 +3,196 @@ ReceiptCategorizationService: Enhanced service for categorizing receipt informat
 Supports multiple languages and merchant databases.
 """
 
+from app.services.merchant_classifier import get_merchant_classifier
+
+# Enhanced keyword-based mapping with Bulgarian merchants
+MERCHANT_KEYWORDS = {
+    "groceries": [
+        # International chains
+        "walmart",
+        "costco",
+        "aldi",
+        "whole foods",
+        "kroger",
+        "safeway",
+        "trader joe",
+        "target",
+        "grocery",
+        "supermarket",
+        "market",
+        # Bulgarian chains
+        "kaufland",
+        "lidl",
+        "billa",
+        "fantastico",
+        "metro",
+        "carrefour",
+        "t market",
+        "piccadilly",
+        "marketplace",
+        "магазин",
+        "хранителен",
+    ],
+    "transport": [
+        # Ride sharing
+        "uber",
+        "lyft",
+        "bolt",
+        "taxi",
+        "cab",
+        # Gas stations
+        "shell",
+        "chevron",
+        "bp",
+        "exxon",
+        "mobil",
+        "gas",
+        "petrol",
+        "lukoil",
+        "omv",
+        "eko",
+        "rompetrol",
+        # Public transport
+        "metro",
+        "subway",
+        "bus",
+        "parking",
+        "toll",
+    ],
+    "entertainment": [
+        "cinema",
+        "movie",
+        "netflix",
+        "spotify",
+        "amc",
+        "theater",
+        "theatre",
+        "concert",
+        "ticket",
+        "entertainment",
+        "game",
+        "gaming",
+        "steam",
+        "кино",
+        "театър",
+    ],
+    "restaurants": [
+        "mcdonalds",
+        "mcdonald's",
+        "starbucks",
+        "restaurant",
+        "cafe",
+        "coffee",
+        "burger king",
+        "kfc",
+        "subway",
+        "pizza",
+        "domino",
+        "dunkin",
+        "ресторант",
+        "кафе",
+        "заведение",
+        "бар",
+    ],
+    "shopping": [
+        "amazon",
+        "ebay",
+        "target",
+        "best buy",
+        "mall",
+        "clothing",
+        "fashion",
+        "nike",
+        "adidas",
+        "zara",
+        "h&m",
+        "store",
+        "shop",
+        "boutique",
+        "magazine",
+        "outlet",
+    ],
+    "healthcare": [
+        "pharmacy",
+        "walgreens",
+        "cvs",
+        "hospital",
+        "clinic",
+        "medical",
+        "doctor",
+        "dentist",
+        "health",
+        "аптека",
+        "болница",
+        "лекар",
+        "софарма",
+        "pharmacy",
+    ],
+    "utilities": [
+        "electric",
+        "electricity",
+        "water",
+        "gas",
+        "utility",
+        "bill",
+        "евн",
+        "топлофикация",
+        "софийска вода",
+    ],
+    "subscriptions": [
+        "subscription",
+        "netflix",
+        "spotify",
+        "amazon prime",
+        "disney",
+        "youtube premium",
+        "apple music",
+        "hbo",
+        "абонамент",
+    ],
+}
+
+# Item keywords for better categorization
+ITEM_KEYWORDS = {
+    "groceries": [
+        "bread",
+        "milk",
+        "cheese",
+        "egg",
+        "meat",
+        "chicken",
+        "fish",
+        "vegetable",
+        "fruit",
+        "beer",
+        "wine",
+        "хляб",
+        "мляко",
+        "сирене",
+    ],
+    "restaurants": [
+        "burger",
+        "pizza",
+        "sandwich",
+        "drink",
+        "coffee",
+        "tea",
+        "meal",
+        "menu",
+        "бургер",
+        "пица",
+        "сандвич",
+    ],
+    "healthcare": [
+        "medicine",
+        "pill",
+        "tablet",
+        "prescription",
+        "лекарство",
+        "медикамент",
+    ],
+}
+
 
 class ReceiptCategorizationService:
     """
@@ -11,194 +201,8 @@ class ReceiptCategorizationService:
     """
 
     def __init__(self):
-        # Enhanced keyword-based mapping with Bulgarian merchants
-        self.category_keywords = {
-            "groceries": [
-                # International chains
-                "walmart",
-                "costco",
-                "aldi",
-                "whole foods",
-                "kroger",
-                "safeway",
-                "trader joe",
-                "target",
-                "grocery",
-                "supermarket",
-                "market",
-                # Bulgarian chains
-                "kaufland",
-                "lidl",
-                "billa",
-                "fantastico",
-                "metro",
-                "carrefour",
-                "t market",
-                "piccadilly",
-                "marketplace",
-                "магазин",
-                "хранителен",
-            ],
-            "transport": [
-                # Ride sharing
-                "uber",
-                "lyft",
-                "bolt",
-                "taxi",
-                "cab",
-                # Gas stations
-                "shell",
-                "chevron",
-                "bp",
-                "exxon",
-                "mobil",
-                "gas",
-                "petrol",
-                "lukoil",
-                "omv",
-                "eko",
-                "rompetrol",
-                # Public transport
-                "metro",
-                "subway",
-                "bus",
-                "parking",
-                "toll",
-            ],
-            "entertainment": [
-                "cinema",
-                "movie",
-                "netflix",
-                "spotify",
-                "amc",
-                "theater",
-                "theatre",
-                "concert",
-                "ticket",
-                "entertainment",
-                "game",
-                "gaming",
-                "steam",
-                "кино",
-                "театър",
-            ],
-            "restaurants": [
-                "mcdonalds",
-                "mcdonald's",
-                "starbucks",
-                "restaurant",
-                "cafe",
-                "coffee",
-                "burger king",
-                "kfc",
-                "subway",
-                "pizza",
-                "domino",
-                "dunkin",
-                "ресторант",
-                "кафе",
-                "заведение",
-                "бар",
-            ],
-            "shopping": [
-                "amazon",
-                "ebay",
-                "target",
-                "best buy",
-                "mall",
-                "clothing",
-                "fashion",
-                "nike",
-                "adidas",
-                "zara",
-                "h&m",
-                "store",
-                "shop",
-                "boutique",
-                "magazine",
-                "outlet",
-            ],
-            "healthcare": [
-                "pharmacy",
-                "walgreens",
-                "cvs",
-                "hospital",
-                "clinic",
-                "medical",
-                "doctor",
-                "dentist",
-                "health",
-                "аптека",
-                "болница",
-                "лекар",
-                "софарма",
-                "pharmacy",
-            ],
-            "utilities": [
-                "electric",
-                "electricity",
-                "water",
-                "gas",
-                "utility",
-                "bill",
-                "евн",
-                "топлофикация",
-                "софийска вода",
-            ],
-            "subscriptions": [
-                "subscription",
-                "netflix",
-                "spotify",
-                "amazon prime",
-                "disney",
-                "youtube premium",
-                "apple music",
-                "hbo",
-                "абонамент",
-            ],
-        }
-
-        # Item keywords for better categorization
-        self.item_keywords = {
-            "groceries": [
-                "bread",
-                "milk",
-                "cheese",
-                "egg",
-                "meat",
-                "chicken",
-                "fish",
-                "vegetable",
-                "fruit",
-                "beer",
-                "wine",
-                "хляб",
-                "мляко",
-                "сирене",
-            ],
-            "restaurants": [
-                "burger",
-                "pizza",
-                "sandwich",
-                "drink",
-                "coffee",
-                "tea",
-                "meal",
-                "menu",
-                "бургер",
-                "пица",
-                "сандвич",
-            ],
-            "healthcare": [
-                "medicine",
-                "pill",
-                "tablet",
-                "prescription",
-                "лекарство",
-                "медикамент",
-            ],
-        }
-
+        self.category_keywords = MERCHANT_KEYWORDS
+        self.item_keywords = ITEM_KEYWORDS
         self.default_category = "other"
 
     def categorize(
@@ -223,39 +227,37 @@ class ReceiptCategorizationService:
         if items is None:
             items = []
 
-        merchant_lower = merchant.lower()
-        hint_lower = hint.lower()
+        # 0. What the ledger files this merchant under wins outright
+        classifier = get_merchant_classifier()
+        learned = classifier.learned_category(merchant, group="merchant")
+        if learned:
+            return learned
 
         # Score each category
-        category_scores = {}
+        category_scores = {category: 0 for category in self.category_keywords}
+
+        # Merchant, hint and item names matched in one pass
+        segments = [merchant, hint] + [str(item.get("name", "")) for item in items]
+        merchant_hits, hint_hits, item_hits = set(), set(), set()
+        for segment, group, category in classifier.scan_segments(segments):
+            if segment == 0 and group == "merchant":
+                merchant_hits.add(category)
+            elif segment == 1 and group == "merchant":
+                hint_hits.add(category)
+            elif segment > 1 and group == "item":
+                item_hits.add((segment, category))
 
-        # 1. Check merchant name (highest priority)
-        for category, keywords in self.category_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in merchant_lower:
-                    score += 3  # High weight for merchant match
-                    break
-            category_scores[category] = score
+        # 1. Merchant name (highest priority)
+        for category in merchant_hits:
+            category_scores[category] += 3  # High weight for merchant match
 
-        # 2. Check hint
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword in hint_lower:
-                    category_scores[category] = category_scores.get(category, 0) + 1
-                    break
+        # 2. Hint
+        for category in hint_hits:
+            category_scores[category] += 1
 
-        # 3. Check items (if available)
-        if items:
-            for category, keywords in self.item_keywords.items():
-                for item in items:
-                    item_name = str(item.get("name", "")).lower()
-                    for keyword in keywords:
-                        if keyword in item_name:
-                            category_scores[category] = (
-                                category_scores.get(category, 0) + 0.5
-                            )
-                            break
+        # 3. Items, once per item and category
+        for _, category in item_hits:
+            category_scores[category] = category_scores.get(category, 0) + 0.5
 
         # 4. Amount-based heuristics
         if amount > 0:
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
+from app.core.query_budget import install_query_instrumentation
 from app.db.models.base import Base
 
 logger = logging.getLogger(__name__)
@@ -108,6 +109,16 @@ def initialize_database() -> None:
             **engine_kwargs,
         )
 
+        install_query_instrumentation(async_engine_local)
+        # Live budget streams are notified after commits touching plans/transactions
+        from app.services.budget_live_updates import install_budget_change_tracking
+
+        install_budget_change_tracking()
+        # Challenge leaderboards follow committed participation changes
+        from app.services.challenge_leaderboard import install_leaderboard_tracking
+
+        install_leaderboard_tracking()
+
         AsyncSessionLocal = async_sessionmaker(
             bind=async_engine_local,
             class_=AsyncSession,
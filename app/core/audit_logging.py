@@ -208,13 +208,18 @@ class SecurityEventQueue:
             await self._fallback_file_logging(events)
 
     async def _ensure_audit_table(self, session: AsyncSession):
-        """Ensure audit logs table exists"""
+        """Ensure audit logs table exists
+
+        Monthly partitions are added (and expired ones dropped) by
+        app/services/partition_maintenance.py; until then rows land in the
+        default partition.
+        """
         try:
             await session.execute(
                 text(
                     """
                 CREATE TABLE IF NOT EXISTS audit_logs (
-                    id VARCHAR(255) PRIMARY KEY,
+                    id VARCHAR(255) NOT NULL,
                     timestamp TIMESTAMP NOT NULL,
                     event_type VARCHAR(50) NOT NULL,
                     user_id VARCHAR(255),
@@ -231,9 +236,21 @@ class SecurityEventQueue:
                     success BOOLEAN NOT NULL,
                     error_message TEXT,
                     additional_context JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id, timestamp)
+                ) PARTITION BY RANGE (timestamp);
+                -- A legacy audit_logs from before alembic 0037 is not partitioned
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM pg_partitioned_table
+                        WHERE partrelid = 'audit_logs'::regclass
+                    ) THEN
+                        CREATE TABLE IF NOT EXISTS audit_logs_default
+                            PARTITION OF audit_logs DEFAULT;
+                    END IF;
+                END $$;
+
                 CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id);
                 CREATE INDEX IF NOT EXISTS idx_audit_logs_endpoint ON audit_logs(endpoint);
@@ -0,0 +1,464 @@
+"""
+Shared In-Process Cache Engine for MITA Backend
+O(1) LRU + TTL storage used by every in-memory cache in the application
+
+The three in-memory caches (caching.MemoryCache, advanced_cache_manager's
+MemoryCache and performance_cache.PerformanceCache) used to keep their own
+bookkeeping: a Python list for LRU order (O(n) remove on every get/set), a
+pickle of every value just to measure it, and a full sort of all keys on
+cleanup. They are now thin adapters over CacheNamespace:
+
+- OrderedDict keeps recency order: get/set/evict are O(1)
+- TTL expiry is lazy on read, plus a hashed timer wheel (expiry slot ->
+  keys) so untouched entries are dropped without scanning the whole cache
+- byte accounting is optional and uses a cheap shallow size estimate
+- every namespace has its own entry/byte limits and hit/miss counters;
+  registered namespaces are exported to Prometheus at scrape time
+"""
+
+import heapq
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Containers are sized from a sample of their items, not a full walk
+_SIZE_SAMPLE_ITEMS = 8
+_SIZE_MAX_DEPTH = 3
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory footprint of a value in bytes.
+
+    Shallow sys.getsizeof plus a sampled walk of containers: orders of
+    magnitude cheaper than pickling, accurate enough for byte limits.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= _SIZE_MAX_DEPTH:
+        return size
+
+    if isinstance(value, dict):
+        count = len(value)
+        if count:
+            sampled = 0
+            for index, (key, item) in enumerate(value.items()):
+                if index >= _SIZE_SAMPLE_ITEMS:
+                    break
+                sampled += estimate_size(key, _depth + 1)
+                sampled += estimate_size(item, _depth + 1)
+            size += sampled * count // min(count, _SIZE_SAMPLE_ITEMS)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if count:
+            sampled = 0
+            for index, item in enumerate(value):
+                if index >= _SIZE_SAMPLE_ITEMS:
+                    break
+                sampled += estimate_size(item, _depth + 1)
+            size += sampled * count // min(count, _SIZE_SAMPLE_ITEMS)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        size += estimate_size(vars(value), _depth + 1)
+    return size
+
+
+class CacheItem:
+    """Stored value plus the metadata the adapters report"""
+
+    __slots__ = (
+        "value",
+        "expires_at",
+        "size",
+        "tags",
+        "created_at",
+        "last_accessed",
+        "access_count",
+    )
+
+    def __init__(self, value, expires_at, size, tags, now):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+        self.created_at = now
+        self.last_accessed = now
+        self.access_count = 0
+
+
+class CacheNamespace:
+    """One bounded LRU/TTL keyspace"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        track_sizes: bool = False,
+        size_estimator: Callable[[Any], int] = estimate_size,
+        touch_on_get: bool = True,
+        wheel_resolution: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.track_sizes = track_sizes or max_bytes is not None
+        self.size_estimator = size_estimator
+        # False gives FIFO eviction (insertion order) instead of LRU
+        self.touch_on_get = touch_on_get
+        self.wheel_resolution = wheel_resolution
+        self.clock = clock
+
+        self._data: "OrderedDict[str, CacheItem]" = OrderedDict()
+        self._wheel: Dict[int, set] = {}
+        self._wheel_heap: List[int] = []
+        self._tag_index: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value for key, or default when missing/expired"""
+        item = self.get_item(key)
+        return default if item is None else item.value
+
+    def get_item(self, key: str) -> Optional[CacheItem]:
+        """Live CacheItem for key (counts as an access), or None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            now = self.clock()
+            if item.expires_at is not None and item.expires_at <= now:
+                self._remove(key, item)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if self.touch_on_get:
+                self._data.move_to_end(key)
+            item.access_count += 1
+            item.last_accessed = now
+            self.hits += 1
+            return item
+
+    def peek(self, key: str) -> Optional[CacheItem]:
+        """CacheItem without touching recency or counters"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item.expires_at is not None and item.expires_at <= self.clock():
+                return None
+            return item
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None,
+        size: Optional[int] = None,
+    ) -> bool:
+        """Store a value. ttl=None uses the namespace default, ttl<=0 never expires.
+
+        Returns False when the value alone exceeds the namespace byte limit.
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if self.track_sizes and size is None:
+            size = self.size_estimator(value)
+        size = size or 0
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning(
+                f"Value too large for cache namespace {self.name}: {size} bytes"
+            )
+            return False
+
+        with self._lock:
+            now = self.clock()
+            self._expire_due(now)
+
+            existing = self._data.get(key)
+            if existing is not None:
+                self._remove(key, existing)
+
+            expires_at = now + ttl if ttl and ttl > 0 else None
+            tag_list = list(tags) if tags else []
+            item = CacheItem(value, expires_at, size, tag_list, now)
+            self._data[key] = item
+            self._bytes += size
+            self.sets += 1
+
+            if expires_at is not None:
+                self._schedule(key, expires_at)
+            for tag in tag_list:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+            self._enforce_limits()
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False
+            self._remove(key, item)
+            self.deletes += 1
+            return True
+
+    def contains(self, key: str) -> bool:
+        return self.peek(key) is not None
+
+    def delete_by_tags(self, tags: Iterable[str]) -> int:
+        """Remove every entry carrying any of the tags"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tag_index.get(tag, ()))
+            removed = 0
+            for key in keys:
+                item = self._data.get(key)
+                if item is not None:
+                    self._remove(key, item)
+                    self.deletes += 1
+                    removed += 1
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._wheel.clear()
+            self._wheel_heap.clear()
+            self._tag_index.clear()
+            self._bytes = 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.sets = 0
+            self.deletes = self.evictions = self.expirations = 0
+
+    def expire_due(self) -> int:
+        """Drop every entry whose expiry slot has passed; returns count"""
+        with self._lock:
+            return self._expire_due(self.clock())
+
+    def items(self) -> List[Tuple[str, CacheItem]]:
+        """Snapshot of live entries in LRU order (oldest first)"""
+        with self._lock:
+            self._expire_due(self.clock())
+            return list(self._data.items())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_due(self.clock())
+            entries = len(self._data)
+            lookups = self.hits + self.misses
+            return {
+                "namespace": self.name,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+                "sets": self.sets,
+                "deletes": self.deletes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _slot(self, expires_at: float) -> int:
+        # An entry in slot s has expires_at <= s * resolution, so the whole
+        # slot is due once floor(now / resolution) reaches s.
+        return -int(-expires_at // self.wheel_resolution)
+
+    def _schedule(self, key: str, expires_at: float) -> None:
+        slot = self._slot(expires_at)
+        bucket = self._wheel.get(slot)
+        if bucket is None:
+            bucket = self._wheel[slot] = set()
+            heapq.heappush(self._wheel_heap, slot)
+        bucket.add(key)
+
+    def _unschedule(self, key: str, expires_at: float) -> None:
+        bucket = self._wheel.get(self._slot(expires_at))
+        if bucket is not None:
+            bucket.discard(key)
+
+    def _expire_due(self, now: float) -> int:
+        heap = self._wheel_heap
+        if not heap:
+            return 0
+        current_slot = int(now // self.wheel_resolution)
+        expired = 0
+        while heap and heap[0] <= current_slot:
+            slot = heapq.heappop(heap)
+            for key in self._wheel.pop(slot, ()):
+                item = self._data.get(key)
+                if (
+                    item is not None
+                    and item.expires_at is not None
+                    and item.expires_at <= now
+                ):
+                    self._remove(key, item, unschedule=False)
+                    expired += 1
+        self.expirations += expired
+        return expired
+
+    def _remove(self, key: str, item: CacheItem, unschedule: bool = True) -> None:
+        del self._data[key]
+        self._bytes -= item.size
+        if unschedule and item.expires_at is not None:
+            self._unschedule(key, item.expires_at)
+        for tag in item.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _enforce_limits(self) -> None:
+        data = self._data
+        while len(data) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            if not data:
+                break
+            key, item = next(iter(data.items()))
+            self._remove(key, item)
+            self.evictions += 1
+
+
+class CacheEngine:
+    """Registry of named namespaces sharing one process"""
+
+    def __init__(self):
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._lock = threading.Lock()
+
+    def namespace(self, name: str, **options) -> CacheNamespace:
+        """Get or create a namespace; options only apply on creation"""
+        with self._lock:
+            ns = self._namespaces.get(name)
+            if ns is None:
+                ns = self._namespaces[name] = CacheNamespace(name, **options)
+            return ns
+
+    def namespaces(self) -> List[CacheNamespace]:
+        with self._lock:
+            return list(self._namespaces.values())
+
+    def drop(self, name: str) -> None:
+        with self._lock:
+            self._namespaces.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {ns.name: ns.stats() for ns in self.namespaces()}
+
+
+_cache_engine = CacheEngine()
+
+
+def get_cache_engine() -> CacheEngine:
+    """Process-wide cache engine"""
+    return _cache_engine
+
+
+class CacheEngineCollector:
+    """Prometheus collector reading namespace counters at scrape time
+
+    Nothing is recorded on the hot path; counters are plain ints on each
+    namespace and converted to metric families only when /metrics is hit.
+    """
+
+    def __init__(self, engine: CacheEngine):
+        self.engine = engine
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        families = {
+            "hits": CounterMetricFamily(
+                "mita_memory_cache_hits", "In-process cache hits", labels=["namespace"]
+            ),
+            "misses": CounterMetricFamily(
+                "mita_memory_cache_misses",
+                "In-process cache misses",
+                labels=["namespace"],
+            ),
+            "evictions": CounterMetricFamily(
+                "mita_memory_cache_evictions",
+                "In-process cache LRU evictions",
+                labels=["namespace"],
+            ),
+            "expirations": CounterMetricFamily(
+                "mita_memory_cache_expirations",
+                "In-process cache TTL expirations",
+                labels=["namespace"],
+            ),
+        }
+        entries = GaugeMetricFamily(
+            "mita_memory_cache_entries",
+            "In-process cache entry count",
+            labels=["namespace"],
+        )
+        size = GaugeMetricFamily(
+            "mita_memory_cache_bytes",
+            "Estimated in-process cache size in bytes",
+            labels=["namespace"],
+        )
+        for ns in self.engine.namespaces():
+            for field, family in families.items():
+                family.add_metric([ns.name], getattr(ns, field))
+            entries.add_metric([ns.name], len(ns))
+            size.add_metric([ns.name], ns.total_bytes)
+
+        yield from families.values()
+        yield entries
+        yield size
+
+
+def register_cache_metrics(registry=None) -> None:
+    """Expose the shared engine's namespaces on the Prometheus registry"""
+    from prometheus_client import REGISTRY
+
+    registry = registry or REGISTRY
+    try:
+        registry.register(CacheEngineCollector(_cache_engine))
+    except ValueError:
+        # Already registered (module reloaded in tests)
+        pass
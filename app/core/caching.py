@@ -7,15 +7,23 @@ import asyncio
 import hashlib
 import json
 import logging
+import math
 import pickle
+import random
+import time
+import uuid
 from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from enum import Enum
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, TypeVar
 
 import redis.asyncio as redis
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
 
+from app.core.cache_engine import CacheNamespace, get_cache_engine
 from app.core.config import settings
 from app.core.error_monitoring import ErrorCategory, ErrorSeverity, log_error
 
@@ -71,139 +79,84 @@ class CacheEntry:
 
 
 class MemoryCache:
-    """High-performance in-memory cache with LRU eviction"""
+    """High-performance in-memory cache with LRU eviction
 
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+    Storage, recency order and expiry live in a CacheNamespace (O(1) per
+    operation); expired entries are dropped lazily and via the engine's timer
+    wheel, so no background cleanup task is needed.
+    """
+
+    def __init__(
+        self, max_size: int = 1000, default_ttl: int = 300, name: Optional[str] = None
+    ):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: Dict[str, CacheEntry] = {}
-        self.access_order: List[str] = []
-        self.lock = asyncio.Lock()
-
-        # Start cleanup task
-        asyncio.create_task(self._cleanup_expired())
+        options = dict(max_entries=max_size, default_ttl=default_ttl, track_sizes=True)
+        if name:
+            self.namespace = get_cache_engine().namespace(name, **options)
+        else:
+            self.namespace = CacheNamespace("memory", **options)
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from memory cache"""
-        async with self.lock:
-            entry = self.cache.get(key)
-            if not entry:
-                return None
-
-            if entry.is_expired():
-                await self._remove_key(key)
-                return None
-
-            # Update access metadata
-            entry.access_count += 1
-            entry.last_accessed = datetime.now(timezone.utc)
-
-            # Update LRU order
-            if key in self.access_order:
-                self.access_order.remove(key)
-            self.access_order.append(key)
-
-            return entry.value
+        return self.namespace.get(key)
 
     async def set(
         self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None
     ):
         """Set value in memory cache"""
-        async with self.lock:
-            ttl = ttl or self.default_ttl
-            expires_at = (
-                datetime.now(timezone.utc) + timedelta(seconds=ttl) if ttl > 0 else None
-            )
-
-            # Calculate size (approximate)
-            size_bytes = len(pickle.dumps(value))
-
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.now(timezone.utc),
-                expires_at=expires_at,
-                access_count=0,
-                last_accessed=datetime.now(timezone.utc),
-                size_bytes=size_bytes,
-                tags=tags or [],
-            )
-
-            self.cache[key] = entry
-
-            # Update access order
-            if key in self.access_order:
-                self.access_order.remove(key)
-            self.access_order.append(key)
-
-            # Evict if necessary
-            await self._evict_if_necessary()
+        self.namespace.set(key, value, ttl or self.default_ttl, tags)
 
     async def delete(self, key: str) -> bool:
         """Delete key from memory cache"""
-        async with self.lock:
-            return await self._remove_key(key)
+        return self.namespace.delete(key)
 
     async def clear_by_tags(self, tags: List[str]):
         """Clear cache entries by tags"""
-        async with self.lock:
-            keys_to_remove = []
-            for key, entry in self.cache.items():
-                if any(tag in entry.tags for tag in tags):
-                    keys_to_remove.append(key)
-
-            for key in keys_to_remove:
-                await self._remove_key(key)
-
-    async def _remove_key(self, key: str) -> bool:
-        """Remove key from cache"""
-        if key in self.cache:
-            del self.cache[key]
-            if key in self.access_order:
-                self.access_order.remove(key)
-            return True
-        return False
-
-    async def _evict_if_necessary(self):
-        """Evict least recently used items if cache is full"""
-        while len(self.cache) > self.max_size:
-            if self.access_order:
-                lru_key = self.access_order.pop(0)
-                await self._remove_key(lru_key)
-
-    async def _cleanup_expired(self):
-        """Periodically cleanup expired entries"""
-        while True:
-            try:
-                await asyncio.sleep(60)  # Cleanup every minute
-
-                async with self.lock:
-                    expired_keys = []
-                    for key, entry in self.cache.items():
-                        if entry.is_expired():
-                            expired_keys.append(key)
-
-                    for key in expired_keys:
-                        await self._remove_key(key)
-
-                    if expired_keys:
-                        logger.debug(
-                            f"Cleaned up {len(expired_keys)} expired cache entries"
-                        )
-
-            except Exception as e:
-                logger.error(f"Error in cache cleanup: {str(e)}")
+        self.namespace.delete_by_tags(tags)
+
+    def clear(self):
+        """Remove every entry"""
+        self.namespace.clear()
+
+    def entries(self) -> List[CacheEntry]:
+        """Snapshot of live entries as CacheEntry records (oldest access first)"""
+        snapshot = []
+        for key, item in self.namespace.items():
+            snapshot.append(
+                CacheEntry(
+                    key=key,
+                    value=item.value,
+                    created_at=datetime.fromtimestamp(item.created_at, timezone.utc),
+                    expires_at=(
+                        datetime.fromtimestamp(item.expires_at, timezone.utc)
+                        if item.expires_at is not None
+                        else None
+                    ),
+                    access_count=item.access_count,
+                    last_accessed=datetime.fromtimestamp(
+                        item.last_accessed, timezone.utc
+                    ),
+                    size_bytes=item.size,
+                    tags=list(item.tags),
+                )
+            )
+        return snapshot
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_size = sum(entry.size_bytes for entry in self.cache.values())
+        stats = self.namespace.stats()
+        entries = stats["entries"]
+        total_size = stats["bytes"]
 
         return {
-            "entries": len(self.cache),
+            "entries": entries,
             "max_size": self.max_size,
-            "utilization": (len(self.cache) / self.max_size) * 100,
+            "utilization": (entries / self.max_size) * 100,
             "total_size_bytes": total_size,
-            "avg_size_bytes": total_size / len(self.cache) if self.cache else 0,
+            "avg_size_bytes": total_size / entries if entries else 0,
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"],
         }
 
 
@@ -382,7 +335,9 @@ class MultiTierCache:
     """Multi-tier cache combining memory and Redis"""
 
     def __init__(self):
-        self.memory_cache = MemoryCache(max_size=1000, default_ttl=300)
+        self.memory_cache = MemoryCache(
+            max_size=1000, default_ttl=300, name="multi_tier"
+        )
         self.redis_cache = RedisCache()
         self.hit_stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
 
@@ -549,13 +504,258 @@ def get_query_cache() -> QueryCache:
     return query_cache
 
 
+# ============================================================================
+# Stampede protection for the caching decorators
+# ============================================================================
+
+
+@dataclass
+class CachedResult:
+    """Envelope stored by `cached`/`cache_query_result`
+
+    fresh_until is wall-clock so it stays meaningful across workers sharing
+    Redis; compute_seconds drives probabilistic early refresh (XFetch).
+    """
+
+    value: Any
+    fresh_until: float
+    compute_seconds: float
+
+
+# In-flight computations per cache key (single-flight within this process)
+_inflight: Dict[str, asyncio.Future] = {}
+# Strong references so background refresh tasks are not garbage collected
+_background_refreshes: set = set()
+
+_decorator_stats = {
+    "hits": 0,
+    "misses": 0,
+    "coalesced": 0,
+    "stale_served": 0,
+    "early_refreshes": 0,
+    "refresh_errors": 0,
+}
+
+
+def _should_refresh_early(entry: CachedResult, beta: float, now: float) -> bool:
+    """XFetch: refresh with rising probability as expiry approaches
+
+    Slow-to-compute values start refreshing earlier. beta <= 0 disables it.
+    """
+    if beta <= 0 or entry.compute_seconds <= 0:
+        return False
+    jitter = -math.log(1.0 - random.random())  # nosec B311 - not security related
+    return now + entry.compute_seconds * beta * jitter >= entry.fresh_until
+
+
+async def _compute_and_store(
+    compute: Callable, store: Callable, ttl: int
+) -> CachedResult:
+    start = time.perf_counter()
+    value = await compute()
+    entry = CachedResult(
+        value=value,
+        fresh_until=time.time() + ttl,
+        compute_seconds=time.perf_counter() - start,
+    )
+    await store(entry)
+    return entry
+
+
+async def _await_other_worker(
+    load: Callable, lock_timeout: float
+) -> Optional[CachedResult]:
+    """Poll the cache while another worker holds the recompute lock"""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await load()
+        if isinstance(entry, CachedResult) and entry.fresh_until > time.time():
+            return entry
+    return None
+
+
+async def _produce(
+    cache_key: str,
+    produce: Callable,
+    load: Callable,
+    distributed_lock: bool,
+    lock_timeout: float,
+) -> CachedResult:
+    """Run produce() under an optional Redis lock shared by all workers"""
+    client = get_cache_manager().redis_cache.redis_client if distributed_lock else None
+    if client is None:
+        return await produce()
+
+    lock_key = f"lock:{cache_key}"
+    token = uuid.uuid4().hex
+    try:
+        acquired = await client.set(
+            lock_key, token, nx=True, px=int(lock_timeout * 1000)
+        )
+    except Exception as e:
+        logger.debug(f"Cache lock unavailable for {cache_key}: {str(e)}")
+        return await produce()
+
+    if not acquired:
+        entry = await _await_other_worker(load, lock_timeout)
+        if entry is not None:
+            _decorator_stats["coalesced"] += 1
+            return entry
+        # Lock holder did not finish in time; compute ourselves
+        return await produce()
+
+    try:
+        return await produce()
+    finally:
+        try:
+            held = await client.get(lock_key)
+            if held in (token, token.encode()):
+                await client.delete(lock_key)
+        except Exception:
+            pass  # Lock expires on its own
+
+
+async def _single_flight(
+    cache_key: str,
+    produce: Callable,
+    load: Callable,
+    distributed_lock: bool,
+    lock_timeout: float,
+) -> CachedResult:
+    """Coalesce concurrent recomputes of the same key onto one future"""
+    loop = asyncio.get_running_loop()
+    pending = _inflight.get(cache_key)
+    if pending is not None and pending.get_loop() is loop:
+        _decorator_stats["coalesced"] += 1
+        return await asyncio.shield(pending)
+
+    future = loop.create_future()
+    _inflight[cache_key] = future
+    try:
+        entry = await _produce(cache_key, produce, load, distributed_lock, lock_timeout)
+        future.set_result(entry)
+        return entry
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()  # Mark retrieved when nobody else was waiting
+        raise
+    finally:
+        if _inflight.get(cache_key) is future:
+            del _inflight[cache_key]
+
+
+_REQUEST_SCOPED = (Session, AsyncSession, Connection, AsyncConnection)
+
+
+def _request_scoped(args: tuple, kwargs: dict) -> bool:
+    """Whether the call carries a DB session or connection
+
+    Those belong to the request that made the call: a background refresh
+    would keep using them after the request has closed them.
+    """
+    return any(isinstance(arg, _REQUEST_SCOPED) for arg in (*args, *kwargs.values()))
+
+
+def _refresh_in_background(cache_key: str, refresh: Callable) -> None:
+    if cache_key in _inflight:
+        return
+
+    async def run():
+        try:
+            await refresh()
+        except Exception as e:
+            _decorator_stats["refresh_errors"] += 1
+            logger.warning(f"Background cache refresh failed for {cache_key}: {e}")
+
+    task = asyncio.create_task(run())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def _get_or_compute(
+    cache_key: str,
+    compute: Callable,
+    load: Callable,
+    store: Callable,
+    ttl: int,
+    stale_ttl: int,
+    early_refresh_beta: float,
+    distributed_lock: bool,
+    lock_timeout: float,
+    background_refresh: bool = True,
+) -> Any:
+    """Cache lookup with single-flight, refresh-ahead and stale-while-revalidate
+
+    Without `background_refresh` nothing is refreshed ahead and a stale
+    entry counts as a miss, recomputed by the caller.
+    """
+
+    def fetch():
+        return _single_flight(
+            cache_key,
+            lambda: _compute_and_store(compute, store, ttl),
+            load,
+            distributed_lock,
+            lock_timeout,
+        )
+
+    entry = await load()
+    if entry is not None:
+        if not isinstance(entry, CachedResult):
+            # Written before values were wrapped; treat as fresh
+            _decorator_stats["hits"] += 1
+            return entry
+
+        now = time.time()
+        if now < entry.fresh_until:
+            _decorator_stats["hits"] += 1
+            if background_refresh and _should_refresh_early(
+                entry, early_refresh_beta, now
+            ):
+                _decorator_stats["early_refreshes"] += 1
+                _refresh_in_background(cache_key, fetch)
+            return entry.value
+
+        if background_refresh and now < entry.fresh_until + stale_ttl:
+            _decorator_stats["stale_served"] += 1
+            _refresh_in_background(cache_key, fetch)
+            return entry.value
+
+    _decorator_stats["misses"] += 1
+    return (await fetch()).value
+
+
+def get_decorator_stats() -> Dict[str, Any]:
+    """Counters for the caching decorators"""
+    stats = dict(_decorator_stats)
+    stats["in_flight"] = len(_inflight)
+    return stats
+
+
 def cached(
     ttl: int = 300,
     key_prefix: str = "",
     tags: List[str] = None,
     levels: List[CacheLevel] = None,
+    stale_ttl: int = 0,
+    early_refresh_beta: float = 0.0,
+    distributed_lock: bool = False,
+    lock_timeout: float = 10.0,
 ):
-    """Decorator for caching function results"""
+    """Decorator for caching function results
+
+    Concurrent misses for the same key share one call. After `ttl` the value
+    is served stale for up to `stale_ttl` seconds while one background call
+    refreshes it; with `early_refresh_beta` > 0 a refresh may start before
+    `ttl` (XFetch, scaled by beta; 1.0 is the usual choice). Calls given a DB
+    session are never refreshed in the background: their stale entries are
+    recomputed in the request. `distributed_lock` extends single-flight
+    across workers with a Redis lock.
+    """
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -566,26 +766,40 @@ def cached(
                 key_data.encode(), usedforsecurity=False
             ).hexdigest()
 
-            # Try to get from cache
-            cached_result = await get_cache_manager().get(cache_key)
-            if cached_result is not None:
-                return cached_result
+            async def store(entry: CachedResult):
+                await get_cache_manager().set(
+                    cache_key, entry, ttl=ttl + stale_ttl, tags=tags, levels=levels
+                )
 
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await get_cache_manager().set(
-                cache_key, result, ttl=ttl, tags=tags, levels=levels
+            return await _get_or_compute(
+                cache_key,
+                compute=lambda: func(*args, **kwargs),
+                load=lambda: get_cache_manager().get(cache_key),
+                store=store,
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                early_refresh_beta=early_refresh_beta,
+                distributed_lock=distributed_lock,
+                lock_timeout=lock_timeout,
+                background_refresh=not _request_scoped(args, kwargs),
             )
 
-            return result
-
         return wrapper
 
     return decorator
 
 
-def cache_query_result(ttl: int = 300):
-    """Decorator for caching database query results"""
+def cache_query_result(
+    ttl: int = 300,
+    stale_ttl: int = 0,
+    early_refresh_beta: float = 0.0,
+    distributed_lock: bool = False,
+    lock_timeout: float = 10.0,
+):
+    """Decorator for caching database query results
+
+    Same stampede protection as `cached`.
+    """
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -599,20 +813,25 @@ def cache_query_result(ttl: int = 300):
                 # If no query info, execute function normally
                 return await func(*args, **kwargs)
 
-            # Try to get cached result
-            cached_result = await query_cache.get_cached_result(
-                query_text, query_params
-            )
-            if cached_result is not None:
-                logger.debug(f"Query cache hit for: {query_text[:50]}...")
-                return cached_result
+            query_cache = get_query_cache()
 
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await query_cache.cache_result(query_text, result, query_params, ttl)
+            async def store(entry: CachedResult):
+                await query_cache.cache_result(
+                    query_text, entry, query_params, ttl + stale_ttl
+                )
 
-            logger.debug(f"Query result cached for: {query_text[:50]}...")
-            return result
+            return await _get_or_compute(
+                query_cache._generate_cache_key(query_text, query_params),
+                compute=lambda: func(*args, **kwargs),
+                load=lambda: query_cache.get_cached_result(query_text, query_params),
+                store=store,
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                early_refresh_beta=early_refresh_beta,
+                distributed_lock=distributed_lock,
+                lock_timeout=lock_timeout,
+                background_refresh=not _request_scoped(args, kwargs),
+            )
 
         return wrapper
 
@@ -623,7 +842,9 @@ async def get_cache_statistics() -> Dict[str, Any]:
     """Get comprehensive cache statistics"""
     # Always go through the lazy getter: the module-global starts as None
     # and importing the bare name froze that None in consumers.
-    return await get_cache_manager().get_comprehensive_stats()
+    stats = await get_cache_manager().get_comprehensive_stats()
+    stats["decorators"] = get_decorator_stats()
+    return stats
 
 
 async def warm_up_cache():
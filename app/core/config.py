@@ -56,6 +56,10 @@ class Settings(BaseSettings):
     ENABLE_TASK_METRICS: bool = True
     METRICS_COLLECTION_INTERVAL: int = 60  # seconds
 
+    # Per-request SQL query budget (0 disables the check)
+    QUERY_BUDGET_PER_REQUEST: int = 40  # Queries per request before warning
+    QUERY_BUDGET_REPEAT_THRESHOLD: int = 8  # Same statement shape = likely N+1
+
     # Auth / JWT - MUST be provided via environment variables for security
     JWT_SECRET: str = ""
     JWT_PREVIOUS_SECRET: str = ""
@@ -172,6 +176,8 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    # Import rarely used routers on their first request (app/core/lazy_routers.py)
+    LAZY_ROUTERS: bool = False
 
     @property
     def ALLOWED_ORIGINS_LIST(self):
@@ -21,6 +21,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engin
 from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.query_budget import current_route
 
 # from app.core.error_monitoring import log_error, ErrorSeverity, ErrorCategory
 
@@ -506,6 +507,7 @@ class OptimizedDatabaseEngine:
                             cursor.rowcount if hasattr(cursor, "rowcount") else None
                         ),
                         connection_id=str(id(conn)),
+                        endpoint=current_route(),
                         parameters=parameters,
                     )
 
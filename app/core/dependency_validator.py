@@ -149,18 +149,20 @@ class DependencyValidator:
         }
 
         try:
-            # Try to import the module
+            # Read the installed version from package metadata first: importing
+            # every SDK (openai, boto3, firebase-admin...) just to check it
+            # cost every process start most of a second
             try:
-                module = importlib.import_module(requirement.name.replace("-", "_"))
-                result["status"] = "imported"
-            except ImportError:
-                # If direct import fails, try to get version from importlib.metadata
+                result["installed_version"] = importlib.metadata.version(
+                    requirement.name
+                )
+                result["status"] = "available"
+            except importlib.metadata.PackageNotFoundError:
+                # Not an installed distribution under that name; try importing it
                 try:
-                    result["status"] = "available"
-                    result["installed_version"] = importlib.metadata.version(
-                        requirement.name
-                    )
-                except importlib.metadata.PackageNotFoundError:
+                    module = importlib.import_module(requirement.name.replace("-", "_"))
+                    result["status"] = "imported"
+                except ImportError:
                     result["status"] = "missing"
                     result["issues"].append(
                         f"Package {requirement.name} is not installed"
@@ -0,0 +1,259 @@
+"""
+Health Collector for MITA Finance
+Background health probes served from an in-process snapshot
+
+Liveness/readiness probes and monitoring scrape the health endpoints every
+few seconds, and each hit used to ping the database, Redis, the task queue
+and external APIs in turn. Each dependency is now a HealthProbe that runs on
+its own interval, with a timeout, in a background task; the result lands in
+a snapshot that the endpoints read without doing any I/O. Every result
+carries when it was taken, so responses show how fresh they are.
+
+Probes start on first use: the first request for one runs it inline (calls
+made while it is in flight share that run) and schedules its loop, so
+probes of routers that are never hit cost nothing. on_startup warms the
+probes behind /health.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.shared_store import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# A result older than this many intervals is reported as stale
+STALE_AFTER_INTERVALS = 3
+
+
+@dataclass
+class HealthProbe:
+    """One dependency check and how often to run it"""
+
+    name: str
+    check: Callable[[], Awaitable[Any]]
+    interval: float  # seconds between runs
+    timeout: float  # seconds before a run counts as failed
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of the latest run of a probe"""
+
+    name: str
+    ok: bool  # the check returned; `value` says what it found
+    value: Any
+    error: Optional[str]  # "timeout" or the exception text when not ok
+    checked_at: float  # time.time() when the run finished
+    duration_ms: float
+    interval: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.checked_at)
+
+    @property
+    def stale(self) -> bool:
+        return self.age_seconds > self.interval * STALE_AFTER_INTERVALS
+
+    def freshness(self) -> Dict[str, Any]:
+        info = {
+            "ok": self.ok,
+            "checked_at": datetime.fromtimestamp(
+                self.checked_at, tz=timezone.utc
+            ).isoformat(),
+            "age_seconds": round(self.age_seconds, 1),
+            "duration_ms": round(self.duration_ms, 1),
+            "stale": self.stale,
+        }
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class HealthCollector:
+    """Runs registered probes in the background and keeps their results"""
+
+    def __init__(self):
+        self._probes: Dict[str, HealthProbe] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._loops: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def register(self, probe: HealthProbe) -> None:
+        """Add or replace a probe; a running loop picks up the new one"""
+        self._probes[probe.name] = probe
+
+    @property
+    def probes(self) -> Dict[str, HealthProbe]:
+        return dict(self._probes)
+
+    # Reads ------------------------------------------------------------------
+
+    def result(self, name: str) -> Optional[ProbeResult]:
+        """Latest result without running anything (None before the first)"""
+        return self._results.get(name)
+
+    async def get(self, name: str) -> ProbeResult:
+        """Latest result; runs the probe now only if it never ran"""
+        result = self._results.get(name)
+        if result is None:
+            result = await self.probe(name)
+        self._ensure_loop(name)
+        return result
+
+    def snapshot(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Freshness of the latest result of each (or each named) probe"""
+        names = self._results.keys() if names is None else names
+        return {
+            name: self._results[name].freshness()
+            for name in names
+            if name in self._results
+        }
+
+    # Runs -------------------------------------------------------------------
+
+    async def probe(self, name: str) -> ProbeResult:
+        """Run a probe now, sharing a run that is already in flight"""
+        task = self._inflight.get(name)
+        if task is None or not _on_running_loop(task):
+            task = asyncio.ensure_future(self._run(self._probes[name]))
+            self._inflight[name] = task
+            task.add_done_callback(lambda done: self._forget(name, done))
+        return await asyncio.shield(task)
+
+    def start(self, names: Optional[Iterable[str]] = None) -> None:
+        """Schedule the loops of the given (default: all) probes"""
+        for name in self._probes if names is None else names:
+            self._ensure_loop(name)
+
+    async def stop(self) -> None:
+        loops = list(self._loops.values())
+        self._loops.clear()
+        for task in loops:
+            task.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+
+    def _forget(self, name: str, task: asyncio.Task) -> None:
+        if self._inflight.get(name) is task:
+            del self._inflight[name]
+
+    def _ensure_loop(self, name: str) -> None:
+        task = self._loops.get(name)
+        if task is not None and not task.done() and _on_running_loop(task):
+            return
+        self._loops[name] = asyncio.get_running_loop().create_task(
+            self._loop(name), name=f"health-probe:{name}"
+        )
+
+    async def _loop(self, name: str) -> None:
+        while True:
+            probe = self._probes[name]
+            result = self._results.get(name)
+            if result is not None:
+                await asyncio.sleep(max(0.0, probe.interval - result.age_seconds))
+            await self.probe(name)
+
+    async def _run(self, probe: HealthProbe) -> ProbeResult:
+        started = time.perf_counter()
+        ok, value, error = False, None, None
+        try:
+            value = await asyncio.wait_for(probe.check(), timeout=probe.timeout)
+            ok = True
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.warning(f"Health probe {probe.name} failed: {error}")
+        result = ProbeResult(
+            name=probe.name,
+            ok=ok,
+            value=value,
+            error=error,
+            checked_at=time.time(),
+            duration_ms=(time.perf_counter() - started) * 1000,
+            interval=probe.interval,
+        )
+        self._results[probe.name] = result
+        return result
+
+
+def _on_running_loop(task: asyncio.Task) -> bool:
+    """Tasks of a loop that has gone away (tests, reloads) are abandoned"""
+    try:
+        return task.get_loop() is asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+
+# ============================================================================
+# Core probes
+# ============================================================================
+
+
+async def check_redis_health() -> str:
+    """Ping Redis with a short timeout: connected / unavailable / not_configured.
+
+    Honors every supported provider config: REDIS_URL / UPSTASH_REDIS_URL
+    (direct protocol URLs) and UPSTASH_REDIS_REST_URL + token (converted to
+    a rediss:// URL the same way app/core/limiter_setup.py does).
+    """
+    redis_url = settings.REDIS_URL or getattr(settings, "UPSTASH_REDIS_URL", "")
+    if not redis_url:
+        rest_url = os.getenv("UPSTASH_REDIS_REST_URL", "")
+        rest_token = os.getenv("UPSTASH_REDIS_REST_TOKEN", "")
+        if rest_url.startswith("https://") and rest_token:
+            host = rest_url.replace("https://", "").replace("http://", "")
+            redis_url = f"rediss://default:{rest_token}@{host}:6379"
+    if not redis_url:
+        return "not_configured"
+    try:
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(
+            redis_url, socket_connect_timeout=3, socket_timeout=3
+        )
+        try:
+            pong = await asyncio.wait_for(client.ping(), timeout=3.0)
+            return "connected" if pong else "error"
+        finally:
+            await client.aclose()
+    except Exception:
+        return "unavailable"
+
+
+async def _check_database() -> bool:
+    from app.core.async_session import check_database_health
+
+    return await check_database_health()
+
+
+async def _alembic_revision() -> str:
+    from app.core.async_session import get_alembic_revision
+
+    return await get_alembic_revision()
+
+
+# Probes behind GET /health, warmed on startup
+CORE_PROBES = ("database", "alembic_revision", "redis")
+
+
+def _register_core_probes(collector: HealthCollector) -> None:
+    collector.register(HealthProbe("database", _check_database, 15, 5))
+    # The migration head only changes on deploy
+    collector.register(HealthProbe("alembic_revision", _alembic_revision, 300, 5))
+    collector.register(HealthProbe("redis", check_redis_health, 15, 3))
+
+
+@process_singleton
+def get_health_collector() -> HealthCollector:
+    """The collector /health reads, with the core probes registered"""
+    collector = HealthCollector()
+    _register_core_probes(collector)
+    return collector
@@ -0,0 +1,143 @@
+"""
+Lazy Router Mounting for MITA Finance
+Defers importing rarely used routers until their first request
+
+With LAZY_ROUTERS enabled, main.py registers a placeholder for each router
+in LAZY_ROUTER_SPECS instead of importing it. The placeholder matches every
+path under the router's URL prefix; on the first request it imports the
+module, includes the real router with the same prefix, tags and
+dependencies, removes itself and hands the request to the real routes.
+
+Until a router has been loaded its endpoints are missing from the OpenAPI
+schema, so the mode is off by default and meant for production workers
+where start time and resident memory matter more than /docs.
+"""
+
+import asyncio
+import importlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LazyRouterSpec:
+    """Where a router lives and the URL space it owns"""
+
+    module: str  # defines `router`
+    prefix: str  # include_router prefix, e.g. "/api"
+    path: str  # the router's own prefix, e.g. "/cluster"
+    tags: List[str] = field(default_factory=list)
+
+    @property
+    def url_prefix(self) -> str:
+        return self.prefix + self.path
+
+
+# Admin, diagnostics and little-used feature routers. Each owns its whole
+# URL prefix: no eagerly mounted router may serve paths below it.
+LAZY_ROUTER_SPECS: Sequence[LazyRouterSpec] = (
+    LazyRouterSpec("app.api.cluster.routes", "/api", "/cluster", ["Clusters"]),
+    LazyRouterSpec("app.api.cohort.routes", "/api", "/cohort", ["Cohorts"]),
+    LazyRouterSpec("app.api.drift.routes", "/api", "/drift", ["Drift"]),
+    LazyRouterSpec("app.api.style.routes", "/api", "/style", ["Styles"]),
+    LazyRouterSpec("app.api.behavior.routes", "/api", "/behavior", ["Behavior"]),
+    LazyRouterSpec("app.api.referral.routes", "/api", "/referral", ["Referrals"]),
+    LazyRouterSpec("app.api.endpoints.audit", "/api", "/audit", ["Audit"]),
+    LazyRouterSpec(
+        "app.api.endpoints.database_performance",
+        "/api",
+        "/database",
+        ["Database Performance"],
+    ),
+    LazyRouterSpec(
+        "app.api.endpoints.cache_management", "/api", "/cache", ["Cache Management"]
+    ),
+    LazyRouterSpec(
+        "app.api.endpoints.feature_flags", "/api", "/feature-flags", ["Feature Flags"]
+    ),
+)
+
+
+def load_router(spec: LazyRouterSpec):
+    return importlib.import_module(spec.module).router
+
+
+class LazyRouterPlaceholder(BaseRoute):
+    """Stands in for a router until a request reaches its prefix"""
+
+    def __init__(
+        self,
+        app: FastAPI,
+        spec: LazyRouterSpec,
+        dependencies: Optional[Sequence[Any]] = None,
+    ):
+        self.app = app
+        self.spec = spec
+        self.dependencies = list(dependencies or [])
+        self.path = spec.url_prefix
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+    def matches(self, scope: Scope):
+        if scope["type"] not in ("http", "websocket"):
+            return Match.NONE, {}
+        path = scope["path"]
+        if path == self.path or path.startswith(self.path + "/"):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with self._lock:
+            if not self.loaded:
+                self.load()
+        # The real routes are in place now; route the request again
+        await self.app.router(scope, receive, send)
+
+    def load(self) -> None:
+        router = load_router(self.spec)
+        self.app.include_router(
+            router,
+            prefix=self.spec.prefix,
+            tags=self.spec.tags,
+            dependencies=self.dependencies,
+        )
+        self.app.router.routes.remove(self)
+        self.app.openapi_schema = None  # regenerate with the new routes
+        self.loaded = True
+        logger.info(f"Loaded router {self.spec.module} on first request")
+
+
+def mount_lazy_routers(
+    app: FastAPI,
+    specs: Sequence[LazyRouterSpec] = LAZY_ROUTER_SPECS,
+    dependencies: Optional[Sequence[Any]] = None,
+) -> List[LazyRouterPlaceholder]:
+    """Register a placeholder per spec; the routers load on demand"""
+    placeholders = [LazyRouterPlaceholder(app, spec, dependencies) for spec in specs]
+    app.router.routes.extend(placeholders)
+    return placeholders
+
+
+def mount_routers_eagerly(
+    app: FastAPI,
+    specs: Sequence[LazyRouterSpec] = LAZY_ROUTER_SPECS,
+    dependencies: Optional[Sequence[Any]] = None,
+) -> None:
+    """Import and include every spec'd router now (the default)"""
+    for spec in specs:
+        app.include_router(
+            load_router(spec),
+            prefix=spec.prefix,
+            tags=spec.tags,
+            dependencies=list(dependencies or []),
+        )
@@ -325,8 +325,13 @@ def cleanup_thread_pool():
 # ============================================================================
 
 
-def validate_bcrypt_configuration() -> dict:
-    """Validate bcrypt configuration and performance"""
+def validate_bcrypt_configuration(include_performance: bool = True) -> dict:
+    """Validate bcrypt configuration and performance
+
+    The performance test hashes and verifies three passwords (about two
+    seconds at production rounds); pass include_performance=False where
+    that cost is not wanted, such as at import time.
+    """
     validation_result = {
         "valid": True,
         "issues": [],
@@ -351,18 +356,19 @@ def validate_bcrypt_configuration() -> dict:
         )
 
     # Test performance
-    try:
-        perf_test = test_password_performance()
-        validation_result["performance"] = perf_test
-
-        if not perf_test["meets_target"]:
-            validation_result["warnings"].append(
-                f"Password hashing performance ({perf_test['average_ms']:.0f}ms) "
-                f"exceeds target ({BCRYPT_PERFORMANCE_TARGET_MS}ms)"
-            )
-    except Exception as e:
-        validation_result["issues"].append(f"Performance test failed: {e}")
-        validation_result["valid"] = False
+    if include_performance:
+        try:
+            perf_test = test_password_performance()
+            validation_result["performance"] = perf_test
+
+            if not perf_test["meets_target"]:
+                validation_result["warnings"].append(
+                    f"Password hashing performance ({perf_test['average_ms']:.0f}ms) "
+                    f"exceeds target ({BCRYPT_PERFORMANCE_TARGET_MS}ms)"
+                )
+        except Exception as e:
+            validation_result["issues"].append(f"Performance test failed: {e}")
+            validation_result["valid"] = False
 
     # Log validation results
     if validation_result["valid"]:
@@ -5,129 +5,68 @@ Provides in-memory caching for frequently accessed data to improve response time
 
 import asyncio
 import logging
-import time
 from functools import wraps
-from threading import RLock
 from typing import Any, Callable, Dict, Optional
 
+from app.core.cache_engine import CacheNamespace, get_cache_engine
+
 logger = logging.getLogger(__name__)
 
 
 class PerformanceCache:
-    """High-performance in-memory cache with TTL and automatic cleanup"""
+    """High-performance in-memory cache with TTL, backed by a shared engine namespace"""
 
-    def __init__(self, max_size: int = 10000, default_ttl: int = 300):
+    def __init__(
+        self, max_size: int = 10000, default_ttl: int = 300, name: Optional[str] = None
+    ):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._access_times: Dict[str, float] = {}
-        self._lock = RLock()
-        self._last_cleanup = time.time()
-        self._cleanup_interval = 60  # Clean up every minute
-
-    def _cleanup_expired(self):
-        """Remove expired entries and enforce size limits"""
-        with self._lock:
-            current_time = time.time()
-
-            # Remove expired entries
-            expired_keys = [
-                key
-                for key, entry in self._cache.items()
-                if entry.get("expires_at", 0) < current_time
-            ]
-
-            for key in expired_keys:
-                self._cache.pop(key, None)
-                self._access_times.pop(key, None)
-
-            # Enforce size limit by removing least recently used items
-            if len(self._cache) > self.max_size:
-                # Sort by access time and remove oldest
-                sorted_keys = sorted(self._access_times.items(), key=lambda x: x[1])
-
-                to_remove = len(self._cache) - self.max_size
-                for i in range(to_remove):
-                    key_to_remove = sorted_keys[i][0]
-                    self._cache.pop(key_to_remove, None)
-                    self._access_times.pop(key_to_remove, None)
-
-            self._last_cleanup = current_time
-
-            if expired_keys:
-                logger.debug(
-                    f"Cache cleanup: removed {len(expired_keys)} expired entries"
-                )
+        options = dict(max_entries=max_size, default_ttl=default_ttl)
+        if name:
+            self._namespace = get_cache_engine().namespace(name, **options)
+        else:
+            self._namespace = CacheNamespace("anonymous", **options)
 
     def get(self, key: str) -> Optional[Any]:
         """Get cached value by key"""
-        current_time = time.time()
-
-        # Periodic cleanup
-        if current_time - self._last_cleanup > self._cleanup_interval:
-            self._cleanup_expired()
-
-        with self._lock:
-            entry = self._cache.get(key)
-            if entry is None:
-                return None
-
-            # Check if expired
-            if entry.get("expires_at", 0) < current_time:
-                self._cache.pop(key, None)
-                self._access_times.pop(key, None)
-                return None
-
-            # Update access time
-            self._access_times[key] = current_time
-            return entry["value"]
+        return self._namespace.get(key)
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set cached value with optional TTL"""
-        current_time = time.time()
-        ttl = ttl or self.default_ttl
-
-        with self._lock:
-            self._cache[key] = {
-                "value": value,
-                "created_at": current_time,
-                "expires_at": current_time + ttl,
-            }
-            self._access_times[key] = current_time
+        self._namespace.set(key, value, ttl or self.default_ttl)
 
     def delete(self, key: str) -> bool:
         """Delete cached entry"""
-        with self._lock:
-            if key in self._cache:
-                self._cache.pop(key, None)
-                self._access_times.pop(key, None)
-                return True
-            return False
+        return self._namespace.delete(key)
 
     def clear(self) -> None:
         """Clear all cached entries"""
-        with self._lock:
-            self._cache.clear()
-            self._access_times.clear()
+        self._namespace.clear()
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._lock:
-            return {
-                "size": len(self._cache),
-                "max_size": self.max_size,
-                "utilization": len(self._cache) / self.max_size,
-                "last_cleanup": self._last_cleanup,
-            }
+        stats = self._namespace.stats()
+        return {
+            "size": stats["entries"],
+            "max_size": self.max_size,
+            "utilization": stats["entries"] / self.max_size,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"],
+        }
 
 
 # Global cache instances
 user_cache = PerformanceCache(
-    max_size=5000, default_ttl=600
+    max_size=5000, default_ttl=600, name="user"
 )  # 10 minutes for user data
-token_cache = PerformanceCache(max_size=10000, default_ttl=300)  # 5 minutes for tokens
+token_cache = PerformanceCache(
+    max_size=10000, default_ttl=300, name="token"
+)  # 5 minutes for tokens
 query_cache = PerformanceCache(
-    max_size=2000, default_ttl=120
+    max_size=2000, default_ttl=120, name="query"
 )  # 2 minutes for query results
 
 
@@ -4,11 +4,8 @@ Provides comprehensive monitoring metrics for production observability
 """
 
 import os
-import time
-from typing import Callable
 
 import psutil
-from fastapi import Request, Response
 from prometheus_client import (  # noqa: F401
     CONTENT_TYPE_LATEST,
     REGISTRY,
@@ -18,7 +15,8 @@ from prometheus_client import (  # noqa: F401
     Info,
     generate_latest,
 )
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.cache_engine import register_cache_metrics
 
 # ============================================================================
 # HTTP Metrics
@@ -55,7 +53,7 @@ http_request_duration_seconds = Histogram(
 http_requests_in_progress = Gauge(
     "mita_http_requests_in_progress",
     "Number of HTTP requests currently being processed",
-    ["method", "endpoint"],
+    ["method"],  # route is not known until the router has matched
 )
 
 # ============================================================================
@@ -96,6 +94,17 @@ active_users_gauge = Gauge(
     "Number of currently active users (authenticated in last 5 minutes)",
 )
 
+live_budget_connections = Gauge(
+    "mita_live_budget_connections",
+    "Open live budget status streams in this worker",
+)
+
+live_budget_events = Counter(
+    "mita_live_budget_events_total",
+    "Frames pushed on live budget status streams",
+    ["event"],  # status, delta, heartbeat
+)
+
 # ============================================================================
 # Database Metrics
 # ============================================================================
@@ -128,10 +137,38 @@ database_query_duration_seconds = Histogram(
     ),
 )
 
+http_request_db_queries = Histogram(
+    "mita_http_request_db_queries",
+    "SQL queries executed per HTTP request by method and route",
+    ["method", "endpoint"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, float("inf")),
+)
+
+http_request_db_seconds = Histogram(
+    "mita_http_request_db_seconds",
+    "Total database time per HTTP request by method and route",
+    ["method", "endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+
+query_budget_violations_total = Counter(
+    "mita_query_budget_violations_total",
+    "Requests that exceeded the query budget or repeated a statement shape",
+    ["endpoint", "reason"],  # reason: budget, repeated_statement
+)
+
 database_errors_total = Counter(
     "mita_database_errors_total", "Total number of database errors", ["error_type"]
 )
 
+# ============================================================================
+# In-Process Cache Metrics
+# ============================================================================
+
+# Per-namespace hit/miss/eviction counters from app.core.cache_engine,
+# read at scrape time so cache operations never touch a metric object.
+register_cache_metrics(REGISTRY)
+
 # ============================================================================
 # External Service Metrics
 # ============================================================================
@@ -152,6 +189,18 @@ external_api_duration_seconds = Histogram(
     buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, float("inf")),
 )
 
+llm_cache_requests = Counter(
+    "mita_llm_cache_requests_total",
+    "LLM completion lookups by call type and outcome",
+    ["call_type", "outcome"],  # outcome: hit, miss, coalesced
+)
+
+llm_tokens = Counter(
+    "mita_llm_tokens_total",
+    "Tokens billed by the LLM provider by call type",
+    ["call_type", "kind"],  # kind: prompt, completion
+)
+
 circuit_breaker_state = Gauge(
     "mita_circuit_breaker_state",
     "Circuit breaker state (0=closed, 1=open, 2=half_open)",
@@ -190,76 +239,35 @@ app_info.info(
 )
 
 # ============================================================================
-# Prometheus Middleware
+# HTTP Metric Recording
 # ============================================================================
 
+# Methods outside this set are folded into one label value so arbitrary
+# verbs sent by scanners cannot grow the series count.
+_KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to automatically collect HTTP metrics for all requests
+
+def bounded_method(method: str) -> str:
+    """HTTP method label with bounded cardinality"""
+    return method if method in _KNOWN_METHODS else "OTHER"
+
+
+def observe_http_request(
+    method: str, endpoint: str, status_code: int, duration: float
+) -> None:
     """
+    Record one finished HTTP request.
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip metrics endpoint itself
-        if request.url.path == "/metrics":
-            return await call_next(request)
-
-        # Normalize endpoint path (remove IDs for better grouping)
-        endpoint = self._normalize_path(request.url.path)
-        method = request.method
-
-        # Track in-progress requests
-        http_requests_in_progress.labels(method=method, endpoint=endpoint).inc()
-
-        # Start timer
-        start_time = time.time()
-
-        try:
-            # Process request
-            response = await call_next(request)
-            status_code = response.status_code
-
-            return response
-        except Exception:
-            # Track errors
-            status_code = 500
-            raise
-        finally:
-            # Calculate duration
-            duration = time.time() - start_time
-
-            # Record metrics
-            http_requests_total.labels(
-                method=method, endpoint=endpoint, status_code=status_code
-            ).inc()
-
-            http_request_duration_seconds.labels(
-                method=method, endpoint=endpoint
-            ).observe(duration)
-
-            http_requests_in_progress.labels(method=method, endpoint=endpoint).dec()
-
-    def _normalize_path(self, path: str) -> str:
-        """
-        Normalize path by replacing UUIDs and IDs with placeholders
-        Examples:
-          /api/goals/123e4567-e89b-12d3-a456-426614174000 -> /api/goals/{id}
-          /api/users/42 -> /api/users/{id}
-        """
-        import re
-
-        # Replace UUIDs
-        path = re.sub(
-            r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
-            "/{id}",
-            path,
-            flags=re.IGNORECASE,
-        )
-
-        # Replace numeric IDs
-        path = re.sub(r"/\d+", "/{id}", path)
-
-        return path
+    `endpoint` must be a route template (e.g. /api/goals/{goal_id}) or a
+    fixed placeholder, never the raw path, to keep label cardinality bounded.
+    Collection happens in app.middleware.http_observability_middleware.
+    """
+    http_requests_total.labels(
+        method=method, endpoint=endpoint, status_code=status_code
+    ).inc()
+    http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(
+        duration
+    )
 
 
 # ============================================================================
@@ -0,0 +1,307 @@
+"""
+Per-Request SQL Query Budget and N+1 Detection
+
+The global monitors (DatabaseQueryMonitor, DatabasePerformanceMonitor) know
+which statements are slow but not which HTTP route issued them. This module
+attributes every cursor execution to the request that caused it through a
+contextvar, so a route that fires 40 small queries shows up even when none
+of them is individually slow.
+
+Pieces:
+- install_query_instrumentation(engine): before/after_cursor_execute hooks,
+  safe to call on the async engine and the sync engine alike.
+- track_queries(): context manager that opens a request scope (used by the
+  ASGI middleware and by the `query_budget` pytest fixture).
+- route summaries: in-process per-route aggregates for the admin API, with
+  Prometheus histograms for the real percentiles.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"(\$\d+|%\(\w+\)s|:\w+|\?)")
+_IN_LIST_RE = re.compile(r"IN \((?:\s*\?\s*,?)+\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Samples kept per route for the in-process percentile summary
+_ROUTE_SAMPLE_SIZE = 200
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse a SQL statement to its shape (literals and params removed).
+
+    Two executions with the same shape but different bound values are the
+    signature of an N+1 loop.
+    """
+    shape = _QUOTED_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _WHITESPACE_RE.sub(" ", shape).strip().upper()
+    shape = _IN_LIST_RE.sub("IN (?)", shape)
+    return shape[:300]
+
+
+@dataclass
+class RequestQueryStats:
+    """Queries executed while serving a single request"""
+
+    route: str = "unknown"
+    query_count: int = 0
+    db_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    scope: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        self.shapes[normalize_statement(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Dict[str, Any]]:
+        """Statement shapes executed at least `threshold` times (N+1 suspects)"""
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "mita_request_query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being served on this task/thread, if any"""
+    return _current_stats.get()
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Matched route path (e.g. /api/goals/{goal_id}) or a bounded fallback"""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or "unmatched"
+
+
+def current_route() -> Optional[str]:
+    """Route template of the request being served, if known"""
+    stats = _current_stats.get()
+    if stats is None:
+        return None
+    if stats.scope is not None and "route" in stats.scope:
+        return route_template(stats.scope)
+    return stats.route
+
+
+@contextmanager
+def track_queries(
+    route: str = "unknown", scope: Optional[Dict[str, Any]] = None
+) -> Iterator[RequestQueryStats]:
+    """Attribute every query executed inside the block to one stats object"""
+    stats = RequestQueryStats(route=route, scope=scope)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Callbacks invoked with each finished request's stats (test fixtures use
+# this because TestClient serves requests on a different thread/context)
+_request_observers: List[Callable[[RequestQueryStats], None]] = []
+
+
+def add_request_observer(callback: Callable[[RequestQueryStats], None]) -> None:
+    _request_observers.append(callback)
+
+
+def remove_request_observer(callback: Callable[[RequestQueryStats], None]) -> None:
+    if callback in _request_observers:
+        _request_observers.remove(callback)
+
+
+def notify_request_finished(stats: RequestQueryStats) -> None:
+    for callback in list(_request_observers):
+        try:
+            callback(stats)
+        except Exception as e:
+            logger.debug(f"Query budget observer failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Engine hooks
+# ---------------------------------------------------------------------------
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("mita_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("mita_query_start")
+    duration = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.record(statement, duration)
+
+
+def _handle_error(context):
+    # A statement that raised never reaches after_cursor_execute; pop its
+    # start here or the pooled connection carries it into later requests.
+    stats = _current_stats.get()
+    if stats is None or context.execution_context is None:
+        return
+    starts = context.connection.info.get("mita_query_start")
+    duration = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.record(context.statement or "", duration)
+
+
+def install_query_instrumentation(engine) -> None:
+    """Register the per-request counting hooks on an engine (idempotent).
+
+    Accepts a sync Engine or an AsyncEngine; async engines are instrumented
+    through their underlying sync_engine, which is where cursor events fire.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    logger.debug("Per-request query instrumentation installed on %s", sync_engine)
+
+
+# ---------------------------------------------------------------------------
+# Budget evaluation and per-route aggregation
+# ---------------------------------------------------------------------------
+
+
+class RouteQueryStatsCollector:
+    """Per-route rolling samples of query count and DB time"""
+
+    def __init__(self, sample_size: int = _ROUTE_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._counts: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=self.sample_size)
+        )
+        self._db_times: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=self.sample_size)
+        )
+        self._violations: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def observe(self, stats: RequestQueryStats, over_budget: bool) -> None:
+        with self.lock:
+            self._counts[stats.route].append(stats.query_count)
+            self._db_times[stats.route].append(stats.db_time)
+            if over_budget:
+                self._violations[stats.route] += 1
+
+    @staticmethod
+    def _percentile(values: List[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Routes ordered by p95 query count, most chatty first"""
+        with self.lock:
+            routes = {
+                route: (list(counts), list(self._db_times[route]))
+                for route, counts in self._counts.items()
+            }
+            violations = dict(self._violations)
+
+        rows = []
+        for route, (counts, db_times) in routes.items():
+            rows.append(
+                {
+                    "route": route,
+                    "samples": len(counts),
+                    "queries_p50": self._percentile(counts, 50),
+                    "queries_p95": self._percentile(counts, 95),
+                    "queries_max": max(counts) if counts else 0,
+                    "db_time_p95_ms": round(self._percentile(db_times, 95) * 1000, 2),
+                    "budget_violations": violations.get(route, 0),
+                }
+            )
+        rows.sort(key=lambda row: row["queries_p95"], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self.lock:
+            self._counts.clear()
+            self._db_times.clear()
+            self._violations.clear()
+
+
+route_query_stats = RouteQueryStatsCollector()
+
+
+def evaluate_query_budget(
+    stats: RequestQueryStats,
+    budget: Optional[int] = None,
+    repeat_threshold: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Check a finished request against the configured budget.
+
+    Logs a warning naming the route when it exceeds the query budget or
+    repeats a statement shape often enough to look like an N+1 loop.
+    """
+    budget = budget if budget is not None else settings.QUERY_BUDGET_PER_REQUEST
+    repeat_threshold = (
+        repeat_threshold
+        if repeat_threshold is not None
+        else settings.QUERY_BUDGET_REPEAT_THRESHOLD
+    )
+
+    over_budget = budget > 0 and stats.query_count > budget
+    repeated = stats.repeated_shapes(repeat_threshold) if repeat_threshold > 0 else []
+
+    if over_budget:
+        logger.warning(
+            f"Query budget exceeded on {stats.route}: "
+            f"{stats.query_count} queries (budget {budget}), "
+            f"{stats.db_time * 1000:.1f}ms in database",
+            extra={
+                "route": stats.route,
+                "query_count": stats.query_count,
+                "query_budget": budget,
+                "db_time_ms": stats.db_time * 1000,
+            },
+        )
+    if repeated:
+        logger.warning(
+            f"Possible N+1 on {stats.route}: "
+            f"{repeated[0]['count']}x {repeated[0]['statement'][:120]}",
+            extra={"route": stats.route, "repeated_statements": repeated[:5]},
+        )
+
+    return {"over_budget": over_budget, "repeated_statements": repeated}
+
+
+def get_query_budget_report(limit: int = 20) -> Dict[str, Any]:
+    """Per-route query statistics for the database performance API"""
+    return {
+        "query_budget": settings.QUERY_BUDGET_PER_REQUEST,
+        "repeat_threshold": settings.QUERY_BUDGET_REPEAT_THRESHOLD,
+        "routes": route_query_stats.summary(limit=limit),
+    }
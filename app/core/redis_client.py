@@ -0,0 +1,81 @@
+"""
+Shared Redis Client for MITA Finance
+One client per Redis URL for the services that keep shared state there
+
+The live budget hub, unread counter, goal statistics cache, challenge
+leaderboard, LLM response cache and merchant classifier each used to build
+their own redis.Redis from the same settings. They now share one client
+(and so one connection pool) per URL: get_sync_redis for threads and sync
+code, get_async_redis for coroutines. A redis.asyncio client belongs to the
+event loop it first connected on, so async clients are kept per running
+loop: the server's loop shares one, and code that runs its own loop
+(asyncio.run in a job or a test) gets a fresh client that goes away with
+that loop. Short socket timeouts keep a degraded Redis from holding a
+request for long; callers handle RedisError and fall back as before.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+SOCKET_TIMEOUT_SECONDS = 3
+
+_clients: Dict[str, object] = {}
+# Event loop -> {url: client}; loops that have closed are dropped
+_async_clients: Dict[asyncio.AbstractEventLoop, Dict[str, object]] = {}
+_lock = threading.Lock()
+
+
+def configured_redis_url() -> str:
+    """REDIS_URL, else UPSTASH_REDIS_URL; empty when Redis is not configured"""
+    return settings.REDIS_URL or getattr(settings, "UPSTASH_REDIS_URL", "") or ""
+
+
+def get_sync_redis(redis_url: Optional[str] = None):
+    """Process-wide sync client for `redis_url` (default: the configured one)"""
+    url = configured_redis_url() if redis_url is None else redis_url
+    client = _clients.get(url)
+    if client is None:
+        import redis
+
+        with _lock:
+            client = _clients.get(url)
+            if client is None:
+                client = redis.Redis.from_url(
+                    url,
+                    socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+                    socket_timeout=SOCKET_TIMEOUT_SECONDS,
+                )
+                _clients[url] = client
+    return client
+
+
+def get_async_redis(redis_url: Optional[str] = None):
+    """redis.asyncio client for `redis_url` on the running event loop
+
+    Call from a coroutine; the client must not be used on another loop.
+    """
+    url = configured_redis_url() if redis_url is None else redis_url
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    client = clients.get(url) if clients is not None else None
+    if client is not None:
+        return client
+
+    import redis.asyncio as aioredis
+
+    with _lock:
+        for closed in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[closed]
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(url)
+        if client is None:
+            client = aioredis.Redis.from_url(
+                url,
+                socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+                socket_timeout=SOCKET_TIMEOUT_SECONDS,
+            )
+            clients[url] = client
+    return client
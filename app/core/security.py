@@ -26,6 +26,14 @@ from app.core.error_handler import (
     RateLimitException,
     ValidationException,
 )
+from app.core.threat_scanner import (
+    SQL_INJECTION,
+    SQL_INJECTION_RULES,
+    XSS_RULES,
+    request_input_scanner,
+    sql_injection_scanner,
+    xss_scanner,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -185,31 +193,9 @@ class SecurityConfig:
     JWT_EXPIRY_HOURS = 24
     REFRESH_TOKEN_EXPIRY_DAYS = 30
 
-    # SQL injection patterns
-    SQL_INJECTION_PATTERNS = [
-        r"(\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b)",
-        r"(\b(or|and)\b\s+\d+\s*=\s*\d+)",
-        r"(\b(or|and)\b\s*'?[^'\s]*'?\s*=\s*'?[^'\s]*'?)",  # tautology: ' OR '1'='1 / OR 1=1
-        r"(--|#|/\*|\*/)",
-        r"(\bxp_cmdshell\b)",
-        r"(\bsp_executesql\b)",
-        r"(\bmassignment\b)",
-        r"(char\(\d+\))",
-        r"(0x[0-9a-f]+)",
-        r"(\bunion\s+all\s+select)",
-    ]
-
-    # XSS patterns
-    XSS_PATTERNS = [
-        r"<script[^>]*>.*?</script>",
-        r"javascript:",
-        r"vbscript:",
-        r"on\w+\s*=",
-        r"<iframe[^>]*>.*?</iframe>",
-        r"<object[^>]*>.*?</object>",
-        r"<embed[^>]*>.*?</embed>",
-        r"<form[^>]*>.*?</form>",
-    ]
+    # Injection patterns (rule sets live in app.core.threat_scanner)
+    SQL_INJECTION_PATTERNS = [rule.pattern for rule in SQL_INJECTION_RULES]
+    XSS_PATTERNS = [rule.pattern for rule in XSS_RULES]
 
     # File upload security
     ALLOWED_FILE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".pdf", ".txt", ".csv"}
@@ -295,16 +281,15 @@ class SQLInjectionProtector:
         if not isinstance(input_string, str):
             return False
 
-        input_lower = input_string.lower()
-
-        for pattern in SecurityConfig.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, input_lower, re.IGNORECASE):
-                logger.warning(
-                    f"SQL injection attempt detected: {SecurityUtils.hash_sensitive_data(input_string)}"
-                )
-                return True
+        match = sql_injection_scanner.scan(input_string)
+        if match is None:
+            return False
 
-        return False
+        logger.warning(
+            f"SQL injection attempt detected ({match.rule.name}): "
+            f"{SecurityUtils.hash_sensitive_data(input_string)}"
+        )
+        return True
 
     @staticmethod
     def sanitize_sql_input(input_string: str) -> str:
@@ -352,14 +337,15 @@ class XSSProtector:
         if not isinstance(input_string, str):
             return False
 
-        for pattern in SecurityConfig.XSS_PATTERNS:
-            if re.search(pattern, input_string, re.IGNORECASE):
-                logger.warning(
-                    f"XSS attempt detected: {SecurityUtils.hash_sensitive_data(input_string)}"
-                )
-                return True
+        match = xss_scanner.scan(input_string)
+        if match is None:
+            return False
 
-        return False
+        logger.warning(
+            f"XSS attempt detected ({match.rule.name}): "
+            f"{SecurityUtils.hash_sensitive_data(input_string)}"
+        )
+        return True
 
     @staticmethod
     def sanitize_html_input(input_string: str) -> str:
@@ -999,14 +985,17 @@ class SecureInputValidator:
                 f"String too long (max {SecurityConfig.MAX_STRING_LENGTH})"
             )
 
-        # Check for SQL injection
-        if SQLInjectionProtector.scan_for_sql_injection(value):
-            raise ValidationException(
-                "Input contains potentially dangerous SQL patterns"
+        # SQL injection and XSS rules in a single pass
+        match = request_input_scanner.scan(value)
+        if match is not None:
+            logger.warning(
+                f"{match.category} attempt detected ({match.rule.name}): "
+                f"{SecurityUtils.hash_sensitive_data(value)}"
             )
-
-        # Check for XSS
-        if XSSProtector.scan_for_xss(value):
+            if match.category == SQL_INJECTION:
+                raise ValidationException(
+                    "Input contains potentially dangerous SQL patterns"
+                )
             raise ValidationException(
                 "Input contains potentially dangerous HTML/JavaScript"
             )
@@ -5,6 +5,7 @@ from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
+from app.core.query_budget import install_query_instrumentation
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -92,6 +93,15 @@ def _initialize_sync_session():
         )
         # Note: psycopg2 doesn't support prepared_statement_cache_size parameter
         # but it's less critical for sync sessions
+        install_query_instrumentation(engine)
+        # Live budget streams are notified after commits touching plans/transactions
+        from app.services.budget_live_updates import install_budget_change_tracking
+
+        install_budget_change_tracking()
+        # Challenge leaderboards follow committed participation changes
+        from app.services.challenge_leaderboard import install_leaderboard_tracking
+
+        install_leaderboard_tracking()
 
         SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
         logger.info(
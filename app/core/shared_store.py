@@ -0,0 +1,177 @@
+"""
+Shared Stores for MITA Finance
+Redis-or-memory key/value stores and process-wide service singletons
+
+Services that keep string values per key (JSON snapshots, cached answers,
+a published map) store them through key_value_store(prefix): in Redis under
+that prefix when Redis is configured, otherwise in a process-local dict with
+per-entry expiry and an optional LRU bound. Both variants offer blocking
+get/set/delete and coroutine aget/aset/adelete. The Redis one asks
+app.core.redis_client for its clients on every call, so coroutines always
+talk through the client of the loop they run on.
+
+Services with richer Redis structures (hashes, sorted sets) keep their own
+store classes and choose between them with redis_or_memory(). Each service
+module exposes its shared instance through a @process_singleton accessor.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from app.core.redis_client import configured_redis_url, get_async_redis, get_sync_redis
+
+T = TypeVar("T")
+
+
+def resolve_redis_url(redis_url: Optional[str] = None) -> str:
+    """`redis_url` if given (empty disables Redis), else the configured one"""
+    return configured_redis_url() if redis_url is None else redis_url
+
+
+def redis_or_memory(
+    redis_url: Optional[str],
+    redis_store: Callable[[str], T],
+    memory_store: Callable[[], T],
+) -> T:
+    """redis_store(url) when Redis is configured, else memory_store()"""
+    url = resolve_redis_url(redis_url)
+    return redis_store(url) if url else memory_store()
+
+
+# ============================================================================
+# Key/value stores
+# ============================================================================
+
+
+class InMemoryKeyValueStore:
+    """Values in this process only, each with an optional expiry"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def adelete(self, key: str) -> None:
+        self.delete(key)
+
+
+class RedisKeyValueStore:
+    """Values as Redis strings under `prefix`
+
+    Clients come from app.core.redis_client unless passed in (tests).
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        redis_url: Optional[str] = None,
+        client=None,
+        async_client=None,
+    ):
+        self.prefix = prefix
+        self.redis_url = redis_url
+        self._client = client
+        self._async_client = async_client
+
+    @property
+    def client(self):
+        return self._client or get_sync_redis(self.redis_url)
+
+    @property
+    def async_client(self):
+        return self._async_client or get_async_redis(self.redis_url)
+
+    def get(self, key: str) -> Optional[str]:
+        return _text(self.client.get(self.prefix + key))
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return _text(await self.async_client.get(self.prefix + key))
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await self.async_client.set(self.prefix + key, value, ex=ttl)
+
+    async def adelete(self, key: str) -> None:
+        await self.async_client.delete(self.prefix + key)
+
+
+def _text(value) -> Optional[str]:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def key_value_store(
+    prefix: str, redis_url: Optional[str] = None, max_entries: Optional[int] = None
+):
+    """Redis store under `prefix` when Redis is configured, else in memory"""
+    return redis_or_memory(
+        redis_url,
+        lambda url: RedisKeyValueStore(prefix, url),
+        lambda: InMemoryKeyValueStore(max_entries),
+    )
+
+
+# ============================================================================
+# Singletons
+# ============================================================================
+
+
+class _ProcessSingleton(Generic[T]):
+    def __init__(self, factory: Callable[[], T]):
+        functools.update_wrapper(self, factory)
+        self._factory = factory
+        self._lock = threading.Lock()
+        # Replace (e.g. with monkeypatch) to hand callers another instance
+        self.instance: Optional[T] = None
+
+    def __call__(self) -> T:
+        instance = self.instance
+        if instance is None:
+            with self._lock:
+                if self.instance is None:
+                    self.instance = self._factory()
+                instance = self.instance
+        return instance
+
+
+def process_singleton(factory: Callable[[], T]) -> "_ProcessSingleton[T]":
+    """Decorator: build factory()'s result on first call, then return it"""
+    return _ProcessSingleton(factory)
@@ -15,7 +15,7 @@ import redis
 from rq import Queue, Worker
 
 # Middleware functionality replaced with RQ 1.15.1 compatible approach
-from rq.job import Job, JobStatus
+from rq.job import Job, JobStatus, get_current_job
 
 from app.core.logger import get_logger
 
@@ -96,18 +96,29 @@ def task_failure_callback(job, connection, type, value, traceback):
     )
 
 
+# Finished jobs sampled per queue for the mean job duration in queue stats
+DURATION_SAMPLE_SIZE = 20
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """RQ stores naive UTC timestamps"""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
 class MitaTaskQueue:
     """Enhanced task queue system for MITA financial operations."""
 
-    def __init__(self):
-        """Initialize the task queue system."""
+    def __init__(self, redis_conn: Optional[redis.Redis] = None):
+        """Initialize the task queue system (on REDIS_URL unless given a connection)."""
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
-        # EMERGENCY FIX: Handle empty Redis URLs gracefully
-        if not self.redis_url or self.redis_url == "":
-            raise Exception("No Redis URL configured - task queue disabled")
+        if redis_conn is None:
+            # EMERGENCY FIX: Handle empty Redis URLs gracefully
+            if not self.redis_url or self.redis_url == "":
+                raise Exception("No Redis URL configured - task queue disabled")
 
-        self.redis_conn = redis.from_url(self.redis_url)
+            redis_conn = redis.from_url(self.redis_url)
+        self.redis_conn = redis_conn
 
         # Initialize priority queues
         self.queues = {
@@ -311,8 +322,14 @@ class MitaTaskQueue:
             logger.error(f"Failed to retry task {task_id}: {str(e)}")
             return None
 
-    def get_queue_stats(self) -> Dict[str, Any]:
-        """Get comprehensive queue statistics."""
+    def get_queue_stats(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get comprehensive queue statistics.
+
+        Besides counts, each queue reports how long its oldest waiting job
+        has been queued and the mean run time of its most recently finished
+        jobs (None without history), which the worker autoscaler reads.
+        """
+        now = now or datetime.now(timezone.utc)
         stats = {}
 
         for priority, queue in self.queues.items():
@@ -323,6 +340,8 @@ class MitaTaskQueue:
                 "started_job_count": queue.started_job_registry.count,
                 "deferred_job_count": queue.deferred_job_registry.count,
                 "finished_job_count": queue.finished_job_registry.count,
+                "oldest_job_age_seconds": self._oldest_job_age(queue, now),
+                "avg_job_duration_seconds": self._recent_job_duration(queue),
             }
 
         # Dead letter queue stats
@@ -342,6 +361,26 @@ class MitaTaskQueue:
 
         return stats
 
+    def _oldest_job_age(self, queue: Queue, now: datetime) -> float:
+        """Seconds the job at the head of the queue has been waiting"""
+        job_ids = queue.get_job_ids(0, 0)
+        job = queue.fetch_job(job_ids[0]) if job_ids else None
+        if job is None or job.enqueued_at is None:
+            return 0.0
+        return max(0.0, (now - _as_utc(job.enqueued_at)).total_seconds())
+
+    def _recent_job_duration(self, queue: Queue) -> Optional[float]:
+        """Mean run time of the last DURATION_SAMPLE_SIZE finished jobs"""
+        job_ids = queue.finished_job_registry.get_job_ids(-DURATION_SAMPLE_SIZE, -1)
+        durations = [
+            (_as_utc(job.ended_at) - _as_utc(job.started_at)).total_seconds()
+            for job in Job.fetch_many(job_ids, connection=self.redis_conn)
+            if job is not None and job.started_at and job.ended_at
+        ]
+        if not durations:
+            return None
+        return sum(durations) / len(durations)
+
     def clean_old_jobs(self, max_age_hours: int = 48) -> Dict[str, int]:
         """Clean up old completed and failed jobs."""
         cleaned = {"completed": 0, "failed": 0}
@@ -386,6 +425,7 @@ class MitaTaskQueue:
             "send_email_notification": 60,  # 1 minute for email
             "send_push_notification": 30,  # 30 seconds for push
             "export_user_data": 900,  # 15 minutes for data export
+            "import_transactions_task": 1800,  # 30 minutes for statement imports
         }
         return timeout_map.get(function_name, 120)  # Default 2 minutes
 
@@ -406,6 +446,7 @@ class MitaTaskQueue:
             data = self.redis_conn.get(key)
             if data:
                 result_dict = json.loads(data)
+                result_dict["status"] = TaskStatus(result_dict["status"])
                 # Convert ISO strings back to datetime objects
                 for field in ["started_at", "completed_at"]:
                     if result_dict[field]:
@@ -456,6 +497,38 @@ def get_task_queue():
 task_queue = None
 
 
+def _current_job_id() -> Optional[str]:
+    """ID of the RQ job being executed, if running inside a worker"""
+    job = get_current_job()
+    return job.id if job else None
+
+
+def report_progress(
+    progress: int, result: Optional[Dict[str, Any]] = None, **metadata
+) -> None:
+    """
+    Publish intermediate progress of the running task to /api/tasks.
+
+    Args:
+        progress: Percentage complete (0-100)
+        result: Partial result to show while the task runs
+        **metadata: Extra details stored alongside the progress
+    """
+    job = get_current_job()
+    if job is None:
+        return
+
+    task_result = TaskResult(
+        task_id=job.id,
+        status=TaskStatus.PROGRESS,
+        result=result,
+        progress=max(0, min(100, int(progress))),
+        started_at=job.started_at,
+        metadata={"progress": int(progress), **metadata},
+    )
+    get_task_queue()._store_task_result(job.id, task_result)
+
+
 def task_wrapper(
     priority: TaskPriority = TaskPriority.NORMAL,
     timeout: Optional[int] = None,
@@ -476,7 +549,7 @@ def task_wrapper(
         @wraps(func)
         def wrapper(*args, **kwargs):
             """Execute task with comprehensive error handling."""
-            task_id = kwargs.pop("_task_id", None)
+            task_id = kwargs.pop("_task_id", None) or _current_job_id()
 
             try:
                 # Update task status to started
@@ -19,6 +19,13 @@ from pydantic import BaseModel, Field
 from pydantic import ValidationError as PydanticValidationError
 from pydantic import condecimal, field_validator, validator
 
+from app.core.threat_scanner import (
+    FREE_TEXT_SQL_RULES,
+    FREE_TEXT_XSS_RULES,
+    TEMPLATE_INJECTION_RULES,
+    free_text_scanner,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -159,42 +166,10 @@ class InputSanitizer:
     ALLOWED_TAGS = ["p", "br", "strong", "em", "u"]
     ALLOWED_ATTRIBUTES = {}
 
-    # Enhanced SQL injection patterns for financial applications
-    SQL_INJECTION_PATTERNS = [
-        # NOTE: no standalone-keyword pattern here. A bare \bCREATE\b (etc.)
-        # blocklist rejected innocent free text ("contract create", "deleted
-        # Netflix sub") on mobile-called transaction descriptions, while all
-        # queries are parameterized anyway. Compound patterns below still
-        # catch actual injection shapes.
-        r"(--|;|/\*|\*/|xp_|sp_)",
-        r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-        r"(\bUNION\s+(ALL\s+)?SELECT)",
-        r"(\bDROP\s+TABLE)",
-        r"(\bTRUNCATE\s+TABLE)",
-        r"(\bDELETE\s+FROM)",
-        r"(\bSHUTDOWN\b)",
-    ]
-
-    # Enhanced XSS patterns for financial applications
-    XSS_PATTERNS = [
-        r"<script[^>]*>.*?</script>",
-        r"javascript:",
-        r"on\w+\s*=",
-        r"<iframe[^>]*>.*?</iframe>",
-        r"<object[^>]*>.*?</object>",
-        r"<embed[^>]*>.*?</embed>",
-        r"<link[^>]*>.*?</link>",
-        r"<meta[^>]*>.*?</meta>",
-        r"data:text/html",
-        r"vbscript:",
-    ]
-
-    # Financial data patterns that should be blocked
-    FINANCIAL_INJECTION_PATTERNS = [
-        r"(\$\{[^}]*\})",  # Template injection
-        r"(#{[^}]*})",  # Expression injection
-        r"(\{\{[^}]*\}\})",  # Template syntax
-    ]
+    # Injection patterns (rule sets live in app.core.threat_scanner)
+    SQL_INJECTION_PATTERNS = [rule.pattern for rule in FREE_TEXT_SQL_RULES]
+    XSS_PATTERNS = [rule.pattern for rule in FREE_TEXT_XSS_RULES]
+    FINANCIAL_INJECTION_PATTERNS = [rule.pattern for rule in TEMPLATE_INJECTION_RULES]
 
     @classmethod
     def sanitize_string(
@@ -226,23 +201,13 @@ class InputSanitizer:
             # Remove all HTML tags
             value = bleach.clean(value, tags=[], attributes={}, strip=True)
 
-        # Check for SQL injection patterns
-        for pattern in cls.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, value, re.IGNORECASE):
-                logger.warning(f"Potential SQL injection attempt blocked: {pattern}")
-                raise ValidationError("Invalid characters detected in input")
-
-        # Check for XSS patterns
-        for pattern in cls.XSS_PATTERNS:
-            if re.search(pattern, value, re.IGNORECASE):
-                logger.warning(f"Potential XSS attempt blocked: {pattern}")
-                raise ValidationError("Invalid characters detected in input")
-
-        # Check for financial injection patterns
-        for pattern in cls.FINANCIAL_INJECTION_PATTERNS:
-            if re.search(pattern, value, re.IGNORECASE):
-                logger.warning(f"Potential template injection blocked: {pattern}")
-                raise ValidationError("Invalid characters detected in input")
+        # SQL injection, XSS and template injection rules in a single pass
+        match = free_text_scanner.scan(value)
+        if match is not None:
+            logger.warning(
+                f"Potential {match.category} attempt blocked: {match.rule.name}"
+            )
+            raise ValidationError("Invalid characters detected in input")
 
         return value
 
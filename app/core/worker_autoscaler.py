@@ -0,0 +1,397 @@
+"""
+Worker Autoscaler for MITA Finance
+Sizes each RQ worker pool from queue depth, job age and job duration
+
+create_standard_worker_configs starts a fixed set of workers, so the nightly
+batches (velocity alerts, AI advice, redistribution, scheduled expenses)
+back up behind them while daytime capacity sits idle. This controller
+samples MitaTaskQueue.get_queue_stats every few seconds and, per WorkerPool:
+
+- wants busy + ceil(backlog * mean job duration / target_drain_seconds)
+  workers, and one more than it has when the oldest job has waited past
+  max_wait_seconds, clamped to [min_workers, max_workers];
+- scales up once SCALE_UP_COOLDOWN has passed since its last change, by at
+  most MAX_STEP_UP workers;
+- scales down one worker at a time, and only after demand has stayed below
+  the current size for SCALE_DOWN_DELAY seconds, so a lull between batch
+  jobs does not stop a worker that is needed again a minute later.
+
+Workers are child processes (ProcessWorkerLauncher). A worker being removed
+gets SIGTERM, which RQ treats as a warm shutdown: it finishes its current
+job first. Every sample and decision is exported as Prometheus metrics.
+scripts/simulate_worker_autoscaling.py replays a workload on fakeredis.
+
+This is for hosts without Kubernetes (a VM or a single container running
+every worker), where it replaces `python -m app.worker`:
+
+    python -m app.core.worker_autoscaler --interval 15 --metrics-port 9108
+
+It must not run alongside the Kubernetes chart's worker HPAs
+(k8s/mita/templates/worker-priority-deployments.yaml), which already scale
+worker pods on rq_*_queue_depth; two controllers would fight over the
+worker count. The chart sets ENABLE_WORKER_AUTOSCALING=false for that
+reason, and the autoscaler refuses to start when it is false.
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import redis
+from prometheus_client import CollectorRegistry, Counter, Gauge
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import configured_redis_url
+from app.core.worker_manager import STANDARD_POOLS, MitaWorker, WorkerConfig, WorkerPool
+
+logger = get_logger(__name__)
+
+DEFAULT_INTERVAL = 15  # seconds between samples
+SCALE_UP_COOLDOWN = 30
+SCALE_DOWN_DELAY = 300
+MAX_STEP_UP = 4
+DEFAULT_JOB_SECONDS = 5.0  # until a queue has finished jobs to measure
+
+
+# ============================================================================
+# Decisions
+# ============================================================================
+
+
+@dataclass
+class PoolSample:
+    """What a pool's queues look like right now"""
+
+    depth: int  # jobs waiting
+    busy: int  # jobs running
+    oldest_job_age: float  # seconds the longest-waiting job has waited
+    job_duration: Optional[float]  # mean run time of recent jobs
+
+
+@dataclass
+class PoolState:
+    """Controller memory per pool, for cooldowns and hysteresis"""
+
+    last_change: float = -math.inf
+    below_since: Optional[float] = None
+
+
+@dataclass
+class ScalingDecision:
+    pool: str
+    current: int
+    desired: int  # demand, clamped to the pool's bounds
+    target: int  # what the pool is scaled to after cooldown and hysteresis
+    reason: str
+    sample: PoolSample
+
+    @property
+    def direction(self) -> str:
+        if self.target > self.current:
+            return "up"
+        if self.target < self.current:
+            return "down"
+        return "hold"
+
+
+def pool_sample(pool: WorkerPool, queue_stats: Dict[str, Any]) -> PoolSample:
+    """Aggregate get_queue_stats entries of the pool's queues"""
+    entries = [
+        entry
+        for entry in queue_stats.values()
+        if isinstance(entry, dict) and entry.get("name") in pool.queues
+    ]
+    depth = sum(entry.get("length", 0) for entry in entries)
+    timed = [
+        (entry["avg_job_duration_seconds"], max(entry.get("length", 0), 1))
+        for entry in entries
+        if entry.get("avg_job_duration_seconds") is not None
+    ]
+    duration = None
+    if timed:
+        duration = sum(d * w for d, w in timed) / sum(w for _, w in timed)
+    return PoolSample(
+        depth=depth,
+        busy=sum(entry.get("started_job_count", 0) for entry in entries),
+        oldest_job_age=max(
+            (entry.get("oldest_job_age_seconds", 0.0) for entry in entries),
+            default=0.0,
+        ),
+        job_duration=duration,
+    )
+
+
+def desired_workers(
+    pool: WorkerPool, sample: PoolSample, current: int
+) -> Tuple[int, str]:
+    """Workers the pool needs now, and why"""
+    duration = sample.job_duration or DEFAULT_JOB_SECONDS
+    demand = sample.busy + math.ceil(
+        sample.depth * duration / pool.target_drain_seconds
+    )
+    reason = f"{sample.depth} queued x {duration:.1f}s, {sample.busy} running"
+    if (
+        sample.depth
+        and sample.oldest_job_age > pool.max_wait_seconds
+        and demand <= current
+    ):
+        demand = current + 1
+        reason = f"oldest job waited {sample.oldest_job_age:.0f}s"
+    return max(pool.min_workers, min(pool.max_workers, demand)), reason
+
+
+def decide(
+    pool: WorkerPool,
+    sample: PoolSample,
+    current: int,
+    state: PoolState,
+    now: float,
+) -> ScalingDecision:
+    """Next size of the pool; updates `state`"""
+    desired, reason = desired_workers(pool, sample, current)
+    target = current
+
+    if desired > current:
+        state.below_since = None
+        if now - state.last_change >= SCALE_UP_COOLDOWN:
+            target = min(desired, current + MAX_STEP_UP)
+        else:
+            reason = f"up cooldown ({reason})"
+    elif desired < current:
+        if state.below_since is None:
+            state.below_since = now
+        if now - state.below_since >= SCALE_DOWN_DELAY:
+            target = current - 1
+            state.below_since = now  # the next step waits a full delay again
+        else:
+            reason = f"down delay ({reason})"
+    else:
+        state.below_since = None
+
+    if target != current:
+        state.last_change = now
+    return ScalingDecision(pool.name, current, desired, target, reason, sample)
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+
+class AutoscalerMetrics:
+    """Prometheus view of every sample and scaling decision"""
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry()
+        self.queue_depth = Gauge(
+            "rq_autoscaler_queue_depth",
+            "Jobs waiting in the pool's queues",
+            ["pool"],
+            registry=self.registry,
+        )
+        self.oldest_job_age = Gauge(
+            "rq_autoscaler_oldest_job_age_seconds",
+            "How long the pool's longest-waiting job has waited",
+            ["pool"],
+            registry=self.registry,
+        )
+        self.job_duration = Gauge(
+            "rq_autoscaler_job_duration_seconds",
+            "Mean run time of the pool's recently finished jobs",
+            ["pool"],
+            registry=self.registry,
+        )
+        self.workers = Gauge(
+            "rq_autoscaler_workers",
+            "Worker processes: current, desired (demand) and target",
+            ["pool", "kind"],
+            registry=self.registry,
+        )
+        self.scaling_events = Counter(
+            "rq_autoscaler_scaling_events_total",
+            "Scale-up and scale-down actions taken",
+            ["pool", "direction"],
+            registry=self.registry,
+        )
+
+    def record(self, decision: ScalingDecision) -> None:
+        pool = decision.pool
+        self.queue_depth.labels(pool).set(decision.sample.depth)
+        self.oldest_job_age.labels(pool).set(decision.sample.oldest_job_age)
+        if decision.sample.job_duration is not None:
+            self.job_duration.labels(pool).set(decision.sample.job_duration)
+        self.workers.labels(pool, "current").set(decision.current)
+        self.workers.labels(pool, "desired").set(decision.desired)
+        self.workers.labels(pool, "target").set(decision.target)
+        if decision.direction != "hold":
+            self.scaling_events.labels(pool, decision.direction).inc()
+
+
+# ============================================================================
+# Worker processes
+# ============================================================================
+
+
+def run_worker_process(config: WorkerConfig, redis_url: str) -> None:
+    """Child process entry point: one MitaWorker on the main thread"""
+    MitaWorker(config, redis.from_url(redis_url)).work()
+
+
+class ProcessWorkerLauncher:
+    """Starts and stops one worker process per pool slot"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = (
+            redis_url or configured_redis_url() or "redis://localhost:6379/0"
+        )
+        self._context = multiprocessing.get_context("spawn")
+        self._serial = itertools.count()
+        self._processes: Dict[str, List[Tuple[str, Any]]] = {}
+
+    def running(self, pool: WorkerPool) -> int:
+        """Live workers of the pool; ones that exited (max_jobs) drop out"""
+        alive = [
+            (worker_id, process)
+            for worker_id, process in self._processes.get(pool.name, [])
+            if process.is_alive()
+        ]
+        self._processes[pool.name] = alive
+        return len(alive)
+
+    def start(self, pool: WorkerPool) -> str:
+        worker_id = f"{pool.name}_worker_{os.getpid()}_{next(self._serial)}"
+        process = self._context.Process(
+            target=run_worker_process,
+            args=(pool.worker_config(worker_id), self.redis_url),
+            name=worker_id,
+        )
+        process.start()
+        self._processes.setdefault(pool.name, []).append((worker_id, process))
+        return worker_id
+
+    def stop(self, pool: WorkerPool) -> Optional[str]:
+        """Warm-stop the newest worker of the pool"""
+        workers = self._processes.get(pool.name)
+        if not workers:
+            return None
+        worker_id, process = workers.pop()
+        process.terminate()  # SIGTERM: RQ finishes the current job, then exits
+        return worker_id
+
+    def stop_all(self, timeout: float = 60) -> None:
+        processes = [p for workers in self._processes.values() for _, p in workers]
+        self._processes.clear()
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+
+
+# ============================================================================
+# Controller
+# ============================================================================
+
+
+def _task_queue_stats() -> Dict[str, Any]:
+    from app.core.task_queue import get_task_queue
+
+    return get_task_queue().get_queue_stats()
+
+
+@dataclass
+class QueueAutoscaler:
+    """Samples the queues and resizes every pool through a launcher"""
+
+    launcher: Any  # running(pool) / start(pool) / stop(pool)
+    pools: Sequence[WorkerPool] = STANDARD_POOLS
+    queue_stats: Callable[[], Dict[str, Any]] = _task_queue_stats
+    clock: Callable[[], float] = time.monotonic
+    metrics: AutoscalerMetrics = field(default_factory=AutoscalerMetrics)
+
+    def __post_init__(self):
+        self.states = {pool.name: PoolState() for pool in self.pools}
+
+    def step(self) -> List[ScalingDecision]:
+        stats = self.queue_stats()
+        now = self.clock()
+        decisions = []
+        for pool in self.pools:
+            current = self.launcher.running(pool)
+            decision = decide(
+                pool, pool_sample(pool, stats), current, self.states[pool.name], now
+            )
+            self._apply(pool, decision)
+            self.metrics.record(decision)
+            decisions.append(decision)
+        return decisions
+
+    def run(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.step()
+            except Exception as e:
+                logger.error(f"Autoscaler step failed: {e}")
+            stop_event.wait(interval)
+
+    def _apply(self, pool: WorkerPool, decision: ScalingDecision) -> None:
+        if decision.direction == "hold":
+            return
+        for _ in range(decision.target - decision.current):
+            self.launcher.start(pool)
+        for _ in range(decision.current - decision.target):
+            self.launcher.stop(pool)
+        logger.info(
+            f"Scaled {pool.name} {decision.current} -> {decision.target} "
+            f"({decision.reason})"
+        )
+
+
+def main() -> None:
+    import argparse
+
+    from prometheus_client import start_http_server
+
+    parser = argparse.ArgumentParser(description="MITA RQ worker autoscaler")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+
+    if not settings.ENABLE_WORKER_AUTOSCALING:
+        logger.error(
+            "ENABLE_WORKER_AUTOSCALING is false: worker count is managed "
+            "elsewhere (Kubernetes HPA); not starting the autoscaler"
+        )
+        raise SystemExit(1)
+
+    launcher = ProcessWorkerLauncher()
+    autoscaler = QueueAutoscaler(launcher)
+    if args.metrics_port:
+        start_http_server(args.metrics_port, registry=autoscaler.metrics.registry)
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    logger.info(f"Worker autoscaler running every {args.interval:g}s")
+    try:
+        autoscaler.run(args.interval, stop_event)
+    finally:
+        logger.info("Stopping worker processes")
+        launcher.stop_all()
+
+
+if __name__ == "__main__":
+    main()
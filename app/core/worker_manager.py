@@ -11,7 +11,7 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import redis
 from rq import Queue, Worker
@@ -53,6 +53,77 @@ class WorkerConfig:
             self.exception_handlers = []
 
 
+@dataclass(frozen=True)
+class WorkerPool:
+    """Interchangeable workers serving the same queues, and their bounds.
+
+    The autoscaler (app/core/worker_autoscaler.py) keeps each pool between
+    min_workers and max_workers, sized so its backlog drains within
+    target_drain_seconds and no job waits longer than max_wait_seconds.
+    """
+
+    name: str
+    queues: Tuple[str, ...]
+    initial_workers: int  # started by create_standard_worker_configs
+    min_workers: int
+    max_workers: int
+    max_jobs: int
+    job_timeout: int
+    heartbeat_interval: int
+    target_drain_seconds: float
+    max_wait_seconds: float
+
+    def worker_config(self, worker_id: str) -> "WorkerConfig":
+        return WorkerConfig(
+            worker_id=worker_id,
+            queues=list(self.queues),
+            max_jobs=self.max_jobs,
+            job_timeout=self.job_timeout,
+            heartbeat_interval=self.heartbeat_interval,
+        )
+
+
+# Queue layout of the MITA workers
+STANDARD_POOLS: Sequence[WorkerPool] = (
+    WorkerPool(
+        name="high_priority",
+        queues=("critical", "high"),
+        initial_workers=2,
+        min_workers=1,
+        max_workers=4,
+        max_jobs=50,
+        job_timeout=600,
+        heartbeat_interval=15,
+        target_drain_seconds=30,
+        max_wait_seconds=60,
+    ),
+    WorkerPool(
+        name="normal_priority",
+        queues=("default",),
+        initial_workers=3,
+        min_workers=1,
+        max_workers=8,
+        max_jobs=100,
+        job_timeout=300,
+        heartbeat_interval=30,
+        target_drain_seconds=300,
+        max_wait_seconds=600,
+    ),
+    WorkerPool(
+        name="low_priority",
+        queues=("low",),
+        initial_workers=1,
+        min_workers=0,
+        max_workers=4,
+        max_jobs=200,
+        job_timeout=1800,  # 30 minutes for long-running tasks
+        heartbeat_interval=60,
+        target_drain_seconds=1800,
+        max_wait_seconds=3600,
+    ),
+)
+
+
 class MitaWorker(Worker):
     """Enhanced RQ Worker with monitoring and health checks."""
 
@@ -497,46 +568,15 @@ class WorkerManager:
 worker_manager = WorkerManager()
 
 
-def create_standard_worker_configs() -> List[WorkerConfig]:
+def create_standard_worker_configs(
+    pools: Sequence[WorkerPool] = STANDARD_POOLS,
+) -> List[WorkerConfig]:
     """Create standard worker configurations for MITA."""
-    configs = []
-
-    # High priority queue workers (2 workers)
-    for i in range(2):
-        configs.append(
-            WorkerConfig(
-                worker_id=f"high_priority_worker_{i}",
-                queues=["critical", "high"],
-                max_jobs=50,
-                job_timeout=600,
-                heartbeat_interval=15,
-            )
-        )
-
-    # Normal priority queue workers (3 workers)
-    for i in range(3):
-        configs.append(
-            WorkerConfig(
-                worker_id=f"normal_priority_worker_{i}",
-                queues=["default"],
-                max_jobs=100,
-                job_timeout=300,
-                heartbeat_interval=30,
-            )
-        )
-
-    # Low priority queue workers (1 worker)
-    configs.append(
-        WorkerConfig(
-            worker_id="low_priority_worker_0",
-            queues=["low"],
-            max_jobs=200,
-            job_timeout=1800,  # 30 minutes for long-running tasks
-            heartbeat_interval=60,
-        )
-    )
-
-    return configs
+    return [
+        pool.worker_config(f"{pool.name}_worker_{i}")
+        for pool in pools
+        for i in range(pool.initial_workers)
+    ]
 
 
 def start_standard_workers():
@@ -4,6 +4,7 @@ from .analytics_log import FeatureAccessLog, FeatureUsageLog, PaywallImpressionL
 from .base import Base
 from .budget_advice import BudgetAdvice
 from .challenge import Challenge, ChallengeParticipation
+from .cohort_model import CohortCentroid, UserCohortLabel
 from .daily_plan import DailyPlan
 from .expense import Expense
 from .goal import Goal
@@ -33,7 +34,9 @@ from .push_token import PushToken
 from .redistribution_event import RedistributionEvent
 from .scheduled_expense import ScheduledExpense
 from .subscription import Subscription
+from .sync_state import SyncTombstone, UserSyncState
 from .transaction import Transaction
+from .transaction_rollup import TransactionRollup
 from .user import User
 from .user_answer import UserAnswer
 from .user_preference import UserPreference
@@ -44,6 +47,7 @@ __all__ = [
     "Base",
     "User",
     "Transaction",
+    "TransactionRollup",
     "DailyPlan",
     "Subscription",
     "PushToken",
@@ -82,4 +86,8 @@ __all__ = [
     "RedistributionEvent",
     "ScheduledExpense",
     "IAPEvent",
+    "CohortCentroid",
+    "UserCohortLabel",
+    "UserSyncState",
+    "SyncTombstone",
 ]
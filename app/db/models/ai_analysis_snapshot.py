@@ -1,17 +1,33 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from .base import Base
 
+# "profile": GPT-rated monthly profile (save_ai_snapshot)
+# "insights": precomputed analyzer output (app/services/ai_insight_snapshots.py)
+PROFILE_KIND = "profile"
+INSIGHTS_KIND = "insights"
+
 
 class AIAnalysisSnapshot(Base):
     __tablename__ = "ai_analysis_snapshots"
+    __table_args__ = (
+        Index(
+            "ix_ai_analysis_snapshots_user_kind_created",
+            "user_id",
+            "kind",
+            "created_at",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    kind = Column(
+        String(20), nullable=False, default=PROFILE_KIND, server_default=PROFILE_KIND
+    )
     rating = Column(String)
     risk = Column(String)
     summary = Column(String)
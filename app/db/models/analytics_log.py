@@ -1,11 +1,15 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import DDL, JSON, Boolean, Column, DateTime, ForeignKey, String, event
 from sqlalchemy.dialects.postgresql import UUID
 
 from .base import Base
 
+# Append-only logs, range-partitioned by month on timestamp (the partition key
+# is therefore part of each primary key). Partitions are created ahead and
+# dropped past retention by app/services/partition_maintenance.py.
+
 
 class FeatureUsageLog(Base):
     """
@@ -13,6 +17,7 @@ class FeatureUsageLog(Base):
     """
 
     __tablename__ = "feature_usage_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -37,7 +42,10 @@ class FeatureUsageLog(Base):
 
     # Timestamps
     timestamp = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
     )
 
 
@@ -47,6 +55,7 @@ class FeatureAccessLog(Base):
     """
 
     __tablename__ = "feature_access_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -69,7 +78,10 @@ class FeatureAccessLog(Base):
 
     # Timestamps
     timestamp = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
     )
 
 
@@ -79,6 +91,7 @@ class PaywallImpressionLog(Base):
     """
 
     __tablename__ = "paywall_impression_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -102,5 +115,23 @@ class PaywallImpressionLog(Base):
 
     # Timestamps
     timestamp = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
+
+
+for _table in (
+    FeatureUsageLog.__table__,
+    FeatureAccessLog.__table__,
+    PaywallImpressionLog.__table__,
+):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS {_table.name}_default "
+            f"PARTITION OF {_table.name} DEFAULT"
+        ).execute_if(dialect="postgresql"),
     )
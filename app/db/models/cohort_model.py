@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base
+
+
+class CohortCentroid(Base):
+    """One row per behavioural cohort of the persisted cluster model.
+
+    `centroid` is in the model's transformed feature space (see
+    app/services/core/cohort/cohort_model.py); `member_count` is how many
+    users were labelled into the cluster at the last training run and is
+    the weight the centre carries into the next incremental update.
+    """
+
+    __tablename__ = "cohort_centroids"
+
+    cluster_id = Column(Integer, primary_key=True, autoincrement=False)
+    centroid = Column(JSON, nullable=False)
+    member_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class UserCohortLabel(Base):
+    """A user's current cohort and a fingerprint of the features behind it.
+
+    Training compares the fingerprint with freshly extracted features to
+    find the users whose behaviour changed since they were labelled.
+    """
+
+    __tablename__ = "user_cohort_labels"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    cluster_id = Column(Integer, nullable=False, index=True)
+    feature_hash = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -2,7 +2,16 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import Column, DateTime, ForeignKey, Numeric, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from .base import Base
@@ -17,6 +26,7 @@ class DailyPlan(Base):
         UniqueConstraint(
             "user_id", "date", "category", name="uq_daily_plan_user_date_category"
         ),
+        Index("ix_daily_plan_user_change_seq", "user_id", "change_seq"),
     )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(
@@ -56,3 +66,11 @@ class DailyPlan(Base):
     created_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    # Per-user change sequence for /api/sync, set by a database trigger
+    change_seq = Column(BigInteger, nullable=True)
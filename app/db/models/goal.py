@@ -2,7 +2,17 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Numeric, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -18,6 +28,7 @@ class Goal(Base):
     """
 
     __tablename__ = "goals"
+    __table_args__ = (Index("ix_goals_user_change_seq", "user_id", "change_seq"),)
 
     # Primary fields
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -71,6 +82,9 @@ class Goal(Base):
     # Priority for UI ordering
     priority = Column(String(10), nullable=True, default="medium")  # high, medium, low
 
+    # Per-user change sequence for /api/sync, set by a database trigger
+    change_seq = Column(BigInteger, nullable=True)
+
     @hybrid_property
     def remaining_amount(self) -> Decimal:
         """Calculate remaining amount to reach goal"""
@@ -2,7 +2,17 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, String, Text
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 
 from .base import Base
@@ -33,6 +43,7 @@ class NotificationStatus(str, Enum):
     """Notification delivery status"""
 
     PENDING = "pending"  # Scheduled but not sent yet
+    DISPATCHING = "dispatching"  # Claimed by a dispatcher, being delivered
     SENT = "sent"  # Successfully sent
     DELIVERED = "delivered"  # Confirmed delivered to device
     READ = "read"  # User has read the notification
@@ -102,6 +113,24 @@ class Notification(Base):
         String(100), nullable=True, index=True
     )  # For grouping related notifications
 
+    # Per-user change sequence for /api/sync, set by a database trigger
+    change_seq = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination of /list: newest first, id breaking ties
+        Index("ix_notifications_user_created", user_id, created_at.desc(), id.desc()),
+        # Unread counter reconciliation and unread_only listing
+        Index(
+            "ix_notifications_user_unread",
+            user_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=text("is_read = false"),
+        ),
+        # Change feed of /api/sync
+        Index("ix_notifications_user_change_seq", user_id, change_seq),
+    )
+
     def to_dict(self):
         """Convert notification to dictionary"""
         return {
@@ -1,20 +1,41 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import DDL, Boolean, Column, DateTime, String, event
 from sqlalchemy.dialects.postgresql import UUID
 
 from .base import Base
 
 
 class NotificationLog(Base):
+    """Delivery log, range-partitioned by month on created_at.
+
+    Partitions are created ahead and dropped past retention by
+    app/services/partition_maintenance.py; the default partition catches
+    anything outside the prepared months.
+    """
+
     __tablename__ = "notification_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     channel = Column(String, nullable=False)  # 'push' or 'email'
     message = Column(String, nullable=False)
     success = Column(Boolean, default=True)
+    # The partition key has to be part of the primary key
     created_at = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
     )
+
+
+event.listen(
+    NotificationLog.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS notification_logs_default "
+        "PARTITION OF notification_logs DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
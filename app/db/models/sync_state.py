@@ -0,0 +1,209 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, BigInteger, Column, DateTime, String, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base
+
+# Tables whose rows /api/sync streams to offline clients
+SYNCED_TABLES = ("transactions", "daily_plan", "goals", "notifications")
+
+
+class UserSyncState(Base):
+    """Per-user change horizon behind the /api/sync change feed.
+
+    Every insert, real update or delete of a synced row takes the next value
+    of the global sync_change_seq sequence (triggers below). At the end of
+    each statement the users it changed are locked here in user_id order and
+    their last_seq advanced; the lock is held until commit, so a user's
+    writes commit in sequence order and a client that has read up to N can
+    never miss a change numbered below N that commits later. A statement
+    whose numbers were overtaken by a concurrent commit for the same user
+    renumbers its rows under the lock.
+
+    last_seq also versions everything a user's heavy GET endpoints return,
+    which is what their ETags are built from. pruned_seq is the highest
+    tombstone removed by retention: a cursor below it may have missed a
+    delete and has to resync.
+
+    No foreign key to users: notifications.user_id has none either, and a
+    cascaded account deletion must not fail on its own tombstones.
+    """
+
+    __tablename__ = "user_sync_state"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+    pruned_seq = Column(BigInteger, nullable=False, default=0)
+
+
+class SyncTombstone(Base):
+    """A hard-deleted synced row, kept so /api/sync can report it."""
+
+    __tablename__ = "sync_tombstones"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    change_seq = Column(BigInteger, primary_key=True)
+    entity = Column(String(50), nullable=False)  # table name
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+NEXT_CHANGE_SEQ_FUNCTIONS = """
+CREATE SEQUENCE IF NOT EXISTS sync_change_seq;
+
+CREATE OR REPLACE FUNCTION assign_sync_change_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_seq := nextval('sync_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION publish_sync_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    row_ids uuid[];
+    row_users uuid[];
+    users uuid[];
+    lows bigint[];
+    highs bigint[];
+    committed bigint;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(id), array_agg(user_id)
+        INTO row_ids, row_users
+        FROM new_rows;
+    ELSE
+        -- Rows the statement left unchanged kept their number
+        SELECT array_agg(n.id), array_agg(n.user_id)
+        INTO row_ids, row_users
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.change_seq IS DISTINCT FROM o.change_seq;
+    END IF;
+
+    IF row_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT array_agg(user_id ORDER BY user_id),
+           array_agg(lo ORDER BY user_id),
+           array_agg(hi ORDER BY user_id)
+    INTO users, lows, highs
+    FROM (
+        SELECT c.user_id, min(t.change_seq) AS lo, max(t.change_seq) AS hi
+        FROM unnest(row_ids, row_users) AS c(id, user_id)
+        JOIN new_rows t ON t.id = c.id
+        GROUP BY c.user_id
+    ) per_user;
+
+    -- One lock order for every statement, so multi-user writes cannot
+    -- deadlock each other here
+    INSERT INTO user_sync_state (user_id, last_seq)
+    SELECT u, 0 FROM unnest(users) AS u ORDER BY u
+    ON CONFLICT (user_id) DO NOTHING;
+    PERFORM 1 FROM user_sync_state
+    WHERE user_id = ANY(users)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    FOR i IN 1 .. array_length(users, 1) LOOP
+        SELECT last_seq INTO committed
+        FROM user_sync_state WHERE user_id = users[i];
+        IF committed >= lows[i] THEN
+            -- A concurrent write for this user took later numbers and
+            -- committed first. Renumber under the lock; the nested
+            -- statement's triggers advance last_seq.
+            EXECUTE 'UPDATE ' || quote_ident(TG_TABLE_NAME)
+                || ' SET change_seq = NULL WHERE id = ANY($1)'
+            USING ARRAY(
+                SELECT c.id FROM unnest(row_ids, row_users) AS c(id, user_id)
+                WHERE c.user_id = users[i]
+            );
+        ELSE
+            UPDATE user_sync_state SET last_seq = highs[i]
+            WHERE user_id = users[i];
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_sync_state (user_id, last_seq)
+    SELECT DISTINCT user_id, 0 FROM old_rows ORDER BY user_id
+    ON CONFLICT (user_id) DO NOTHING;
+    PERFORM 1 FROM user_sync_state
+    WHERE user_id IN (SELECT user_id FROM old_rows)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    -- Numbered after the locks, so above anything these users committed
+    WITH tombstones AS (
+        INSERT INTO sync_tombstones (user_id, change_seq, entity, entity_id, deleted_at)
+        SELECT user_id, nextval('sync_change_seq'), TG_TABLE_NAME, id, now()
+        FROM old_rows
+        RETURNING user_id, change_seq
+    )
+    UPDATE user_sync_state s SET last_seq = t.hi
+    FROM (
+        SELECT user_id, max(change_seq) AS hi FROM tombstones GROUP BY user_id
+    ) t
+    WHERE s.user_id = t.user_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Rows are numbered by row triggers, so ORM writes, bulk statements and raw
+# SQL all get a sequence number; users are locked by statement triggers.
+# Updates that change nothing keep their number; rows are compared as text
+# because json columns (notifications.data) have no equality operator.
+# The renumbering update sets change_seq to NULL, which the row trigger
+# replaces.
+CHANGE_SEQ_TRIGGERS_TEMPLATE = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = '{table}_sync_seq_insert'
+          AND tgrelid = '{table}'::regclass
+    ) THEN
+        CREATE TRIGGER {table}_sync_seq_insert
+            BEFORE INSERT ON {table}
+            FOR EACH ROW EXECUTE FUNCTION assign_sync_change_seq();
+        CREATE TRIGGER {table}_sync_seq_update
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW WHEN (ROW(OLD.*)::text IS DISTINCT FROM ROW(NEW.*)::text)
+            EXECUTE FUNCTION assign_sync_change_seq();
+        CREATE TRIGGER {table}_sync_publish_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION publish_sync_changes();
+        CREATE TRIGGER {table}_sync_publish_update
+            AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION publish_sync_changes();
+        CREATE TRIGGER {table}_sync_tombstone
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_sync_tombstone();
+    END IF;
+END;
+$$;
+"""
+
+CHANGE_SEQ_TRIGGERS = [
+    CHANGE_SEQ_TRIGGERS_TEMPLATE.format(table=table) for table in SYNCED_TABLES
+]
+
+# Databases bootstrapped with metadata.create_all (init_database, tests) get
+# the triggers too; every statement is idempotent.
+for _ddl in (NEXT_CHANGE_SEQ_FUNCTIONS, *CHANGE_SEQ_TRIGGERS):
+    event.listen(
+        Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql")
+    )
@@ -2,11 +2,13 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Numeric,
     String,
     Text,
@@ -74,6 +76,13 @@ class Transaction(Base):
         DateTime(timezone=True), nullable=True, default=None, index=True
     )  # Soft delete support
 
+    # Per-user change sequence for /api/sync, set by a database trigger
+    change_seq = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index("ix_transactions_user_change_seq", "user_id", "change_seq"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="transactions")
     goal = relationship(
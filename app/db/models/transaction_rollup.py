@@ -0,0 +1,218 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    event,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base
+
+
+class TransactionRollup(Base):
+    """Per-user spending cube at (UTC day, category) grain.
+
+    Holds count / sum / sum of squares / min / max of the user's live
+    (not soft-deleted) transactions, so analytics read a few rows per month
+    instead of re-aggregating raw transactions. Mean and variance of any
+    range follow from the sums.
+
+    Kept current by statement-level triggers on transactions (below), which
+    covers ORM writes, bulk inserts and raw SQL alike. A missed or corrupted
+    range can be backfilled with scripts/rebuild_transaction_rollups.py.
+    """
+
+    __tablename__ = "transaction_daily_rollups"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = Column(Date, primary_key=True)  # UTC calendar day of spent_at
+    category = Column(String(50), primary_key=True)
+
+    txn_count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Numeric(16, 2), nullable=False, default=0)
+    amount_sumsq = Column(Numeric(28, 4), nullable=False, default=0)
+    amount_min = Column(Numeric(12, 2), nullable=True)
+    amount_max = Column(Numeric(12, 2), nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+# Inserts merge into their cells. Updates and deletes can retire the current
+# min/max, so the cells they touch are re-derived from transactions instead
+# (each one an index range on (user_id, spent_at)).
+MAINTAIN_ROLLUPS_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_transaction_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    cell_users uuid[];
+    cell_days date[];
+    cell_categories text[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_advisory_xact_lock(hashtext('transaction_daily_rollups'), cell)
+        FROM (
+            SELECT DISTINCT hashtext(user_id::text
+                || (spent_at AT TIME ZONE 'UTC')::date::text || category) AS cell
+            FROM new_rows
+            WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+            ORDER BY cell
+        ) locks;
+        INSERT INTO transaction_daily_rollups AS r (
+            user_id, day, category, txn_count, amount_sum, amount_sumsq,
+            amount_min, amount_max, updated_at
+        )
+        SELECT user_id, (spent_at AT TIME ZONE 'UTC')::date, category,
+               count(*), sum(amount), sum(amount * amount),
+               min(amount), max(amount), now()
+        FROM new_rows
+        WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, day, category) DO UPDATE SET
+            txn_count = r.txn_count + EXCLUDED.txn_count,
+            amount_sum = r.amount_sum + EXCLUDED.amount_sum,
+            amount_sumsq = r.amount_sumsq + EXCLUDED.amount_sumsq,
+            amount_min = LEAST(r.amount_min, EXCLUDED.amount_min),
+            amount_max = GREATEST(r.amount_max, EXCLUDED.amount_max),
+            updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        SELECT array_agg(user_id), array_agg(day), array_agg(category)
+        INTO cell_users, cell_days, cell_categories
+        FROM (
+            SELECT DISTINCT user_id, (spent_at AT TIME ZONE 'UTC')::date AS day,
+                   category
+            FROM old_rows
+            WHERE deleted_at IS NULL AND spent_at IS NOT NULL
+        ) cells;
+    ELSE
+        SELECT array_agg(user_id), array_agg(day), array_agg(category)
+        INTO cell_users, cell_days, cell_categories
+        FROM (
+            SELECT o.user_id, (o.spent_at AT TIME ZONE 'UTC')::date AS day,
+                   o.category
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.deleted_at IS NULL AND o.spent_at IS NOT NULL
+              AND (o.user_id, o.category, o.amount, o.spent_at, n.deleted_at IS NULL)
+                  IS DISTINCT FROM (n.user_id, n.category, n.amount, n.spent_at, true)
+            UNION
+            SELECT n.user_id, (n.spent_at AT TIME ZONE 'UTC')::date, n.category
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE n.deleted_at IS NULL AND n.spent_at IS NOT NULL
+              AND (n.user_id, n.category, n.amount, n.spent_at, o.deleted_at IS NULL)
+                  IS DISTINCT FROM (o.user_id, o.category, o.amount, o.spent_at, true)
+        ) cells;
+    END IF;
+
+    IF cell_users IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Under READ COMMITTED the recompute cannot see a concurrent insert into
+    -- the same cell, and would overwrite its merge. Both paths lock their
+    -- cells (in one order, so they cannot deadlock each other) until commit;
+    -- the recompute is a new statement, so its snapshot sees whatever the
+    -- lock holder committed.
+    PERFORM pg_advisory_xact_lock(hashtext('transaction_daily_rollups'), cell)
+    FROM (
+        SELECT DISTINCT hashtext(c.user_id::text || c.day::text || c.category)
+            AS cell
+        FROM unnest(cell_users, cell_days, cell_categories)
+            AS c(user_id, day, category)
+        ORDER BY cell
+    ) locks;
+
+    WITH cells AS (
+        SELECT * FROM unnest(cell_users, cell_days, cell_categories)
+            AS c(user_id, day, category)
+    ),
+    fresh AS (
+        SELECT c.user_id, c.day, c.category,
+               count(t.id) AS txn_count,
+               coalesce(sum(t.amount), 0) AS amount_sum,
+               coalesce(sum(t.amount * t.amount), 0) AS amount_sumsq,
+               min(t.amount) AS amount_min,
+               max(t.amount) AS amount_max
+        FROM cells c
+        LEFT JOIN transactions t
+          ON t.user_id = c.user_id
+         AND t.category = c.category
+         AND t.deleted_at IS NULL
+         AND t.spent_at >= c.day::timestamp AT TIME ZONE 'UTC'
+         AND t.spent_at < (c.day + 1)::timestamp AT TIME ZONE 'UTC'
+        GROUP BY c.user_id, c.day, c.category
+    ),
+    emptied AS (
+        DELETE FROM transaction_daily_rollups r
+        USING fresh f
+        WHERE f.txn_count = 0
+          AND r.user_id = f.user_id AND r.day = f.day AND r.category = f.category
+    )
+    INSERT INTO transaction_daily_rollups AS r (
+        user_id, day, category, txn_count, amount_sum, amount_sumsq,
+        amount_min, amount_max, updated_at
+    )
+    SELECT user_id, day, category, txn_count, amount_sum, amount_sumsq,
+           amount_min, amount_max, now()
+    FROM fresh
+    WHERE txn_count > 0
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        txn_count = EXCLUDED.txn_count,
+        amount_sum = EXCLUDED.amount_sum,
+        amount_sumsq = EXCLUDED.amount_sumsq,
+        amount_min = EXCLUDED.amount_min,
+        amount_max = EXCLUDED.amount_max,
+        updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Transition tables allow one event per trigger, hence three triggers
+MAINTAIN_ROLLUPS_TRIGGERS = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'transactions_rollup_insert'
+          AND tgrelid = 'transactions'::regclass
+    ) THEN
+        CREATE TRIGGER transactions_rollup_insert
+            AFTER INSERT ON transactions
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+        CREATE TRIGGER transactions_rollup_update
+            AFTER UPDATE ON transactions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+        CREATE TRIGGER transactions_rollup_delete
+            AFTER DELETE ON transactions
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_transaction_rollups();
+    END IF;
+END;
+$$;
+"""
+
+# Databases bootstrapped with metadata.create_all (init_database, tests) get
+# the triggers too; both statements are idempotent.
+for _ddl in (MAINTAIN_ROLLUPS_FUNCTION, MAINTAIN_ROLLUPS_TRIGGERS):
+    event.listen(
+        Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql")
+    )
@@ -26,22 +26,14 @@ from starlette.middleware.cors import CORSMiddleware
 from app.api.ai.routes import router as ai_router
 from app.api.analytics.routes import router as analytics_router
 from app.api.auth.routes import router as auth_router
-from app.api.behavior.routes import router as behavior_router
 from app.api.budget.routes import router as budget_router
 from app.api.calendar.routes import router as calendar_router
 from app.api.challenge.routes import router as challenge_router
 from app.api.checkpoint.routes import router as checkpoint_router
 from app.api.client_errors.routes import router as client_errors_router
-from app.api.cluster.routes import router as cluster_router
-from app.api.cohort.routes import router as cohort_router
 from app.api.dashboard.routes import router as dashboard_router
 from app.api.dependencies import get_current_user
-from app.api.drift.routes import router as drift_router
 from app.api.email.routes import router as email_router
-from app.api.endpoints.audit import router as audit_router
-from app.api.endpoints.cache_management import router as cache_management_router
-from app.api.endpoints.database_performance import router as db_performance_router
-from app.api.endpoints.feature_flags import router as feature_flags_router
 from app.api.expense.routes import router as expense_router
 from app.api.financial.routes import router as financial_router
 from app.api.goal.routes import router as goal_router
@@ -59,10 +51,9 @@ from app.api.notifications.routes import router as notifications_router
 from app.api.ocr.routes import router as ocr_router
 from app.api.onboarding.routes import router as onboarding_router
 from app.api.plan.routes import router as plan_router
-from app.api.referral.routes import router as referral_router
 from app.api.scheduled_expenses.routes import router as scheduled_expenses_router
 from app.api.spend.routes import router as spend_router
-from app.api.style.routes import router as style_router
+from app.api.sync.routes import router as sync_router
 from app.api.tasks.routes import router as tasks_router
 from app.api.transactions.routes import router as transactions_router
 from app.api.users.routes import router as users_router
@@ -81,15 +72,14 @@ from app.core.error_handler import (
     validation_exception_handler,
 )
 from app.core.feature_flags import get_feature_flag_manager, is_feature_enabled
+from app.core.health_collector import CORE_PROBES, get_health_collector
+from app.core.lazy_routers import mount_lazy_routers, mount_routers_eagerly
 from app.core.limiter_setup import init_rate_limiter
 from app.core.logging_config import setup_logging
-from app.core.prometheus_metrics import (
-    CONTENT_TYPE_LATEST,
-    PrometheusMiddleware,
-    get_metrics,
-)
+from app.core.prometheus_metrics import CONTENT_TYPE_LATEST, get_metrics
 from app.core.simple_rate_limiter import check_api_rate_limit
 from app.middleware.audit_middleware import audit_middleware
+from app.middleware.http_observability_middleware import HTTPObservabilityMiddleware
 from app.utils.response_wrapper import error_response
 
 # ---- Firebase Admin SDK init ----
@@ -473,41 +463,9 @@ async def prometheus_metrics(request: Request):
     return Response(content=metrics_data, media_type=CONTENT_TYPE_LATEST)
 
 
-async def _check_redis_health() -> str:
-    """Ping Redis with a short timeout: connected / unavailable / not_configured.
-
-    Honors every supported provider config: REDIS_URL / UPSTASH_REDIS_URL
-    (direct protocol URLs) and UPSTASH_REDIS_REST_URL + token (converted to
-    a rediss:// URL the same way app/core/limiter_setup.py does).
-    """
-    redis_url = settings.REDIS_URL or getattr(settings, "UPSTASH_REDIS_URL", "")
-    if not redis_url:
-        rest_url = os.getenv("UPSTASH_REDIS_REST_URL", "")
-        rest_token = os.getenv("UPSTASH_REDIS_REST_TOKEN", "")
-        if rest_url.startswith("https://") and rest_token:
-            host = rest_url.replace("https://", "").replace("http://", "")
-            redis_url = f"rediss://default:{rest_token}@{host}:6379"
-    if not redis_url:
-        return "not_configured"
-    try:
-        import redis.asyncio as aioredis
-
-        client = aioredis.from_url(
-            redis_url, socket_connect_timeout=3, socket_timeout=3
-        )
-        try:
-            pong = await asyncio.wait_for(client.ping(), timeout=3.0)
-            return "connected" if pong else "error"
-        finally:
-            await client.aclose()
-    except Exception:
-        return "unavailable"
-
-
 @app.get("/health")
 async def detailed_health_check():
     """Detailed health check with database status and performance metrics"""
-    from app.core.async_session import check_database_health, get_alembic_revision
     from app.core.performance_cache import get_cache_stats
 
     # Check environment configuration
@@ -528,21 +486,23 @@ async def detailed_health_check():
         "sentry_configured": _sentry_initialized,
     }
 
-    # Check database health
-    database_status = "unknown"
-    database_error = None
+    # Database, migration head and Redis come from the background health
+    # collector: probe traffic reads the snapshot instead of pinging each
+    # dependency on every hit.
+    collector = get_health_collector()
+    database, alembic, redis_probe = await asyncio.gather(
+        *(collector.get(name) for name in CORE_PROBES)
+    )
 
-    try:
-        db_healthy = await asyncio.wait_for(
-            check_database_health(), timeout=5.0
-        )  # Aligned with Docker HEALTHCHECK --timeout (5-10s)
-        database_status = "connected" if db_healthy else "disconnected"
-    except asyncio.TimeoutError:
+    database_error = None
+    if database.ok:
+        database_status = "connected" if database.value else "disconnected"
+    elif database.error == "timeout":
         database_status = "timeout"
         database_error = "Database health check timed out"
-    except Exception as e:
+    else:
         database_status = "error"
-        database_error = str(e)
+        database_error = database.error
 
     # Deployment provenance + dependency reachability (safe read-only
     # diagnostics: a commit SHA and a migration revision id reveal no
@@ -554,18 +514,10 @@ async def detailed_health_check():
         or os.getenv("SOURCE_VERSION")
         or "unknown"
     )[:12]
-    # Only look up the migration head when the DB check above succeeded —
-    # a second 5s wait on an unreachable DB would push /health past the
-    # container healthcheck timeout instead of returning a degraded body.
-    alembic_revision = "unknown"
-    if database_status == "connected":
-        try:
-            alembic_revision = await asyncio.wait_for(
-                get_alembic_revision(), timeout=5.0
-            )
-        except Exception:
-            pass
-    redis_status = await _check_redis_health()
+    alembic_revision = (
+        alembic.value if alembic.ok and database_status == "connected" else "unknown"
+    )
+    redis_status = redis_probe.value if redis_probe.ok else "unavailable"
 
     # Get performance cache statistics
     cache_stats = get_cache_stats()
@@ -582,6 +534,10 @@ async def detailed_health_check():
         overall_status = "degraded"
     if not _sentry_initialized and settings.ENVIRONMENT == "production":
         overall_status = "degraded"
+    # A stuck collector keeps serving its last snapshot; past the staleness
+    # window that snapshot no longer vouches for the dependency.
+    if any(probe.stale for probe in (database, alembic, redis_probe)):
+        overall_status = "degraded"
     if (
         not config_status["jwt_secret_configured"]
         or not config_status["database_configured"]
@@ -600,6 +556,7 @@ async def detailed_health_check():
         "sentry": sentry_status,
         "config": config_status,
         "cache_stats": cache_stats,
+        "checks": collector.snapshot(CORE_PROBES),
         "timestamp": time.time(),
         "port": os.getenv("PORT", "8000"),
     }
@@ -698,9 +655,6 @@ async def terms_of_service():
 
 # ---- Middlewares ----
 
-# Add Prometheus metrics middleware (first to track all requests)
-app.add_middleware(PrometheusMiddleware)
-
 # Add standardized error handling middleware
 app.add_middleware(StandardizedErrorMiddleware, include_request_details=settings.DEBUG)
 app.add_middleware(
@@ -731,79 +685,6 @@ app.add_middleware(
 # 3. All tokens sent via header, returned in response body (never in cookies)
 # See: app/core/security_notes.py and docs/adr/ADR-20251115-csrf-protection-analysis.md
 
-# Lightweight performance monitoring middleware
-
-
-@app.middleware("http")
-async def performance_logging_middleware(request: Request, call_next):
-    """Lightweight middleware for critical error handling only"""
-    start_time = time.time()
-
-    try:
-        response = await call_next(request)
-        duration = time.time() - start_time
-
-        # Only log very slow requests to reduce I/O overhead
-        if duration > 2.0:  # Only log requests taking more than 2 seconds
-            logger.warning(
-                f"SLOW REQUEST: {request.method} {request.url.path} "
-                f"completed in {duration*1000:.0f}ms with status {response.status_code}"
-            )
-
-        return response
-
-    except Exception as exc:
-        duration = time.time() - start_time
-        logger.error(
-            f"ERROR: {request.method} {request.url.path} failed after {duration*1000:.0f}ms: {exc}"
-        )
-
-        # Send to Sentry with comprehensive context
-        with sentry_sdk.push_scope() as scope:
-            scope.set_tag("error_type", "middleware_exception")
-            scope.set_tag("endpoint", request.url.path)
-            scope.set_tag("method", request.method)
-            scope.set_context(
-                "request",
-                {
-                    "url": str(request.url),
-                    "method": request.method,
-                    "headers": dict(request.headers),
-                    "duration_ms": duration * 1000,
-                },
-            )
-
-            # Extract user context if available
-            try:
-                auth_header = request.headers.get("Authorization")
-                if auth_header and auth_header.startswith("Bearer "):
-                    raw_token = auth_header.replace("Bearer ", "").strip()
-
-                    # If token is empty or looks like garbage, consider unauthenticated
-                    if not raw_token or raw_token == ".":
-                        scope.set_tag("user_authenticated", False)
-                    else:
-                        try:
-                            from app.services.auth_jwt_service import get_token_info
-
-                            token_info = get_token_info(raw_token)
-                            if token_info:
-                                scope.set_user({"id": token_info.get("user_id")})
-                                scope.set_tag("user_authenticated", True)
-                            else:
-                                scope.set_tag("user_authenticated", False)
-                        except Exception:
-                            # Error decoding token - not 502, just "unauthenticated"
-                            scope.set_tag("user_authenticated", False)
-                else:
-                    scope.set_tag("user_authenticated", False)
-            except Exception:
-                scope.set_tag("user_authenticated", False)
-
-            sentry_sdk.capture_exception(exc)
-        raise
-
-
 # RESTORED: Optimized audit middleware with separate database connections to prevent deadlocks
 # The previous audit middleware caused database deadlocks due to concurrent sessions.
 # This new implementation uses a separate connection pool and async queuing to prevent issues.
@@ -910,30 +791,10 @@ async def optimized_audit_middleware(request: Request, call_next):
         raise
 
 
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["Strict-Transport-Security"] = (
-        "max-age=63072000; includeSubDomains"
-    )
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    if request.url.path.startswith("/docs") or request.url.path.startswith("/redoc"):
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net"
-        )
-    else:
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net"
-        )
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=()"
-    response.headers["Referrer-Policy"] = "same-origin"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    return response
+# Metrics, request timing, SQL query budget, Sentry capture and security
+# headers in one pure-ASGI layer. Added last so it is the outermost user
+# middleware: it times the whole stack and stamps headers on every response.
+app.add_middleware(HTTPObservabilityMiddleware)
 
 
 # ---- Routers ----
@@ -970,9 +831,7 @@ private_routers_list = [
     (plan_router, "/api", ["Plans"]),
     (budget_router, "/api", ["Budgets"]),
     (analytics_router, "/api", ["Analytics"]),
-    (behavior_router, "/api", ["Behavior"]),
     (spend_router, "/api", ["Spend"]),
-    (style_router, "/api", ["Styles"]),
     (tasks_router, "/api", ["Tasks"]),
     (insights_router, "/api", ["Insights"]),
     (habits_router, "/api", ["Habits"]),
@@ -981,19 +840,12 @@ private_routers_list = [
     (iap_router, "/api", ["IAP"]),
     (notifications_router, "/api", ["Notifications"]),
     (mood_router, "/api", ["Mood"]),
-    (referral_router, "/api", ["Referrals"]),
     (onboarding_router, "/api", ["Onboarding"]),
     (ocr_router, "/api", ["OCR"]),
-    (cohort_router, "/api", ["Cohorts"]),
-    (cluster_router, "/api", ["Clusters"]),
     (checkpoint_router, "/api", ["Checkpoints"]),
-    (drift_router, "/api", ["Drift"]),
-    (audit_router, "/api", ["Audit"]),
-    (db_performance_router, "/api", ["Database Performance"]),
-    (cache_management_router, "/api", ["Cache Management"]),
-    (feature_flags_router, "/api", ["Feature Flags"]),
     (installments_router, "/api", ["Installments"]),
     (scheduled_expenses_router, "/api", ["Scheduled Expenses"]),
+    (sync_router, "/api", ["Sync"]),
     (
         external_services_health_router,
         "",
@@ -1001,14 +853,23 @@ private_routers_list = [
     ),  # No /api prefix for health endpoints
 ]
 
+private_dependencies = [Depends(get_current_user), Depends(check_api_rate_limit)]
+
 for router, prefix, tags in private_routers_list:
     app.include_router(
         router,
         prefix=prefix,
         tags=tags,
-        dependencies=[Depends(get_current_user), Depends(check_api_rate_limit)],
+        dependencies=private_dependencies,
     )
 
+# Admin, diagnostics and little-used routers: imported now, or on their
+# first request when LAZY_ROUTERS is set
+if settings.LAZY_ROUTERS:
+    mount_lazy_routers(app, dependencies=private_dependencies)
+else:
+    mount_routers_eagerly(app, dependencies=private_dependencies)
+
 # ---- STANDARDIZED EXCEPTION HANDLERS ----
 
 # Import the new standardized error handling system
@@ -1198,6 +1059,9 @@ async def on_startup():
             logging.warning(f"⚠️ Audit system init failed: {e}")
             services_status["audit_system"] = False
 
+        # Background health probes: /health serves their latest results
+        get_health_collector().start(CORE_PROBES)
+
         # Log startup status
         ready_services = sum(services_status.values())
         total_services = len(services_status)
@@ -1233,6 +1097,9 @@ async def on_shutdown():
         logging.info("⏳ Waiting for in-flight requests to complete (5 seconds)...")
         await asyncio.sleep(5)
 
+        # Stop background health probes before their connections go away
+        await get_health_collector().stop()
+
         # Step 2: Close audit system connections
         try:
             from app.core.audit_logging import _audit_db_pool
@@ -0,0 +1,209 @@
+"""
+HTTP Observability Middleware for MITA Finance API
+
+One pure-ASGI layer for the per-request work that used to be spread over
+PrometheusMiddleware (BaseHTTPMiddleware) and the performance-logging and
+security-headers `@app.middleware("http")` functions in app/main.py:
+
+- Prometheus request count/latency/in-progress, labelled by the matched
+  route template (scope["route"]) instead of a regex-normalized path
+- per-request SQL query budget (app.core.query_budget)
+- slow-request logging and Sentry capture of unhandled exceptions
+- security headers on every response
+
+BaseHTTPMiddleware runs the downstream app in a separate task and re-streams
+the response body through memory object streams; each such layer costs
+measurable time on every request. This class only wraps `send`.
+"""
+
+import logging
+import time
+
+import sentry_sdk
+
+from app.core.prometheus_metrics import (
+    bounded_method,
+    http_request_db_queries,
+    http_request_db_seconds,
+    http_requests_in_progress,
+    observe_http_request,
+    query_budget_violations_total,
+)
+from app.core.query_budget import (
+    evaluate_query_budget,
+    notify_request_finished,
+    route_query_stats,
+    route_template,
+    track_queries,
+)
+
+logger = logging.getLogger(__name__)
+
+_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net"
+)
+
+SECURITY_HEADERS = (
+    ("Strict-Transport-Security", "max-age=63072000; includeSubDomains"),
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("Content-Security-Policy", _CSP),
+    ("Permissions-Policy", "geolocation=(), microphone=()"),
+    ("Referrer-Policy", "same-origin"),
+    ("X-XSS-Protection", "1; mode=block"),
+)
+
+# Encoded once; appended to the raw ASGI header list of every response
+_RAW_SECURITY_HEADERS = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in SECURITY_HEADERS
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _RAW_SECURITY_HEADERS)
+
+# Paths that are neither measured nor budgeted (the scrape itself, probes)
+_UNMEASURED_PATHS = frozenset({"/metrics"})
+
+
+def record_request_queries(method: str, stats) -> None:
+    """Publish a finished request's query stats (metrics, budget log, observers)"""
+    try:
+        http_request_db_queries.labels(method=method, endpoint=stats.route).observe(
+            stats.query_count
+        )
+        http_request_db_seconds.labels(method=method, endpoint=stats.route).observe(
+            stats.db_time
+        )
+
+        verdict = evaluate_query_budget(stats)
+        if verdict["over_budget"]:
+            query_budget_violations_total.labels(
+                endpoint=stats.route, reason="budget"
+            ).inc()
+        if verdict["repeated_statements"]:
+            query_budget_violations_total.labels(
+                endpoint=stats.route, reason="repeated_statement"
+            ).inc()
+        route_query_stats.observe(stats, verdict["over_budget"])
+        notify_request_finished(stats)
+    except Exception as e:
+        # Instrumentation must never break a response
+        logger.debug(f"Query budget recording failed: {e}")
+
+
+class HTTPObservabilityMiddleware:
+    """Metrics, timing, query budget and security headers in a single ASGI layer"""
+
+    def __init__(self, app, slow_request_threshold: float = 2.0):
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] in _UNMEASURED_PATHS:
+            await self.app(scope, receive, self._with_security_headers(send))
+            return
+
+        method = bounded_method(scope["method"])
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                _add_security_headers(message)
+            await send(message)
+
+        http_requests_in_progress.labels(method=method).inc()
+        with track_queries(scope=scope) as query_stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as exc:
+                duration = time.perf_counter() - start_time
+                logger.error(
+                    f"ERROR: {scope['method']} {scope['path']} failed after "
+                    f"{duration * 1000:.0f}ms: {exc}"
+                )
+                _capture_exception(scope, exc, duration)
+                raise
+            finally:
+                duration = time.perf_counter() - start_time
+                endpoint = route_template(scope)
+                http_requests_in_progress.labels(method=method).dec()
+                observe_http_request(method, endpoint, status_code, duration)
+
+                query_stats.route = endpoint
+                record_request_queries(method, query_stats)
+
+        if duration > self.slow_request_threshold:
+            logger.warning(
+                f"SLOW REQUEST: {scope['method']} {scope['path']} "
+                f"completed in {duration * 1000:.0f}ms with status {status_code}"
+            )
+
+    @staticmethod
+    def _with_security_headers(send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                _add_security_headers(message)
+            await send(message)
+
+        return send_wrapper
+
+
+def _add_security_headers(message) -> None:
+    """Set the security headers on an http.response.start message in place"""
+    headers = [
+        (name, value)
+        for name, value in message.get("headers", [])
+        if name.lower() not in _SECURITY_HEADER_NAMES
+    ]
+    headers.extend(_RAW_SECURITY_HEADERS)
+    message["headers"] = headers
+
+
+def _capture_exception(scope, exc: Exception, duration: float) -> None:
+    """Send an unhandled request exception to Sentry with request context"""
+    from starlette.requests import Request
+
+    request = Request(scope)
+    with sentry_sdk.push_scope() as sentry_scope:
+        sentry_scope.set_tag("error_type", "middleware_exception")
+        sentry_scope.set_tag("endpoint", request.url.path)
+        sentry_scope.set_tag("method", request.method)
+        sentry_scope.set_context(
+            "request",
+            {
+                "url": str(request.url),
+                "method": request.method,
+                "headers": dict(request.headers),
+                "duration_ms": duration * 1000,
+            },
+        )
+
+        # Extract user context if available
+        user_authenticated = False
+        try:
+            auth_header = request.headers.get("Authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                raw_token = auth_header.replace("Bearer ", "").strip()
+
+                # Empty or garbage tokens are treated as unauthenticated
+                if raw_token and raw_token != ".":
+                    from app.services.auth_jwt_service import get_token_info
+
+                    token_info = get_token_info(raw_token)
+                    if token_info:
+                        sentry_scope.set_user({"id": token_info.get("user_id")})
+                        user_authenticated = True
+        except Exception:
+            # Error decoding token - not 502, just "unauthenticated"
+            user_authenticated = False
+        sentry_scope.set_tag("user_authenticated", user_authenticated)
+
+        sentry_sdk.capture_exception(exc)
@@ -5,9 +5,6 @@ AdvancedOCRService: Dual OCR Engine (Tesseract for free users, Google Vision API
 import os
 import tempfile
 
-import pytesseract
-from PIL import Image
-
 from app.core.logger import get_logger
 from app.ocr.confidence_scorer import ConfidenceScorer
 from app.ocr.google_vision_ocr_service import GoogleVisionOCRService
@@ -67,6 +64,9 @@ class AdvancedOCRService:
         Returns:
             dict: Parsed receipt data with merchant, items, amount, date, category.
         """
+        import pytesseract
+        from PIL import Image
+
         from app.ocr.ocr_parser import parse_receipt_details
 
         try:
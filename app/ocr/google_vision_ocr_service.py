@@ -5,12 +5,14 @@ GoogleVisionOCRService: Real integration with Google Cloud Vision API.
 import io
 import os
 
-from google.cloud import vision
-
 
 class GoogleVisionOCRService:
     def __init__(self, credentials_json_path: str):
+        # The Vision SDK is heavy; import it only when OCR actually runs
+        from google.cloud import vision
+
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_json_path
+        self.vision = vision
         self.client = vision.ImageAnnotatorClient()
 
     def process_image(self, image_path: str) -> dict:
@@ -28,7 +30,7 @@ class GoogleVisionOCRService:
         with io.open(image_path, "rb") as image_file:
             content = image_file.read()
 
-        image = vision.Image(content=content)
+        image = self.vision.Image(content=content)
         response = self.client.text_detection(image=image)
 
         if response.error.message:
@@ -1,6 +1,8 @@
 import re
 from datetime import datetime
 
+from app.services.merchant_classifier import get_merchant_classifier
+
 # Simple keyword heuristics for determining the category
 CATEGORY_KEYWORDS = {
     "groceries": [
@@ -77,14 +79,24 @@ def parse_receipt_text(text: str) -> dict:
         if date_found:
             break
 
-    # 3. Category by matching keywords
-    for line in lines:
-        for cat, keywords in CATEGORY_KEYWORDS.items():
-            if any(word in line for word in keywords):
-                category = cat
+    # 3. Category: the ledger's usual one for the merchant (first line), else
+    # the first line with a keyword, first category in dictionary order
+    classifier = get_merchant_classifier()
+    merchant = next((line.strip() for line in lines if line.strip()), "")
+    learned = classifier.learned_category(merchant, group="receipt")
+    if learned:
+        category = learned
+    else:
+        order = list(CATEGORY_KEYWORDS)
+        first_line, found = None, []
+        for line_no, _, cat in classifier.scan_segments(lines, group="receipt"):
+            if first_line is None:
+                first_line = line_no
+            elif line_no != first_line:
                 break
-        if category != "other":
-            break
+            found.append(cat)
+        if found:
+            category = min(found, key=order.index)
 
     return {
         "amount": round(best_amount, 2),
@@ -4,9 +4,6 @@ import os
 import tempfile
 from typing import Dict, Union
 
-import pytesseract
-from PIL import Image
-
 from app.core.logger import get_logger
 from app.ocr.confidence_scorer import ConfidenceScorer
 from app.ocr.ocr_parser import parse_receipt_details
@@ -33,6 +30,10 @@ class OCRReceiptService:
         if not os.path.exists(image_path):
             raise FileNotFoundError("Image file not found.")
 
+        # Tesseract and Pillow load on first use, not with the API
+        import pytesseract
+        from PIL import Image
+
         # Process image with Tesseract OCR
         image = Image.open(image_path)
         raw_text = pytesseract.image_to_string(image)
@@ -10,13 +10,14 @@ import logging
 import pickle
 import time
 from abc import ABC, abstractmethod
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from threading import RLock, Thread
 from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 
+from app.core.cache_engine import CacheNamespace, get_cache_engine
+
 try:
     import redis
 
@@ -144,7 +145,16 @@ class CacheBackend(ABC):
 
 
 class MemoryCache(CacheBackend):
-    """High-performance in-memory cache with advanced features"""
+    """High-performance in-memory cache with advanced features
+
+    Backed by a CacheNamespace from app.core.cache_engine: O(1) get/set/evict,
+    lazy + timer-wheel TTL expiry and incremental byte accounting. Values are
+    stored as-is; compression only pays off for the out-of-process tiers, so
+    compression_threshold is kept for signature compatibility only.
+
+    LRU, TTL and FIFO map directly onto the namespace (FIFO/TTL simply do not
+    refresh recency on reads). LFU and RANDOM fall back to LRU.
+    """
 
     def __init__(
         self,
@@ -152,238 +162,63 @@ class MemoryCache(CacheBackend):
         max_memory_mb: int = 100,
         eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
         compression_threshold: int = 1024,
+        name: Optional[str] = None,
     ):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.eviction_policy = eviction_policy
         self.compression_threshold = compression_threshold
 
-        self._cache: Dict[str, CacheEntry] = {}
-        self._access_order = OrderedDict()  # For LRU
-        self._frequency_counter = defaultdict(int)  # For LFU
-        self._stats = CacheStats()
-        self._lock = RLock()
-
-        # Background cleanup thread
-        self._cleanup_thread = Thread(target=self._cleanup_loop, daemon=True)
-        self._cleanup_thread.start()
+        options = dict(
+            max_entries=max_size,
+            max_bytes=self.max_memory_bytes,
+            touch_on_get=eviction_policy
+            not in (EvictionPolicy.FIFO, EvictionPolicy.TTL),
+        )
+        if name:
+            self._namespace = get_cache_engine().namespace(name, **options)
+        else:
+            self._namespace = CacheNamespace("advanced_memory", **options)
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        with self._lock:
-            if key not in self._cache:
-                self._stats.misses += 1
-                return None
-
-            entry = self._cache[key]
-
-            # Check expiration
-            if entry.is_expired:
-                del self._cache[key]
-                self._access_order.pop(key, None)
-                self._stats.misses += 1
-                self._stats.evictions += 1
-                return None
-
-            # Update access statistics
-            entry.update_access()
-            self._update_access_tracking(key)
-            self._stats.hits += 1
-
-            # Decompress if needed
-            value = entry.value
-            if entry.compressed:
-                value = self._decompress(value)
-
-            return value
+        return self._namespace.get(key)
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache"""
-        with self._lock:
-            try:
-                # Serialize and potentially compress
-                serialized_value, compressed = self._serialize_and_compress(value)
-                size_bytes = len(pickle.dumps(serialized_value))
-
-                # Check memory limits
-                if size_bytes > self.max_memory_bytes:
-                    logger.warning(f"Value too large for cache: {size_bytes} bytes")
-                    return False
-
-                # Evict if necessary
-                while (
-                    len(self._cache) >= self.max_size
-                    or self._get_total_size() + size_bytes > self.max_memory_bytes
-                ):
-                    if not self._evict_one():
-                        break
-
-                # Create cache entry
-                entry = CacheEntry(
-                    key=key,
-                    value=serialized_value,
-                    created_at=datetime.now(),
-                    last_accessed=datetime.now(),
-                    ttl_seconds=ttl,
-                    size_bytes=size_bytes,
-                    compressed=compressed,
-                )
-
-                # Store entry
-                self._cache[key] = entry
-                self._update_access_tracking(key)
-                self._stats.sets += 1
-                self._stats.size_bytes += size_bytes
-                self._stats.entry_count = len(self._cache)
-
-                return True
-
-            except Exception as e:
-                logger.error(f"Failed to set cache entry {key}: {e}")
-                return False
+        try:
+            # ttl=None means no expiry for this backend
+            return self._namespace.set(key, value, ttl or 0)
+        except Exception as e:
+            logger.error(f"Failed to set cache entry {key}: {e}")
+            return False
 
     async def delete(self, key: str) -> bool:
         """Delete entry from cache"""
-        with self._lock:
-            if key in self._cache:
-                entry = self._cache[key]
-                del self._cache[key]
-                self._access_order.pop(key, None)
-                self._stats.deletes += 1
-                self._stats.size_bytes -= entry.size_bytes
-                self._stats.entry_count = len(self._cache)
-                return True
-            return False
+        return self._namespace.delete(key)
 
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
-        with self._lock:
-            return key in self._cache and not self._cache[key].is_expired
+        return self._namespace.contains(key)
 
     async def clear(self) -> bool:
         """Clear all cache entries"""
-        with self._lock:
-            self._cache.clear()
-            self._access_order.clear()
-            self._frequency_counter.clear()
-            self._stats = CacheStats()
-            return True
+        self._namespace.clear()
+        self._namespace.reset_stats()
+        return True
 
     def get_stats(self) -> CacheStats:
         """Get cache statistics"""
-        with self._lock:
-            self._stats.entry_count = len(self._cache)
-            return self._stats
-
-    def _serialize_and_compress(self, value: Any) -> tuple[Any, bool]:
-        """Serialize and optionally compress value"""
-        # Simple JSON serialization for basic types
-        if isinstance(value, (str, int, float, bool, list, dict)):
-            serialized = json.dumps(value).encode("utf-8")
-        else:
-            serialized = pickle.dumps(value)
-
-        # Compress if above threshold
-        if len(serialized) > self.compression_threshold:
-            compressed_data = gzip.compress(serialized)
-            if len(compressed_data) < len(serialized):
-                return compressed_data, True
-
-        return serialized, False
-
-    def _decompress(self, value: Any) -> Any:
-        """Decompress and deserialize value"""
-        try:
-            decompressed = gzip.decompress(value)
-            # Try JSON first, then pickle
-            try:
-                return json.loads(decompressed.decode("utf-8"))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                return pickle.loads(decompressed)  # nosec B301 - app-written cache data
-        except Exception as e:
-            logger.error(f"Failed to decompress cache value: {e}")
-            return None
-
-    def _update_access_tracking(self, key: str):
-        """Update access tracking for eviction policies"""
-        if self.eviction_policy == EvictionPolicy.LRU:
-            self._access_order[key] = datetime.now()
-            self._access_order.move_to_end(key)
-        elif self.eviction_policy == EvictionPolicy.LFU:
-            self._frequency_counter[key] += 1
-
-    def _evict_one(self) -> bool:
-        """Evict one entry based on policy"""
-        if not self._cache:
-            return False
-
-        key_to_evict = None
-
-        if self.eviction_policy == EvictionPolicy.LRU:
-            key_to_evict = next(iter(self._access_order))  # First (oldest) key
-
-        elif self.eviction_policy == EvictionPolicy.LFU:
-            min_freq = min(self._frequency_counter.values())
-            for key, freq in self._frequency_counter.items():
-                if freq == min_freq and key in self._cache:
-                    key_to_evict = key
-                    break
-
-        elif self.eviction_policy == EvictionPolicy.TTL:
-            # Find expired entries first, then oldest
-            datetime.now()
-            for key, entry in self._cache.items():
-                if entry.is_expired:
-                    key_to_evict = key
-                    break
-            if not key_to_evict:
-                key_to_evict = min(
-                    self._cache.keys(), key=lambda k: self._cache[k].created_at
-                )
-
-        elif self.eviction_policy == EvictionPolicy.FIFO:
-            key_to_evict = min(
-                self._cache.keys(), key=lambda k: self._cache[k].created_at
-            )
-
-        elif self.eviction_policy == EvictionPolicy.RANDOM:
-            import random
-
-            key_to_evict = random.choice(list(self._cache.keys()))
-
-        if key_to_evict:
-            entry = self._cache[key_to_evict]
-            del self._cache[key_to_evict]
-            self._access_order.pop(key_to_evict, None)
-            self._frequency_counter.pop(key_to_evict, None)
-            self._stats.evictions += 1
-            self._stats.size_bytes -= entry.size_bytes
-            return True
-
-        return False
-
-    def _get_total_size(self) -> int:
-        """Get total cache size in bytes"""
-        return sum(entry.size_bytes for entry in self._cache.values())
-
-    def _cleanup_loop(self):
-        """Background cleanup of expired entries"""
-        while True:
-            try:
-                time.sleep(60)  # Check every minute
-                with self._lock:
-                    expired_keys = [
-                        key for key, entry in self._cache.items() if entry.is_expired
-                    ]
-                    for key in expired_keys:
-                        entry = self._cache[key]
-                        del self._cache[key]
-                        self._access_order.pop(key, None)
-                        self._frequency_counter.pop(key, None)
-                        self._stats.evictions += 1
-                        self._stats.size_bytes -= entry.size_bytes
-            except Exception as e:
-                logger.error(f"Error in cache cleanup: {e}")
+        stats = self._namespace.stats()
+        return CacheStats(
+            hits=stats["hits"],
+            misses=stats["misses"],
+            sets=stats["sets"],
+            deletes=stats["deletes"],
+            evictions=stats["evictions"] + stats["expirations"],
+            size_bytes=stats["bytes"],
+            entry_count=stats["entries"],
+        )
 
 
 class RedisCache(CacheBackend):
@@ -6,7 +6,7 @@ Provides real ML-based financial insights, pattern detection, and recommendation
 import logging
 import statistics
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
@@ -23,14 +23,35 @@ from app.services.core.income_scaling_algorithms import scale_threshold_by_incom
 logger = logging.getLogger(__name__)
 
 
+def spending_record(txn) -> Dict:
+    """Analyzer input row for a transaction (or a row with its columns)"""
+    spent_at = txn.spent_at
+    if spent_at.tzinfo is None:
+        spent_at = spent_at.replace(tzinfo=timezone.utc)
+    return {
+        "amount": float(txn.amount),
+        "category": txn.category or "other",
+        "date": spent_at,
+        "description": txn.description or "",
+    }
+
+
 class AIFinancialAnalyzer:
     """Advanced financial AI analyzer with real ML algorithms"""
 
-    def __init__(self, db: Session, user_id: int):
+    def __init__(
+        self,
+        db: Session,
+        user_id: int,
+        user: Optional[User] = None,
+        spending_data: Optional[List[Dict]] = None,
+    ):
+        """`user` and `spending_data` skip the per-user loads when a batch
+        has already fetched them"""
         self.db = db
         self.user_id = user_id
-        self.user = self._get_user()
-        self._spending_data = None
+        self.user = user if user is not None else self._get_user()
+        self._spending_data = spending_data
         self._transaction_data = None
         self._user_context = None
         self._dynamic_thresholds = None
@@ -106,15 +127,7 @@ class AIFinancialAnalyzer:
                 .all()
             )
 
-            self._spending_data = [
-                {
-                    "amount": float(txn.amount),
-                    "category": txn.category or "other",
-                    "date": txn.spent_at,
-                    "description": txn.description or "",
-                }
-                for txn in transactions
-            ]
+            self._spending_data = [spending_record(txn) for txn in transactions]
 
         return self._spending_data
 
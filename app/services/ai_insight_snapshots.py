@@ -0,0 +1,320 @@
+"""
+AI Insight Snapshots for MITA Finance
+Precomputed analyzer output for the /api/ai insight endpoints
+
+Each insight GET (spending-patterns, personalized-feedback, weekly-insights,
+financial-health-score, spending-anomalies, savings-optimization) used to
+build an AIFinancialAnalyzer and re-read up to six months of the user's
+transactions on every request. The analyzer now runs ahead of time:
+
+- the nightly job (cron_task_ai_insights) splits users with recent
+  transactions into chunks and enqueues one job per chunk, so the RQ
+  workers compute chunks in parallel;
+- a chunk loads its users, their sync versions and their six-month ledger
+  with three queries, and every section is computed from that one load;
+- the sections are stored as an AIAnalysisSnapshot of kind "insights",
+  whose full_profile follows INSIGHTS_SCHEMA_VERSION; the user's older
+  insight snapshots are deleted in the same transaction.
+
+Endpoints serve the latest snapshot and describe it in meta.snapshot. It
+is stale once older than MAX_SNAPSHOT_AGE, or once SIGNIFICANT_CHANGES of
+the user's transactions have been written or hard-deleted since it was
+taken: rows whose change_seq is above the sync version stored with the
+snapshot (see app/services/sync_feed.py), counted with two index ranges
+cut off at the threshold. Notification and daily plan writes take numbers
+from the same sequence but do not touch the analyzer's input, so they do
+not count. A stale snapshot is still served, and the endpoint then queues a refresh of that
+user off the event loop (request_insight_refresh). A user with no
+snapshot of the current schema gets one computed inline.
+
+Ledger changes are only checked on read: nothing is queued when the
+changes happen. A user who crosses SIGNIFICANT_CHANGES keeps their
+snapshot until they next open an insight, or until the nightly run.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    AIAnalysisSnapshot,
+    SyncTombstone,
+    Transaction,
+    User,
+    UserSyncState,
+)
+from app.db.models.ai_analysis_snapshot import INSIGHTS_KIND
+from app.services.ai_financial_analyzer import AIFinancialAnalyzer, spending_record
+
+logger = logging.getLogger(__name__)
+
+# Bump when a section's shape changes: older snapshots are then recomputed
+# on first read instead of served
+INSIGHTS_SCHEMA_VERSION = 1
+
+# Snapshot section -> AIFinancialAnalyzer method
+INSIGHT_SECTIONS = {
+    "spending_patterns": "analyze_spending_patterns",
+    "personalized_feedback": "generate_personalized_feedback",
+    "weekly_insights": "generate_weekly_insights",
+    "financial_health_score": "calculate_financial_health_score",
+    "spending_anomalies": "detect_spending_anomalies",
+    "savings_optimization": "generate_savings_optimization",
+}
+
+SPENDING_WINDOW_DAYS = 180  # the analyzer's six-month window
+MAX_SNAPSHOT_AGE = timedelta(hours=26)  # a nightly run plus slack
+SIGNIFICANT_CHANGES = 20
+CHUNK_SIZE = 200
+REFRESH_DEBOUNCE_SECONDS = 900
+REFRESH_KEY_PREFIX = "mita:ai_insights:refresh:"
+
+
+class InsightUnavailable(Exception):
+    """No snapshot section to serve; the endpoint uses its fallback"""
+
+
+# ============================================================================
+# Computing snapshots
+# ============================================================================
+
+
+def compute_sections(analyzer: AIFinancialAnalyzer) -> Dict[str, Any]:
+    """Every insight section; a section that raises is left out"""
+    sections = {}
+    for name, method in INSIGHT_SECTIONS.items():
+        try:
+            sections[name] = getattr(analyzer, method)()
+        except Exception as e:
+            logger.warning(
+                f"Insight section {name} failed for user {analyzer.user_id}: {e}"
+            )
+    return jsonable_encoder(sections)
+
+
+def refresh_insight_snapshots(
+    db: Session, user_ids: Iterable[Any], now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Recompute and store the insight snapshots of a chunk of users"""
+    now = now or datetime.now(timezone.utc)
+    ids = [
+        user_id if isinstance(user_id, UUID) else UUID(str(user_id))
+        for user_id in user_ids
+    ]
+    if not ids:
+        return {"refreshed": 0, "skipped": 0}
+
+    # Versions first: a change landing during the computation then counts
+    # against this snapshot rather than being hidden by it
+    versions = dict(
+        db.execute(
+            select(UserSyncState.user_id, UserSyncState.last_seq).where(
+                UserSyncState.user_id.in_(ids)
+            )
+        ).all()
+    )
+    users = {
+        user.id: user
+        for user in db.execute(select(User).where(User.id.in_(ids))).scalars()
+    }
+    spending = defaultdict(list)
+    rows = db.execute(
+        select(
+            Transaction.user_id,
+            Transaction.amount,
+            Transaction.category,
+            Transaction.spent_at,
+            Transaction.description,
+        ).where(
+            Transaction.user_id.in_(ids),
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= now - timedelta(days=SPENDING_WINDOW_DAYS),
+        )
+    )
+    for row in rows:
+        spending[row.user_id].append(spending_record(row))
+
+    snapshots = []
+    for user_id in ids:
+        user = users.get(user_id)
+        if user is None:
+            continue
+        analyzer = AIFinancialAnalyzer(
+            db, user_id, user=user, spending_data=spending[user_id]
+        )
+        sections = compute_sections(analyzer)
+        snapshots.append(
+            AIAnalysisSnapshot(
+                user_id=user_id,
+                kind=INSIGHTS_KIND,
+                rating=sections.get("financial_health_score", {}).get("grade"),
+                full_profile={
+                    "schema_version": INSIGHTS_SCHEMA_VERSION,
+                    "generated_at": now.isoformat(),
+                    "sync_version": versions.get(user_id) or 0,
+                    "transactions_analyzed": len(spending[user_id]),
+                    "sections": sections,
+                },
+                created_at=now,
+            )
+        )
+
+    db.execute(
+        delete(AIAnalysisSnapshot).where(
+            AIAnalysisSnapshot.kind == INSIGHTS_KIND,
+            AIAnalysisSnapshot.user_id.in_([s.user_id for s in snapshots]),
+        )
+    )
+    db.add_all(snapshots)
+    db.commit()
+    return {"refreshed": len(snapshots), "skipped": len(ids) - len(snapshots)}
+
+
+def users_to_refresh(db: Session, now: Optional[datetime] = None) -> List[UUID]:
+    """Onboarded users with a transaction inside the analysis window
+
+    Everyone else would get the analyzer's no-data answers, which are
+    cheap enough to compute when first asked for.
+    """
+    now = now or datetime.now(timezone.utc)
+    active = (
+        select(Transaction.user_id)
+        .where(
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= now - timedelta(days=SPENDING_WINDOW_DAYS),
+        )
+        .distinct()
+    )
+    return list(
+        db.execute(
+            select(User.id)
+            .where(User.has_onboarded.is_(True), User.id.in_(active))
+            .order_by(User.id)
+        ).scalars()
+    )
+
+
+def chunked(items: List[Any], size: int = CHUNK_SIZE) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+# ============================================================================
+# Serving snapshots
+# ============================================================================
+
+
+@dataclass
+class InsightSnapshot:
+    """The parts of a stored insight snapshot the endpoints serve"""
+
+    generated_at: datetime
+    sync_version: int
+    sections: Dict[str, Any] = field(default_factory=dict)
+
+    def describe(self, changes: int, now: datetime) -> Dict[str, Any]:
+        """meta.snapshot of a response served from this snapshot"""
+        age = now - self.generated_at
+        return {
+            "generated_at": self.generated_at.isoformat(),
+            "age_seconds": max(int(age.total_seconds()), 0),
+            "changes_since": changes,
+            "stale": age > MAX_SNAPSHOT_AGE or changes >= SIGNIFICANT_CHANGES,
+            "schema_version": INSIGHTS_SCHEMA_VERSION,
+        }
+
+
+def load_insight_snapshot(db: Session, user_id) -> Optional[InsightSnapshot]:
+    """The user's latest insight snapshot of the current schema, if any"""
+    profile = db.execute(
+        select(AIAnalysisSnapshot.full_profile)
+        .where(
+            AIAnalysisSnapshot.user_id == user_id,
+            AIAnalysisSnapshot.kind == INSIGHTS_KIND,
+        )
+        .order_by(AIAnalysisSnapshot.created_at.desc())
+        .limit(1)
+    ).scalar()
+    if not isinstance(profile, dict):
+        return None
+    if profile.get("schema_version") != INSIGHTS_SCHEMA_VERSION:
+        return None
+    return InsightSnapshot(
+        generated_at=datetime.fromisoformat(profile["generated_at"]),
+        sync_version=profile.get("sync_version") or 0,
+        sections=profile.get("sections") or {},
+    )
+
+
+def transaction_changes_since(db: Session, user_id, since: int) -> int:
+    """Transactions of the user written or hard-deleted after change `since`
+
+    Saturates at SIGNIFICANT_CHANGES, where the snapshot goes stale anyway.
+    """
+    written = (
+        select(Transaction.id)
+        .where(Transaction.user_id == user_id, Transaction.change_seq > since)
+        .limit(SIGNIFICANT_CHANGES)
+    )
+    removed = (
+        select(SyncTombstone.entity_id)
+        .where(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.change_seq > since,
+            SyncTombstone.entity == Transaction.__tablename__,
+        )
+        .limit(SIGNIFICANT_CHANGES)
+    )
+    counts = db.execute(
+        select(
+            select(func.count()).select_from(written.subquery()).scalar_subquery(),
+            select(func.count()).select_from(removed.subquery()).scalar_subquery(),
+        )
+    ).one()
+    return min(sum(counts), SIGNIFICANT_CHANGES)
+
+
+def request_insight_refresh(user_id) -> bool:
+    """Queue a refresh of one user's snapshot, once per debounce window"""
+    from app.core.task_queue import enqueue_task, get_task_queue
+    from app.tasks.async_tasks import refresh_ai_insights_task
+
+    try:
+        conn = getattr(get_task_queue(), "redis_conn", None)
+        key = f"{REFRESH_KEY_PREFIX}{user_id}"
+        if conn is not None and not conn.set(
+            key, 1, nx=True, ex=REFRESH_DEBOUNCE_SECONDS
+        ):
+            return False
+        enqueue_task(refresh_ai_insights_task, user_ids=[str(user_id)])
+        return True
+    except Exception as e:
+        logger.warning(f"Could not queue insight refresh for user {user_id}: {e}")
+        return False
+
+
+def get_insight(
+    db: Session, user_id, section: str, now: Optional[datetime] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """(section data, meta) for an insight endpoint
+
+    Raises InsightUnavailable when the section could not be computed. A
+    stale snapshot is served as is; the caller queues the refresh when
+    meta["snapshot"]["stale"] is set, outside its database session.
+    """
+    now = now or datetime.now(timezone.utc)
+    snapshot = load_insight_snapshot(db, user_id)
+    if snapshot is None:
+        refresh_insight_snapshots(db, [user_id], now)
+        snapshot = load_insight_snapshot(db, user_id)
+    if snapshot is None or section not in snapshot.sections:
+        raise InsightUnavailable(section)
+
+    changes = transaction_changes_since(db, user_id, snapshot.sync_version)
+    return snapshot.sections[section], {"snapshot": snapshot.describe(changes, now)}
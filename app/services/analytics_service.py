@@ -1,69 +1,32 @@
 from datetime import datetime, timezone
 from typing import List
 
-from sqlalchemy import extract, func, select
-from sqlalchemy.orm import Session
-
-from app.db.models.transaction import Transaction
 from app.services.core.analytics.monthly_aggregator import aggregate_monthly_data
 from app.services.core.api.analytics_engine import detect_anomalies
+from app.services.transaction_rollups import (
+    category_totals_query,
+    current_month_range,
+    daily_totals_query,
+)
 
 
 async def get_monthly_category_totals(user_id: str, db):
     """Category totals for the current month (AsyncSession).
 
-    The routes inject an AsyncSession; the previous sync body called
-    db.execute(...).all() on a coroutine and raised on every request.
+    Reads the transaction rollup cube with a range on its UTC day key, so
+    neither extract() on spent_at nor a scan of the month's transactions is
+    involved.
     """
-    current_year = datetime.now(timezone.utc).year
-    current_month = datetime.now(timezone.utc).month
-
-    # spent_at is timestamptz: date()/extract() on it use the DB session's
-    # TimeZone, so day/month buckets shifted on any non-UTC server (and made
-    # this endpoint's "today" disagree with the UTC-based callers around
-    # midnight). Normalize to UTC explicitly.
-    spent_at_utc = func.timezone("UTC", Transaction.spent_at)
-
-    stmt = (
-        select(Transaction.category, func.sum(Transaction.amount).label("total"))
-        .where(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            extract("year", spent_at_utc) == current_year,
-            extract("month", spent_at_utc) == current_month,
-        )
-        .group_by(Transaction.category)
-    )
-
-    result = (await db.execute(stmt)).all()
+    start, end = current_month_range()
+    result = (await db.execute(category_totals_query(user_id, start, end))).all()
 
     return [{"category": row[0], "total": float(row[1])} for row in result]
 
 
 async def get_monthly_trend(user_id: str, db):
     """Return daily totals for the current month (AsyncSession)."""
-
-    current_year = datetime.now(timezone.utc).year
-    current_month = datetime.now(timezone.utc).month
-
-    spent_at_utc = func.timezone("UTC", Transaction.spent_at)
-
-    stmt = (
-        select(
-            func.date(spent_at_utc).label("day"),
-            func.sum(Transaction.amount).label("total"),
-        )
-        .where(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            extract("year", spent_at_utc) == current_year,
-            extract("month", spent_at_utc) == current_month,
-        )
-        .group_by("day")
-        .order_by("day")
-    )
-
-    result = (await db.execute(stmt)).all()
+    start, end = current_month_range()
+    result = (await db.execute(daily_totals_query(user_id, start, end))).all()
 
     return [{"date": row[0].isoformat(), "amount": float(row[1])} for row in result]
 
@@ -27,9 +27,11 @@ logger = logging.getLogger(__name__)
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-# SECURITY UPDATE: Validate bcrypt configuration on startup
+# SECURITY UPDATE: Validate bcrypt configuration on startup. The hashing
+# benchmark is left to the security monitoring endpoint: at import it added
+# about two seconds to every API and worker start.
 try:
-    validation_result = validate_bcrypt_configuration()
+    validation_result = validate_bcrypt_configuration(include_performance=False)
     if not validation_result["valid"]:
         logger.error(
             f"Bcrypt configuration validation failed: {validation_result['issues']}"
@@ -0,0 +1,368 @@
+"""
+Live Budget Updates for MITA Finance
+Push budget status changes to connected clients instead of polling
+
+Write paths never publish by hand: a SQLAlchemy session listener records
+which users had Transaction or DailyPlan rows flushed and, once the
+transaction commits, publishes "budget changed" on the per-user Redis
+channel mita:budget:live:<user_id>. That covers transaction create/update/
+delete, real-time rebalancing and the redistribution cron alike.
+
+Each API worker keeps a single pattern subscription and fans messages out to
+the in-process subscriber queues, so the number of Redis connections does
+not grow with the number of streaming clients. Without Redis the hub
+delivers in-process only (single worker deployments and tests).
+
+Commits made outside the event loop (sync sessions in the threadpool, RQ
+jobs, cron) only queue the user ids; a daemon publisher thread does the
+Redis round trip, so a slow Redis never holds up a commit. The outbox is
+bounded and best-effort: when it is full, or the process exits before the
+thread drains it, the notification is dropped and clients pick the change
+up on their next status load.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.prometheus_metrics import live_budget_connections, live_budget_events
+from app.core.redis_client import get_async_redis, get_sync_redis
+from app.core.shared_store import process_singleton, resolve_redis_url
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "mita:budget:live:"
+
+# Wait this long after a change before recomputing, so a burst of writes
+# (transaction + plan update + rebalance) becomes one delta
+DEBOUNCE_SECONDS = 0.25
+# SSE comment sent on idle connections to keep proxies from closing them
+HEARTBEAT_SECONDS = 20.0
+# Longest single wait for a pattern message before checking again
+LISTEN_POLL_SECONDS = 5.0
+# Pending sync publishes; beyond this, notifications are dropped
+PUBLISH_QUEUE_SIZE = 1000
+
+_SESSION_KEY = "mita_budget_changed_users"
+
+
+def channel_for(user_id) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+class LiveBudgetHub:
+    """Per-process fan-out from budget-change notifications to subscribers"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = resolve_redis_url(redis_url)
+        self._subscribers: Dict[str, set] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False
+        self._pending: set = set()
+        self._outbox: Optional[queue.Queue] = None
+        self._publisher: Optional[threading.Thread] = None
+        self._publisher_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def subscribe(self, user_id) -> AsyncIterator[asyncio.Queue]:
+        """Queue that receives a token whenever the user's budget changes
+
+        maxsize=1: while a notification is pending, further ones coalesce.
+        """
+        key = str(user_id)
+        wakeup: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._loop = asyncio.get_running_loop()
+        self._subscribers.setdefault(key, set()).add(wakeup)
+        live_budget_connections.inc()
+        self._ensure_listener()
+        try:
+            yield wakeup
+        finally:
+            live_budget_connections.dec()
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(wakeup)
+                if not queues:
+                    del self._subscribers[key]
+            if not self._subscribers and self._listener is not None:
+                self._listener.cancel()
+                self._listener = None
+                self._listening = False
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def deliver(self, user_id) -> int:
+        """Wake every local subscriber of the user; returns how many were woken"""
+        queues = self._subscribers.get(str(user_id))
+        if not queues:
+            return 0
+        woken = 0
+        for wakeup in queues:
+            try:
+                wakeup.put_nowait(True)
+                woken += 1
+            except asyncio.QueueFull:
+                pass  # A notification is already pending
+        return woken
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def publish(self, user_ids: Iterable) -> None:
+        """Announce budget changes for the users to every worker"""
+        user_ids = [str(user_id) for user_id in user_ids]
+        published = False
+        if self.redis_url:
+            try:
+                client = self._get_client()
+                for user_id in user_ids:
+                    await client.publish(channel_for(user_id), "changed")
+                published = True
+            except Exception as e:
+                logger.debug(f"Live budget publish via Redis failed: {e}")
+
+        # Our own listener relays what went through Redis
+        if not (published and self._listening):
+            for user_id in user_ids:
+                self.deliver(user_id)
+
+    def publish_from_sync(self, user_ids: Iterable) -> None:
+        """Publish from code that may or may not be running inside the event loop"""
+        user_ids = list(user_ids)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            task = loop.create_task(self.publish(user_ids))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+            return
+
+        # Worker threads, cron jobs and other processes: hand off to the
+        # publisher thread rather than blocking the caller (a commit hook)
+        outbox = self._ensure_publisher()
+        try:
+            outbox.put_nowait(user_ids)
+        except queue.Full:
+            logger.warning(
+                f"Live budget outbox full, dropped notification for {len(user_ids)} users"
+            )
+
+    def _ensure_publisher(self) -> queue.Queue:
+        """Start the publisher thread if this process has none running
+
+        Checked on every call: a forked worker inherits the parent's hub but
+        not its thread, and gets a fresh outbox and thread of its own.
+        """
+        publisher = self._publisher
+        if publisher is not None and publisher.is_alive():
+            return self._outbox
+        with self._publisher_lock:
+            if self._publisher is None or not self._publisher.is_alive():
+                self._outbox = queue.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+                self._publisher = threading.Thread(
+                    target=self._drain_outbox,
+                    args=(self._outbox,),
+                    name="live-budget-publisher",
+                    daemon=True,
+                )
+                self._publisher.start()
+            return self._outbox
+
+    def _drain_outbox(self, outbox: queue.Queue) -> None:
+        while True:
+            user_ids = outbox.get()
+            try:
+                self._publish_blocking(user_ids)
+            except Exception as e:
+                logger.debug(f"Live budget publish failed: {e}")
+
+    def _publish_blocking(self, user_ids: List) -> None:
+        published = False
+        if self.redis_url:
+            try:
+                client = self._get_sync_client()
+                for user_id in user_ids:
+                    client.publish(channel_for(user_id), "changed")
+                published = True
+            except Exception as e:
+                logger.debug(f"Live budget publish via Redis failed: {e}")
+
+        if self._loop is not None and not (published and self._listening):
+            for user_id in user_ids:
+                self._loop.call_soon_threadsafe(self.deliver, user_id)
+
+    # ------------------------------------------------------------------
+    # Redis plumbing
+    # ------------------------------------------------------------------
+
+    def _get_client(self):
+        return get_async_redis(self.redis_url)
+
+    def _get_sync_client(self):
+        return get_sync_redis(self.redis_url)
+
+    def _ensure_listener(self) -> None:
+        if not self.redis_url or self._listener is not None:
+            return
+        self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Relay the pattern subscription to local queues, reconnecting on errors"""
+        backoff = 1.0
+        while self._subscribers:
+            pubsub = None
+            try:
+                pubsub = self._get_client().pubsub()
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self._listening = True
+                backoff = 1.0
+                while True:
+                    # An explicit timeout, not the client's short socket
+                    # timeout, bounds each wait on an idle subscription
+                    message = await pubsub.get_message(timeout=LISTEN_POLL_SECONDS)
+                    if message is None or message.get("type") != "pmessage":
+                        continue
+                    channel = message.get("channel") or ""
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self.deliver(channel[len(CHANNEL_PREFIX) :])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live budget subscription lost: {e}")
+            finally:
+                self._listening = False
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+@process_singleton
+def get_live_budget_hub() -> LiveBudgetHub:
+    """The hub every stream in this worker subscribes through"""
+    return LiveBudgetHub()
+
+
+# ============================================================================
+# Change tracking on the write paths
+# ============================================================================
+
+
+def _collect_changed_users(session: Session, flush_context) -> None:
+    from app.db.models import DailyPlan, Transaction
+
+    changed = None
+    for collection in (session.new, session.dirty, session.deleted):
+        for obj in collection:
+            if isinstance(obj, (Transaction, DailyPlan)):
+                user_id = getattr(obj, "user_id", None)
+                if user_id is not None:
+                    if changed is None:
+                        changed = session.info.setdefault(_SESSION_KEY, set())
+                    changed.add(user_id)
+
+
+def _publish_changed_users(session: Session) -> None:
+    changed = session.info.pop(_SESSION_KEY, None)
+    if changed:
+        try:
+            get_live_budget_hub().publish_from_sync(changed)
+        except Exception as e:
+            logger.debug(f"Live budget notification skipped: {e}")
+
+
+def _discard_changed_users(session: Session, *args) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def install_budget_change_tracking() -> None:
+    """Publish budget changes after every commit that touched plans/transactions
+
+    Listens on the Session class, so it covers sync sessions and the sync
+    sessions behind AsyncSession. Safe to call more than once.
+    """
+    if event.contains(Session, "after_flush", _collect_changed_users):
+        return
+    event.listen(Session, "after_flush", _collect_changed_users)
+    event.listen(Session, "after_commit", _publish_changed_users)
+    event.listen(Session, "after_soft_rollback", _discard_changed_users)
+
+
+# ============================================================================
+# Event stream
+# ============================================================================
+
+
+def format_sse(event_name: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def live_status_events(
+    user_id,
+    load_status: Callable[[], Awaitable[Dict[str, Any]]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    hub: Optional[LiveBudgetHub] = None,
+    heartbeat: float = HEARTBEAT_SECONDS,
+    debounce: float = DEBOUNCE_SECONDS,
+) -> AsyncIterator[str]:
+    """SSE frames: the full status once, then only the fields that changed"""
+    hub = hub or get_live_budget_hub()
+    async with hub.subscribe(user_id) as wakeup:
+        snapshot = await load_status()
+        live_budget_events.labels(event="status").inc()
+        yield format_sse("status", snapshot)
+
+        while not await is_disconnected():
+            try:
+                await asyncio.wait_for(wakeup.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                live_budget_events.labels(event="heartbeat").inc()
+                yield ": keepalive\n\n"
+                continue
+
+            if debounce:
+                await asyncio.sleep(debounce)
+            while not wakeup.empty():
+                wakeup.get_nowait()
+
+            current = await load_status()
+            delta = {
+                key: value
+                for key, value in current.items()
+                if snapshot.get(key) != value
+            }
+            if delta:
+                snapshot = current
+                live_budget_events.labels(event="delta").inc()
+                yield format_sse("delta", delta)
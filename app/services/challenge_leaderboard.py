@@ -0,0 +1,499 @@
+"""
+Challenge Leaderboard for MITA Finance
+Completed-challenge rankings kept in sorted sets
+
+Each board is a sorted set of user_id -> completed challenges: one all-time
+board and one per challenge month ("2026-10"). A top-N read is a reverse
+range and a user's rank/percentile is a score lookup plus two range counts,
+all O(log n), instead of a GROUP BY over every completed participation.
+
+Boards follow the database through a SQLAlchemy session listener: commits
+that complete a participation (or revert/delete a completed one) adjust the
+user's score on the all-time and month boards. A board set that has never
+been built, e.g. after a Redis flush, is rebuilt from challenge_participations
+on first read: one worker at a time, into temporary keys that are renamed
+over the live boards in one transaction. A completion committed while that
+rebuild's query runs can still be lost until the next rebuild.
+
+When Redis stops answering, a worker ranks from the database for each
+request and tries Redis again after a growing backoff. A worker that hit a
+Redis error clears the built marker on its next successful call, so the
+boards are rebuilt to recover increments lost during the outage; increments
+committed while it backs off are dropped the same way. Commit hooks only
+queue their deltas: one applier thread per process writes them to Redis.
+With no Redis URL configured, each process ranks from boards held in its
+own memory.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import get_sync_redis
+from app.core.shared_store import process_singleton, redis_or_memory
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME = "all_time"
+KEY_PREFIX = "mita:leaderboard:challenges:"
+# Keys under KEY_PREFIX + "_" are bookkeeping; board names never start with "_"
+# Set of the boards the last rebuild wrote, plus the _BUILT marker
+REGISTRY_KEY = f"{KEY_PREFIX}_boards"
+_BUILT = "_built"
+REBUILD_LOCK_KEY = f"{KEY_PREFIX}_rebuild_lock"
+REBUILD_LOCK_SECONDS = 60
+_TEMP_PREFIX = f"{KEY_PREFIX}_rebuild:"
+
+# Backoff before a worker tries Redis again after an error
+RETRY_BACKOFF_SECONDS = 5.0
+MAX_RETRY_BACKOFF_SECONDS = 300.0
+APPLY_QUEUE_SIZE = 1000
+
+_SESSION_KEY = "mita_leaderboard_changes"
+_MAX_MEMBER = "\U0010ffff"
+
+
+@dataclass
+class Standing:
+    score: float
+    higher: int  # participants with a strictly higher score
+    lower: int  # participants with a strictly lower score
+    total: int
+
+
+# ============================================================================
+# Stores
+# ============================================================================
+
+
+class InMemoryLeaderboardStore:
+    """Each board a score map plus a sorted (score, member) list"""
+
+    def __init__(self):
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._ranked: Dict[str, List[Tuple[float, str]]] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def is_built(self) -> bool:
+        return self._built
+
+    def begin_rebuild(self) -> bool:
+        return True
+
+    def invalidate(self) -> None:
+        self._built = False
+
+    def increment(self, board: str, member: str, delta: float) -> None:
+        with self._lock:
+            scores = self._scores.setdefault(board, {})
+            ranked = self._ranked.setdefault(board, [])
+            old = scores.get(member)
+            if old is not None:
+                ranked.pop(bisect_left(ranked, (old, member)))
+            new = (old or 0) + delta
+            if new > 0:
+                scores[member] = new
+                insort(ranked, (new, member))
+            else:
+                scores.pop(member, None)
+
+    def top(self, board: str, limit: int) -> List[Tuple[str, float]]:
+        with self._lock:
+            ranked = self._ranked.get(board, [])
+            return [(member, score) for score, member in reversed(ranked[-limit:])]
+
+    def standing(self, board: str, member: str) -> Optional[Standing]:
+        with self._lock:
+            score = self._scores.get(board, {}).get(member)
+            if score is None:
+                return None
+            ranked = self._ranked[board]
+            return Standing(
+                score=score,
+                higher=len(ranked) - bisect_right(ranked, (score, _MAX_MEMBER)),
+                lower=bisect_left(ranked, (score, "")),
+                total=len(ranked),
+            )
+
+    def size(self, board: str) -> int:
+        return len(self._scores.get(board, {}))
+
+    def replace(self, boards: Dict[str, Dict[str, float]]) -> None:
+        with self._lock:
+            self._scores = {board: dict(scores) for board, scores in boards.items()}
+            self._ranked = {
+                board: sorted((score, member) for member, score in scores.items())
+                for board, scores in boards.items()
+            }
+            self._built = True
+
+
+class RedisLeaderboardStore:
+    """Each board a sorted set under mita:leaderboard:challenges:<board>"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def is_built(self) -> bool:
+        return bool(self.client.sismember(REGISTRY_KEY, _BUILT))
+
+    def begin_rebuild(self) -> bool:
+        """Claim the rebuild; False while another worker holds it"""
+        return bool(
+            self.client.set(REBUILD_LOCK_KEY, 1, nx=True, ex=REBUILD_LOCK_SECONDS)
+        )
+
+    def invalidate(self) -> None:
+        """Have the next read rebuild the boards"""
+        self.client.srem(REGISTRY_KEY, _BUILT)
+
+    def increment(self, board: str, member: str, delta: float) -> None:
+        key = KEY_PREFIX + board
+        score = self.client.zincrby(key, delta, member)
+        if score <= 0:
+            # Nobody with zero completions counts as a participant
+            self.client.zremrangebyscore(key, "-inf", 0)
+
+    def top(self, board: str, limit: int) -> List[Tuple[str, float]]:
+        rows = self.client.zrevrange(KEY_PREFIX + board, 0, limit - 1, withscores=True)
+        return [(_text(member), score) for member, score in rows]
+
+    def standing(self, board: str, member: str) -> Optional[Standing]:
+        key = KEY_PREFIX + board
+        score = self.client.zscore(key, member)
+        if score is None:
+            return None
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zcount(key, f"({score}", "+inf")
+        pipe.zcount(key, "-inf", f"({score}")
+        pipe.zcard(key)
+        higher, lower, total = pipe.execute()
+        return Standing(score=score, higher=higher, lower=lower, total=total)
+
+    def size(self, board: str) -> int:
+        return self.client.zcard(KEY_PREFIX + board)
+
+    def replace(self, boards: Dict[str, Dict[str, float]]) -> None:
+        """Swap in rebuilt boards; readers never see a half-written one"""
+        temp = f"{_TEMP_PREFIX}{uuid4().hex}:"
+        pipe = self.client.pipeline(transaction=False)
+        for board, scores in boards.items():
+            if scores:
+                pipe.zadd(temp + board, scores)
+        pipe.execute()
+
+        keys = [KEY_PREFIX + board for board, scores in boards.items() if scores]
+        stale = [
+            key
+            for key in map(_text, self.client.scan_iter(match=f"{KEY_PREFIX}*"))
+            if not key.startswith(f"{KEY_PREFIX}_") and key not in keys
+        ]
+        pipe = self.client.pipeline(transaction=True)
+        for key in keys:
+            pipe.rename(temp + key[len(KEY_PREFIX) :], key)
+        if stale:
+            pipe.delete(*stale)
+        pipe.delete(REGISTRY_KEY)
+        pipe.sadd(REGISTRY_KEY, _BUILT, *keys)
+        pipe.delete(REBUILD_LOCK_KEY)
+        pipe.execute()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ============================================================================
+# Leaderboard
+# ============================================================================
+
+
+class ChallengeLeaderboard:
+    """Rank users by completed challenges, all time or per challenge month"""
+
+    def __init__(self, store=None, redis_url: Optional[str] = None):
+        self._store = store
+        self.redis_url = redis_url
+        self._outbox: Optional[queue.Queue] = None
+        self._applier: Optional[threading.Thread] = None
+        self._applier_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._backoff = RETRY_BACKOFF_SECONDS
+        self._resync = False
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = redis_or_memory(
+                self.redis_url,
+                lambda url: RedisLeaderboardStore(get_sync_redis(url)),
+                InMemoryLeaderboardStore,
+            )
+        return self._store
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def apply(self, changes: Dict[Tuple[str, str], int]) -> None:
+        """Add score deltas keyed by (user_id, month) to both of their boards
+
+        Dropped while Redis is backing off; the boards are rebuilt after.
+        """
+        if time.monotonic() < self._retry_at:
+            self._resync = True
+            return
+        try:
+            if self._resync:
+                self.store.invalidate()
+                self._resync = False
+            for (user_id, month), delta in changes.items():
+                if not delta:
+                    continue
+                for board in (ALL_TIME, month):
+                    self.store.increment(board, user_id, delta)
+        except RedisError as e:
+            self._back_off(e)
+            raise
+
+    def apply_from_sync(self, changes: Dict[Tuple[str, str], int]) -> None:
+        """Queue deltas from a commit hook for the applier thread
+
+        The commit never waits on Redis, inside the event loop or not, and
+        deltas are applied in commit order.
+        """
+        outbox = self._ensure_applier()
+        try:
+            outbox.put_nowait(changes)
+        except queue.Full:
+            self._resync = True
+            logger.warning("Leaderboard outbox full, boards will be rebuilt")
+
+    def _ensure_applier(self) -> queue.Queue:
+        """Start the applier thread if this process has none running
+
+        Checked on every call: a forked worker inherits the parent's
+        leaderboard but not its thread.
+        """
+        applier = self._applier
+        if applier is not None and applier.is_alive():
+            return self._outbox
+        with self._applier_lock:
+            if self._applier is None or not self._applier.is_alive():
+                self._outbox = queue.Queue(maxsize=APPLY_QUEUE_SIZE)
+                self._applier = threading.Thread(
+                    target=self._drain_outbox,
+                    args=(self._outbox,),
+                    name="leaderboard-applier",
+                    daemon=True,
+                )
+                self._applier.start()
+            return self._outbox
+
+    def _drain_outbox(self, outbox: queue.Queue) -> None:
+        while True:
+            changes = outbox.get()
+            try:
+                self.apply(changes)
+            except Exception as e:
+                logger.warning(f"Leaderboard update failed: {e}")
+            finally:
+                outbox.task_done()
+
+    def _back_off(self, error: Exception) -> None:
+        """Stop using Redis for a growing interval, then rebuild the boards"""
+        logger.warning(
+            f"Leaderboard Redis unavailable, retrying in {self._backoff:.0f}s: {error}"
+        )
+        self._retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, MAX_RETRY_BACKOFF_SECONDS)
+        self._resync = True
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def rebuild(self, db) -> int:
+        """Recompute every board from challenge_participations (AsyncSession)"""
+        boards = await self._load_boards(db)
+        await asyncio.to_thread(self.store.replace, boards)
+        logger.info(f"Rebuilt {len(boards)} challenge leaderboards")
+        return len(boards[ALL_TIME])
+
+    async def _load_boards(self, db) -> Dict[str, Dict[str, float]]:
+        from app.db.models import ChallengeParticipation
+
+        result = await db.execute(
+            select(
+                ChallengeParticipation.user_id,
+                ChallengeParticipation.month,
+                func.count(ChallengeParticipation.id),
+            )
+            .filter(ChallengeParticipation.status == "completed")
+            .group_by(ChallengeParticipation.user_id, ChallengeParticipation.month)
+        )
+        boards: Dict[str, Dict[str, float]] = {ALL_TIME: {}}
+        for user_id, month, count in result.all():
+            member = str(user_id)
+            boards.setdefault(month, {})[member] = count
+            boards[ALL_TIME][member] = boards[ALL_TIME].get(member, 0) + count
+        return boards
+
+    async def standings(
+        self, db, user_id, period: str = ALL_TIME, limit: int = 10
+    ) -> Dict:
+        """Top `limit` users plus the caller's rank and percentile"""
+        member = str(user_id)
+        if time.monotonic() >= self._retry_at:
+            try:
+                result = await self._read(db, member, period, limit)
+                self._backoff = RETRY_BACKOFF_SECONDS
+                if result is not None:
+                    return result
+            except RedisError as e:
+                if not isinstance(self.store, RedisLeaderboardStore):
+                    raise
+                self._back_off(e)
+
+        # Redis is backing off or another worker is rebuilding: rank from the
+        # database for this request only
+        local = InMemoryLeaderboardStore()
+        local.replace(await self._load_boards(db))
+        return self._standings(local, member, period, limit)
+
+    async def _read(self, db, member: str, period: str, limit: int) -> Optional[Dict]:
+        """Standings from the store, rebuilding it first if needed
+
+        None while another worker holds the rebuild.
+        """
+        store = self.store
+        if self._resync:
+            await asyncio.to_thread(store.invalidate)
+            self._resync = False
+        if not await asyncio.to_thread(store.is_built):
+            if not await asyncio.to_thread(store.begin_rebuild):
+                return None
+            await self.rebuild(db)
+        return await asyncio.to_thread(self._standings, store, member, period, limit)
+
+    def _standings(self, store, member: str, period: str, limit: int) -> Dict:
+        top_users = []
+        previous_score, rank = None, 0
+        for position, (entry, score) in enumerate(store.top(period, limit), 1):
+            if score != previous_score:
+                rank, previous_score = position, score
+            top_users.append(
+                {"rank": rank, "user_id": entry, "completed_challenges": int(score)}
+            )
+
+        standing = store.standing(period, member)
+        if standing is None:
+            user_rank = percentile = None
+            user_score = 0
+            total = store.size(period)
+        else:
+            # Tied users share a rank; percentile = share of the others beaten
+            user_rank = standing.higher + 1
+            others = standing.total - 1
+            percentile = round(100.0 * standing.lower / others, 1) if others else 100.0
+            user_score = int(standing.score)
+            total = standing.total
+
+        return {
+            "top_users": top_users,
+            "user_rank": user_rank,
+            "user_completed_challenges": user_score,
+            "percentile": percentile,
+            "total_participants": total,
+            "period": period,
+        }
+
+
+@process_singleton
+def get_challenge_leaderboard() -> ChallengeLeaderboard:
+    """The leaderboard the challenge routes and commit hooks share"""
+    return ChallengeLeaderboard()
+
+
+def resolve_period(period: Optional[str]) -> str:
+    """'all_time', 'month' (the current one) or an explicit 'YYYY-MM'"""
+    if not period or period == ALL_TIME:
+        return ALL_TIME
+    if period == "month":
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+    datetime.strptime(period, "%Y-%m")  # ValueError for anything else
+    return period
+
+
+# ============================================================================
+# Change tracking on the write paths
+# ============================================================================
+
+
+def _completion_delta(obj, state) -> int:
+    if state == "new":
+        return 1 if obj.status == "completed" else 0
+    if state == "deleted":
+        return -1 if obj.status == "completed" else 0
+
+    history = inspect(obj).attrs.status.history
+    if not history.has_changes():
+        return 0
+    was_completed = "completed" in (history.deleted or ())
+    return int(obj.status == "completed") - int(was_completed)
+
+
+def _collect_leaderboard_changes(session: Session, flush_context) -> None:
+    from app.db.models import ChallengeParticipation
+
+    for state, collection in (
+        ("new", session.new),
+        ("dirty", session.dirty),
+        ("deleted", session.deleted),
+    ):
+        for obj in collection:
+            if not isinstance(obj, ChallengeParticipation):
+                continue
+            delta = _completion_delta(obj, state)
+            if delta and obj.user_id is not None and obj.month:
+                changes = session.info.setdefault(_SESSION_KEY, {})
+                key = (str(obj.user_id), obj.month)
+                changes[key] = changes.get(key, 0) + delta
+
+
+def _apply_leaderboard_changes(session: Session) -> None:
+    changes = session.info.pop(_SESSION_KEY, None)
+    if changes:
+        try:
+            get_challenge_leaderboard().apply_from_sync(changes)
+        except Exception as e:
+            logger.warning(f"Leaderboard update skipped: {e}")
+
+
+def _discard_leaderboard_changes(session: Session, *args) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def install_leaderboard_tracking() -> None:
+    """Keep the boards in step with committed participation changes
+
+    Listens on the Session class, so it covers sync sessions and the sync
+    sessions behind AsyncSession. Safe to call more than once.
+    """
+    if event.contains(Session, "after_flush", _collect_leaderboard_changes):
+        return
+    event.listen(Session, "after_flush", _collect_leaderboard_changes)
+    event.listen(Session, "after_commit", _apply_leaderboard_changes)
+    event.listen(Session, "after_soft_rollback", _discard_leaderboard_changes)
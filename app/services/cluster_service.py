@@ -1,21 +1,40 @@
+from sqlalchemy.orm import Session
+
 from app.services.core.cohort.cluster_mapper import map_cluster_label
-from app.services.core.cohort.cohort_cluster_engine import CohortClusterEngine
+from app.services.core.cohort.cohort_model import CohortTrainingResult, get_cohort_model
+
 
-# Create a single cluster engine instance for the app
-_cluster_engine = CohortClusterEngine()
+def fit_cluster_model(db: Session) -> CohortTrainingResult:
+    """Update the persisted cohort model from new and changed users."""
+    return get_cohort_model().train(db)
 
 
-def fit_cluster_model(user_blobs: dict) -> None:
-    """Train the clusterer on user feature data."""
-    _cluster_engine.fit(user_blobs)
+def get_user_cluster(db: Session, user_id) -> dict:
+    """Cluster id and descriptive label for the given user ID."""
+    cluster_id = get_cohort_model().get_label(db, user_id)
+    return {
+        "user_id": str(user_id),
+        "cluster_id": cluster_id,
+        "label": map_cluster_label(cluster_id),
+    }
 
 
-def get_user_cluster_label(user_id: str) -> str:
+def get_user_cluster_label(db: Session, user_id) -> str:
     """Return cluster label for the given user ID."""
-    label = _cluster_engine.get_label(user_id)
-    return map_cluster_label(label)
+    return map_cluster_label(get_cohort_model().get_label(db, user_id))
+
 
+def get_cluster_centroids(db: Session) -> list:
+    """Return centroid coordinates and sizes for all clusters."""
+    from app.db.models import CohortCentroid
 
-def get_cluster_centroids() -> dict:
-    """Return centroid coordinates for all clusters."""
-    return _cluster_engine.get_centroids()
+    rows = db.query(CohortCentroid).order_by(CohortCentroid.cluster_id).all()
+    return [
+        {
+            "cluster_id": row.cluster_id,
+            "label": map_cluster_label(row.cluster_id),
+            "centroid": row.centroid,
+            "member_count": row.member_count,
+        }
+        for row in rows
+    ]
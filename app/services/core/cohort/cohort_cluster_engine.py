@@ -1,7 +1,7 @@
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 
-import numpy as np
-from sklearn.cluster import KMeans
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class CohortClusterEngine:
@@ -9,7 +9,8 @@ class CohortClusterEngine:
 
     def __init__(self, n_clusters: int = 4):
         """Create a new clustering engine."""
-        self.model = KMeans(n_clusters=n_clusters, random_state=42)
+        self.n_clusters = n_clusters
+        self.model = None  # scikit-learn is imported on the first fit()
         self.user_vectors: Dict[str, List[float]] = {}
         self.labels: Dict[str, int] = {}
 
@@ -40,7 +41,11 @@ class CohortClusterEngine:
             vectors.append(vec)
             ids.append(user_id)
 
+        import numpy as np
+        from sklearn.cluster import KMeans
+
         X = np.array(vectors)
+        self.model = KMeans(n_clusters=self.n_clusters, random_state=42)
         self.model.fit(X)
 
         for i, user_id in enumerate(ids):
@@ -50,6 +55,6 @@ class CohortClusterEngine:
         """Return the assigned cluster label for a user."""
         return self.labels.get(user_id, -1)
 
-    def get_centroids(self) -> np.ndarray:
+    def get_centroids(self) -> "np.ndarray":
         """Return coordinates of all cluster centroids."""
         return self.model.cluster_centers_
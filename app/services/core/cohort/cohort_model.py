@@ -0,0 +1,392 @@
+"""
+Cohort Model for MITA Finance
+Persisted MiniBatchKMeans cohorts, trained incrementally from the database
+
+CohortClusterEngine kept feature vectors and labels in process memory and
+refit a full KMeans over every user blob on each fit, so labels vanished on
+restart and differed between workers. This model lives in two tables:
+cohort_centroids (each cluster's centre and member count) and
+user_cohort_labels (each user's cluster and a fingerprint of the features
+it was assigned from).
+
+train() extracts every user's features, and their stored label, with one
+set-based statement. The first run fits MiniBatchKMeans over all users;
+later runs restore the stored centres, weighted by their member counts,
+and partial_fit only the users whose fingerprint changed (new users
+included). Everyone is then relabelled by nearest centre and only rows
+whose label or fingerprint moved are written. Random centre reassignment
+is off for updates so that a cluster id keeps its meaning between runs.
+
+assign() places a user who has no label yet: one feature row and k
+distances.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.shared_store import process_singleton
+from app.db.models import (
+    ChallengeParticipation,
+    CohortCentroid,
+    DailyPlan,
+    Mood,
+    RedistributionEvent,
+    User,
+    UserCohortLabel,
+)
+
+logger = logging.getLogger(__name__)
+
+FEATURES = (
+    "income",
+    "moods",
+    "mood_variety",
+    "challenges",
+    "avg_daily_spend",
+    "redistributions",
+)
+N_CLUSTERS = 4
+FEATURE_WINDOW_DAYS = 90
+BATCH_SIZE = 4096  # MiniBatchKMeans mini-batch
+LABEL_CHUNK = 100_000  # users per nearest-centre distance block
+WRITE_CHUNK = 5_000  # label rows per statement
+RANDOM_STATE = 42
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+# ============================================================================
+# Features
+# ============================================================================
+
+
+def cohort_features_query(today: date, user_ids: Optional[Sequence] = None):
+    """Raw features and stored label of every (or each given) user, one row each"""
+    since = datetime.combine(
+        today - timedelta(days=FEATURE_WINDOW_DAYS), time.min, tzinfo=timezone.utc
+    )
+    until = datetime.combine(today + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+    moods = (
+        select(
+            Mood.user_id,
+            func.count(Mood.id).label("moods"),
+            func.count(distinct(Mood.mood)).label("mood_variety"),
+        )
+        .where(Mood.date >= since.date())
+        .group_by(Mood.user_id)
+        .subquery()
+    )
+    challenges = (
+        select(
+            ChallengeParticipation.user_id,
+            func.count(ChallengeParticipation.id).label("challenges"),
+        )
+        .where(ChallengeParticipation.started_at >= since)
+        .group_by(ChallengeParticipation.user_id)
+        .subquery()
+    )
+    # Elapsed plan days only; the rest of the month is planned, not spent
+    spend = (
+        select(
+            DailyPlan.user_id,
+            func.sum(DailyPlan.spent_amount).label("spent"),
+            func.count(distinct(func.date(DailyPlan.date))).label("plan_days"),
+        )
+        .where(DailyPlan.date >= since, DailyPlan.date < until)
+        .group_by(DailyPlan.user_id)
+        .subquery()
+    )
+    redistributions = (
+        select(
+            RedistributionEvent.user_id,
+            func.count(RedistributionEvent.id).label("redistributions"),
+        )
+        .where(RedistributionEvent.created_at >= since)
+        .group_by(RedistributionEvent.user_id)
+        .subquery()
+    )
+
+    query = (
+        select(
+            User.id,
+            User.monthly_income,
+            moods.c.moods,
+            moods.c.mood_variety,
+            challenges.c.challenges,
+            spend.c.spent,
+            spend.c.plan_days,
+            redistributions.c.redistributions,
+            UserCohortLabel.cluster_id,
+            UserCohortLabel.feature_hash,
+        )
+        .select_from(User)
+        .outerjoin(moods, moods.c.user_id == User.id)
+        .outerjoin(challenges, challenges.c.user_id == User.id)
+        .outerjoin(spend, spend.c.user_id == User.id)
+        .outerjoin(redistributions, redistributions.c.user_id == User.id)
+        .outerjoin(UserCohortLabel, UserCohortLabel.user_id == User.id)
+    )
+    if user_ids is not None:
+        query = query.where(User.id.in_(list(user_ids)))
+    return query
+
+
+def feature_matrix(rows) -> Tuple[List, np.ndarray]:
+    """User ids and an (n, len(FEATURES)) array of raw features"""
+    ids = []
+    values = []
+    for row in rows:
+        ids.append(row.id)
+        values.append(
+            (
+                float(row.monthly_income or 0),
+                row.moods or 0,
+                row.mood_variety or 0,
+                row.challenges or 0,
+                float(row.spent or 0) / row.plan_days if row.plan_days else 0.0,
+                row.redistributions or 0,
+            )
+        )
+    raw = np.array(values, dtype=np.float64).reshape(len(values), len(FEATURES))
+    return ids, raw
+
+
+def transform_features(raw: np.ndarray) -> np.ndarray:
+    """log1p of every feature, so income does not drown out the counts"""
+    return np.log1p(np.clip(raw, 0.0, None))
+
+
+def feature_fingerprints(raw: np.ndarray) -> np.ndarray:
+    """Stable signed 64-bit FNV-1a hash of each row, rounded to cents"""
+    words = np.round(raw * 100).astype(np.int64).view(np.uint64)
+    hashes = np.full(len(raw), _FNV_OFFSET, dtype=np.uint64)
+    for column in words.T:
+        hashes ^= column
+        hashes *= _FNV_PRIME
+    return hashes.view(np.int64)
+
+
+# ============================================================================
+# Clustering
+# ============================================================================
+
+
+def fit_centroids(
+    X: np.ndarray, n_clusters: int = N_CLUSTERS, random_state: int = RANDOM_STATE
+) -> np.ndarray:
+    """Cold start: MiniBatchKMeans over every user"""
+    from sklearn.cluster import MiniBatchKMeans
+
+    model = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        batch_size=BATCH_SIZE,
+        n_init=3,
+        random_state=random_state,
+    )
+    return model.fit(X).cluster_centers_
+
+
+def update_centroids(
+    centroids: np.ndarray,
+    weights: np.ndarray,
+    X: np.ndarray,
+    random_state: int = RANDOM_STATE,
+) -> np.ndarray:
+    """partial_fit the stored centres on the rows of X, a batch at a time
+
+    The model is restored through the public API: initialised at the stored
+    centres, then fed the centres themselves weighted by their member
+    counts, which leaves them in place and gives each the learning rate of
+    a cluster that has already absorbed that many users.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    model = MiniBatchKMeans(
+        n_clusters=len(centroids),
+        init=centroids,
+        n_init=1,
+        batch_size=BATCH_SIZE,
+        reassignment_ratio=0.0,
+        compute_labels=False,
+        random_state=random_state,
+    )
+    model.partial_fit(centroids, sample_weight=np.maximum(weights, 1.0))
+    for start in range(0, len(X), BATCH_SIZE):
+        model.partial_fit(X[start : start + BATCH_SIZE])
+    return model.cluster_centers_
+
+
+def nearest_centroids(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centre for each row"""
+    labels = np.empty(len(X), dtype=np.int64)
+    centre_norms = (centroids**2).sum(axis=1)
+    for start in range(0, len(X), LABEL_CHUNK):
+        block = X[start : start + LABEL_CHUNK]
+        # ||x - c||^2 without the ||x||^2 term, which is the same for every c
+        distances = centre_norms - 2.0 * block @ centroids.T
+        labels[start : start + len(block)] = distances.argmin(axis=1)
+    return labels
+
+
+# ============================================================================
+# Model
+# ============================================================================
+
+
+@dataclass
+class CohortTrainingResult:
+    users: int
+    updated: int  # users fed to partial_fit (everyone on a cold start)
+    written: int  # label rows inserted or replaced
+    cold_start: bool
+
+
+class CohortModel:
+    """Database-backed cohort clusters shared by every worker"""
+
+    def __init__(self, n_clusters: int = N_CLUSTERS):
+        self.n_clusters = n_clusters
+
+    def load_centroids(
+        self, db: Session
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """(centres, member counts) ordered by cluster id; (None, None) untrained"""
+        rows = list(
+            db.execute(
+                select(CohortCentroid).order_by(CohortCentroid.cluster_id)
+            ).scalars()
+        )
+        if not rows:
+            return None, None
+        centroids = np.array([row.centroid for row in rows], dtype=np.float64)
+        weights = np.array([row.member_count for row in rows], dtype=np.float64)
+        return centroids, weights
+
+    def train(self, db: Session, today: Optional[date] = None) -> CohortTrainingResult:
+        """Update the model from new and changed users, then relabel"""
+        today = today or date.today()
+        rows = db.execute(cohort_features_query(today)).all()
+        if len(rows) < self.n_clusters:
+            logger.info(f"Cohort training skipped: {len(rows)} users")
+            return CohortTrainingResult(len(rows), 0, 0, cold_start=False)
+
+        ids, raw = feature_matrix(rows)
+        X = transform_features(raw)
+        fingerprints = feature_fingerprints(raw)
+        stored_labels = np.array(
+            [-1 if row.cluster_id is None else row.cluster_id for row in rows]
+        )
+        stored_hashes = np.array(
+            [0 if row.feature_hash is None else row.feature_hash for row in rows],
+            dtype=np.int64,
+        )
+        changed = (stored_labels < 0) | (stored_hashes != fingerprints)
+
+        centroids, weights = self.load_centroids(db)
+        cold_start = centroids is None or len(centroids) != self.n_clusters
+        if cold_start:
+            centroids = fit_centroids(X, self.n_clusters)
+            updated = len(ids)
+        else:
+            updated = int(changed.sum())
+            if updated:
+                centroids = update_centroids(centroids, weights, X[changed])
+
+        labels = nearest_centroids(X, centroids)
+        dirty = np.flatnonzero(changed | (labels != stored_labels))
+        counts = np.bincount(labels, minlength=self.n_clusters)
+
+        db.execute(delete(CohortCentroid))
+        db.execute(
+            insert(CohortCentroid),
+            [
+                {
+                    "cluster_id": cluster_id,
+                    "centroid": centroids[cluster_id].tolist(),
+                    "member_count": int(counts[cluster_id]),
+                }
+                for cluster_id in range(self.n_clusters)
+            ],
+        )
+        for start in range(0, len(dirty), WRITE_CHUNK):
+            chunk = dirty[start : start + WRITE_CHUNK]
+            self._write_labels(
+                db,
+                [ids[i] for i in chunk],
+                labels[chunk].tolist(),
+                fingerprints[chunk].tolist(),
+            )
+        db.commit()
+
+        logger.info(
+            f"Cohort model trained: {len(ids)} users, {updated} updated, "
+            f"{len(dirty)} labels written, cold_start={cold_start}"
+        )
+        return CohortTrainingResult(len(ids), updated, len(dirty), cold_start)
+
+    def assign(self, db: Session, user_id, today: Optional[date] = None) -> int:
+        """Label one user by nearest stored centre; -1 before the first training"""
+        centroids, _ = self.load_centroids(db)
+        if centroids is None:
+            return -1
+        row = db.execute(
+            cohort_features_query(today or date.today(), user_ids=[user_id])
+        ).first()
+        if row is None:
+            return -1
+        _, raw = feature_matrix([row])
+        label = int(nearest_centroids(transform_features(raw), centroids)[0])
+        self._write_labels(db, [row.id], [label], feature_fingerprints(raw).tolist())
+        db.commit()
+        return label
+
+    def get_label(self, db: Session, user_id) -> int:
+        """Stored cohort of a user, assigning one on first request"""
+        label = db.execute(
+            select(UserCohortLabel.cluster_id).where(UserCohortLabel.user_id == user_id)
+        ).scalar()
+        if label is not None:
+            return label
+        return self.assign(db, user_id)
+
+    def _write_labels(self, db: Session, user_ids, labels, fingerprints) -> None:
+        # Upsert: two first requests for the same user (or a request racing
+        # a training run) both write, the later one wins, neither fails on
+        # the primary key as a delete-then-insert did.
+        stmt = pg_insert(UserCohortLabel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserCohortLabel.user_id],
+            set_={
+                "cluster_id": stmt.excluded.cluster_id,
+                "feature_hash": stmt.excluded.feature_hash,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        now = datetime.now(timezone.utc)
+        db.execute(
+            stmt,
+            [
+                {
+                    "user_id": user_id,
+                    "cluster_id": label,
+                    "feature_hash": fingerprint,
+                    "updated_at": now,
+                }
+                for user_id, label, fingerprint in zip(user_ids, labels, fingerprints)
+            ],
+        )
+
+
+@process_singleton
+def get_cohort_model() -> CohortModel:
+    """The model cohort assignment and the nightly refit share"""
+    return CohortModel()
@@ -4,6 +4,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 
 from app.db.models import AIAnalysisSnapshot
+from app.db.models.ai_analysis_snapshot import PROFILE_KIND
 
 
 def adapt_category_weights(
@@ -11,7 +12,7 @@ def adapt_category_weights(
 ) -> Dict[str, float]:
     snapshot = (
         db.query(AIAnalysisSnapshot)
-        .filter_by(user_id=user_id)
+        .filter_by(user_id=user_id, kind=PROFILE_KIND)
         .order_by(AIAnalysisSnapshot.created_at.desc())
         .first()
     )
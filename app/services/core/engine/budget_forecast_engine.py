@@ -12,6 +12,14 @@ DESIGN PHILOSOPHY:
 - Category "at risk" threshold: burning > 120% of planned daily pace.
 - Status thresholds: warning when projected overspend < 10% of plan,
   danger when projected overspend >= 10% of plan.
+
+PROBABILISTIC MODE:
+- compute_probabilistic_forecast() bootstraps the user's own history of
+  daily spend: each simulated remaining day is a whole historical day drawn
+  at random, so categories that move together stay together.
+- All paths are drawn at once: day counts per path (bincount) times the
+  history matrix, one matrix product. Floats inside the simulation only;
+  every figure returned is a quantized Decimal.
 """
 
 from __future__ import annotations
@@ -19,9 +27,11 @@ from __future__ import annotations
 import logging
 from calendar import monthrange
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import ROUND_HALF_UP, Decimal
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +50,12 @@ DANGER_RATIO: Decimal = Decimal("0.10")
 # Average days per month (used only for fractional months_remaining on goals).
 AVG_DAYS_MONTH: Decimal = Decimal("30.44")
 
+# Monte-Carlo mode: paths per forecast, history window, reported percentiles.
+SIMULATION_PATHS: int = 10_000
+SIMULATION_CHUNK: int = 1_000
+HISTORY_DAYS: int = 90
+PERCENTILES: Tuple[int, int, int] = (10, 50, 90)
+
 _ZERO = Decimal("0")
 _CENT = Decimal("0.01")
 
@@ -71,6 +87,15 @@ class GoalData:
     target_date: Optional[date]
 
 
+@dataclass(frozen=True)
+class DailySpendData:
+    """Total spent in one category on one day, aggregated by the route."""
+
+    date: date
+    category: str
+    amount: Decimal
+
+
 # ---------------------------------------------------------------------------
 # Output data classes
 # ---------------------------------------------------------------------------
@@ -534,3 +559,311 @@ def compute_forecast(
         all_categories=all_categories_sorted,
         goals=goal_forecasts,
     )
+
+
+# ---------------------------------------------------------------------------
+# Probabilistic forecast (Monte-Carlo)
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CategorySimulation:
+    """Distribution of one category's month-end balance."""
+
+    category: str
+    monthly_planned: Decimal
+    monthly_spent: Decimal
+    balance_p10: Decimal  # pessimistic: 10% of paths end at or below this
+    balance_p50: Decimal
+    balance_p90: Decimal
+    overshoot_probability: Decimal  # share of paths that end over budget
+
+    def to_dict(self) -> Dict:
+        return {
+            "category": self.category,
+            "monthly_planned": float(self.monthly_planned),
+            "monthly_spent": float(self.monthly_spent),
+            "balance_p10": float(self.balance_p10),
+            "balance_p50": float(self.balance_p50),
+            "balance_p90": float(self.balance_p90),
+            "overshoot_probability": float(self.overshoot_probability),
+        }
+
+
+@dataclass
+class GoalSimulation:
+    """Chance that month-end leftovers do not cover a goal's contribution."""
+
+    goal_id: str
+    title: str
+    required_monthly_contribution: Optional[Decimal]
+    shortfall_probability: Optional[Decimal]  # None = no deadline to fund
+
+    def to_dict(self) -> Dict:
+        return {
+            "goal_id": self.goal_id,
+            "title": self.title,
+            "required_monthly_contribution": (
+                float(self.required_monthly_contribution)
+                if self.required_monthly_contribution is not None
+                else None
+            ),
+            "shortfall_probability": (
+                float(self.shortfall_probability)
+                if self.shortfall_probability is not None
+                else None
+            ),
+        }
+
+
+@dataclass
+class ProbabilisticForecast:
+    """Linear forecast plus the simulated month-end distribution."""
+
+    forecast: ForecastResult
+    paths: int
+    history_days: int  # days of history the paths were drawn from
+    history_source: str  # "transactions" | "daily_plan" | "none"
+    balance_p10: Decimal
+    balance_p50: Decimal
+    balance_p90: Decimal
+    overshoot_probability: Optional[Decimal]  # None when there is no plan
+    categories: List[CategorySimulation]  # sorted desc by overshoot_probability
+    goals: List[GoalSimulation]
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.forecast.to_dict(),
+            "mode": "probabilistic",
+            "simulation": {
+                "paths": self.paths,
+                "history_days": self.history_days,
+                "history_source": self.history_source,
+                "balance_p10": float(self.balance_p10),
+                "balance_p50": float(self.balance_p50),
+                "balance_p90": float(self.balance_p90),
+                "overshoot_probability": (
+                    float(self.overshoot_probability)
+                    if self.overshoot_probability is not None
+                    else None
+                ),
+                "categories": [c.to_dict() for c in self.categories],
+                "goals": [g.to_dict() for g in self.goals],
+            },
+        }
+
+
+def _d(value: float) -> Decimal:
+    """Simulation float → Decimal quantized to cents (or to 0.01 probability)."""
+    return _q(Decimal(str(round(float(value), 4))))
+
+
+def _history_matrix(
+    history: List[DailySpendData],
+    categories: List[str],
+    first_day: date,
+    last_day: date,
+) -> np.ndarray:
+    """
+    Daily spend as a (days, categories) matrix over [first_day, last_day].
+
+    Days without a row are zero-spend days; they are part of the user's
+    behaviour and must be drawn as often as any other day.
+    """
+    days = (last_day - first_day).days + 1
+    column = {cat: i for i, cat in enumerate(categories)}
+    matrix = np.zeros((max(days, 0), len(categories)))
+    for row in history:
+        if first_day <= row.date <= last_day and row.category in column:
+            matrix[(row.date - first_day).days, column[row.category]] += float(
+                row.amount
+            )
+    return matrix
+
+
+def simulate_month_end(
+    history: np.ndarray,
+    days_remaining: int,
+    paths: int = SIMULATION_PATHS,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Future spend per path and category, shape (paths, categories).
+
+    Each path draws days_remaining historical days with replacement. Rather
+    than gathering a (paths, days_remaining, categories) block, the draws are
+    counted per path with one bincount and multiplied by the history matrix,
+    SIMULATION_CHUNK paths at a time so the counts stay in cache.
+    """
+    n_days, n_categories = history.shape
+    future = np.zeros((paths, n_categories))
+    if days_remaining <= 0 or n_days == 0:
+        return future
+    rng = rng or np.random.default_rng()
+    offsets = np.arange(SIMULATION_CHUNK)[:, None] * n_days
+    for start in range(0, paths, SIMULATION_CHUNK):
+        n = min(SIMULATION_CHUNK, paths - start)
+        draws = rng.integers(0, n_days, size=(n, days_remaining))
+        draws += offsets[:n]
+        counts = np.bincount(draws.ravel(), minlength=n * n_days)
+        future[start : start + n] = counts.reshape(n, n_days) @ history
+    return future
+
+
+def _simulate_goals(
+    goal_forecasts: List[GoalForecast], total_balance: np.ndarray
+) -> List[GoalSimulation]:
+    """
+    Fund goals from the month-end leftover, nearest deadline first.
+
+    A goal falls short on a path when the leftover does not cover its
+    required contribution plus those of every goal due before it.
+    """
+    simulations: Dict[str, GoalSimulation] = {}
+    committed = 0.0
+    ordered = sorted(
+        goal_forecasts, key=lambda g: (g.target_date is None, g.target_date)
+    )
+    for goal in ordered:
+        required = goal.required_monthly_contribution
+        if goal.remaining <= _ZERO:
+            probability: Optional[Decimal] = _ZERO
+        elif goal.target_date is None:
+            probability = None
+        elif required is None:
+            probability = Decimal("1.00")  # deadline passed unfunded
+        else:
+            committed += float(required)
+            probability = _d(np.mean(total_balance < committed))
+        simulations[goal.goal_id] = GoalSimulation(
+            goal_id=goal.goal_id,
+            title=goal.title,
+            required_monthly_contribution=required,
+            shortfall_probability=probability,
+        )
+    return [simulations[g.goal_id] for g in goal_forecasts]
+
+
+def compute_probabilistic_forecast(
+    daily_plans: List[DailyPlanData],
+    goals: List[GoalData],
+    history: List[DailySpendData],
+    year: int,
+    month: int,
+    today: Optional[date] = None,
+    paths: int = SIMULATION_PATHS,
+    seed: Optional[int] = None,
+) -> ProbabilisticForecast:
+    """
+    Monte-Carlo month-end forecast on top of compute_forecast().
+
+    Args:
+        daily_plans:  All DailyPlan rows for the month, pre-fetched by the route.
+        goals:        Active Goal rows for the user, pre-fetched by the route.
+        history:      Daily spend per category over the last HISTORY_DAYS,
+                      pre-aggregated by the route. When empty, the month's
+                      own DailyPlan spending so far is bootstrapped instead.
+        year, month:  Target month.
+        today:        Override date.today() for testing.
+        paths:        Number of simulated month-end trajectories.
+        seed:         Seed for reproducible paths (same inputs → same output).
+
+    Returns:
+        ProbabilisticForecast with P10/P50/P90 balances and overshoot
+        probabilities, overall, per category and per goal.
+    """
+    if today is None:
+        today = date.today()
+    forecast = compute_forecast(daily_plans, goals, year, month, today=today)
+
+    planned: Dict[str, Decimal] = {}
+    spent: Dict[str, Decimal] = {}
+    for p in daily_plans:
+        planned[p.category] = planned.get(p.category, _ZERO) + p.planned_amount
+        spent[p.category] = spent.get(p.category, _ZERO) + p.spent_amount
+
+    # ── History to draw from: days before today, oldest first ───────────────
+    last_day = today - timedelta(days=1)
+    source = "transactions"
+    rows = [h for h in history if h.date <= last_day]
+    if rows:
+        first_day = max(min(h.date for h in rows), today - timedelta(days=HISTORY_DAYS))
+    else:
+        source = "daily_plan"
+        first_day = date(year, month, 1)
+        rows = [
+            DailySpendData(p.date, p.category, p.spent_amount)
+            for p in daily_plans
+            if p.date <= last_day
+        ]
+    categories = sorted(set(planned) | {h.category for h in rows})
+    matrix = _history_matrix(rows, categories, first_day, last_day)
+    if matrix.shape[0] == 0:
+        source = "none"
+
+    future = simulate_month_end(
+        matrix, forecast.days_remaining, paths, np.random.default_rng(seed)
+    )
+    base = np.array(
+        [float(planned.get(c, _ZERO) - spent.get(c, _ZERO)) for c in categories]
+    )
+    balances = base - future  # (paths, categories)
+    total_balance = balances.sum(axis=1)
+
+    if not daily_plans:
+        return ProbabilisticForecast(
+            forecast=forecast,
+            paths=paths,
+            history_days=matrix.shape[0],
+            history_source=source,
+            balance_p10=_ZERO,
+            balance_p50=_ZERO,
+            balance_p90=_ZERO,
+            overshoot_probability=None,
+            categories=[],
+            goals=_simulate_goals(forecast.goals, total_balance),
+        )
+
+    category_pcts = np.percentile(balances, PERCENTILES, axis=0)
+    category_overshoot = (balances < 0).mean(axis=0)
+    simulated = [
+        CategorySimulation(
+            category=cat,
+            monthly_planned=planned.get(cat, _ZERO),
+            monthly_spent=spent.get(cat, _ZERO),
+            balance_p10=_d(category_pcts[0, i]),
+            balance_p50=_d(category_pcts[1, i]),
+            balance_p90=_d(category_pcts[2, i]),
+            overshoot_probability=_d(category_overshoot[i]),
+        )
+        for i, cat in enumerate(categories)
+    ]
+    simulated.sort(key=lambda c: (-c.overshoot_probability, c.category))
+
+    total_pcts = np.percentile(total_balance, PERCENTILES)
+    overshoot = _d(np.mean(total_balance < 0))
+
+    logger.info(
+        "forecast: %d-%02d probabilistic paths=%d history=%d(%s) "
+        "p50=%.2f overshoot=%.2f",
+        year,
+        month,
+        paths,
+        matrix.shape[0],
+        source,
+        total_pcts[1],
+        float(overshoot),
+    )
+
+    return ProbabilisticForecast(
+        forecast=forecast,
+        paths=paths,
+        history_days=matrix.shape[0],
+        history_source=source,
+        balance_p10=_d(total_pcts[0]),
+        balance_p50=_d(total_pcts[1]),
+        balance_p90=_d(total_pcts[2]),
+        overshoot_probability=overshoot,
+        categories=simulated,
+        goals=_simulate_goals(forecast.goals, total_balance),
+    )
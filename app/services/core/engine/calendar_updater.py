@@ -8,6 +8,22 @@ from app.core.date_utils import day_to_range
 from app.db.models import DailyPlan
 
 
+def day_status(total_planned: Decimal, total_spent: Decimal):
+    """Calendar colour of a day from its planned and spent totals"""
+    delta = total_spent - total_planned
+
+    # Dynamic yellow threshold: 5% of planned budget, bounded between $2 and $25
+    yellow_threshold = max(
+        Decimal("2.00"), min(Decimal("25.00"), total_planned * Decimal("0.05"))
+    )
+
+    if delta <= Decimal("0.00"):
+        return "green", delta
+    if delta <= yellow_threshold:
+        return "yellow", delta
+    return "red", delta
+
+
 def update_day_status(db: Session, user_id: UUID, day: date):
     day_start, day_end = day_to_range(day)
     days = (
@@ -29,19 +45,7 @@ def update_day_status(db: Session, user_id: UUID, day: date):
         total_planned += d.planned_amount
         total_spent += d.spent_amount
 
-    delta = total_spent - total_planned
-
-    # Dynamic yellow threshold: 5% of planned budget, bounded between $2 and $25
-    yellow_threshold = max(
-        Decimal("2.00"), min(Decimal("25.00"), total_planned * Decimal("0.05"))
-    )
-
-    if delta <= Decimal("0.00"):
-        status = "green"
-    elif delta <= yellow_threshold:
-        status = "yellow"
-    else:
-        status = "red"
+    status, delta = day_status(total_planned, total_spent)
 
     for d in days:
         d.status = status
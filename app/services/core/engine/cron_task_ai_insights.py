@@ -0,0 +1,49 @@
+"""
+Nightly AI Insight Snapshot Cron Task
+
+Splits onboarded users with transactions in the analysis window into
+chunks and enqueues one refresh job per chunk; the RQ workers compute the
+chunks in parallel and the /api/ai insight endpoints serve the results.
+
+- run_ai_insight_snapshots() — no-arg wrapper, called directly by rq_scheduler
+- enqueue_insight_refreshes(db, chunk_size) — testable core, accepts injected session
+"""
+
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.core.session import get_db
+from app.core.task_queue import enqueue_task
+from app.services.ai_insight_snapshots import CHUNK_SIZE, chunked, users_to_refresh
+
+logger = get_logger(__name__)
+
+
+def enqueue_insight_refreshes(
+    db: Session, chunk_size: int = CHUNK_SIZE
+) -> Dict[str, int]:
+    from app.tasks.async_tasks import refresh_ai_insights_task
+
+    user_ids = [str(user_id) for user_id in users_to_refresh(db)]
+    chunks = chunked(user_ids, chunk_size)
+    for chunk in chunks:
+        enqueue_task(refresh_ai_insights_task, user_ids=chunk)
+
+    logger.info(
+        "AI insight snapshots: %d users enqueued in %d chunks",
+        len(user_ids),
+        len(chunks),
+    )
+    return {"users": len(user_ids), "chunks": len(chunks)}
+
+
+def run_ai_insight_snapshots() -> None:
+    db: Session = next(get_db())
+    try:
+        enqueue_insight_refreshes(db)
+    except Exception as e:
+        logger.error(f"AI insight snapshot scheduling failed: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,28 @@
+"""
+Nightly Cohort Model Cron Task
+
+Updates the persisted cohort clusters from users whose features changed
+since the last run (new users included) and relabels everyone by nearest
+centroid; API workers read the labels from the database.
+
+- run_cohort_model_training() — no-arg wrapper, called directly by rq_scheduler
+"""
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.core.session import get_db
+from app.services.core.cohort.cohort_model import get_cohort_model
+
+logger = get_logger(__name__)
+
+
+def run_cohort_model_training() -> None:
+    db: Session = next(get_db())
+    try:
+        get_cohort_model().train(db)
+    except Exception as e:
+        logger.error(f"Cohort model training failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
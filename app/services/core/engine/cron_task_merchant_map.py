@@ -0,0 +1,27 @@
+"""
+Nightly Merchant Map Cron Task
+
+Relearns the merchant→category map (most frequent ledger category per
+normalized merchant) and publishes it; API processes pick up the new copy
+on their next reload.
+
+- run_merchant_map_rebuild() — no-arg wrapper, called directly by rq_scheduler
+"""
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.core.session import get_db
+from app.services.merchant_classifier import get_merchant_classifier
+
+logger = get_logger(__name__)
+
+
+def run_merchant_map_rebuild() -> None:
+    db: Session = next(get_db())
+    try:
+        get_merchant_classifier().rebuild(db)
+    except Exception as e:
+        logger.error(f"Merchant map rebuild failed: {e}")
+    finally:
+        db.close()
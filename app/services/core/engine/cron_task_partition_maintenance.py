@@ -0,0 +1,63 @@
+"""
+Daily Partition Maintenance Cron Task
+
+Creates the coming months' partitions for the partitioned log tables, drops
+partitions past retention, trims expired rows from the notifications
+table in batches and prunes old sync tombstones. Rows removed and
+rows/second are logged per table.
+
+- run_partition_maintenance() — no-arg wrapper, called directly by rq_scheduler
+- run_partition_maintenance_batch(db, now) — testable core, accepts injected session
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.core.session import get_db
+from app.services.notification_service import NotificationService
+from app.services.partition_maintenance import maintain_partitions
+from app.services.sync_feed import prune_tombstones
+
+logger = get_logger(__name__)
+
+NOTIFICATION_RETENTION_DAYS = 30
+
+
+def run_partition_maintenance_batch(
+    db: Session, now: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Run partition maintenance, notification cleanup and tombstone pruning.
+
+    Returns one report dict per table (see DeleteReport.to_dict()).
+    """
+    reports = [report.to_dict() for report in maintain_partitions(db, now=now)]
+
+    try:
+        removed = NotificationService(db).cleanup_old_notifications(
+            days=NOTIFICATION_RETENTION_DAYS
+        )
+        reports.append({"table": "notifications", "rows": removed})
+    except Exception as e:
+        logger.error(f"Notification cleanup failed: {e}")
+
+    # After the cleanup, whose deletes leave tombstones of their own
+    try:
+        removed = prune_tombstones(db, now=now)
+        reports.append({"table": "sync_tombstones", "rows": removed})
+    except Exception as e:
+        logger.error(f"Sync tombstone pruning failed: {e}")
+
+    return reports
+
+
+def run_partition_maintenance() -> None:
+    db: Session = next(get_db())
+    try:
+        for report in run_partition_maintenance_batch(db):
+            logger.info(f"Retention report: {report}")
+    finally:
+        db.close()
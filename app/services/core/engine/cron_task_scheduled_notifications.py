@@ -0,0 +1,27 @@
+"""
+Scheduled Notification Dispatch Cron Task
+
+Delivers PENDING notifications whose scheduled_for has passed. Due rows are
+claimed with FOR UPDATE SKIP LOCKED, so overlapping runs (or several workers
+after an outage) split the backlog instead of double-sending.
+
+- run_scheduled_notifications() — no-arg wrapper, called directly by rq_scheduler
+"""
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import get_logger
+from app.core.session import get_db
+from app.services.notification_dispatcher import ScheduledNotificationDispatcher
+
+logger = get_logger(__name__)
+
+
+def run_scheduled_notifications() -> None:
+    db: Session = next(get_db())
+    try:
+        ScheduledNotificationDispatcher(db).run()
+    except Exception as e:
+        logger.error(f"Scheduled notification dispatch failed: {e}")
+    finally:
+        db.close()
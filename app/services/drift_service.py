@@ -3,7 +3,7 @@ import os
 from typing import Dict
 
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials
 
 # Get JSON key from environment variable
 firebase_json = os.environ.get("FIREBASE_JSON")
@@ -12,6 +12,9 @@ _COLLECTION = "drift_logs"
 
 
 def _get_db():
+    # google-cloud-firestore takes ~0.3s to import; only drift logging needs it
+    from firebase_admin import firestore
+
     if not firebase_admin._apps:
         if firebase_json:
             cred = credentials.Certificate(json.loads(firebase_json))
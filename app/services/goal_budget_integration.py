@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.core.logging_config import get_logger
 from app.db.models import Goal, Transaction, User
+from app.services.goal_statistics import get_goal_statistics_cache
 
 logger = get_logger(__name__)
 
@@ -285,6 +286,7 @@ class GoalBudgetIntegration:
             goal.add_savings(amount)
 
             self.db.commit()
+            get_goal_statistics_cache().invalidate(user_id)
             self.db.refresh(goal)
             self.db.refresh(transaction)
 
@@ -0,0 +1,162 @@
+"""
+Goal Statistics for MITA Finance
+Per-user goal statistics from one conditional-aggregate query, cached
+
+/goals/statistics used to make nine round trips, one select(func.count(...))
+or sum/avg per figure. All of them now come from a single statement over the
+user's goals, each aggregate restricted with FILTER (WHERE ...), which
+PostgreSQL (and SQLite) evaluate in one scan of the user's rows.
+
+The result is cached per user under mita:goals:stats:<user_id> (in process
+without Redis). The goal routes invalidate it after every write through the
+asyncio client (ainvalidate). Sync services call invalidate(), which deletes
+through the sync client only where no event loop is running; services
+bridged with AsyncSession.run_sync run on the loop, and there it schedules
+ainvalidate() instead of blocking it. Overdue and due-soon depend on the
+date, so an entry only serves the day it was computed, and it expires after
+STATS_TTL_SECONDS to pick up writes made elsewhere (auto-transfers, budget
+sync). If Redis errors, statistics are computed from the database.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.shared_store import key_value_store, process_singleton
+from app.db.models import Goal
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "mita:goals:stats:"
+STATS_TTL_SECONDS = 600
+DUE_SOON_DAYS = 7
+
+
+# ============================================================================
+# Query
+# ============================================================================
+
+
+def goal_statistics_query(user_id, today: date):
+    """Every goal statistic for one user as a single row"""
+    active = Goal.status == "active"
+    dated = Goal.target_date.isnot(None)
+    soon = today + timedelta(days=DUE_SOON_DAYS)
+    return select(
+        func.count(Goal.id).label("total_goals"),
+        func.count(Goal.id).filter(active).label("active_goals"),
+        func.count(Goal.id).filter(Goal.status == "completed").label("completed"),
+        func.count(Goal.id).filter(Goal.status == "paused").label("paused_goals"),
+        func.avg(Goal.progress).filter(active).label("average_progress"),
+        func.sum(Goal.target_amount).filter(active).label("total_target"),
+        func.sum(Goal.saved_amount).filter(active).label("total_saved"),
+        func.count(Goal.id)
+        .filter(active, dated, Goal.target_date < today)
+        .label("overdue_goals"),
+        func.count(Goal.id)
+        .filter(active, dated, Goal.target_date >= today, Goal.target_date <= soon)
+        .label("due_soon"),
+    ).where(Goal.user_id == user_id)
+
+
+async def compute_goal_statistics(db: AsyncSession, user_id, today: date) -> Dict:
+    row = (await db.execute(goal_statistics_query(user_id, today))).one()
+    total = row.total_goals or 0
+    completed = row.completed or 0
+    completion_rate = (completed / total * 100) if total > 0 else 0.0
+    return {
+        "total_goals": total,
+        "active_goals": row.active_goals or 0,
+        "completed_goals": completed,
+        "paused_goals": row.paused_goals or 0,
+        "completion_rate": round(completion_rate, 2),
+        "average_progress": round(float(row.average_progress or 0.0), 2),
+        "total_target_amount": float(row.total_target or 0.0),
+        "total_saved_amount": float(row.total_saved or 0.0),
+        "overdue_goals": row.overdue_goals or 0,
+        "due_soon": row.due_soon or 0,
+    }
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+
+class GoalStatisticsCache:
+    """Cached goal statistics, invalidated by the goal routes"""
+
+    def __init__(
+        self,
+        store=None,
+        redis_url: Optional[str] = None,
+        ttl: int = STATS_TTL_SECONDS,
+    ):
+        self._store = store
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self._tasks: set = set()  # the loop only keeps weak references
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = key_value_store(KEY_PREFIX, self.redis_url)
+        return self._store
+
+    async def get(self, db: AsyncSession, user_id, today: Optional[date] = None):
+        """The user's statistics, from cache when computed today"""
+        today = today or date.today()
+        member = str(user_id)
+        try:
+            cached = await self.store.aget(member)
+        except RedisError as e:
+            logger.warning(f"Goal statistics cache unavailable: {e}")
+            return await compute_goal_statistics(db, user_id, today)
+
+        if cached is not None:
+            entry = json.loads(cached)
+            if entry.get("as_of") == today.isoformat():
+                return entry["statistics"]
+
+        statistics = await compute_goal_statistics(db, user_id, today)
+        entry = {"as_of": today.isoformat(), "statistics": statistics}
+        try:
+            await self.store.aset(member, json.dumps(entry), self.ttl)
+        except RedisError as e:
+            logger.warning(f"Could not cache goal statistics for {member}: {e}")
+        return statistics
+
+    def invalidate(self, user_id) -> None:
+        """Call after committing any change to the user's goals"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            task = loop.create_task(self.ainvalidate(user_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+        try:
+            self.store.delete(str(user_id))
+        except RedisError as e:
+            logger.warning(f"Goal statistics invalidate failed for {user_id}: {e}")
+
+    async def ainvalidate(self, user_id) -> None:
+        """invalidate() for coroutines, without blocking the event loop"""
+        try:
+            await self.store.adelete(str(user_id))
+        except RedisError as e:
+            logger.warning(f"Goal statistics invalidate failed for {user_id}: {e}")
+
+
+@process_singleton
+def get_goal_statistics_cache() -> GoalStatisticsCache:
+    """The statistics cache the goal routes and goal services invalidate"""
+    return GoalStatisticsCache()
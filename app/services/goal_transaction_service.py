@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.core.logging_config import get_logger
 from app.db.models import Goal, Transaction
+from app.services.goal_statistics import get_goal_statistics_cache
 
 logger = get_logger(__name__)
 
@@ -76,6 +77,7 @@ class GoalTransactionService:
             goal.add_savings(amount_to_add)
 
             db.commit()
+            get_goal_statistics_cache().invalidate(goal.user_id)
             db.refresh(goal)
 
             logger.info(
@@ -187,6 +189,7 @@ class GoalTransactionService:
                 goal.saved_amount = max(Decimal("0"), goal.saved_amount - amount)
                 goal.update_progress()
                 db.commit()
+                get_goal_statistics_cache().invalidate(user_id)
 
                 logger.info(
                     f"Unlinked transaction {transaction_id} from goal {goal_id}, recalculated progress"
@@ -0,0 +1,329 @@
+"""
+LLM Response Cache for MITA Finance
+Content-addressed chat completion caching with request coalescing
+
+Chat completions are keyed by a SHA-256 of the canonical request - model,
+messages (system prompt included) with whitespace collapsed, temperature and
+max_tokens - so any two callers asking the same thing share one answer.
+Answers live in Redis under mita:llm:<hash> for a TTL chosen per call type
+(a merchant's category barely changes, advice should stay fresh), or in an
+in-process LRU of MEMORY_MAX_ENTRIES answers when no Redis URL is set.
+Coroutine callers read and write through redis.asyncio, synchronous clients
+through the sync client.
+
+Identical requests that arrive while the first is still in flight wait for
+its answer instead of sending their own. Only successful completions are
+stored; an exception reaches every waiter and nothing is cached. If the
+first caller is cancelled its waiters are not: one of them sends the request.
+
+MicroBatcher collects single requests for a few milliseconds and hands them
+to one callback together; categorization uses it to send one prompt for
+many expenses.
+
+Hits, misses, coalesced waits and token usage per call type are counted
+both in-process (stats()) and as Prometheus metrics.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.prometheus_metrics import llm_cache_requests, llm_tokens
+from app.core.shared_store import key_value_store, process_singleton
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "mita:llm:"
+CALL_TTLS = {
+    "categorization": 30 * 86400,
+    "budget_analysis": 6 * 3600,
+    "financial_advice": 3600,
+    "agent": 3600,
+}
+DEFAULT_TTL = 3600
+MEMORY_MAX_ENTRIES = 10_000
+# How long a coalesced synchronous caller waits for the leader's answer
+SYNC_WAIT_SECONDS = 120.0
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Messages reduced to role and whitespace-collapsed content"""
+    return [
+        {
+            "role": str(message.get("role", "")),
+            "content": " ".join(str(message.get("content") or "").split()),
+        }
+        for message in messages
+    ]
+
+
+def cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Content address of a chat completion request"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": normalize_messages(messages),
+            "temperature": round(float(temperature), 3),
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+
+class _Pending:
+    """A synchronous in-flight request other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMResponseCache:
+    """Cached, coalesced chat completions with usage accounting"""
+
+    def __init__(self, store=None, redis_url: Optional[str] = None):
+        self._store = store
+        self.redis_url = redis_url
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_sync: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = key_value_store(
+                KEY_PREFIX, self.redis_url, max_entries=MEMORY_MAX_ENTRIES
+            )
+        return self._store
+
+    async def get_or_call(
+        self, call_type: str, key: str, produce: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Cached answer for key, else the in-flight one, else produce()"""
+        try:
+            value = await self.store.aget(key)
+        except RedisError as e:
+            logger.warning(f"LLM cache read failed, calling the model: {e}")
+            value = None
+        if value is not None:
+            self._count(call_type, "hit")
+            return value
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            self._count(call_type, "coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the leader was cancelled: take over instead of
+                # propagating a cancellation nobody asked this caller for
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.get_or_call(call_type, key, produce)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._count(call_type, "miss")
+        try:
+            value = await produce()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't log it as lost
+            raise
+        else:
+            try:
+                await self.store.aset(key, value, self._ttl(call_type))
+            except RedisError as e:
+                logger.warning(f"LLM cache write failed for {call_type}: {e}")
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def get_or_call_sync(
+        self, call_type: str, key: str, produce: Callable[[], str]
+    ) -> str:
+        """Blocking counterpart of get_or_call() for synchronous clients"""
+        value = self._lookup(call_type, key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            pending = self._inflight_sync.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight_sync[key] = _Pending()
+
+        if not leader:
+            self._count(call_type, "coalesced")
+            if not pending.done.wait(SYNC_WAIT_SECONDS):
+                raise TimeoutError("Timed out waiting for an identical LLM request")
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        self._count(call_type, "miss")
+        try:
+            pending.value = produce()
+            self._save(call_type, key, pending.value)
+            return pending.value
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            pending.done.set()
+            with self._lock:
+                self._inflight_sync.pop(key, None)
+
+    def record_usage(self, call_type: str, usage: Any) -> None:
+        """Count the tokens reported on a completion's usage block"""
+        if usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int) and tokens > 0:
+                self._stats[call_type][f"{kind}_tokens"] += tokens
+                llm_tokens.labels(call_type=call_type, kind=kind).inc(tokens)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per call type counts of hits, misses, coalesced waits and tokens"""
+        report = {}
+        for call_type, counts in self._stats.items():
+            lookups = counts["hit"] + counts["miss"] + counts["coalesced"]
+            report[call_type] = {
+                "hit": counts["hit"],
+                "miss": counts["miss"],
+                "coalesced": counts["coalesced"],
+                "prompt_tokens": counts["prompt_tokens"],
+                "completion_tokens": counts["completion_tokens"],
+                "hit_rate": (
+                    round((counts["hit"] + counts["coalesced"]) / lookups, 4)
+                    if lookups
+                    else 0.0
+                ),
+            }
+        return report
+
+    def _lookup(self, call_type: str, key: str) -> Optional[str]:
+        try:
+            value = self.store.get(key)
+        except RedisError as e:
+            logger.warning(f"LLM cache read failed, calling the model: {e}")
+            return None
+        if value is not None:
+            self._count(call_type, "hit")
+        return value
+
+    def _save(self, call_type: str, key: str, value: str) -> None:
+        try:
+            self.store.set(key, value, self._ttl(call_type))
+        except RedisError as e:
+            logger.warning(f"LLM cache write failed for {call_type}: {e}")
+
+    @staticmethod
+    def _ttl(call_type: str) -> int:
+        return CALL_TTLS.get(call_type, DEFAULT_TTL)
+
+    def _count(self, call_type: str, outcome: str) -> None:
+        self._stats[call_type][outcome] += 1
+        llm_cache_requests.labels(call_type=call_type, outcome=outcome).inc()
+
+
+@process_singleton
+def get_llm_cache() -> LLMResponseCache:
+    """The cache GPT services use unless handed their own"""
+    return LLMResponseCache()
+
+
+# ============================================================================
+# Micro-batching
+# ============================================================================
+
+
+class MicroBatcher:
+    """Groups concurrent single requests into one batched call
+
+    The first request opens a window of max_wait seconds; the batch is sent
+    when the window closes or max_batch requests have joined, whichever is
+    first. flush() receives the items in arrival order and returns one
+    result per item; an exception in place of a result fails that item
+    alone.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 20,
+        max_wait: float = 0.02,
+    ):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()  # the loop only keeps weak references
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._send()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._send)
+        return await future
+
+    def _send(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.flush([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
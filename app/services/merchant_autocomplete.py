@@ -0,0 +1,319 @@
+"""
+Merchant Autocomplete for MITA Finance
+Per-user prefix index behind /transactions/merchants/suggestions
+
+The suggestions endpoint used to run `description ILIKE '%q%'` with a
+GROUP BY over the user's whole ledger on every keystroke. Each user's
+distinct (description, category) pairs are now loaded once with a single
+aggregate query into an in-memory trie keyed on the start of every word, so
+"star" finds both "Starbucks" and "Lucky Star Diner". A lookup walks the
+prefix and ranks what lies below it by frequency and recency.
+
+Indexes are kept for the most recently active users (LRU), updated in place
+when a transaction is created in this process, dropped on edits and deletes,
+and rebuilt after INDEX_TTL_SECONDS so writes made by other workers show up.
+
+Memory, not the number of users, bounds the cache: an index costs about
+NODE_BYTES per trie node (a node per character of every word suffix, so
+~7 KB per typical entry), and least recently used indexes are evicted once
+the total passes MAX_CACHE_BYTES. A user's index holds at most
+MAX_ENTRIES_PER_USER of their most used merchants.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.shared_store import process_singleton
+from app.db.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+MAX_ENTRIES_PER_USER = 2_000
+NODE_BYTES = 350  # measured with tracemalloc, children dict included
+INDEX_TTL_SECONDS = 900
+MAX_SUGGESTIONS = 10
+# Trie depth; longer queries are finished by filtering below that node
+MAX_PREFIX_CHARS = 12
+# Recency boost halves every RECENCY_HALF_LIFE_DAYS since the last use
+RECENCY_HALF_LIFE_DAYS = 30.0
+RECENCY_WEIGHT = 2.0
+
+EntryKey = Tuple[str, str]  # (description, category)
+
+
+def _fold(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _suffixes(folded: str) -> List[str]:
+    """The name from the start of each of its words"""
+    starts = [0] + [i + 1 for i, char in enumerate(folded) if char == " "]
+    return [folded[start:] for start in starts]
+
+
+@dataclass
+class Entry:
+    name: str
+    category: str
+    frequency: int
+    last_used: Optional[datetime]
+    rank: Tuple[float, str] = (0.0, "")
+
+    def score(self, now: datetime) -> float:
+        """log-damped frequency plus a boost that decays with age"""
+        boost = 0.0
+        if self.last_used is not None:
+            last_used = self.last_used
+            if last_used.tzinfo is None:
+                last_used = last_used.replace(tzinfo=timezone.utc)
+            age_days = max((now - last_used).total_seconds(), 0) / 86400
+            boost = RECENCY_WEIGHT * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+        return math.log1p(self.frequency) + boost
+
+
+class _Node:
+    __slots__ = ("children", "top", "deep")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[EntryKey] = []
+        # At MAX_PREFIX_CHARS only: every entry that continues past here
+        self.deep: Optional[Set[EntryKey]] = None
+
+
+class UserMerchantIndex:
+    """One user's suggestions, reachable from the prefix of any word
+
+    Every trie node keeps the best `limit` entries below it, so a lookup is
+    a walk down the prefix and nothing more. Scores are taken as of the
+    build; an index lives for minutes, recency decays over weeks.
+    """
+
+    def __init__(self, limit: int = MAX_SUGGESTIONS, as_of: Optional[datetime] = None):
+        self.limit = limit
+        self.as_of = as_of or datetime.now(timezone.utc)
+        self.built_at = time.monotonic()
+        self.root = _Node()
+        self.entries: Dict[EntryKey, Entry] = {}
+        self.node_count = 1
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.node_count * NODE_BYTES
+
+    def load(self, rows) -> None:
+        """Bulk build from (description, category, frequency, last_used)"""
+        for name, category, frequency, last_used in rows:
+            self._merge(name, category, frequency, last_used)
+        # Best first: each node's list fills with its top entries in order
+        for entry in sorted(self.entries.values(), key=lambda e: e.rank):
+            key = (entry.name, entry.category)
+            for node in self._nodes(entry.name):
+                if len(node.top) < self.limit:
+                    node.top.append(key)
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        frequency: int = 1,
+        last_used: Optional[datetime] = None,
+    ) -> None:
+        """Count one more use; scores only grow, so only this entry moves"""
+        entry = self._merge(name, category, frequency, last_used)
+        if entry is None:
+            return
+        key = (entry.name, entry.category)
+        for node in self._nodes(entry.name):
+            if key not in node.top:
+                node.top.append(key)
+            node.top.sort(key=lambda k: self.entries[k].rank)
+            del node.top[self.limit :]
+
+    def search(self, prefix: str) -> List[Entry]:
+        """Best entries with a word starting with prefix (all for "")"""
+        folded = _fold(prefix)
+        node = self.root
+        for char in folded[:MAX_PREFIX_CHARS]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if len(folded) <= MAX_PREFIX_CHARS:
+            return [self.entries[key] for key in node.top]
+        matches = [
+            self.entries[key]
+            for key in node.deep or ()
+            if any(word.startswith(folded) for word in _suffixes(_fold(key[0])))
+        ]
+        return sorted(matches, key=lambda e: e.rank)[: self.limit]
+
+    def _merge(
+        self, name: str, category: str, frequency: int, last_used: Optional[datetime]
+    ) -> Optional[Entry]:
+        name = " ".join((name or "").split())
+        if not name:
+            return None
+        key = (name, category)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = Entry(name, category, 0, last_used)
+            for suffix in _suffixes(_fold(name)):
+                if len(suffix) > MAX_PREFIX_CHARS:
+                    node = self.root
+                    for char in suffix[:MAX_PREFIX_CHARS]:
+                        node = self._child(node, char)
+                    if node.deep is None:
+                        node.deep = set()
+                    node.deep.add(key)
+        elif last_used and (entry.last_used is None or last_used > entry.last_used):
+            entry.last_used = last_used
+        entry.frequency += frequency
+        entry.rank = (-entry.score(self.as_of), name.casefold())
+        return entry
+
+    def _nodes(self, name: str) -> List[_Node]:
+        """Root plus every node on the paths of the name's word suffixes"""
+        nodes, seen = [self.root], {id(self.root)}
+        for suffix in _suffixes(_fold(name)):
+            node = self.root
+            for char in suffix[:MAX_PREFIX_CHARS]:
+                node = self._child(node, char)
+                if id(node) not in seen:
+                    seen.add(id(node))
+                    nodes.append(node)
+        return nodes
+
+    def _child(self, node: _Node, char: str) -> _Node:
+        child = node.children.get(char)
+        if child is None:
+            child = node.children[char] = _Node()
+            self.node_count += 1
+        return child
+
+
+class MerchantAutocomplete:
+    """Per-user indexes served from memory, built lazily from the ledger"""
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_CACHE_BYTES,
+        ttl: float = INDEX_TTL_SECONDS,
+        max_entries: int = MAX_ENTRIES_PER_USER,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._indexes: "OrderedDict[str, UserMerchantIndex]" = OrderedDict()
+        # Estimated size of each cached index, as last accounted for
+        self._sizes: Dict[str, int] = {}
+        self.cached_bytes = 0
+        self._lock = threading.Lock()
+
+    async def suggest(
+        self, db: AsyncSession, user_id, query: Optional[str] = None
+    ) -> List[Entry]:
+        index = self._cached(user_id)
+        if index is None:
+            index = await self._build(db, user_id)
+        with self._lock:
+            return index.search(query or "")
+
+    def record(self, transaction: Transaction) -> None:
+        """Fold a just-created transaction into its user's index, if loaded"""
+        if not transaction.description:
+            return
+        index = self._cached(transaction.user_id)
+        if index is not None:
+            with self._lock:
+                index.add(
+                    transaction.description,
+                    transaction.category,
+                    last_used=transaction.spent_at,
+                )
+                key = str(transaction.user_id)
+                if self._indexes.get(key) is index:
+                    self._account(key, index)
+                    self._evict()
+
+    def invalidate(self, user_id) -> None:
+        with self._lock:
+            self._drop(str(user_id))
+
+    def _cached(self, user_id) -> Optional[UserMerchantIndex]:
+        key = str(user_id)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                return None
+            if time.monotonic() - index.built_at >= self.ttl:
+                self._drop(key)
+                return None
+            self._indexes.move_to_end(key)
+            return index
+
+    async def _build(self, db: AsyncSession, user_id) -> UserMerchantIndex:
+        started = time.monotonic()
+        result = await db.execute(
+            select(
+                Transaction.description,
+                Transaction.category,
+                func.count(Transaction.id),
+                func.max(Transaction.spent_at),
+            )
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.deleted_at.is_(None),
+                Transaction.description.isnot(None),
+            )
+            .group_by(Transaction.description, Transaction.category)
+            .order_by(func.count(Transaction.id).desc())
+            .limit(self.max_entries)
+        )
+        index = UserMerchantIndex()
+        index.load(result.all())
+
+        key = str(user_id)
+        with self._lock:
+            self._drop(key)
+            self._indexes[key] = index
+            self._account(key, index)
+            self._evict()
+        logger.debug(
+            f"Merchant index for user {user_id}: {len(index.entries)} entries, "
+            f"~{index.estimated_bytes // 1024} KB "
+            f"in {(time.monotonic() - started) * 1000:.1f}ms"
+        )
+        return index
+
+    # Callers hold self._lock
+
+    def _account(self, key: str, index: UserMerchantIndex) -> None:
+        size = index.estimated_bytes
+        self.cached_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _drop(self, key: str) -> None:
+        if self._indexes.pop(key, None) is not None:
+            self.cached_bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self) -> None:
+        """Least recently used first; the newest index always stays"""
+        while self.cached_bytes > self.max_bytes and len(self._indexes) > 1:
+            key, _ = self._indexes.popitem(last=False)
+            self.cached_bytes -= self._sizes.pop(key, 0)
+
+
+@process_singleton
+def get_merchant_autocomplete() -> MerchantAutocomplete:
+    """This worker's per-user merchant indexes, kept fresh by transaction writes"""
+    return MerchantAutocomplete()
@@ -0,0 +1,323 @@
+"""
+Merchant Classifier for MITA Finance
+One-pass keyword matching and a learned merchant→category map
+
+Receipt parsing and receipt categorization each keep their own keyword
+dictionaries. All of them are compiled once per process into a single
+Aho-Corasick automaton whose outputs carry the dictionary (group) and the
+category of every keyword, so a receipt is matched in one pass over its
+text however many categories and keywords there are.
+
+On top of the keywords sits a map learned from the transaction ledger: for
+every normalized merchant name, the category users file it under most often.
+A nightly cron task rebuilds it and publishes it to Redis under
+mita:merchant_map (in process without Redis); every process serves its copy
+from memory and picks up a new one at most RELOAD_SECONDS later.
+
+The ledger files spending under transaction categories (dining,
+transportation, public_transport, ...), while each keyword dictionary has
+its own budget-style names (restaurants, transport, health or healthcare).
+A learned category is translated into the asking dictionary's names
+through LEDGER_SYNONYMS; one with no counterpart there is ignored and the
+keywords decide.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.shared_store import key_value_store, process_singleton
+from app.db.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+MAP_KEY = "mita:merchant_map"
+RELOAD_SECONDS = 300
+# Ledger window and evidence needed before a merchant is learned
+LOOKBACK_DAYS = 365
+MIN_SUPPORT = 3
+
+_STORE_NUMBER = re.compile(r"#\s*\d+|\d+")
+_PUNCTUATION = re.compile(r"[^\w&' ]+")
+
+Match = Tuple[int, str, str]  # (end offset, group, category)
+
+# Ledger category -> keyword dictionary names to try, in order
+LEDGER_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "dining": ("restaurants",),
+    "food": ("groceries", "restaurants"),
+    "transportation": ("transport",),
+    "public_transport": ("transport",),
+    "gas": ("transport",),
+    "clothing": ("shopping",),
+    "healthcare": ("health",),
+    "health": ("healthcare",),
+}
+
+
+def normalize_merchant(name: Optional[str]) -> str:
+    """Merchant name without case, store numbers or punctuation"""
+    text = _STORE_NUMBER.sub(" ", (name or "").lower())
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+# ============================================================================
+# Keyword automaton
+# ============================================================================
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over named keyword dictionaries
+
+    groups maps a group name to {category: [keywords]}. scan() reports every
+    keyword occurrence in the text, overlapping ones included, exactly as
+    `keyword in text` would find it - in a single left-to-right pass.
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, Iterable[str]]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[set] = [set()]
+
+        for group, dictionary in groups.items():
+            for category, keywords in dictionary.items():
+                for keyword in keywords:
+                    keyword = keyword.lower()
+                    if not keyword:
+                        continue
+                    node = 0
+                    for char in keyword:
+                        nxt = self._goto[node].get(char)
+                        if nxt is None:
+                            nxt = len(self._goto)
+                            self._goto[node][char] = nxt
+                            self._goto.append({})
+                            self._fail.append(0)
+                            outputs.append(set())
+                        node = nxt
+                    outputs[node].add((group, category))
+
+        # Breadth-first failure links; each node inherits its suffix's outputs
+        # and transitions, which turns the trie into a DFA: one dict lookup
+        # per character, never a walk back along failure links
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])]
+        self._delta.extend({} for _ in range(1, len(self._goto)))
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._delta[node] = {
+                **self._delta[self._fail[node]],
+                **self._goto[node],
+            }
+            for char, child in self._goto[node].items():
+                self._fail[child] = self._delta[self._fail[node]].get(char, 0)
+                outputs[child] |= outputs[self._fail[child]]
+                queue.append(child)
+        self._out: List[Tuple[Tuple[str, str], ...]] = [
+            tuple(sorted(found)) for found in outputs
+        ]
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def scan(self, text: str) -> Iterator[Match]:
+        """Every (end offset, group, category) keyword hit in text"""
+        delta, out = self._delta, self._out
+        node = 0
+        for index, char in enumerate(text.lower()):
+            node = delta[node].get(char, 0)
+            if out[node]:
+                for group, category in out[node]:
+                    yield index, group, category
+
+
+def _default_groups() -> Dict[str, Dict[str, Iterable[str]]]:
+    # Imported here: the dictionaries live next to their call sites, which
+    # import this module in turn
+    from app.categorization.receipt_categorization_service import (
+        ITEM_KEYWORDS,
+        MERCHANT_KEYWORDS,
+    )
+    from app.ocr.ocr_parser import CATEGORY_KEYWORDS
+
+    return {
+        "receipt": CATEGORY_KEYWORDS,
+        "merchant": MERCHANT_KEYWORDS,
+        "item": ITEM_KEYWORDS,
+    }
+
+
+# ============================================================================
+# Learned merchant map
+# ============================================================================
+
+
+def build_learned_map(
+    db: Session,
+    lookback_days: int = LOOKBACK_DAYS,
+    min_support: int = MIN_SUPPORT,
+) -> Dict[str, str]:
+    """Most frequent ledger category per normalized merchant
+
+    Grouping happens in the database; spellings of one merchant are merged
+    afterwards. Merchants seen fewer than min_support times and "other" are
+    left out.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+    rows = db.execute(
+        select(Transaction.merchant, Transaction.category, func.count())
+        .where(
+            Transaction.merchant.isnot(None),
+            Transaction.deleted_at.is_(None),
+            Transaction.spent_at >= since,
+        )
+        .group_by(Transaction.merchant, Transaction.category)
+    )
+
+    votes: Dict[str, Counter] = defaultdict(Counter)
+    for merchant, category, count in rows:
+        name = normalize_merchant(merchant)
+        if name and category and category != "other":
+            votes[name][category] += count
+
+    learned = {}
+    for name, counts in votes.items():
+        category, count = max(counts.items(), key=lambda kv: (kv[1], kv[0]))
+        if count >= min_support:
+            learned[name] = category
+    return learned
+
+
+# ============================================================================
+# Classifier
+# ============================================================================
+
+
+class MerchantClassifier:
+    """Compiled keyword automaton plus the learned merchant map"""
+
+    def __init__(
+        self,
+        groups: Optional[Dict[str, Dict[str, Iterable[str]]]] = None,
+        store=None,
+        redis_url: Optional[str] = None,
+        reload_seconds: float = RELOAD_SECONDS,
+    ):
+        groups = groups if groups is not None else _default_groups()
+        self.automaton = KeywordAutomaton(groups)
+        self.vocabularies = {
+            group: set(dictionary) for group, dictionary in groups.items()
+        }
+        self._store = store
+        self.redis_url = redis_url
+        self.reload_seconds = reload_seconds
+        self._learned: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = key_value_store("", self.redis_url)
+        return self._store
+
+    # Keywords -------------------------------------------------------------
+
+    def scan(self, text: str) -> Iterator[Match]:
+        return self.automaton.scan(text)
+
+    def scan_segments(
+        self, segments: List[str], group: Optional[str] = None
+    ) -> Iterator[Tuple[int, str, str]]:
+        """(segment index, group, category) hits over many texts in one pass
+
+        The segments are joined by newlines, which no keyword contains, so a
+        match never spans two of them.
+        """
+        segments = [segment.lower().replace("\n", " ") for segment in segments]
+        ends = []
+        offset = -1
+        for segment in segments:
+            offset += len(segment) + 1
+            ends.append(offset)
+        segment = 0
+        for end, hit_group, category in self.automaton.scan("\n".join(segments)):
+            if group is not None and hit_group != group:
+                continue
+            while ends[segment] < end:
+                segment += 1
+            yield segment, hit_group, category
+
+    # Learned map ------------------------------------------------------------
+
+    def learned_category(
+        self, merchant: Optional[str], group: Optional[str] = None
+    ) -> Optional[str]:
+        """The ledger's usual category for this merchant, if it has one
+
+        With `group`, in that keyword dictionary's names, or None when it
+        has no counterpart there.
+        """
+        name = normalize_merchant(merchant)
+        if not name:
+            return None
+        category = self.learned_map().get(name)
+        if category is None or group is None:
+            return category
+        vocabulary = self.vocabularies.get(group, ())
+        for candidate in (category, *LEDGER_SYNONYMS.get(category, ())):
+            if candidate in vocabulary:
+                return candidate
+        return None
+
+    def learned_map(self) -> Dict[str, str]:
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.reload_seconds:
+            with self._lock:
+                if (
+                    self._loaded_at is None
+                    or now - self._loaded_at >= self.reload_seconds
+                ):
+                    self._reload()
+                    self._loaded_at = now
+        return self._learned
+
+    def rebuild(self, db: Session) -> int:
+        """Relearn the map from the ledger, publish it and serve it"""
+        learned = build_learned_map(db)
+        try:
+            self.store.set(MAP_KEY, json.dumps(learned, separators=(",", ":")))
+        except RedisError as e:
+            logger.warning(f"Could not publish merchant map: {e}")
+        self._learned = learned
+        self._loaded_at = time.monotonic()
+        logger.info(f"Learned categories for {len(learned)} merchants")
+        return len(learned)
+
+    def _reload(self) -> None:
+        try:
+            value = self.store.get(MAP_KEY)
+        except RedisError as e:
+            logger.warning(f"Merchant map read failed, keeping current copy: {e}")
+            return
+        if value is None:
+            return
+        try:
+            self._learned = json.loads(value)
+        except ValueError as e:
+            logger.warning(f"Ignoring malformed merchant map: {e}")
+
+
+@process_singleton
+def get_merchant_classifier() -> MerchantClassifier:
+    """The classifier receipt parsing, categorization and the cron task share"""
+    return MerchantClassifier()
@@ -0,0 +1,392 @@
+"""
+Notification Dispatcher for MITA Finance
+Bulk delivery of scheduled notifications
+
+Due notifications are claimed a chunk at a time with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can drain a
+backlog side by side without double-sending: rows another worker holds are
+skipped rather than waited on. The claim marks the rows DISPATCHING and
+commits straight away, so no row lock or transaction stays open while FCM
+and SMTP are called. Each chunk is then delivered per channel in bulk - FCM
+batch calls that stop at each user's first working token, concurrent emails
+for the rest - and its outcome is written back with a single UPDATE,
+together with the delivery log rows, in a second short transaction.
+
+A claim is a lease: rows left DISPATCHING for CLAIM_LEASE (a worker died
+mid-chunk) are claimed again.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models.notification import (
+    Notification,
+    NotificationPriority,
+    NotificationStatus,
+)
+from app.db.models.notification_log import NotificationLog
+from app.db.models.push_token import PushToken
+from app.db.models.user import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+EMAIL_CONCURRENCY = 20
+# Past this, a DISPATCHING row is taken to be abandoned and claimed again
+CLAIM_LEASE = timedelta(minutes=10)
+
+PushSender = Callable[[list], List[bool]]
+EmailSender = Callable[[List[Dict]], List[bool]]
+
+
+def push_data(notification: Notification) -> Dict:
+    """FCM data payload for a notification"""
+    data = {
+        "notification_id": str(notification.id),
+        "type": notification.type,
+        "priority": notification.priority,
+        "category": notification.category or "",
+    }
+    if notification.action_url:
+        data["action_url"] = notification.action_url
+    if notification.data:
+        data.update(notification.data)
+    return data
+
+
+def email_job(notification: Notification, email: str, name: Optional[str]) -> Dict:
+    """Keyword arguments for EmailService.send_email() for a notification"""
+    from app.services.email_service import EmailPriority, EmailType
+
+    # Map notification priority to email priority
+    priority = EmailPriority.NORMAL
+    if notification.priority == NotificationPriority.HIGH.value:
+        priority = EmailPriority.HIGH
+    elif notification.priority == NotificationPriority.LOW.value:
+        priority = EmailPriority.LOW
+
+    # Determine email type based on notification category
+    email_type = EmailType.WELCOME  # Default
+    if notification.category == "budget":
+        email_type = EmailType.BUDGET_ALERT
+    elif notification.category == "security":
+        email_type = EmailType.SECURITY_ALERT
+    elif notification.category == "transaction":
+        email_type = EmailType.TRANSACTION_CONFIRMATION
+
+    return {
+        "to_email": email,
+        "email_type": email_type,
+        "variables": {
+            "title": notification.title,
+            "message": notification.message,
+            "action_url": notification.action_url or "",
+            "user_name": name or email,
+        },
+        "priority": priority,
+        "user_id": str(notification.user_id),
+    }
+
+
+def email_log_engine():
+    """Async engine for EmailService's delivery log rows
+
+    Email batches run under asyncio.run() from sync code, on a loop of their
+    own, so they cannot borrow the app's engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import settings
+
+    return create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        connect_args={
+            "statement_cache_size": 0,  # CRITICAL: Disable for PgBouncer
+            "prepared_statement_cache_size": 0,  # CRITICAL: Disable for PgBouncer
+            "server_settings": {"jit": "off"},
+        },
+    )
+
+
+def send_emails(jobs: List[Dict], concurrency: int = EMAIL_CONCURRENCY) -> List[bool]:
+    """Send EmailService.send_email() jobs concurrently; one flag per job
+
+    Each send gets its own session for the delivery log; an AsyncSession
+    must not be shared by concurrent coroutines.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.services.email_service import EmailService
+
+    async def send_all():
+        engine = email_log_engine()
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        service = EmailService()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def send(job):
+            async with gate, sessions() as session:
+                return (await service.send_email(**job, db=session)).success
+
+        try:
+            return await asyncio.gather(
+                *(send(job) for job in jobs), return_exceptions=True
+            )
+        finally:
+            await engine.dispose()
+
+    return [result is True for result in asyncio.run(send_all())]
+
+
+def _default_push_sender(messages: list) -> List[bool]:
+    from app.services.push_service import send_push_batch
+
+    return send_push_batch(messages)
+
+
+def _build_push_message(notification: Notification, token: str):
+    from app.services.push_service import build_push_message
+
+    return build_push_message(
+        user_id=notification.user_id,
+        token=token,
+        title=notification.title,
+        body=notification.message,
+        data=push_data(notification),
+        image_url=notification.image_url,
+    )
+
+
+@dataclass
+class DispatchResult:
+    """Totals over one or more claimed chunks"""
+
+    claimed: int = 0
+    delivered: Dict[str, int] = field(default_factory=dict)
+    failed: int = 0
+    chunks: int = 0
+
+    def add(self, other: "DispatchResult") -> None:
+        self.claimed += other.claimed
+        self.failed += other.failed
+        self.chunks += other.chunks
+        for channel, count in other.delivered.items():
+            self.delivered[channel] = self.delivered.get(channel, 0) + count
+
+
+class ScheduledNotificationDispatcher:
+    """Claims due PENDING notifications in chunks and delivers them in bulk"""
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        push_sender: Optional[PushSender] = None,
+        email_sender: Optional[EmailSender] = None,
+        build_message: Callable = _build_push_message,
+    ):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.push_sender = push_sender or _default_push_sender
+        self.email_sender = email_sender or send_emails
+        self.build_message = build_message
+
+    def claim_query(self, now: datetime):
+        return (
+            select(Notification)
+            .where(
+                or_(
+                    and_(
+                        Notification.status == NotificationStatus.PENDING.value,
+                        Notification.scheduled_for <= now,
+                    ),
+                    and_(
+                        Notification.status == NotificationStatus.DISPATCHING.value,
+                        Notification.updated_at <= now - CLAIM_LEASE,
+                    ),
+                )
+            )
+            .order_by(Notification.scheduled_for)
+            .limit(self.chunk_size)
+            .with_for_update(skip_locked=True)
+        )
+
+    def run(self, max_chunks: Optional[int] = None) -> DispatchResult:
+        """Drain due notifications until none are left to claim"""
+        total = DispatchResult()
+        while max_chunks is None or total.chunks < max_chunks:
+            result = self.dispatch_chunk()
+            if not result.claimed:
+                break
+            total.add(result)
+
+        logger.info(
+            f"Dispatched {total.claimed} scheduled notifications in "
+            f"{total.chunks} chunks: delivered {total.delivered}, "
+            f"failed {total.failed}"
+        )
+        return total
+
+    def dispatch_chunk(self, now: Optional[datetime] = None) -> DispatchResult:
+        """Claim one chunk, deliver it outside any transaction, record it"""
+        now = now or datetime.now(timezone.utc)
+        claimed, tokens, users = self._claim(now)
+        if not claimed:
+            return DispatchResult()
+
+        outcomes = self._deliver(claimed, tokens, users)
+        try:
+            self._record(claimed, outcomes, now)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result = DispatchResult(claimed=len(claimed), chunks=1)
+        for channel in outcomes.values():
+            if channel is None:
+                result.failed += 1
+            else:
+                result.delivered[channel] = result.delivered.get(channel, 0) + 1
+        return result
+
+    def _claim(self, now: datetime) -> Tuple[List[Notification], Dict, Dict]:
+        """Mark a chunk DISPATCHING and load its recipients, then commit"""
+        try:
+            claimed = self.db.execute(self.claim_query(now)).scalars().all()
+            if not claimed:
+                self.db.commit()
+                return [], {}, {}
+
+            self.db.execute(
+                update(Notification)
+                .where(Notification.id.in_([n.id for n in claimed]))
+                .values(status=NotificationStatus.DISPATCHING.value, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            user_ids = {notification.user_id for notification in claimed}
+            tokens: Dict = {}
+            for user_id, token in self.db.execute(
+                select(PushToken.user_id, PushToken.token).where(
+                    PushToken.user_id.in_(user_ids)
+                )
+            ):
+                tokens.setdefault(user_id, []).append(token)
+            users = {
+                user_id: (email, name)
+                for user_id, email, name in self.db.execute(
+                    select(User.id, User.email, User.name).where(User.id.in_(user_ids))
+                )
+                if email
+            }
+            # Keep the loaded rows usable after commit without a new query
+            for notification in claimed:
+                self.db.expunge(notification)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return claimed, tokens, users
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _deliver(
+        self, notifications: Sequence[Notification], tokens: Dict, users: Dict
+    ) -> Dict:
+        """Channel each notification went out on, or None if it failed"""
+        outcomes = {notification.id: None for notification in notifications}
+
+        # Push: like the single-notification path, a user's tokens are tried
+        # in turn until one succeeds. Round n sends every still-undelivered
+        # notification's n-th token in one bulk call.
+        attempt = 0
+        while True:
+            targets: List[Tuple[Notification, str]] = [
+                (notification, tokens[notification.user_id][attempt])
+                for notification in notifications
+                if outcomes[notification.id] is None
+                and attempt < len(tokens.get(notification.user_id, ()))
+            ]
+            if not targets:
+                break
+            sent = self.push_sender(
+                [self.build_message(n, token) for n, token in targets]
+            )
+            for (notification, _), success in zip(targets, sent):
+                if success:
+                    outcomes[notification.id] = "push"
+            attempt += 1
+
+        # Email fallback for the rest, sent concurrently
+        mailable = [
+            n for n in notifications if outcomes[n.id] is None and n.user_id in users
+        ]
+        if mailable:
+            sent = self.email_sender(
+                [email_job(n, *users[n.user_id]) for n in mailable]
+            )
+            for notification, success in zip(mailable, sent):
+                if success:
+                    outcomes[notification.id] = "email"
+
+        return outcomes
+
+    def _record(
+        self, notifications: Sequence[Notification], outcomes: Dict, now: datetime
+    ) -> None:
+        """One UPDATE for the whole chunk, plus log rows for the deliveries"""
+        delivered = {id_: channel for id_, channel in outcomes.items() if channel}
+        failed = [id_ for id_, channel in outcomes.items() if channel is None]
+        status = {id_: NotificationStatus.DELIVERED.value for id_ in delivered}
+        status.update({id_: NotificationStatus.FAILED.value for id_ in failed})
+
+        values = {
+            "status": case(status, value=Notification.id),
+            "updated_at": now,
+        }
+        if delivered:
+            values["channel"] = case(
+                delivered, value=Notification.id, else_=Notification.channel
+            )
+            values["sent_at"] = case(
+                {id_: now for id_ in delivered},
+                value=Notification.id,
+                else_=Notification.sent_at,
+            )
+            values["delivered_at"] = case(
+                {id_: now for id_ in delivered},
+                value=Notification.id,
+                else_=Notification.delivered_at,
+            )
+        if failed:
+            values["error_message"] = case(
+                {id_: "Both push and email delivery failed" for id_ in failed},
+                value=Notification.id,
+                else_=Notification.error_message,
+            )
+
+        self.db.execute(
+            update(Notification)
+            .where(Notification.id.in_(list(outcomes)))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.add_all(
+            NotificationLog(
+                user_id=notification.user_id,
+                channel=delivered[notification.id],
+                message=f"{notification.title}: {notification.message}",
+                success=True,
+                created_at=now,
+            )
+            for notification in notifications
+            if notification.id in delivered
+        )
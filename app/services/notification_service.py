@@ -4,12 +4,13 @@ Handles creation, delivery, scheduling, and tracking of all notifications
 """
 
 import asyncio
+import base64
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, tuple_
 from sqlalchemy.orm import Session
 
 from app.db.models.notification import (
@@ -20,12 +21,38 @@ from app.db.models.notification import (
 )
 from app.db.models.push_token import PushToken
 from app.db.models.user import User
+from app.services.notification_dispatcher import (
+    DEFAULT_CHUNK_SIZE,
+    ScheduledNotificationDispatcher,
+    email_job,
+    email_log_engine,
+    push_data,
+)
 from app.services.notification_log_service import log_notification
+from app.services.partition_maintenance import batched_delete
 from app.services.push_service import send_push_notification
+from app.services.unread_counter import get_unread_counter
 
 logger = logging.getLogger(__name__)
 
 
+def encode_cursor(notification: Notification) -> str:
+    """Opaque keyset cursor pointing just past `notification`"""
+    raw = f"{notification.created_at.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of encode_cursor(); ValueError for anything malformed"""
+    try:
+        created_at, notification_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), UUID(notification_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
 class NotificationService:
     """Service for managing notifications"""
 
@@ -92,6 +119,7 @@ class NotificationService:
         self.db.add(notification)
         self.db.commit()
         self.db.refresh(notification)
+        get_unread_counter().created(user_id, expires_at)
 
         # Send immediately if requested and not scheduled
         if send_immediately and not scheduled_for:
@@ -122,67 +150,26 @@ class NotificationService:
                 return False
 
             # Import email service here to avoid circular imports
-            from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+            from sqlalchemy.ext.asyncio import AsyncSession
             from sqlalchemy.orm import sessionmaker
 
-            from app.core.config import settings
-            from app.services.email_service import (
-                EmailPriority,
-                EmailService,
-                EmailType,
-            )
+            from app.services.email_service import EmailService
 
             # Create async database session for email service
             async def send_email_async():
-                engine = create_async_engine(
-                    settings.ASYNC_DATABASE_URL,
-                    connect_args={
-                        "statement_cache_size": 0,  # CRITICAL: Disable for PgBouncer
-                        "prepared_statement_cache_size": 0,  # CRITICAL: Disable for PgBouncer
-                        "server_settings": {"jit": "off"},
-                    },
-                )
+                engine = email_log_engine()
                 async_session = sessionmaker(
                     engine, class_=AsyncSession, expire_on_commit=False
                 )
                 async with async_session() as session:
                     email_service = EmailService()
 
-                    # Map notification priority to email priority
-                    email_priority = EmailPriority.NORMAL
-                    if notification.priority == NotificationPriority.HIGH.value:
-                        email_priority = EmailPriority.HIGH
-                    elif notification.priority == NotificationPriority.LOW.value:
-                        email_priority = EmailPriority.LOW
-
-                    # Determine email type based on notification category
-                    email_type = EmailType.WELCOME  # Default
-                    if notification.category == "budget":
-                        email_type = EmailType.BUDGET_ALERT
-                    elif notification.category == "security":
-                        email_type = EmailType.SECURITY_ALERT
-                    elif notification.category == "transaction":
-                        email_type = EmailType.TRANSACTION_CONFIRMATION
-
-                    # Prepare email variables
-                    variables = {
-                        "title": notification.title,
-                        "message": notification.message,
-                        "action_url": notification.action_url or "",
-                        # User has a `name` column (no full_name attribute —
-                        # the old access broke the email fallback entirely)
-                        "user_name": getattr(user, "name", None) or user.email,
-                    }
-
-                    # Send email
-                    result = await email_service.send_email(
-                        to_email=user.email,
-                        email_type=email_type,
-                        variables=variables,
-                        priority=email_priority,
-                        user_id=str(user.id),
-                        db=session,
+                    # User has a `name` column (no full_name attribute —
+                    # the old access broke the email fallback entirely)
+                    job = email_job(
+                        notification, user.email, getattr(user, "name", None)
                     )
+                    result = await email_service.send_email(**job, db=session)
 
                     return result.success
 
@@ -243,26 +230,12 @@ class NotificationService:
                 # Try push notification
                 for push_token in push_tokens:
                     try:
-                        # Build notification data
-                        fcm_data = {
-                            "notification_id": str(notification.id),
-                            "type": notification.type,
-                            "priority": notification.priority,
-                            "category": notification.category or "",
-                        }
-
-                        if notification.action_url:
-                            fcm_data["action_url"] = notification.action_url
-
-                        if notification.data:
-                            fcm_data.update(notification.data)
-
                         # Send via FCM
                         success = send_push_notification(
                             token=push_token.token,
                             title=notification.title,
                             body=notification.message,
-                            data=fcm_data,
+                            data=push_data(notification),
                             image_url=notification.image_url,
                             user_id=notification.user_id,
                             db=self.db,
@@ -327,6 +300,7 @@ class NotificationService:
         notification_type: Optional[str] = None,
         priority: Optional[str] = None,
         category: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> List[Notification]:
         """
         Get notifications for a user with optional filters
@@ -334,11 +308,12 @@ class NotificationService:
         Args:
             user_id: User ID
             limit: Maximum number of notifications to return
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored when a cursor is given)
             unread_only: Only return unread notifications
             notification_type: Filter by notification type
             priority: Filter by priority level
             category: Filter by category
+            cursor: Keyset cursor from the previous page (see encode_cursor)
 
         Returns:
             List of notifications
@@ -366,13 +341,21 @@ class NotificationService:
             )
         )
 
-        # Order by creation date (newest first)
-        query = query.order_by(Notification.created_at.desc())
+        # Order by creation date (newest first), id breaking ties
+        query = query.order_by(Notification.created_at.desc(), Notification.id.desc())
 
-        # Apply pagination
-        query = query.limit(limit).offset(offset)
+        # Keyset pagination: seek past the cursor along the (user_id,
+        # created_at, id) index instead of counting through skipped rows
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Notification.created_at, Notification.id)
+                < tuple_(created_at, last_id)
+            )
+        elif offset:
+            query = query.offset(offset)
 
-        return query.all()
+        return query.limit(limit).all()
 
     def get_notification_by_id(
         self, notification_id: UUID, user_id: UUID
@@ -400,6 +383,7 @@ class NotificationService:
             notification.read_at = datetime.now(timezone.utc)
             self.db.commit()
             self.db.refresh(notification)
+            get_unread_counter().removed(user_id, notification.expires_at)
 
             logger.info(
                 f"Marked notification {notification_id} as read for user {user_id}"
@@ -409,7 +393,7 @@ class NotificationService:
 
     def mark_all_as_read(self, user_id: UUID) -> int:
         """Mark all notifications as read for a user"""
-        notifications = (
+        count = (
             self.db.query(Notification)
             .filter(
                 and_(
@@ -417,16 +401,17 @@ class NotificationService:
                     Notification.is_read.is_(False),
                 )
             )
-            .all()
+            .update(
+                {
+                    Notification.is_read: True,
+                    Notification.read_at: datetime.now(timezone.utc),
+                },
+                synchronize_session=False,
+            )
         )
-
-        for notification in notifications:
-            notification.is_read = True
-            notification.read_at = datetime.now(timezone.utc)
-
         self.db.commit()
+        get_unread_counter().invalidate(user_id)
 
-        count = len(notifications)
         logger.info(f"Marked {count} notifications as read for user {user_id}")
         return count
 
@@ -435,84 +420,56 @@ class NotificationService:
         notification = self.get_notification_by_id(notification_id, user_id)
 
         if notification:
+            was_unread, expires_at = not notification.is_read, notification.expires_at
             self.db.delete(notification)
             self.db.commit()
+            if was_unread:
+                get_unread_counter().removed(user_id, expires_at)
             logger.info(f"Deleted notification {notification_id} for user {user_id}")
             return True
 
         return False
 
     def get_unread_count(self, user_id: UUID) -> int:
-        """Get count of unread notifications for a user"""
-        return (
-            self.db.query(Notification)
-            .filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.is_read.is_(False),
-                    or_(
-                        Notification.expires_at.is_(None),
-                        Notification.expires_at > datetime.now(timezone.utc),
-                    ),
-                )
-            )
-            .count()
-        )
+        """Get count of unread notifications for a user
 
-    def send_scheduled_notifications(self):
+        Served from the cached per-user counter; see UnreadCounter.
+        """
+        return get_unread_counter().count(self.db, user_id)
+
+    def send_scheduled_notifications(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
         """
         Send all notifications that are scheduled for delivery
         Should be called by a cron job or background task
-        """
-        now = datetime.now(timezone.utc)
 
-        scheduled_notifications = (
-            self.db.query(Notification)
-            .filter(
-                and_(
-                    Notification.status == NotificationStatus.PENDING.value,
-                    Notification.scheduled_for <= now,
-                )
-            )
-            .all()
-        )
-
-        logger.info(
-            f"Found {len(scheduled_notifications)} scheduled notifications to send"
-        )
-
-        for notification in scheduled_notifications:
-            self._deliver_notification(notification)
+        Claims due notifications in chunks with FOR UPDATE SKIP LOCKED, so
+        several workers can run this concurrently; see
+        ScheduledNotificationDispatcher.
+        """
+        return ScheduledNotificationDispatcher(self.db, chunk_size=chunk_size).run()
 
-    def cleanup_old_notifications(self, days: int = 30):
+    def cleanup_old_notifications(self, days: int = 30, batch_size: int = 5000):
         """
-        Clean up old notifications (older than specified days)
+        Clean up old notifications (older than specified days) and expired ones
         Should be called by a cron job
-        """
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-        old_notifications = (
-            self.db.query(Notification)
-            .filter(
-                or_(
-                    Notification.created_at < cutoff_date,
-                    and_(
-                        Notification.expires_at.isnot(None),
-                        Notification.expires_at < datetime.now(timezone.utc),
-                    ),
-                )
-            )
-            .all()
+        Deletes in short ctid-keyed batches rather than loading rows into the
+        ORM; returns the number of rows removed.
+        """
+        now = datetime.now(timezone.utc)
+        report = batched_delete(
+            self.db,
+            Notification.__tablename__,
+            "created_at < :cutoff OR (expires_at IS NOT NULL AND expires_at < :now)",
+            {"cutoff": now - timedelta(days=days), "now": now},
+            batch_size=batch_size,
         )
 
-        for notification in old_notifications:
-            self.db.delete(notification)
-
-        self.db.commit()
-
-        count = len(old_notifications)
-        logger.info(f"Cleaned up {count} old notifications")
-        return count
+        logger.info(
+            f"Cleaned up {report.rows} old notifications "
+            f"({report.rows_per_second:.0f} rows/s)"
+        )
+        return report.rows
 
     def get_grouped_notifications(
         self, user_id: UUID, group_key: str
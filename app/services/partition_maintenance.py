@@ -0,0 +1,348 @@
+"""
+Partition Maintenance for MITA Finance
+Monthly range partitions and batched retention for append-heavy log tables
+
+notification_logs, the analytics logs and audit_logs are partitioned by month
+on their time column (alembic 0037). Retention drops whole partitions, which
+is a catalog operation instead of a DELETE that has to visit, WAL-log and later
+vacuum every expired row. Each table also has a DEFAULT partition catching
+rows outside the prepared months (client-supplied timestamps, or a database
+created with create_all before the first maintenance run).
+
+audit_logs keeps the active region's compliance retention period (seven
+years in the US), not a log-table one.
+
+Tables that are not partitioned, and the default partitions, are trimmed with
+batched_delete(): short ctid-keyed DELETE statements, each in its own
+transaction, so no single statement holds locks or bloats for long.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.validation_config import config_manager, get_current_region
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MONTHS_AHEAD = 3
+DEFAULT_BATCH_SIZE = 5000
+AUDIT_RETENTION_YEARS_DEFAULT = 7
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A log table range-partitioned by month on `column`"""
+
+    name: str
+    column: str
+    retention_days: int
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.name}_default"
+
+
+def audit_retention_days() -> int:
+    """The region's audit retention period in days, leap years included"""
+    config = config_manager.get_config(get_current_region())
+    rules = config.compliance_rules if config else {}
+    years = rules.get("retention_period_years", AUDIT_RETENTION_YEARS_DEFAULT)
+    return int(years) * 366
+
+
+PARTITIONED_TABLES: Tuple[PartitionedTable, ...] = (
+    PartitionedTable("notification_logs", "created_at", retention_days=180),
+    PartitionedTable("feature_usage_logs", "timestamp", retention_days=395),
+    PartitionedTable("feature_access_logs", "timestamp", retention_days=395),
+    PartitionedTable("paywall_impression_logs", "timestamp", retention_days=395),
+    PartitionedTable("audit_logs", "timestamp", retention_days=audit_retention_days()),
+)
+
+
+@dataclass
+class DeleteReport:
+    """Outcome of one retention pass over a table"""
+
+    table: str
+    rows: int = 0  # deleted row by row, exact
+    dropped_rows_estimate: int = 0  # planner estimate for dropped partitions
+    seconds: float = 0.0
+    batches: int = 0
+    dropped_partitions: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "table": self.table,
+            "rows": self.rows,
+            "dropped_rows_estimate": self.dropped_rows_estimate,
+            "seconds": round(self.seconds, 3),
+            "batches": self.batches,
+            "rows_per_second": round(self.rows_per_second, 1),
+            "dropped_partitions": list(self.dropped_partitions),
+        }
+
+
+# ============================================================================
+# Partition naming and planning
+# ============================================================================
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition this module created, else None"""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bound(month: date) -> str:
+    # The explicit UTC offset is honoured by timestamptz columns and ignored
+    # by plain timestamp ones, so both get UTC month boundaries
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def plan_partitions(
+    table: PartitionedTable,
+    existing: Iterable[str],
+    now: datetime,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+) -> Tuple[List[date], List[str]]:
+    """Months to create and partitions to drop
+
+    Creates the current month plus `months_ahead`. A partition is dropped only
+    once its whole range is older than the retention cutoff.
+    """
+    existing = list(existing)
+    covered = {partition_month(table.name, name) for name in existing}
+    current = month_start(now)
+    to_create = [
+        month
+        for month in (add_months(current, i) for i in range(months_ahead + 1))
+        if month not in covered
+    ]
+
+    cutoff = (now - timedelta(days=table.retention_days)).date()
+    to_drop = sorted(
+        name
+        for name in existing
+        if (month := partition_month(table.name, name)) is not None
+        and add_months(month, 1) <= cutoff
+    )
+    return to_create, to_drop
+
+
+# ============================================================================
+# Batched delete
+# ============================================================================
+
+
+def batched_delete_sql(table: str, where: str) -> str:
+    return (
+        f"DELETE FROM {table} WHERE ctid IN "
+        f"(SELECT ctid FROM {table} WHERE {where} LIMIT :batch_size)"
+    )
+
+
+def batched_delete(
+    db: Session,
+    table: str,
+    where: str,
+    params: Optional[Dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> DeleteReport:
+    """Delete rows matching `where` in commits of at most `batch_size` rows
+
+    `table` must be a plain table or a single partition: ctid only identifies
+    a row within one relation.
+    """
+    statement = text(batched_delete_sql(table, where))
+    bound = {**(params or {}), "batch_size": batch_size}
+    report = DeleteReport(table=table)
+    started = time.perf_counter()
+
+    while max_batches is None or report.batches < max_batches:
+        try:
+            deleted = db.execute(statement, bound).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        report.batches += 1
+        report.rows += deleted
+        if deleted < batch_size:
+            break
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Deleted {report.rows} rows from {table} in {report.batches} batches "
+        f"({report.rows_per_second:.0f} rows/s)"
+    )
+    return report
+
+
+# ============================================================================
+# Maintenance
+# ============================================================================
+
+_LIST_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    """
+)
+
+
+def _create_partition(db: Session, table: PartitionedTable, month: date) -> None:
+    name = partition_name(table.name, month)
+    start, end = _bound(month), _bound(add_months(month, 1))
+    in_range = f"{table.column} >= {start} AND {table.column} < {end}"
+
+    db.execute(text(f"LOCK TABLE {table.default_partition} IN EXCLUSIVE MODE"))
+    stranded = db.execute(
+        text(f"SELECT 1 FROM {table.default_partition} WHERE {in_range} LIMIT 1")
+    ).first()
+    if stranded is None:
+        db.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {table.name} "
+                f"FOR VALUES FROM ({start}) TO ({end})"
+            )
+        )
+        return
+
+    # Rows for this month already sit in the default partition, which would
+    # make a plain CREATE ... PARTITION OF fail. Move them into a standalone
+    # table and attach it; the lock above keeps new ones from arriving.
+    db.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {table.default_partition} "
+            f"WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+    )
+    db.execute(
+        text(
+            f"ALTER TABLE {table.name} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ({start}) TO ({end})"
+        )
+    )
+
+
+def _drop_partition(db: Session, table: PartitionedTable, name: str) -> int:
+    """Detach and drop a partition; returns the planner's row estimate
+
+    Counting exactly would scan the partition the drop exists to avoid.
+    """
+    rows = db.execute(
+        text("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE relname = :n"),
+        {"n": name},
+    ).scalar()
+    db.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    return int(rows or 0)
+
+
+def maintain_table(
+    db: Session,
+    table: PartitionedTable,
+    now: Optional[datetime] = None,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> DeleteReport:
+    """Prepare upcoming partitions and apply retention to one table"""
+    now = now or datetime.now(timezone.utc)
+    existing = [
+        row[0] for row in db.execute(_LIST_PARTITIONS_SQL, {"table": table.name})
+    ]
+    to_create, to_drop = plan_partitions(table, existing, now, months_ahead)
+
+    report = DeleteReport(table=table.name)
+    started = time.perf_counter()
+    for month in to_create:
+        try:
+            _create_partition(db, table, month)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    for name in to_drop:
+        try:
+            report.dropped_rows_estimate += _drop_partition(db, table, name)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        report.dropped_partitions.append(name)
+    report.seconds = time.perf_counter() - started
+
+    # Out-of-range rows in the default partition age out row by row
+    leftovers = batched_delete(
+        db,
+        table.default_partition,
+        f"{table.column} < :cutoff",
+        {"cutoff": now - timedelta(days=table.retention_days)},
+        batch_size=batch_size,
+    )
+    report.rows += leftovers.rows
+    report.batches += leftovers.batches
+    report.seconds += leftovers.seconds
+
+    logger.info(
+        f"Partition maintenance on {table.name}: created {len(to_create)}, "
+        f"dropped {len(to_drop)} (~{report.dropped_rows_estimate} rows), "
+        f"deleted {report.rows} rows ({report.rows_per_second:.0f} rows/s)"
+    )
+    return report
+
+
+def maintain_partitions(
+    db: Session,
+    tables: Sequence[PartitionedTable] = PARTITIONED_TABLES,
+    now: Optional[datetime] = None,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+) -> List[DeleteReport]:
+    """Run maintain_table() over every partitioned log table
+
+    A failure on one table is logged and does not stop the others.
+    """
+    reports = []
+    for table in tables:
+        try:
+            reports.append(maintain_table(db, table, now, months_ahead))
+        except Exception as e:
+            logger.error(f"Partition maintenance failed for {table.name}: {e}")
+    return reports
@@ -1,5 +1,5 @@
 import collections
-from typing import Optional
+from typing import List, Optional
 
 if not hasattr(collections, "MutableMapping"):
     import collections.abc
@@ -74,6 +74,63 @@ def _record_log(
         )
 
 
+# FCM accepts at most this many messages per send_each() call
+FCM_BATCH_LIMIT = 500
+
+
+def build_push_message(
+    *,
+    user_id,
+    token: str,
+    body: str,
+    title: Optional[str] = None,
+    data: Optional[dict] = None,
+    image_url: Optional[str] = None,
+) -> messaging.Message:
+    """Build the FCM message send_push_notification() and send_push_batch() send."""
+    # Build notification data
+    notification_data = {"user_id": str(user_id)}
+    if data:
+        notification_data.update(data)
+
+    # Build FCM message
+    fcm_notification = messaging.Notification(
+        title=title or "Mita Finance",
+        body=body,
+    )
+
+    # Add image if provided
+    if image_url:
+        fcm_notification.image = image_url
+
+    return messaging.Message(
+        notification=fcm_notification,
+        token=token,
+        data=notification_data,
+    )
+
+
+def send_push_batch(messages: List[messaging.Message]) -> List[bool]:
+    """Send many FCM messages with one HTTP batch per FCM_BATCH_LIMIT messages.
+
+    Returns one success flag per message, in order. Unlike
+    send_push_notification() nothing is logged here; callers record
+    deliveries in bulk.
+    """
+    results: List[bool] = []
+    for start in range(0, len(messages), FCM_BATCH_LIMIT):
+        chunk = messages[start : start + FCM_BATCH_LIMIT]
+        try:
+            batch = messaging.send_each(chunk)
+            results.extend(response.success for response in batch.responses)
+        except Exception as e:
+            import logging
+
+            logging.error(f"Failed to send FCM batch of {len(chunk)}: {e}")
+            results.extend(False for _ in chunk)
+    return results
+
+
 def send_push_notification(
     *,
     user_id: int,
@@ -105,30 +162,16 @@ def send_push_notification(
 
     # Use body if provided, otherwise fall back to message
     notification_body = body or message
-    notification_title = title or "Mita Finance"
-
     if not notification_body:
         raise ValueError("Either 'body' or 'message' must be provided")
 
-    # Build notification data
-    notification_data = {"user_id": str(user_id)}
-    if data:
-        notification_data.update(data)
-
-    # Build FCM message
-    fcm_notification = messaging.Notification(
-        title=notification_title,
-        body=notification_body,
-    )
-
-    # Add image if provided
-    if image_url:
-        fcm_notification.image = image_url
-
-    msg = messaging.Message(
-        notification=fcm_notification,
+    msg = build_push_message(
+        user_id=user_id,
         token=token,
-        data=notification_data,
+        title=title,
+        body=notification_body,
+        data=data,
+        image_url=image_url,
     )
 
     try:
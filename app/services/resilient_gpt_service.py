@@ -1,26 +1,74 @@
 """
 Resilient GPT Service with Circuit Breaker Protection
 Enhanced version of GPT agent with proper error handling, retries, and fallbacks
+
+Completions go through the shared LLM response cache (app.services.llm_cache):
+identical prompts are answered from it or joined while in flight. Expense
+categorization is keyed on the normalized expense alone and concurrent
+requests are micro-batched into a single prompt.
 """
 
+import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import openai
 from openai import AsyncOpenAI
 
 from app.core.circuit_breaker import CircuitBreakerConfig, get_circuit_breaker_manager
+from app.services.llm_cache import MicroBatcher, cache_key, get_llm_cache
 
 logger = logging.getLogger(__name__)
 
+CATEGORIZATION_BATCH_SIZE = 20
+CATEGORIZATION_BATCH_WAIT = 0.02  # seconds a categorization waits for company
+CATEGORIZATION_BATCH_INSTRUCTIONS = (
+    "You will receive a numbered list of expenses. Reply with only a JSON array "
+    "holding one object per expense, in order, shaped like "
+    '{"index": 0, "category": "food", "confidence": 90, "reasoning": "..."}. '
+    "Confidence is 0-100; keep reasoning under 20 words."
+)
+
+
+def _amount_band(amount: float) -> str:
+    if amount < 10:
+        return "under $10"
+    if amount < 100:
+        return "$10-$100"
+    if amount < 1000:
+        return "$100-$1,000"
+    return "over $1,000"
+
+
+def categorization_item(
+    description: str, amount: float, merchant: Optional[str] = None
+) -> str:
+    """One expense as the categorizer sees it
+
+    Text is lower-cased and the amount reduced to a band, so "STARBUCKS
+    $4.50" and "Starbucks $5.20" are the same question and share an answer.
+    """
+    description = " ".join((description or "").lower().split())
+    merchant = " ".join((merchant or "").lower().split()) or "unknown"
+    return (
+        f"description: {description}; merchant: {merchant}; "
+        f"amount: {_amount_band(amount)}"
+    )
+
 
 class ResilientGPTService:
     """Enhanced GPT service with circuit breaker protection and error handling"""
 
-    def __init__(self, api_key: str, model: str = "gpt-4"):
+    def __init__(self, api_key: str, model: str = "gpt-4", client=None, cache=None):
         """Initialize the resilient GPT service"""
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = client or AsyncOpenAI(api_key=api_key)
         self.model = model
+        self.llm_cache = cache or get_llm_cache()
+        self._categorizer = MicroBatcher(
+            self._categorize_batch,
+            max_batch=CATEGORIZATION_BATCH_SIZE,
+            max_wait=CATEGORIZATION_BATCH_WAIT,
+        )
         self.circuit_breaker_manager = get_circuit_breaker_manager()
 
         # Register service with custom config for OpenAI
@@ -124,37 +172,27 @@ class ResilientGPTService:
         self, description: str, amount: float, merchant: Optional[str] = None
     ) -> Dict[str, Any]:
         """Categorize an expense with confidence scoring"""
-        context = f"Description: {description}, Amount: ${amount:.2f}"
-        if merchant:
-            context += f", Merchant: {merchant}"
-
-        messages = [
-            {
-                "role": "user",
-                "content": f"Categorize this expense and provide a confidence score (0-100): {context}",
-            }
-        ]
+        item = categorization_item(description, amount, merchant)
+        key = cache_key(
+            self.model,
+            [
+                {
+                    "role": "system",
+                    "content": self.system_prompts["expense_categorizer"],
+                },
+                {"role": "user", "content": item},
+            ],
+            temperature=0.3,
+        )
 
         try:
-            response = await self._make_chat_request(
-                user_messages=messages,
-                system_prompt_key="expense_categorizer",
-                fallback_type="categorization",
-                max_tokens=200,
+            # Concurrent misses share one batched prompt
+            answer = await self.llm_cache.get_or_call(
+                "categorization",
+                key,
+                lambda: self._categorizer.submit((item, description)),
             )
-
-            # A canned fallback string means the AI never answered — do not
-            # parse it as a model response (that would fabricate confidence).
-            if response in self.fallback_responses.get("categorization", []):
-                return {
-                    "category": "Other",
-                    "confidence": 50,
-                    "reasoning": "Automatic categorization unavailable",
-                    "suggested_category": None,
-                }
-
-            # Parse response for structured data
-            return self._parse_categorization_response(response, description)
+            return json.loads(answer)
 
         except Exception as e:
             logger.error(f"Expense categorization failed: {str(e)}")
@@ -165,6 +203,67 @@ class ResilientGPTService:
                 "suggested_category": None,
             }
 
+    async def _categorize_batch(self, items: List[Tuple[str, str]]) -> List[Any]:
+        """Categorize many expenses with one prompt; one JSON answer per item"""
+        listing = "\n".join(f"{index}. {item}" for index, (item, _) in enumerate(items))
+        messages = [
+            {
+                "role": "system",
+                "content": f"{self.system_prompts['expense_categorizer']} "
+                f"{CATEGORIZATION_BATCH_INSTRUCTIONS}",
+            },
+            {"role": "user", "content": f"Categorize these expenses:\n{listing}"},
+        ]
+        response = await self._call_model(
+            messages,
+            "categorization",
+            max_tokens=min(4000, 100 + 80 * len(items)),
+            temperature=0.3,
+        )
+        return self._parse_batch_response(response, len(items))
+
+    def _parse_batch_response(self, response: str, count: int) -> List[Any]:
+        """Per-item answers from a batched reply; exceptions for missing items
+
+        An item the model skipped or garbled fails on its own (and is not
+        cached) instead of failing its whole batch.
+        """
+        entries: Dict[int, Dict[str, Any]] = {}
+        try:
+            parsed = json.loads(
+                response[response.index("[") : response.rindex("]") + 1]
+            )
+            for position, entry in enumerate(parsed):
+                if isinstance(entry, dict):
+                    entries[int(entry.get("index", position))] = entry
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Unparseable batched categorization reply: {e}")
+
+        results: List[Any] = []
+        for index in range(count):
+            entry = entries.get(index)
+            if not entry or not entry.get("category"):
+                results.append(
+                    ValueError(f"No categorization returned for item {index}")
+                )
+                continue
+            category = str(entry["category"]).strip().title()
+            try:
+                confidence = max(0, min(100, int(entry.get("confidence", 70))))
+            except (TypeError, ValueError):
+                confidence = 70
+            results.append(
+                json.dumps(
+                    {
+                        "category": category,
+                        "confidence": confidence,
+                        "reasoning": str(entry.get("reasoning", ""))[:200],
+                        "suggested_category": category if confidence < 80 else None,
+                    }
+                )
+            )
+        return results
+
     async def _make_chat_request(
         self,
         user_messages: List[Dict[str, str]],
@@ -173,6 +272,7 @@ class ResilientGPTService:
         context: Optional[Dict[str, Any]] = None,
         max_tokens: int = 600,
         temperature: float = 0.3,
+        use_cache: bool = True,
     ) -> str:
         """Make a chat completion request with circuit breaker protection"""
 
@@ -190,20 +290,14 @@ class ResilientGPTService:
         messages.extend(user_messages)
 
         try:
-            # Use circuit breaker protection
-            async def _make_request():
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    timeout=60.0,  # Request-level timeout
+            if use_cache:
+                result = await self._complete(
+                    messages, fallback_type, max_tokens, temperature
+                )
+            else:
+                result = await self._call_model(
+                    messages, fallback_type, max_tokens, temperature
                 )
-                return response.choices[0].message.content.strip()
-
-            result = await self.circuit_breaker_manager.call_service(
-                "openai_chat", _make_request
-            )
 
             logger.info(f"Successfully generated {system_prompt_key} response")
             return result
@@ -234,6 +328,45 @@ class ResilientGPTService:
             logger.error(f"Unexpected error in GPT service: {str(e)}", exc_info=True)
             return self._get_fallback_response(fallback_type)
 
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        call_type: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        """Cached, coalesced completion; errors propagate and are never cached"""
+        key = cache_key(self.model, messages, temperature, max_tokens)
+        return await self.llm_cache.get_or_call(
+            call_type,
+            key,
+            lambda: self._call_model(messages, call_type, max_tokens, temperature),
+        )
+
+    async def _call_model(
+        self,
+        messages: List[Dict[str, str]],
+        call_type: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        """One chat completion through the circuit breaker"""
+
+        async def _make_request():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=60.0,  # Request-level timeout
+            )
+            self.llm_cache.record_usage(call_type, getattr(response, "usage", None))
+            return response.choices[0].message.content.strip()
+
+        return await self.circuit_breaker_manager.call_service(
+            "openai_chat", _make_request
+        )
+
     def _get_fallback_response(self, fallback_type: str) -> str:
         """Get a fallback response when AI is unavailable"""
         responses = self.fallback_responses.get(
@@ -254,51 +387,6 @@ class ResilientGPTService:
             "In the meantime, you can review your recent transactions manually."
         )
 
-    def _parse_categorization_response(
-        self, response: str, description: str
-    ) -> Dict[str, Any]:
-        """Parse categorization response into structured data"""
-        try:
-            # Simple parsing logic - in production, you might want more sophisticated parsing
-            response.lower().split("\n")
-            category = "Other"
-            confidence = 70  # Default confidence
-            reasoning = response
-
-            # Look for category indicators
-            category_keywords = {
-                "food": ["food", "restaurant", "dining", "grocery", "meal"],
-                "transportation": ["transport", "gas", "fuel", "uber", "taxi", "bus"],
-                "shopping": ["shopping", "retail", "store", "purchase"],
-                "entertainment": ["entertainment", "movie", "game", "fun"],
-                "utilities": ["utility", "electric", "water", "internet", "phone"],
-                "healthcare": ["health", "medical", "doctor", "pharmacy"],
-                "travel": ["travel", "hotel", "flight", "vacation"],
-            }
-
-            description_lower = description.lower()
-            for cat, keywords in category_keywords.items():
-                if any(keyword in description_lower for keyword in keywords):
-                    category = cat.title()
-                    confidence = 85
-                    break
-
-            return {
-                "category": category,
-                "confidence": confidence,
-                "reasoning": reasoning[:200],  # Truncate for storage
-                "suggested_category": category if confidence < 80 else None,
-            }
-
-        except Exception as e:
-            logger.error(f"Error parsing categorization response: {str(e)}")
-            return {
-                "category": "Other",
-                "confidence": 50,
-                "reasoning": "Parsing failed",
-                "suggested_category": None,
-            }
-
     async def get_service_health(self) -> Dict[str, Any]:
         """Get health status of the GPT service"""
         circuit_breaker = self.circuit_breaker_manager.get_circuit_breaker(
@@ -320,6 +408,7 @@ class ResilientGPTService:
             "last_request_time": stats["last_success_time"]
             or stats["last_failure_time"],
             "model": self.model,
+            "cache": self.llm_cache.stats(),
             "available_features": [
                 "financial_advice",
                 "budget_analysis",
@@ -337,6 +426,7 @@ class ResilientGPTService:
                 system_prompt_key="financial_advisor",
                 fallback_type="financial_advice",
                 max_tokens=50,
+                use_cache=False,
             )
 
             # A canned fallback response means the API did not actually answer
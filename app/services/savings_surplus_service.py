@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from app.core.category_priority import CATEGORY_PRIORITY, CategoryLevel
 from app.core.logging_config import get_logger
 from app.db.models import DailyPlan, Goal
+from app.services.goal_statistics import get_goal_statistics_cache
 
 logger = get_logger(__name__)
 
@@ -86,6 +87,7 @@ def apply_surplus_to_goal(
     try:
         goal.add_savings(surplus)
         db.commit()
+        get_goal_statistics_cache().invalidate(user_id)
         db.refresh(goal)
         logger.info(
             f"Applied ${surplus:.2f} surplus to goal [{goal.title}] for user {user_id}"
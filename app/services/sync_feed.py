@@ -0,0 +1,308 @@
+"""
+Sync Change Feed for MITA Finance
+Delta sync for offline mobile clients, and ETags from the same version
+
+The app used to refetch full transaction lists, calendar months, goals and
+notifications on every open. Every insert, update and delete of those rows
+now takes the next change sequence number, and each user's numbers commit
+in order (database triggers, see app/db/models/sync_state.py), so a client
+that remembers the last number it saw asks GET /api/sync?since=<cursor> for
+exactly what changed:
+
+- each source is read with an index range on (user_id, change_seq), at
+  most one page plus one row per source, and the pages are merged by
+  sequence number, so the cursor never skips a change;
+- soft-deleted rows (deleted_at set) and hard deletes (sync_tombstones)
+  come back as ids under "deleted". Tombstones are kept for
+  TOMBSTONE_RETENTION_DAYS; a cursor older than the newest one pruned
+  gets `reset` and syncs again from 0.
+
+The user's latest sequence number (user_sync_state.last_seq, one primary
+key lookup) also versions everything the heavy GET endpoints return.
+etag_by_sync_version answers a matching If-None-Match with 304 before the
+endpoint runs its queries or serializes anything.
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    DailyPlan,
+    Goal,
+    Notification,
+    SyncTombstone,
+    Transaction,
+    UserSyncState,
+)
+from app.utils.json_encoding import encode_models
+from app.utils.response_wrapper import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Feed keys, matching the table names tombstones record
+SYNC_SOURCES = {
+    "transactions": Transaction,
+    "daily_plan": DailyPlan,
+    "goals": Goal,
+    "notifications": Notification,
+}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+# Longer than a phone plausibly stays offline; older cursors resync from 0
+TOMBSTONE_RETENTION_DAYS = 90
+PRUNE_BATCH_USERS = 1000
+
+
+# ============================================================================
+# Change feed
+# ============================================================================
+
+
+@dataclass
+class SyncPage:
+    """One page of a user's changes after a cursor"""
+
+    since: int
+    cursor: int  # pass back as `since` for the next page
+    version: int  # the user's latest sequence number
+    has_more: bool
+    changes: Dict[str, List[Any]] = field(default_factory=dict)
+    deleted: Dict[str, List[Any]] = field(default_factory=dict)
+    pruned: int = 0  # the newest tombstone retention removed
+
+    @property
+    def reset(self) -> bool:
+        """The cursor is ahead of the server, or old enough to have missed a
+        pruned tombstone: the client must resync from 0"""
+        return self.since > self.version or 0 < self.since < self.pruned
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cursor": str(self.cursor),
+            "version": str(self.version),
+            "has_more": self.has_more,
+            "reset": self.reset,
+            "changes": self.changes,
+            "deleted": self.deleted,
+        }
+
+
+def sync_version_query(user_id):
+    return select(UserSyncState.last_seq).where(UserSyncState.user_id == user_id)
+
+
+def get_sync_version(db: Session, user_id) -> int:
+    """The user's latest change sequence number; 0 before any change"""
+    return db.execute(sync_version_query(user_id)).scalar() or 0
+
+
+def get_changes(
+    db: Session, user_id, since: int = 0, limit: int = DEFAULT_PAGE_SIZE
+) -> SyncPage:
+    """Rows of the user changed after `since`, oldest change first"""
+    state = db.execute(
+        select(UserSyncState.last_seq, UserSyncState.pruned_seq).where(
+            UserSyncState.user_id == user_id
+        )
+    ).first()
+    version, pruned = state if state is not None else (0, 0)
+    result = SyncPage(
+        since=since,
+        cursor=0,
+        version=version,
+        has_more=False,
+        changes={name: [] for name in SYNC_SOURCES},
+        deleted={name: [] for name in SYNC_SOURCES},
+        pruned=pruned,
+    )
+    if result.reset:
+        return result
+
+    candidates = []
+    for name, model in SYNC_SOURCES.items():
+        rows = db.execute(
+            select(model)
+            .where(model.user_id == user_id, model.change_seq > since)
+            .order_by(model.change_seq)
+            .limit(limit + 1)
+        ).scalars()
+        candidates.extend((row.change_seq, name, row) for row in rows)
+    tombstones = db.execute(
+        select(SyncTombstone)
+        .where(SyncTombstone.user_id == user_id, SyncTombstone.change_seq > since)
+        .order_by(SyncTombstone.change_seq)
+        .limit(limit + 1)
+    ).scalars()
+    candidates.extend((t.change_seq, t.entity, t) for t in tombstones)
+
+    # Each source returned its lowest limit + 1 rows, so the lowest `limit`
+    # of the union are the next `limit` changes overall
+    candidates.sort(key=lambda candidate: candidate[0])
+    page = candidates[:limit]
+
+    result.cursor = page[-1][0] if page else since
+    result.has_more = len(candidates) > limit
+    for _, name, row in page:
+        if isinstance(row, SyncTombstone):
+            result.deleted[name].append(row.entity_id)
+        elif getattr(row, "deleted_at", None) is not None:
+            result.deleted[name].append(row.id)
+        else:
+            result.changes[name].append(row)
+    return result
+
+
+def prune_tombstones(
+    db: Session,
+    now: Optional[datetime] = None,
+    retention_days: int = TOMBSTONE_RETENTION_DAYS,
+    batch_users: int = PRUNE_BATCH_USERS,
+) -> int:
+    """Delete tombstones older than the retention, recording per user the
+    newest one removed; returns the number of rows removed.
+
+    Each batch locks its users in user_id order, the order the change_seq
+    triggers lock them in, and commits.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    expired = SyncTombstone.deleted_at < cutoff
+    removed = 0
+    after = None
+
+    while True:
+        query = select(SyncTombstone.user_id).where(expired)
+        if after is not None:
+            query = query.where(SyncTombstone.user_id > after)
+        users = (
+            db.execute(
+                query.distinct().order_by(SyncTombstone.user_id).limit(batch_users)
+            )
+            .scalars()
+            .all()
+        )
+        if not users:
+            break
+        try:
+            db.execute(
+                select(UserSyncState.user_id)
+                .where(UserSyncState.user_id.in_(users))
+                .order_by(UserSyncState.user_id)
+                .with_for_update()
+            )
+            horizons = db.execute(
+                select(SyncTombstone.user_id, func.max(SyncTombstone.change_seq))
+                .where(expired, SyncTombstone.user_id.in_(users))
+                .group_by(SyncTombstone.user_id)
+            ).all()
+            for user_id, seq in horizons:
+                db.execute(
+                    update(UserSyncState)
+                    .where(
+                        UserSyncState.user_id == user_id,
+                        UserSyncState.pruned_seq < seq,
+                    )
+                    .values(pruned_seq=seq)
+                )
+            removed += db.execute(
+                delete(SyncTombstone).where(expired, SyncTombstone.user_id.in_(users))
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        after = users[-1]
+
+    logger.info(f"Pruned {removed} sync tombstones older than {retention_days} days")
+    return removed
+
+
+# ============================================================================
+# ETags
+# ============================================================================
+
+
+async def _sync_version(db, user_id) -> int:
+    if isinstance(db, AsyncSession):
+        try:
+            return (await db.execute(sync_version_query(user_id))).scalar() or 0
+        except Exception:
+            await db.rollback()  # leave the session usable for the endpoint
+            raise
+    try:
+        return await run_in_threadpool(get_sync_version, db, user_id)
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+
+
+def sync_etag(request: Request, user, version: int) -> str:
+    """Strong ETag of a GET response whose data only moves with `version`
+
+    The URL and the user's timezone pick the representation; the UTC date
+    covers day-relative fields (overdue goals, today's calendar status).
+    """
+    key = "|".join(
+        [
+            request.url.path,
+            str(sorted(request.query_params.multi_items())),
+            str(user.id),
+            str(getattr(user, "timezone", "") or ""),
+            datetime.now(timezone.utc).date().isoformat(),
+            str(version),
+        ]
+    )
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def etag_by_sync_version(func: Callable) -> Callable:
+    """ETag / 304 for a GET endpoint taking `request`, `user` and `db`
+
+    The version is read before the endpoint runs: a write landing in
+    between yields a body newer than its ETag, which only costs the client
+    one extra full response later, never a stale 304.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        request, user, db = kwargs["request"], kwargs["user"], kwargs["db"]
+        try:
+            etag = sync_etag(request, user, await _sync_version(db, user.id))
+        except Exception as e:
+            logger.debug(f"Sync version unavailable, serving without ETag: {e}")
+            etag = None
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag and _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        if inspect.iscoroutinefunction(func):
+            result = await func(*args, **kwargs)
+        else:
+            result = await run_in_threadpool(func, *args, **kwargs)
+
+        if not isinstance(result, Response):
+            result = FastJSONResponse(content=encode_models(result))
+        if etag and result.status_code == 200:
+            result.headers.update(headers)
+        return result
+
+    return wrapper
@@ -15,6 +15,7 @@ from app.tasks.async_tasks import (
     daily_ai_advice_batch_task,
     export_user_data_task,
     generate_ai_analysis_task,
+    import_transactions_task,
     monthly_budget_redistribution_batch_task,
     process_ocr_task,
     send_email_notification_task,
@@ -271,6 +272,46 @@ class TaskManager:
             logger.error(f"Failed to submit data export task: {str(e)}", exc_info=True)
             raise
 
+    def submit_transaction_import_task(
+        self, user_id: int, file_path: str, file_format: str
+    ) -> TaskInfo:
+        """
+        Submit bank statement import task.
+
+        Args:
+            user_id: User ID to import transactions for
+            file_path: Path to the uploaded statement file
+            file_format: Statement format ('csv', 'ofx' or 'qif')
+
+        Returns:
+            TaskInfo with task details
+        """
+        try:
+            job = enqueue_task(
+                import_transactions_task,
+                user_id=user_id,
+                file_path=file_path,
+                file_format=file_format,
+            )
+
+            logger.info(
+                f"Transaction import task submitted for user {user_id}: {job.id}",
+                extra={"user_id": user_id, "task_id": job.id, "format": file_format},
+            )
+
+            return TaskInfo(
+                task_id=job.id,
+                status=TaskStatus.QUEUED,
+                created_at=datetime.now(timezone.utc),
+                estimated_completion="1-10 minutes",
+            )
+
+        except Exception as e:
+            logger.error(
+                f"Failed to submit transaction import task: {str(e)}", exc_info=True
+            )
+            raise
+
     def get_task_status(self, task_id: str) -> Optional[TaskInfo]:
         """
         Get comprehensive task status information.
@@ -288,8 +329,8 @@ class TaskManager:
                 return None
 
             # Calculate progress percentage if available
-            progress = None
-            if task_result.metadata:
+            progress = task_result.progress
+            if progress is None and task_result.metadata:
                 progress = task_result.metadata.get("progress")
 
             return TaskInfo(
@@ -0,0 +1,220 @@
+"""
+Transaction Rollups for MITA Finance
+Analytics reads over the per-user (day, category) rollup cube
+
+Every query here filters transaction_daily_rollups with a half-open range on
+day, which the (user_id, day, category) primary key serves directly; none of
+them touch the raw transactions table. Days are UTC calendar days, the same
+bucketing the maintenance triggers use.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import extract, func, select, text
+from sqlalchemy.orm import Session
+
+from app.db.models.transaction_rollup import TransactionRollup
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RollupStats:
+    """Aggregate of any set of rollup cells"""
+
+    count: int = 0
+    total: Decimal = Decimal("0")
+    sum_squares: Decimal = Decimal("0")
+    minimum: Optional[Decimal] = None
+    maximum: Optional[Decimal] = None
+
+    @classmethod
+    def from_row(cls, row) -> "RollupStats":
+        count, total, sum_squares, minimum, maximum = row
+        return cls(
+            count=int(count or 0),
+            total=Decimal(total or 0),
+            sum_squares=Decimal(sum_squares or 0),
+            minimum=minimum,
+            maximum=maximum,
+        )
+
+    @property
+    def mean(self) -> float:
+        return float(self.total / self.count) if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the individual transaction amounts"""
+        if not self.count:
+            return 0.0
+        return max(
+            0.0,
+            float(
+                (self.sum_squares - self.total * self.total / self.count) / self.count
+            ),
+        )
+
+    @property
+    def sample_stdev(self) -> float:
+        """Same as statistics.stdev() over the individual amounts"""
+        if self.count < 2:
+            return 0.0
+        spread = self.sum_squares - self.total * self.total / self.count
+        return math.sqrt(max(0.0, float(spread / (self.count - 1))))
+
+
+def month_range(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def current_month_range() -> Tuple[date, date]:
+    now = datetime.now(timezone.utc)
+    return month_range(now.year, now.month)
+
+
+def trailing_days(days: int) -> Tuple[date, date]:
+    """[today - (days - 1), tomorrow): the last `days` UTC days including today"""
+    today = datetime.now(timezone.utc).date()
+    return today - timedelta(days=days - 1), today + timedelta(days=1)
+
+
+def day_start_utc(day: date) -> datetime:
+    """First instant of a rollup day, for matching raw transactions"""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _in_range(user_id, start: Optional[date], end: Optional[date]) -> list:
+    conditions = [TransactionRollup.user_id == user_id]
+    if start is not None:
+        conditions.append(TransactionRollup.day >= start)
+    if end is not None:
+        conditions.append(TransactionRollup.day < end)
+    return conditions
+
+
+# ============================================================================
+# Queries (execute with either a Session or an AsyncSession)
+# ============================================================================
+
+
+def category_totals_query(user_id, start: date, end: date):
+    return (
+        select(
+            TransactionRollup.category,
+            func.sum(TransactionRollup.amount_sum).label("total"),
+        )
+        .where(*_in_range(user_id, start, end))
+        .group_by(TransactionRollup.category)
+    )
+
+
+def daily_totals_query(user_id, start: date, end: date):
+    return (
+        select(
+            TransactionRollup.day, func.sum(TransactionRollup.amount_sum).label("total")
+        )
+        .where(*_in_range(user_id, start, end))
+        .group_by(TransactionRollup.day)
+        .order_by(TransactionRollup.day)
+    )
+
+
+def monthly_totals_query(
+    user_id, start: Optional[date] = None, end: Optional[date] = None
+):
+    year = extract("year", TransactionRollup.day)
+    month = extract("month", TransactionRollup.day)
+    return (
+        select(
+            month.label("month"),
+            year.label("year"),
+            func.sum(TransactionRollup.amount_sum).label("total"),
+        )
+        .where(*_in_range(user_id, start, end))
+        .group_by(year, month)
+    )
+
+
+def stats_query(user_id, start: Optional[date], end: Optional[date]):
+    return select(
+        func.sum(TransactionRollup.txn_count),
+        func.sum(TransactionRollup.amount_sum),
+        func.sum(TransactionRollup.amount_sumsq),
+        func.min(TransactionRollup.amount_min),
+        func.max(TransactionRollup.amount_max),
+    ).where(*_in_range(user_id, start, end))
+
+
+def cells_query(user_id, start: date, end: date):
+    return (
+        select(
+            TransactionRollup.day,
+            TransactionRollup.category,
+            TransactionRollup.txn_count,
+            TransactionRollup.amount_sum,
+            TransactionRollup.amount_sumsq,
+        )
+        .where(*_in_range(user_id, start, end))
+        .order_by(TransactionRollup.day)
+    )
+
+
+# ============================================================================
+# Rebuild
+# ============================================================================
+
+_REBUILD_SQL = """
+INSERT INTO transaction_daily_rollups (
+    user_id, day, category, txn_count, amount_sum, amount_sumsq,
+    amount_min, amount_max, updated_at
+)
+SELECT user_id, (spent_at AT TIME ZONE 'UTC')::date, category,
+       count(*), sum(amount), sum(amount * amount),
+       min(amount), max(amount), now()
+FROM transactions
+WHERE deleted_at IS NULL AND spent_at IS NOT NULL {user_filter}
+GROUP BY 1, 2, 3
+"""
+
+
+def rebuild_rollups(db: Session, user_id: Any = None) -> int:
+    """Recompute rollups from transactions, for one user or everyone
+
+    Holds a lock that the maintenance triggers wait on, so writes landing
+    during the rebuild are applied on top of it rather than lost. Commits
+    and returns the number of cells written.
+    """
+    params = {}
+    user_filter = ""
+    delete_sql = "DELETE FROM transaction_daily_rollups"
+    if user_id is not None:
+        params["user_id"] = user_id
+        user_filter = "AND user_id = :user_id"
+        delete_sql += " WHERE user_id = :user_id"
+
+    try:
+        db.execute(
+            text("LOCK TABLE transaction_daily_rollups IN SHARE ROW EXCLUSIVE MODE")
+        )
+        db.execute(text(delete_sql), params)
+        written = db.execute(
+            text(_REBUILD_SQL.format(user_filter=user_filter)), params
+        ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"Rebuilt {written} transaction rollup cells"
+        + (f" for user {user_id}" if user_id is not None else "")
+    )
+    return written
@@ -0,0 +1,219 @@
+"""
+Unread Notification Counter for MITA Finance
+Per-user unread counts cached in Redis hashes
+
+/unread-count and /list used to COUNT(*) the user's unread, unexpired
+notifications on every poll. Each user now has a hash
+mita:notifications:unread:<user_id> with two fields: `count` and
+`valid_until`, the moment the count may next go stale (the earliest expiry
+among the counted notifications, capped at RECONCILE_SECONDS from when it was
+taken). NotificationService adjusts the count after each commit that creates,
+reads or deletes an unread notification.
+
+A missing or stale hash is reconciled from the database with one query over
+the partial unread index. So are drifts from anything that bypasses the
+service, which last at most RECONCILE_SECONDS. Adjusting a missing hash is a
+no-op; the next read rebuilds it. With no Redis URL the counts sit in a dict
+in each process, which is only accurate while one process serves a user. If
+Redis stops answering, reads fall back to counting in the database.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import get_sync_redis
+from app.core.shared_store import process_singleton, redis_or_memory
+from app.db.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "mita:notifications:unread:"
+RECONCILE_SECONDS = 900
+# Idle users' hashes disappear on their own
+KEY_TTL_SECONDS = 86400
+
+
+# ============================================================================
+# Stores
+# ============================================================================
+
+
+class InMemoryUnreadStore:
+    """(count, valid_until) per user in a dict"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Tuple[int, float]]:
+        return self._entries.get(user_id)
+
+    def set(self, user_id: str, count: int, valid_until: float) -> None:
+        with self._lock:
+            self._entries[user_id] = (count, valid_until)
+
+    def adjust(
+        self, user_id: str, delta: int, expires_at: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            count, valid_until = entry
+            if expires_at is not None:
+                valid_until = min(valid_until, expires_at)
+            self._entries[user_id] = (max(0, count + delta), valid_until)
+
+    def clear(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class RedisUnreadStore:
+    """A count and valid_until field in each user's mita:notifications:unread hash"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, user_id: str) -> Optional[Tuple[int, float]]:
+        count, valid_until = self.client.hmget(
+            KEY_PREFIX + user_id, "count", "valid_until"
+        )
+        # A hash left without valid_until (key expired mid-adjust) is unusable
+        if count is None or valid_until is None:
+            return None
+        return int(count), float(valid_until)
+
+    def set(self, user_id: str, count: int, valid_until: float) -> None:
+        key = KEY_PREFIX + user_id
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(key, mapping={"count": count, "valid_until": valid_until})
+        pipe.expire(key, KEY_TTL_SECONDS)
+        pipe.execute()
+
+    def adjust(
+        self, user_id: str, delta: int, expires_at: Optional[float] = None
+    ) -> None:
+        key = KEY_PREFIX + user_id
+
+        # Read-modify-write under WATCH: a concurrent set/clear/expiry of the
+        # hash aborts the EXEC and redis-py reruns the function, so a count is
+        # never adjusted into a hash that was just dropped or rebuilt.
+        def apply(pipe):
+            count, valid_until = pipe.hmget(key, "count", "valid_until")
+            if count is None or valid_until is None:
+                return  # not cached: the next read reconciles from the database
+            pipe.multi()
+            pipe.hset(key, "count", max(0, int(count) + delta))
+            if expires_at is not None and expires_at < float(valid_until):
+                pipe.hset(key, "valid_until", expires_at)
+
+        self.client.transaction(apply, key)
+
+    def clear(self, user_id: str) -> None:
+        self.client.delete(KEY_PREFIX + user_id)
+
+
+# ============================================================================
+# Counter
+# ============================================================================
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def unread_query(user_id, now: datetime):
+    """Unread, unexpired count and the earliest expiry among them"""
+    return select(func.count(), func.min(Notification.expires_at)).where(
+        and_(
+            Notification.user_id == user_id,
+            Notification.is_read.is_(False),
+            or_(Notification.expires_at.is_(None), Notification.expires_at > now),
+        )
+    )
+
+
+class UnreadCounter:
+    """Cached unread notification counts with database reconciliation"""
+
+    def __init__(self, store=None, redis_url: Optional[str] = None):
+        self._store = store
+        self.redis_url = redis_url
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = redis_or_memory(
+                self.redis_url,
+                lambda url: RedisUnreadStore(get_sync_redis(url)),
+                InMemoryUnreadStore,
+            )
+        return self._store
+
+    def count(self, db: Session, user_id) -> int:
+        """The user's unread count, reconciling it when missing or stale"""
+        member = str(user_id)
+        try:
+            entry = self.store.get(member)
+            if entry is not None and time.time() < entry[1]:
+                return entry[0]
+            return self.reconcile(db, user_id)
+        except RedisError as e:
+            logger.warning(f"Unread counter unavailable, counting in database: {e}")
+            return self._count_in_db(db, user_id)[0]
+
+    def reconcile(self, db: Session, user_id) -> int:
+        """Recount from the database and cache the result"""
+        count, earliest_expiry = self._count_in_db(db, user_id)
+        valid_until = time.time() + RECONCILE_SECONDS
+        if earliest_expiry is not None:
+            valid_until = min(valid_until, _timestamp(earliest_expiry))
+        self.store.set(str(user_id), count, valid_until)
+        return count
+
+    def _count_in_db(self, db: Session, user_id):
+        now = datetime.now(timezone.utc)
+        count, earliest_expiry = db.execute(unread_query(user_id, now)).one()
+        return int(count or 0), earliest_expiry
+
+    # ------------------------------------------------------------------
+    # Writes (call after the change has been committed)
+    # ------------------------------------------------------------------
+
+    def created(self, user_id, expires_at: Optional[datetime] = None) -> None:
+        self._safely(
+            "adjust", str(user_id), 1, _timestamp(expires_at), action="increment"
+        )
+
+    def removed(self, user_id, expires_at: Optional[datetime] = None) -> None:
+        """An unread notification was read or deleted"""
+        if expires_at is not None and _timestamp(expires_at) <= time.time():
+            return  # already out of the count
+        self._safely("adjust", str(user_id), -1, action="decrement")
+
+    def invalidate(self, user_id) -> None:
+        self._safely("clear", str(user_id), action="invalidate")
+
+    def _safely(self, method: str, *args, action: str) -> None:
+        try:
+            getattr(self.store, method)(*args)
+        except RedisError as e:
+            logger.warning(f"Unread counter {action} failed for {args[0]}: {e}")
+
+
+@process_singleton
+def get_unread_counter() -> UnreadCounter:
+    """The counter NotificationService adjusts and the routes read"""
+    return UnreadCounter()
@@ -6,20 +6,23 @@ All long-running and computationally expensive tasks are defined here.
 import os
 import tempfile
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
 from app.core.logger import get_logger
 from app.core.session import get_db
-from app.core.task_queue import TaskPriority, task_wrapper
+from app.core.task_queue import TaskPriority, report_progress, task_wrapper
 from app.db.models import AIAnalysisSnapshot, BudgetAdvice, PushToken, Transaction, User
+from app.db.models.ai_analysis_snapshot import PROFILE_KIND
 from app.ocr.advanced_ocr_service import AdvancedOCRService
 from app.orchestrator.receipt_orchestrator import process_receipt_from_ocr_result
 from app.services.advisory_service import AdvisoryService
+from app.services.ai_insight_snapshots import refresh_insight_snapshots
 from app.services.budget_redistributor import redistribute_budget_for_user
 from app.services.core.engine.ai_snapshot_service import save_ai_snapshot
 from app.services.push_service import send_push_notification
+from app.services.transaction_import import TransactionImporter
 from app.storage.receipt_image_storage import get_receipt_storage
 from app.utils.email_utils import send_reminder_email
 
@@ -489,6 +492,7 @@ def export_user_data_task(
                 snapshots = (
                     db.query(AIAnalysisSnapshot)
                     .filter(AIAnalysisSnapshot.user_id == user_id)
+                    .filter(AIAnalysisSnapshot.kind == PROFILE_KIND)
                     .order_by(AIAnalysisSnapshot.created_at.desc())
                     .all()
                 )
@@ -572,6 +576,67 @@ def export_user_data_task(
         raise
 
 
+@task_wrapper(
+    priority=TaskPriority.LOW, timeout=1800, retry_count=0, retry_delay=60  # 30 minutes
+)
+def import_transactions_task(
+    user_id: int,
+    file_path: str,
+    file_format: str,
+    task_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Import a bank statement file (CSV, OFX or QIF) into the user's ledger.
+
+    Args:
+        user_id: User ID to import transactions for
+        file_path: Path to the uploaded statement file
+        file_format: Statement format ('csv', 'ofx' or 'qif')
+        task_id: Task ID for progress tracking
+
+    Returns:
+        Dict containing the import report
+    """
+    logger.info(f"Starting {file_format} transaction import for user {user_id}")
+
+    def progress(fraction, report):
+        # The last few percent are the DailyPlan recompute
+        report_progress(int(fraction * 95), result=report.to_dict())
+
+    try:
+        db: Session = next(get_db())
+
+        try:
+            report = TransactionImporter(db, user_id, progress=progress).run(
+                file_path, file_format
+            )
+            return {
+                "status": "success",
+                "user_id": str(user_id),
+                "file_format": file_format,
+                **report.to_dict(),
+            }
+
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(
+            f"Transaction import failed for user {user_id}: {str(e)}",
+            extra={"user_id": user_id, "file_format": file_format},
+            exc_info=True,
+        )
+        raise
+
+    finally:
+        # A re-run needs a fresh upload; imports are not retried
+        try:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+        except Exception as cleanup_error:
+            logger.warning(f"Failed to clean up import file: {cleanup_error}")
+
+
 # Batch processing tasks for cron jobs
 
 
@@ -804,3 +869,50 @@ def cleanup_old_tasks_batch_task(
     except Exception as e:
         logger.error(f"Task cleanup failed: {str(e)}", exc_info=True)
         raise
+
+
+@task_wrapper(
+    priority=TaskPriority.NORMAL,
+    timeout=900,  # 15 minutes
+    retry_count=2,
+    retry_delay=300,
+)
+def refresh_ai_insights_task(
+    user_ids: List[str], task_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Recompute the precomputed AI insight snapshots of a chunk of users.
+
+    Args:
+        user_ids: One nightly chunk, or a single user whose snapshot is stale
+        task_id: Task ID for progress tracking
+
+    Returns:
+        Dict containing refreshed and skipped counts
+    """
+    try:
+        db: Session = next(get_db())
+
+        try:
+            result = refresh_insight_snapshots(db, user_ids)
+
+            logger.info(
+                f"AI insight snapshots refreshed: "
+                f"refreshed={result['refreshed']}, skipped={result['skipped']}"
+            )
+
+            return {
+                "status": "success",
+                **result,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(
+            f"AI insight snapshot refresh failed for {len(user_ids)} users: {str(e)}",
+            exc_info=True,
+        )
+        raise
@@ -130,3 +130,106 @@ def _sweep_idle_connections():
         conn.close()
     except Exception:
         pass
+
+
+# ---------------------------------------------------------------------------
+# Per-request SQL query budget
+#
+# Usage:
+#     def test_dashboard_is_not_chatty(client, query_budget):
+#         with query_budget(max_queries=15) as requests:
+#             client.get("/api/dashboard")
+#
+# HTTPObservabilityMiddleware reports every finished request to registered
+# observers; TestClient serves requests on its portal thread, so the
+# contextvar itself is not visible from the test body.
+# ---------------------------------------------------------------------------
+from contextlib import contextmanager  # noqa: E402
+
+
+@pytest.fixture
+def query_budget():
+    from app.core.query_budget import add_request_observer, remove_request_observer
+
+    @contextmanager
+    def _assert_queries(max_queries, max_repeats=None):
+        captured = []
+        add_request_observer(captured.append)
+        try:
+            yield captured
+        finally:
+            remove_request_observer(captured.append)
+
+        assert captured, "no instrumented request was served inside the block"
+        for stats in captured:
+            assert stats.query_count <= max_queries, (
+                f"{stats.route} ran {stats.query_count} queries "
+                f"(budget {max_queries}): {stats.shapes.most_common(5)}"
+            )
+            if max_repeats is not None:
+                shape, count = (stats.shapes.most_common(1) or [("", 0)])[0]
+                assert count <= max_repeats, (
+                    f"{stats.route} repeated a statement {count}x "
+                    f"(limit {max_repeats}): {shape[:200]}"
+                )
+
+    return _assert_queries
+
+
+# ---------------------------------------------------------------------------
+# SQLite copies of model tables
+#
+# Service tests run on in-memory SQLite. The models use PostgreSQL-only
+# column types (ARRAY, JSONB) and foreign keys into tables a test does not
+# create, so build a plain copy of each table a test needs:
+#
+#     def test_import(sqlite_table):
+#         metadata = MetaData()
+#         sqlite_table(Transaction, metadata)
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def sqlite_table():
+    from sqlalchemy import JSON, Column, Table
+    from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+    def _copy(model, metadata):
+        """Copy of a model's table without the PostgreSQL-only types and FKs"""
+        columns = []
+        for column in model.__table__.columns:
+            kind = JSON() if isinstance(column.type, (ARRAY, JSONB)) else column.type
+            columns.append(
+                Column(
+                    column.name,
+                    kind,
+                    primary_key=column.primary_key,
+                    default=column.default,
+                    autoincrement=column.autoincrement,
+                )
+            )
+        return Table(model.__tablename__, metadata, *columns)
+
+    return _copy
+
+
+# ---------------------------------------------------------------------------
+# Redis-or-memory store variants
+#
+# Stores come as an in-memory and a Redis implementation with the same
+# interface. Tests taking `store_backend` run once per variant; the Redis
+# one gets a sync and an async fakeredis client sharing one server:
+#
+#     def test_counter(store_backend):
+#         store = store_backend(InMemoryUnreadStore, lambda c, _: RedisUnreadStore(c))
+# ---------------------------------------------------------------------------
+@pytest.fixture(params=["memory", "redis"])
+def store_backend(request):
+    def _build(memory_store, redis_store):
+        if request.param == "memory":
+            return memory_store()
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        return redis_store(
+            fakeredis.FakeRedis(server=server), fakeredis.FakeAsyncRedis(server=server)
+        )
+
+    return _build
@@ -0,0 +1,86 @@
+"""
+In-Process Cache Engine Micro-Benchmark
+
+Compares the shared CacheNamespace against the previous MemoryCache
+bookkeeping (list-based LRU order with O(n) remove, pickle for sizing)
+on a 100k-entry working set.
+
+Run with output:
+    python -m pytest app/tests/performance/test_cache_engine_performance.py -s
+"""
+
+import pickle
+import random
+import time
+
+import pytest
+
+from app.core.cache_engine import CacheNamespace
+
+ENTRIES = 100_000
+LEGACY_ENTRIES = 5_000  # the list-based LRU is too slow for the full set
+OPERATIONS = 20_000
+
+
+class _LegacyListLRU:
+    """Bookkeeping of the old caching.MemoryCache, minus the asyncio lock"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.cache = {}
+        self.access_order = []
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            return None
+        if key in self.access_order:
+            self.access_order.remove(key)
+        self.access_order.append(key)
+        return value[0]
+
+    def set(self, key, value):
+        self.cache[key] = (value, len(pickle.dumps(value)))
+        if key in self.access_order:
+            self.access_order.remove(key)
+        self.access_order.append(key)
+        while len(self.cache) > self.max_size:
+            del self.cache[self.access_order.pop(0)]
+
+
+def _workload(cache, size):
+    payload = {"id": 1, "name": "user", "roles": ["a", "b"]}
+    for i in range(size):
+        cache.set(f"k{i}", payload)
+
+    rng = random.Random(42)
+    keys = [f"k{rng.randrange(size * 2)}" for _ in range(OPERATIONS)]
+    start = time.perf_counter()
+    for index, key in enumerate(keys):
+        if index % 4 == 0:
+            cache.set(key, payload)
+        else:
+            cache.get(key)
+    return (time.perf_counter() - start) / OPERATIONS
+
+
+@pytest.mark.performance
+def test_cache_engine_constant_time_operations():
+    engine_small = _workload(
+        CacheNamespace("bench", max_entries=LEGACY_ENTRIES, track_sizes=True),
+        LEGACY_ENTRIES,
+    )
+    engine_large = _workload(
+        CacheNamespace("bench", max_entries=ENTRIES, track_sizes=True), ENTRIES
+    )
+    legacy_small = _workload(_LegacyListLRU(LEGACY_ENTRIES), LEGACY_ENTRIES)
+
+    print(
+        f"\nper op: engine@{LEGACY_ENTRIES} {engine_small * 1e6:.2f}us | "
+        f"engine@{ENTRIES} {engine_large * 1e6:.2f}us | "
+        f"legacy@{LEGACY_ENTRIES} {legacy_small * 1e6:.2f}us"
+    )
+
+    # O(1): 20x more entries must not cost anywhere near 20x per operation
+    assert engine_large < engine_small * 5
+    assert engine_small < legacy_small
@@ -0,0 +1,75 @@
+"""
+Cohort Model Benchmark
+
+Times the compute side of a cohort training run on synthetic users with
+the model's six features: the cold-start MiniBatchKMeans fit, a nightly
+incremental update where 5% of users changed, relabelling everyone by
+nearest centroid and fingerprinting the feature rows, at 100k and 1M
+users. The old engine refit a full KMeans over every user on each run.
+
+Run with output:
+    python -m pytest app/tests/performance/test_cohort_model_performance.py -s
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.services.core.cohort.cohort_model import (
+    FEATURES,
+    N_CLUSTERS,
+    feature_fingerprints,
+    fit_centroids,
+    nearest_centroids,
+    transform_features,
+    update_centroids,
+)
+
+# Loaded up front so the first cold-start timing is not the import
+pytest.importorskip("sklearn.cluster")
+
+CHANGED_SHARE = 0.05
+
+
+def _raw_features(users, seed=0):
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(8.2, 0.6, users)
+    moods = rng.poisson(20, users)
+    variety = np.minimum(moods, rng.integers(1, 6, users))
+    challenges = rng.poisson(2, users)
+    spend = income / 30 * rng.uniform(0.4, 1.2, users)
+    redistributions = rng.poisson(3, users)
+    raw = np.column_stack([income, moods, variety, challenges, spend, redistributions])
+    assert raw.shape[1] == len(FEATURES)
+    return raw
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("users", [100_000, 1_000_000])
+def test_training_compute_scales_to_a_million_users(users):
+    raw = _raw_features(users)
+    X = transform_features(raw)
+    changed = np.random.default_rng(1).random(users) < CHANGED_SHARE
+
+    centroids, cold_s = _timed(lambda: fit_centroids(X))
+    labels = nearest_centroids(X, centroids)
+    weights = np.bincount(labels, minlength=N_CLUSTERS).astype(np.float64)
+    updated, update_s = _timed(lambda: update_centroids(centroids, weights, X[changed]))
+    _, label_s = _timed(lambda: nearest_centroids(X, updated))
+    _, hash_s = _timed(lambda: feature_fingerprints(raw))
+
+    print(f"\n{users:,} users, {N_CLUSTERS} clusters, {int(changed.sum()):,} changed")
+    print(f"  cold-start fit:          {cold_s * 1000:8.1f}ms")
+    print(f"  incremental partial_fit: {update_s * 1000:8.1f}ms")
+    print(f"  relabel everyone:        {label_s * 1000:8.1f}ms")
+    print(f"  fingerprints:            {hash_s * 1000:8.1f}ms")
+
+    assert update_s < cold_s
+    assert update_s + label_s + hash_s < 2.0 * users / 1_000_000
@@ -0,0 +1,89 @@
+"""
+Monte-Carlo Forecast Benchmark
+
+Times the probabilistic month-end forecast for a typical user: 12 budget
+categories, 90 days of history, 20 days left in the month and 10,000
+simulated paths. The simulation must stay under ~20ms per user so the
+endpoint can run it inline.
+
+Run with output:
+    python -m pytest app/tests/performance/test_forecast_simulation_performance.py -s
+"""
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.core.engine.budget_forecast_engine import (
+    DailyPlanData,
+    DailySpendData,
+    GoalData,
+    compute_probabilistic_forecast,
+    simulate_month_end,
+)
+
+RUNS = 30
+TODAY = date(2026, 10, 11)
+CATEGORIES = [f"category_{i}" for i in range(12)]
+
+
+def _inputs():
+    rng = random.Random(3)
+    plans = [
+        DailyPlanData(
+            date(2026, 10, day),
+            category,
+            Decimal("20"),
+            Decimal(rng.randint(0, 40)) if day < TODAY.day else Decimal(0),
+        )
+        for day in range(1, 32)
+        for category in CATEGORIES
+    ]
+    history = [
+        DailySpendData(TODAY - timedelta(days=k), category, Decimal(rng.randint(1, 40)))
+        for k in range(1, 91)
+        for category in CATEGORIES
+        if rng.random() < 0.5
+    ]
+    goals = [
+        GoalData(
+            f"g{i}", f"Goal {i}", Decimal(2000), Decimal(0), None, date(2027, i, 1)
+        )
+        for i in range(1, 4)
+    ]
+    return plans, goals, history
+
+
+def _median_ms(fn):
+    fn()
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+@pytest.mark.performance
+def test_ten_thousand_paths_per_user():
+    plans, goals, history = _inputs()
+    matrix = np.random.default_rng(0).gamma(1.0, 10.0, size=(90, len(CATEGORIES)))
+    rng = np.random.default_rng(1)
+
+    simulation_ms = _median_ms(lambda: simulate_month_end(matrix, 20, 10_000, rng))
+    forecast_ms = _median_ms(
+        lambda: compute_probabilistic_forecast(
+            plans, goals, history, 2026, 10, today=TODAY, seed=1
+        )
+    )
+
+    print(f"\n10,000 paths x 20 days x {len(CATEGORIES)} categories")
+    print(f"  simulation only:        {simulation_ms:6.1f}ms")
+    print(f"  full forecast (+ stats): {forecast_ms:6.1f}ms")
+
+    assert simulation_ms < 20
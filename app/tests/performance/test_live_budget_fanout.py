@@ -0,0 +1,107 @@
+"""
+Live Budget Stream Fan-out Benchmark
+
+Measures how the per-worker hub scales with open streams: notification
+fan-out latency across thousands of connections, and how many status
+recomputes (DB round-trips) idle connections cost compared with polling.
+
+Run with output:
+    python -m pytest app/tests/performance/test_live_budget_fanout.py -s
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.budget_live_updates import LiveBudgetHub, live_status_events
+
+USERS = 2_000
+CONNECTIONS_PER_USER = 5  # phone, tablet, web tabs...
+POLL_INTERVAL = 30.0  # what the app used to do on the home screen
+
+
+@pytest.mark.performance
+def test_fanout_scales_with_connections():
+    hub = LiveBudgetHub(redis_url="")
+    user_ids = [f"user-{i}" for i in range(USERS)]
+
+    async def run():
+        woken = 0
+        async with _subscribed(hub, user_ids, CONNECTIONS_PER_USER):
+            start = time.perf_counter()
+            for user_id in user_ids:
+                woken += hub.deliver(user_id)
+            elapsed = time.perf_counter() - start
+            return woken, hub.connection_count, elapsed
+
+    woken, connections, elapsed = asyncio.run(run())
+
+    print(
+        f"\n{connections} connections: fan-out to all in {elapsed * 1000:.1f}ms "
+        f"({elapsed / connections * 1e6:.2f}us per connection)"
+    )
+    assert woken == connections == USERS * CONNECTIONS_PER_USER
+    assert elapsed / connections < 50e-6
+
+
+@pytest.mark.performance
+def test_idle_streams_do_not_recompute():
+    hub = LiveBudgetHub(redis_url="")
+    streams = 1_000
+    changed_users = 10
+    loads = 0
+
+    async def load_status():
+        nonlocal loads
+        loads += 1
+        return {"spent_today": float(loads)}
+
+    async def connected():
+        return False
+
+    async def consume(user_id):
+        async for _ in live_status_events(
+            user_id, load_status, connected, hub=hub, heartbeat=3600, debounce=0
+        ):
+            pass
+
+    async def run():
+        tasks = [asyncio.create_task(consume(f"user-{i}")) for i in range(streams)]
+        await asyncio.sleep(0.2)
+        idle_loads = loads
+        for i in range(changed_users):
+            hub.deliver(f"user-{i}")
+        await asyncio.sleep(0.2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return idle_loads, loads
+
+    idle_loads, total_loads = asyncio.run(run())
+
+    polled = streams * 3  # /live_status + /dashboard + /forecast per poll
+    print(
+        f"\n{streams} open streams: {idle_loads} initial loads, "
+        f"{total_loads - idle_loads} recomputes for {changed_users} changed users "
+        f"(polling every {POLL_INTERVAL:.0f}s: {polled} requests per interval)"
+    )
+    assert idle_loads == streams
+    assert total_loads - idle_loads == changed_users
+
+
+class _subscribed:
+    """Hold `per_user` subscriptions for every user for the block's duration"""
+
+    def __init__(self, hub, user_ids, per_user):
+        self.contexts = [
+            hub.subscribe(user_id) for user_id in user_ids for _ in range(per_user)
+        ]
+
+    async def __aenter__(self):
+        for context in self.contexts:
+            await context.__aenter__()
+
+    async def __aexit__(self, *exc):
+        for context in self.contexts:
+            await context.__aexit__(None, None, None)
@@ -0,0 +1,87 @@
+"""
+LLM Response Cache Benchmark
+
+Replays a burst of expense categorizations - many users, a long tail of
+merchants, the popular ones repeated - against the offline stub client with
+a realistic per-request latency, and compares model calls, billed tokens and
+wall time with and without the cache, coalescing and batching.
+
+Run with output:
+    python -m pytest app/tests/performance/test_llm_cache_performance.py -s
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.core.shared_store import InMemoryKeyValueStore
+from app.services.llm_cache import LLMResponseCache
+from app.services.resilient_gpt_service import ResilientGPTService
+from app.tests.llm_stub_client import StubChatClient
+
+REQUESTS = 2_000
+MERCHANTS = 300
+LATENCY = 0.05  # seconds per model round trip
+CONCURRENCY = 100
+
+
+class _NoCache(LLMResponseCache):
+    """Every lookup misses and nothing is shared: the old behaviour"""
+
+    async def get_or_call(self, call_type, key, produce):
+        self._count(call_type, "miss")
+        return await produce()
+
+
+def _workload():
+    rng = random.Random(7)
+    # Zipf-ish popularity: a few merchants account for most spending
+    weights = [1 / (rank + 1) for rank in range(MERCHANTS)]
+    merchants = rng.choices(range(MERCHANTS), weights=weights, k=REQUESTS)
+    return [(f"Merchant {m}", round(rng.uniform(2, 80), 2)) for m in merchants]
+
+
+async def _replay(service, workload):
+    gate = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(merchant, amount):
+        async with gate:
+            return await service.categorize_expense("card payment", amount, merchant)
+
+    return await asyncio.gather(*(one(m, a) for m, a in workload))
+
+
+def _run(cache, unbatched=False):
+    client = StubChatClient(latency=LATENCY)
+    service = ResilientGPTService("sk-test", "gpt-4", client=client, cache=cache)
+    if unbatched:
+        service._categorizer.max_batch = 1
+    start = time.perf_counter()
+    results = asyncio.run(_replay(service, _workload()))
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()["categorization"]
+    return results, client, stats, elapsed
+
+
+@pytest.mark.performance
+def test_categorization_cache_cuts_model_calls_and_tokens():
+    _, base_client, base, base_elapsed = _run(
+        _NoCache(store=InMemoryKeyValueStore()), unbatched=True
+    )
+    results, client, stats, elapsed = _run(LLMResponseCache(store=InMemoryKeyValueStore()))
+
+    base_tokens = base["prompt_tokens"] + base["completion_tokens"]
+    tokens = stats["prompt_tokens"] + stats["completion_tokens"]
+    print(
+        f"\nuncached: {len(base_client.calls)} model calls, {base_tokens} tokens, "
+        f"{base_elapsed:.2f}s"
+        f"\ncached:   {len(client.calls)} model calls, {tokens} tokens, "
+        f"{elapsed:.2f}s (hit rate {stats['hit_rate']:.1%}, "
+        f"{stats['coalesced']} coalesced)"
+    )
+    assert len(results) == REQUESTS
+    assert all(r["confidence"] == 90 for r in results)  # all answered by the model
+    assert len(client.calls) * 20 < len(base_client.calls)
+    assert tokens * 3 < base_tokens
@@ -0,0 +1,140 @@
+"""
+Response Serialization Benchmark
+
+Times rendering a success envelope for the two heaviest list payloads:
+GET /api/transactions/?limit=1000 (Transaction rows, Decimal/UUID/datetime
+columns) and a month of saved calendar days (nested category dicts). The
+"before" path is the old one: jsonable_encoder over the payload, then
+JSONResponse's stdlib json. "After" is StandardizedResponse.success with
+orjson, and the streamed writer for a 20k-row list.
+
+Run with output:
+    python -m pytest app/tests/performance/test_response_serialization_performance.py -s
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.db.models import Transaction
+from app.utils.response_wrapper import StandardizedResponse
+
+pytest.importorskip("orjson")
+
+ROUNDS = 5
+CATEGORIES = ["food", "groceries", "transportation", "rent", "utilities", "other"]
+
+
+def _transactions(count):
+    user_id = uuid4()
+    start = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [
+        Transaction(
+            id=uuid4(),
+            user_id=user_id,
+            category=CATEGORIES[i % len(CATEGORIES)],
+            amount=Decimal(f"{(i * 37) % 5000}.{i % 100:02d}"),
+            currency="USD",
+            description=f"Purchase {i}",
+            merchant=f"Merchant {i % 40}",
+            is_recurring=False,
+            spent_at=start + timedelta(minutes=17 * i),
+            created_at=start + timedelta(minutes=17 * i),
+            updated_at=start + timedelta(minutes=17 * i),
+        )
+        for i in range(count)
+    ]
+
+
+def _calendar_month():
+    return {
+        "calendar": [
+            {
+                "date": f"2026-10-{day:02d}",
+                "day": day,
+                "planned_budget": {
+                    category: {
+                        "planned": Decimal("42.50"),
+                        "spent": Decimal(day),
+                        "status": "active",
+                    }
+                    for category in CATEGORIES
+                },
+                "limit": Decimal("255.00"),
+                "total": Decimal("255.00"),
+                "spent": Decimal(day * 6),
+                "status": "active",
+            }
+            for day in range(1, 32)
+        ]
+    }
+
+
+def _legacy_success(data):
+    content = {
+        "success": True,
+        "message": "Transactions retrieved successfully",
+        "data": jsonable_encoder(data),
+        "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
+        "request_id": f"req_{uuid4().hex[:12]}",
+    }
+    return JSONResponse(content=content)
+
+
+def _best(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def _report(label, size, seconds):
+    rate = size / seconds / 1_000_000
+    print(f"  {label:<10} {seconds * 1000:8.2f}ms  {size:>10,} bytes  {rate:7.1f} MB/s")
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("payload", ["transactions", "calendar"])
+def test_success_envelope_serialization(payload):
+    data = _transactions(1000) if payload == "transactions" else _calendar_month()
+
+    legacy, legacy_s = _best(lambda: _legacy_success(data))
+    fast, fast_s = _best(lambda: StandardizedResponse.success(data))
+
+    print(f"\n{payload}")
+    _report("before", len(legacy.body), legacy_s)
+    _report("after", len(fast.body), fast_s)
+    print(f"  speedup    {legacy_s / fast_s:8.1f}x")
+
+    assert json.loads(fast.body)["data"] == json.loads(legacy.body)["data"]
+    assert fast_s < legacy_s
+
+
+@pytest.mark.performance
+def test_streamed_list_serialization():
+    rows = _transactions(20_000)
+
+    async def collect(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    def streamed():
+        return asyncio.run(collect(StandardizedResponse.stream(iter(rows))))
+
+    legacy, legacy_s = _best(lambda: _legacy_success(rows))
+    body, stream_s = _best(streamed)
+
+    print(f"\n{len(rows):,} transactions")
+    _report("before", len(legacy.body), legacy_s)
+    _report("streamed", len(body), stream_s)
+
+    assert json.loads(body)["data"] == json.loads(legacy.body)["data"]
+    assert stream_s < legacy_s
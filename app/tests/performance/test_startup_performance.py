@@ -0,0 +1,49 @@
+"""
+API Startup Benchmark
+
+Imports app.main in fresh interpreters, with every router mounted eagerly
+and with LAZY_ROUTERS, and reports wall time, peak RSS and module count.
+Heavy SDKs (scikit-learn, OpenAI, Google Vision and Firestore, pytesseract,
+Pillow) must stay unloaded in both modes.
+
+Run with output:
+    python -m pytest app/tests/performance/test_startup_performance.py -s
+"""
+
+import statistics
+
+import pytest
+
+from scripts.profile_startup import profile_startup
+
+RUNS = 3
+HEAVY_MODULES = ["sklearn", "openai", "google.cloud.vision", "pytesseract", "PIL"]
+
+
+def _measure(env):
+    runs = [profile_startup("app.main", env=env, importtime=False) for _ in range(RUNS)]
+    return {
+        "wall_ms": statistics.median(run["wall_ms"] for run in runs),
+        "max_rss_mb": statistics.median(run["max_rss_mb"] for run in runs),
+        "modules": runs[0]["modules"],
+        "loaded": set(runs[0]["loaded"]),
+    }
+
+
+@pytest.mark.performance
+def test_startup_eager_vs_lazy_routers():
+    eager = _measure({"LAZY_ROUTERS": "false"})
+    lazy = _measure({"LAZY_ROUTERS": "true"})
+
+    print(f"\nimport app.main, median of {RUNS} fresh interpreters")
+    for label, result in (("eager routers", eager), ("lazy routers", lazy)):
+        print(
+            f"  {label:14} {result['wall_ms']:7.0f}ms  "
+            f"RSS {result['max_rss_mb']:5.0f}MB  {result['modules']} modules"
+        )
+
+    for result in (eager, lazy):
+        assert [m for m in HEAVY_MODULES if m in result["loaded"]] == []
+    assert "app.api.cluster.routes" in eager["loaded"]
+    assert "app.api.cluster.routes" not in lazy["loaded"]
+    assert lazy["modules"] < eager["modules"]
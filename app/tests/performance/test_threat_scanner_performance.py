@@ -0,0 +1,123 @@
+"""
+Input Threat Scanner Benchmark
+
+Compares the old one-re.search-per-pattern loops with the single-pass
+scanner on realistic transaction payloads, as SecureInputValidator and
+InputSanitizer see them.
+
+Run with output:
+    python -m pytest app/tests/performance/test_threat_scanner_performance.py -s
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from app.core.security import SecurityConfig
+from app.core.threat_scanner import free_text_scanner, request_input_scanner
+from app.core.validators import InputSanitizer
+
+MERCHANTS = [
+    "Whole Foods Market #10234",
+    "Starbucks Coffee",
+    "Uber *Trip",
+    "Amazon.com Order 114-2233",
+    "Shell Oil 5723",
+    "Netflix.com",
+    "Trader Joe's",
+    "Delta Air Lines",
+    "CVS/Pharmacy",
+    "Café de Flore",
+]
+NOTES = [
+    "weekly groceries",
+    "ride to airport = reimbursable",
+    "split with Sam; pay back Friday",
+    "gift for mom (birthday)",
+    "",
+    "Deleted old subscription",
+    "lunch w/ team",
+]
+CATEGORIES = ["food", "transport", "shopping", "entertainment", "utilities"]
+ROUNDS = 20
+
+
+def _payloads(count=1_000, seed=3):
+    rng = random.Random(seed)
+    return [
+        {
+            "merchant": rng.choice(MERCHANTS),
+            "description": rng.choice(NOTES),
+            "category": rng.choice(CATEGORIES),
+            "currency": "USD",
+            "location": "Austin, TX",
+            "tags": [rng.choice(CATEGORIES), "card"],
+        }
+        for _ in range(count)
+    ]
+
+
+def _strings(payloads):
+    for payload in payloads:
+        for value in payload.values():
+            if isinstance(value, list):
+                yield from value
+            else:
+                yield value
+
+
+def _legacy_strict(text):
+    lowered = text.lower()
+    for pattern in SecurityConfig.SQL_INJECTION_PATTERNS:
+        if re.search(pattern, lowered, re.IGNORECASE):
+            return True
+    for pattern in SecurityConfig.XSS_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    return False
+
+
+def _legacy_free_text(text):
+    for patterns in (
+        InputSanitizer.SQL_INJECTION_PATTERNS,
+        InputSanitizer.XSS_PATTERNS,
+        InputSanitizer.FINANCIAL_INJECTION_PATTERNS,
+    ):
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                return True
+    return False
+
+
+def _time(check, strings):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        flagged = sum(1 for text in strings if check(text))
+    return time.perf_counter() - start, flagged
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize(
+    "label,legacy,scanner",
+    [
+        ("SecureInputValidator", _legacy_strict, request_input_scanner),
+        ("InputSanitizer", _legacy_free_text, free_text_scanner),
+    ],
+)
+def test_scanner_outpaces_pattern_loops(label, legacy, scanner):
+    strings = list(_strings(_payloads()))
+
+    legacy_time, legacy_flagged = _time(legacy, strings)
+    scanner_time, scanner_flagged = _time(scanner.matches, strings)
+
+    per_string = ROUNDS * len(strings)
+    print(
+        f"\n{label}: {len(strings)} strings x {ROUNDS}: "
+        f"loops {legacy_time / per_string * 1e6:.2f}us/string, "
+        f"scanner {scanner_time / per_string * 1e6:.2f}us/string "
+        f"({legacy_time / scanner_time:.1f}x)"
+    )
+    assert scanner_flagged == legacy_flagged
+    assert scanner_time * 3 < legacy_time
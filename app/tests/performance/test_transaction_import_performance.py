@@ -0,0 +1,71 @@
+"""
+Statement Import Benchmark
+
+Imports a 100k-row CSV statement end to end - streaming parse, validation,
+ledger dedup, batched inserts and the DailyPlan recompute - and reports
+throughput. On SQLite batches go through executemany; on PostgreSQL they
+use COPY and insert faster still.
+
+Run with output:
+    python -m pytest app/tests/performance/test_transaction_import_performance.py -s
+"""
+
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyPlan, Transaction
+from app.services.transaction_import import TransactionImporter
+
+ROWS = 100_000
+DAYS = 365
+MERCHANTS = ["Corner Cafe", "Fresh Market", "City Transit", "Fuel Stop", "Cinema"]
+CATEGORIES = ["food", "groceries", "transportation", "gas", "entertainment"]
+
+
+def _sqlite_table(model, metadata):
+    columns = []
+    for column in model.__table__.columns:
+        kind = JSON() if isinstance(column.type, (ARRAY, JSONB)) else column.type
+        columns.append(Column(column.name, kind, primary_key=column.primary_key))
+    return Table(model.__tablename__, metadata, *columns)
+
+
+@pytest.mark.performance
+def test_import_100k_rows(tmp_path):
+    path = tmp_path / "statement.csv"
+    today = date.today()
+    with open(path, "w") as handle:
+        handle.write("Date,Amount,Payee,Category\n")
+        for i in range(ROWS):
+            day = today - timedelta(days=1 + i % DAYS)
+            cents = 100 + (i * 37) % 9000
+            handle.write(
+                f"{day.isoformat()},-{cents // 100}.{cents % 100:02d},"
+                f"{MERCHANTS[i % 5]} {i % 40},{CATEGORIES[i % 5]}\n"
+            )
+
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    _sqlite_table(Transaction, metadata)
+    _sqlite_table(DailyPlan, metadata)
+    metadata.create_all(engine)
+
+    with Session(engine) as db:
+        start = time.perf_counter()
+        report = TransactionImporter(db, uuid4(), tz="UTC").run(str(path), "csv")
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"\n{report.rows} rows in {elapsed:.1f}s "
+        f"({report.rows / elapsed:,.0f} rows/s, {report.batches} batches, "
+        f"{report.days_recomputed} days recomputed)"
+    )
+    assert report.imported == ROWS
+    assert report.days_recomputed == DAYS
+    assert report.rows / elapsed > 2_000
@@ -0,0 +1,242 @@
+"""
+Precomputed AI insight snapshots
+
+Snapshots are computed on in-memory SQLite from the real analyzer and
+compared with what the analyzer returns when run per request.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import MetaData, create_engine, select
+from sqlalchemy.orm import Session
+
+import app.api.ai.routes as ai_routes
+import app.services.core.engine.cron_task_ai_insights as cron_task
+from app.db.models import (
+    AIAnalysisSnapshot,
+    SyncTombstone,
+    Transaction,
+    User,
+    UserSyncState,
+)
+from app.db.models.ai_analysis_snapshot import INSIGHTS_KIND, PROFILE_KIND
+from app.services.ai_financial_analyzer import AIFinancialAnalyzer
+from app.services.ai_insight_snapshots import (
+    INSIGHT_SECTIONS,
+    SIGNIFICANT_CHANGES,
+    InsightUnavailable,
+    get_insight,
+    refresh_insight_snapshots,
+)
+
+MODELS = [User, Transaction, AIAnalysisSnapshot, UserSyncState, SyncTombstone]
+CATEGORIES = ["food", "dining", "transportation", "entertainment", "shopping"]
+
+
+@pytest.fixture
+def db(sqlite_table):
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for model in MODELS:
+        sqlite_table(model, metadata)
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    requested = []
+    monkeypatch.setattr(ai_routes, "request_insight_refresh", requested.append)
+    return requested
+
+
+class RunSyncDB:
+    """The AsyncSession.run_sync bridge _insight_response goes through"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run_sync(self, fn):
+        return fn(self.session)
+
+
+def _serve(db, user, section):
+    response = asyncio.run(ai_routes._insight_response(RunSyncDB(db), user, section))
+    body = json.loads(response.body)
+    return body["data"], body["meta"]
+
+
+def _user(db, onboarded=True, transactions=60):
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex}@example.com",
+        password_hash="x",
+        monthly_income=Decimal("4000"),
+        has_onboarded=onboarded,
+    )
+    db.add(user)
+    now = datetime.now(timezone.utc)
+    for i in range(transactions):
+        db.add(
+            Transaction(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                category=CATEGORIES[i % len(CATEGORIES)],
+                amount=Decimal(f"{12 + (i * 7) % 90}.50") * (6 if i == 40 else 1),
+                description=f"purchase {i}",
+                spent_at=now - timedelta(days=i * 2, hours=i % 5),
+                created_at=now - timedelta(days=i * 2),
+            )
+        )
+    db.commit()
+    return user
+
+
+def _snapshots(db, user_id, kind=INSIGHTS_KIND):
+    return (
+        db.execute(
+            select(AIAnalysisSnapshot).where(
+                AIAnalysisSnapshot.user_id == user_id,
+                AIAnalysisSnapshot.kind == kind,
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+
+def _transactions(db, user_id):
+    return (
+        db.execute(select(Transaction).where(Transaction.user_id == user_id))
+        .scalars()
+        .all()
+    )
+
+
+def _tombstone(user_id, seq, entity="transactions"):
+    return SyncTombstone(
+        user_id=user_id, change_seq=seq, entity=entity, entity_id=uuid.uuid4()
+    )
+
+
+def test_batch_matches_the_per_request_analyzer(db):
+    users = [_user(db), _user(db), _user(db, transactions=0)]
+    db.add(AIAnalysisSnapshot(user_id=users[0].id, kind=PROFILE_KIND, rating="B"))
+    db.commit()
+
+    assert refresh_insight_snapshots(db, [str(u.id) for u in users]) == {
+        "refreshed": 3,
+        "skipped": 0,
+    }
+    refresh_insight_snapshots(db, [users[0].id])
+
+    for user in users:
+        [snapshot] = _snapshots(db, user.id)
+        sections = snapshot.full_profile["sections"]
+        assert set(sections) == set(INSIGHT_SECTIONS)
+
+        per_request = AIFinancialAnalyzer(db, user.id)
+        for name in ("financial_health_score", "savings_optimization"):
+            expected = getattr(per_request, INSIGHT_SECTIONS[name])()
+            assert sections[name] == expected, name
+        patterns = per_request.analyze_spending_patterns()
+        assert sections["spending_patterns"]["patterns"] == patterns["patterns"]
+        assert len(sections["spending_anomalies"]) == len(
+            per_request.detect_spending_anomalies()
+        )
+
+    assert len(_snapshots(db, users[0].id, kind=PROFILE_KIND)) == 1
+
+
+def test_missing_snapshot_is_computed_on_first_read(db, refreshes):
+    user = _user(db)
+
+    data, meta = _serve(db, user, "weekly_insights")
+
+    assert "weekly_summary" in data
+    assert meta["snapshot"]["stale"] is False
+    assert meta["snapshot"]["changes_since"] == 0
+    assert len(_snapshots(db, user.id)) == 1
+    assert refreshes == []
+
+
+def test_snapshot_goes_stale_with_age_or_ledger_changes(db, refreshes):
+    user = _user(db)
+    taken = datetime.now(timezone.utc)
+    refresh_insight_snapshots(db, [user.id], now=taken)
+
+    _, meta = get_insight(db, user.id, "spending_patterns", now=taken)
+    assert not meta["snapshot"]["stale"]
+
+    _, meta = get_insight(
+        db, user.id, "spending_patterns", now=taken + timedelta(hours=27)
+    )
+    assert meta["snapshot"]["stale"]
+    assert refreshes == []  # queued by the endpoint, outside the session
+
+    # Notification and daily plan writes advance the sync version too
+    db.add(UserSyncState(user_id=user.id, last_seq=5 * SIGNIFICANT_CHANGES))
+    db.add(_tombstone(user.id, 1, "notifications"))
+    db.commit()
+    _, meta = get_insight(db, user.id, "spending_patterns", now=taken)
+    assert meta["snapshot"]["changes_since"] == 0
+    assert not meta["snapshot"]["stale"]
+
+    ledger = _transactions(db, user.id)
+    for seq, txn in enumerate(ledger[: SIGNIFICANT_CHANGES - 2], start=2):
+        txn.change_seq = seq
+    db.add_all([_tombstone(user.id, 90, "transactions"), _tombstone(user.id, 91)])
+    db.commit()
+    _, meta = get_insight(db, user.id, "spending_patterns", now=taken)
+    assert meta["snapshot"]["changes_since"] == SIGNIFICANT_CHANGES
+    assert meta["snapshot"]["stale"]
+
+    _, meta = _serve(db, user, "spending_patterns")
+    assert meta["snapshot"]["stale"]
+    assert refreshes == [user.id]
+
+
+def test_old_schema_is_recomputed_and_failed_sections_fall_back(db, refreshes):
+    user = _user(db)
+    db.add(
+        AIAnalysisSnapshot(
+            user_id=user.id,
+            kind=INSIGHTS_KIND,
+            full_profile={"schema_version": 0, "sections": {}},
+        )
+    )
+    db.commit()
+
+    data, _ = get_insight(db, user.id, "financial_health_score")
+    assert "grade" in data
+
+    [snapshot] = _snapshots(db, user.id)
+    profile = dict(snapshot.full_profile)
+    profile["sections"] = {}
+    snapshot.full_profile = profile
+    db.commit()
+    with pytest.raises(InsightUnavailable):
+        get_insight(db, user.id, "financial_health_score")
+
+
+def test_nightly_job_enqueues_active_users_in_chunks(db, monkeypatch):
+    active = [_user(db, transactions=3) for _ in range(5)]
+    _user(db, onboarded=False, transactions=3)
+    _user(db, transactions=0)
+    enqueued = []
+    monkeypatch.setattr(
+        cron_task, "enqueue_task", lambda func, user_ids: enqueued.append(user_ids)
+    )
+
+    assert cron_task.enqueue_insight_refreshes(db, chunk_size=2) == {
+        "users": 5,
+        "chunks": 3,
+    }
+    assert [len(chunk) for chunk in enqueued] == [2, 2, 1]
+    assert sorted(sum(enqueued, [])) == sorted(str(u.id) for u in active)
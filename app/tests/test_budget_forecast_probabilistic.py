@@ -0,0 +1,227 @@
+"""
+Probabilistic month-end forecast
+
+/budget/forecast projected month-end from one linear daily pace. With
+mode=probabilistic it also bootstraps the user's own daily spending history
+into 10,000 month-end paths and reports P10/P50/P90 balances and the chance
+of going over, overall, per category and per goal.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.budget.services import fetch_daily_spend_history
+from app.db.models import Transaction
+from app.services.core.engine.budget_forecast_engine import (
+    DailyPlanData,
+    DailySpendData,
+    GoalData,
+    compute_probabilistic_forecast,
+    simulate_month_end,
+)
+
+TODAY = date(2026, 10, 11)  # 20 days left in October
+
+
+def _plans(planned, spent_per_day):
+    """October plan rows: `planned` per category, spend up to yesterday"""
+    return [
+        DailyPlanData(
+            date=date(2026, 10, day),
+            category=category,
+            planned_amount=Decimal(planned[category]) / 31,
+            spent_amount=(
+                Decimal(spent_per_day[category]) if day < TODAY.day else Decimal(0)
+            ),
+        )
+        for day in range(1, 32)
+        for category in planned
+    ]
+
+
+def _history(amounts_by_category, days=60):
+    """Every category spends its amounts in turn, one per day"""
+    return [
+        DailySpendData(
+            TODAY - timedelta(days=k),
+            category,
+            Decimal(amounts[k % len(amounts)]),
+        )
+        for k in range(1, days + 1)
+        for category, amounts in amounts_by_category.items()
+    ]
+
+
+def test_paths_are_sums_of_whole_historical_days():
+    history = np.array([[10.0, 1.0], [30.0, 3.0]])
+
+    future = simulate_month_end(history, 4, paths=2_500, rng=np.random.default_rng(0))
+
+    assert future.shape == (2_500, 2)
+    # Each path is 4 whole days: the two categories move together
+    assert np.allclose(future[:, 0], future[:, 1] * 10)
+    assert set(np.unique(future[:, 0])) <= {40.0, 60.0, 80.0, 100.0, 120.0}
+    assert abs(future[:, 0].mean() - 80) < 1
+    assert not simulate_month_end(history, 0, paths=10).any()
+
+
+def test_steady_spender_has_no_spread():
+    result = compute_probabilistic_forecast(
+        _plans({"groceries": 620}, {"groceries": 20}),
+        [],
+        _history({"groceries": ["20"]}),
+        2026,
+        10,
+        today=TODAY,
+        seed=1,
+    )
+
+    # 620 planned - 10 days * 20 spent - 20 days * 20 to come
+    assert result.balance_p10 == result.balance_p90 == Decimal("20.00")
+    assert result.overshoot_probability == Decimal("0.00")
+    assert result.history_source == "transactions"
+    assert result.history_days == 60
+    payload = result.to_dict()
+    assert payload["mode"] == "probabilistic"
+    assert payload["status"] == "on_track"  # the linear forecast is kept
+    assert payload["simulation"]["balance_p50"] == 20.0
+
+
+def test_volatile_category_carries_the_overshoot_risk():
+    args = (
+        _plans(
+            {"rent": 600, "dining_out": 300},
+            {"rent": 0, "dining_out": 10},
+        ),
+        [
+            GoalData("near", "Car", Decimal(1000), Decimal(0), None, date(2027, 1, 1)),
+            GoalData("far", "Trip", Decimal(900), Decimal(0), None, date(2027, 6, 1)),
+            GoalData("open", "Rainy day", Decimal(500), Decimal(0), None, None),
+            GoalData("done", "Phone", Decimal(100), Decimal(100), None, None),
+        ],
+        # Dining out: quiet most days, an expensive one every fifth day
+        _history({"rent": ["0"], "dining_out": ["0", "0", "5", "5", "60"]}),
+        2026,
+        10,
+    )
+
+    result = compute_probabilistic_forecast(*args, today=TODAY, seed=7)
+    again = compute_probabilistic_forecast(*args, today=TODAY, seed=7)
+
+    assert again.to_dict() == result.to_dict()
+    dining, rent = result.categories
+    assert dining.category == "dining_out"
+    assert dining.balance_p10 < dining.balance_p50 < dining.balance_p90
+    assert Decimal("0.1") < dining.overshoot_probability < Decimal("0.9")
+    assert rent.overshoot_probability == Decimal("0.00")
+
+    goals = {g.goal_id: g.shortfall_probability for g in result.goals}
+    # Leftovers fund the nearest deadline first
+    assert goals["near"] < goals["far"]
+    assert goals["open"] is None
+    assert goals["done"] == Decimal("0")
+
+
+def test_without_history_the_month_so_far_is_bootstrapped():
+    result = compute_probabilistic_forecast(
+        _plans({"groceries": 620}, {"groceries": 25}),
+        [],
+        [],
+        2026,
+        10,
+        today=TODAY,
+        seed=1,
+    )
+
+    assert result.history_source == "daily_plan"
+    assert result.history_days == 10
+    assert result.balance_p50 == Decimal("-130.00")
+    assert result.overshoot_probability == Decimal("1.00")
+
+
+def test_history_is_daily_spend_before_today(sqlite_table):
+    user_id = uuid4()
+    noon = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=12)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        metadata = MetaData()
+        sqlite_table(Transaction, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            for days_ago, amount, deleted in [
+                (1, 10, None),
+                (1, 5, None),
+                (2, 7, None),
+                (2, 100, noon),  # deleted
+                (0, 50, None),  # today: still in progress
+                (120, 9, None),  # outside the window
+            ]:
+                db.add(
+                    Transaction(
+                        id=uuid4(),
+                        user_id=user_id,
+                        category="groceries",
+                        amount=amount,
+                        spent_at=noon - timedelta(days=days_ago),
+                        deleted_at=deleted,
+                    )
+                )
+            await db.commit()
+            rows = await fetch_daily_spend_history(db, user_id, None, TODAY)
+        await engine.dispose()
+        return rows
+
+    rows = sorted(asyncio.run(run()), key=lambda r: r.date)
+
+    assert [(r.date, r.amount) for r in rows] == [
+        (TODAY - timedelta(days=2), Decimal("7")),
+        (TODAY - timedelta(days=1), Decimal("15")),
+    ]
+
+
+def test_history_days_are_the_users_local_days(sqlite_table):
+    user_id = uuid4()
+    midnight = datetime.combine(TODAY, datetime.min.time())
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        metadata = MetaData()
+        sqlite_table(Transaction, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            # 22:30 UTC two days ago is 01:30 yesterday in Sofia (UTC+3);
+            # 22:30 UTC yesterday is already today there.
+            for spent_at, amount in [
+                (midnight - timedelta(days=1, hours=1, minutes=30), 12),
+                (midnight - timedelta(hours=1, minutes=30), 40),
+            ]:
+                db.add(
+                    Transaction(
+                        id=uuid4(),
+                        user_id=user_id,
+                        category="restaurants",
+                        amount=amount,
+                        spent_at=spent_at,
+                    )
+                )
+            await db.commit()
+            rows = await fetch_daily_spend_history(db, user_id, "Europe/Sofia", TODAY)
+        await engine.dispose()
+        return rows
+
+    rows = asyncio.run(run())
+
+    assert [(r.date, r.amount) for r in rows] == [
+        (TODAY - timedelta(days=1), Decimal("12")),
+    ]
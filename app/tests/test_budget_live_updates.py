@@ -0,0 +1,168 @@
+"""
+Live budget status stream
+
+The home screen polled /budget/live_status, /dashboard and /forecast. The
+SSE stream sends one full status, then deltas only when a commit touched
+the user's transactions or daily plan.
+"""
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.db.models import DailyPlan, Transaction
+from app.services import budget_live_updates
+from app.services.budget_live_updates import LiveBudgetHub, live_status_events
+
+
+def _parse(frame: str):
+    lines = frame.strip().splitlines()
+    return lines[0].split(": ", 1)[1], json.loads(lines[1].split(": ", 1)[1])
+
+
+def test_stream_sends_status_then_only_changed_fields():
+    hub = LiveBudgetHub(redis_url="")
+    user_id = uuid4()
+    status = {"spent_today": 10.0, "remaining_today": 40.0, "status": "good"}
+    loads = 0
+
+    async def load_status():
+        nonlocal loads
+        loads += 1
+        return dict(status)
+
+    async def connected():
+        return False
+
+    async def run():
+        stream = live_status_events(
+            user_id, load_status, connected, hub=hub, heartbeat=0.05, debounce=0
+        )
+        first = await stream.__anext__()
+
+        status.update(spent_today=25.0, remaining_today=25.0)
+        hub.deliver(user_id)
+        delta = await stream.__anext__()
+
+        # A change notification with nothing new yields no frame, only keepalives
+        hub.deliver(user_id)
+        keepalive = await stream.__anext__()
+        await stream.aclose()
+        return first, delta, keepalive
+
+    first, delta, keepalive = asyncio.run(run())
+
+    assert _parse(first) == (
+        "status",
+        {"spent_today": 10.0, "remaining_today": 40.0, "status": "good"},
+    )
+    assert _parse(delta) == ("delta", {"spent_today": 25.0, "remaining_today": 25.0})
+    assert keepalive == ": keepalive\n\n"
+    assert loads == 3
+    assert hub.connection_count == 0
+
+
+def test_notifications_coalesce_while_pending():
+    hub = LiveBudgetHub(redis_url="")
+    user_id = uuid4()
+
+    async def run():
+        async with hub.subscribe(user_id) as queue:
+            woken = [hub.deliver(user_id) for _ in range(5)]
+            return woken, queue.qsize()
+
+    woken, pending = asyncio.run(run())
+    assert woken == [1, 0, 0, 0, 0]
+    assert pending == 1
+
+
+def test_commit_touching_transactions_notifies_subscribers(monkeypatch):
+    hub = LiveBudgetHub(redis_url="")
+    monkeypatch.setattr(budget_live_updates.get_live_budget_hub, "instance", hub)
+    user_id, other_user = uuid4(), uuid4()
+
+    session = SimpleNamespace(
+        new=[Transaction(user_id=user_id, category="food", amount=5)],
+        dirty=[DailyPlan(user_id=user_id)],
+        deleted=[],
+        info={},
+    )
+    rolled_back = SimpleNamespace(
+        new=[Transaction(user_id=other_user, category="food", amount=5)],
+        dirty=[],
+        deleted=[],
+        info={},
+    )
+
+    async def run():
+        async with hub.subscribe(user_id) as mine, hub.subscribe(other_user) as theirs:
+            budget_live_updates._collect_changed_users(session, None)
+            budget_live_updates._publish_changed_users(session)
+
+            budget_live_updates._collect_changed_users(rolled_back, None)
+            budget_live_updates._discard_changed_users(rolled_back)
+            budget_live_updates._publish_changed_users(rolled_back)
+
+            await asyncio.sleep(0)  # publish runs as a task
+            return mine.qsize(), theirs.qsize()
+
+    assert asyncio.run(run()) == (1, 0)
+    assert session.info == {}
+
+
+def test_commit_outside_the_loop_does_not_wait_for_redis():
+    hub = LiveBudgetHub(redis_url="redis://live-budget-test")
+    user_id = uuid4()
+    release = threading.Event()
+    published = []
+
+    class SlowRedis:
+        def publish(self, channel, message):
+            release.wait(5)
+            published.append(channel)
+
+    hub._get_sync_client = SlowRedis
+
+    async def run():
+        async with hub.subscribe(user_id) as queue:
+            hub._listener.cancel()  # no real Redis to subscribe to
+            # A sync-session commit in the threadpool returns at once ...
+            await asyncio.wait_for(
+                asyncio.to_thread(hub.publish_from_sync, [user_id]), timeout=1
+            )
+            assert published == [] and queue.empty()
+            # ... and the publisher thread finishes the job in the background
+            release.set()
+            return await asyncio.wait_for(queue.get(), timeout=5)
+
+    assert asyncio.run(run()) is True
+    assert published == [budget_live_updates.channel_for(user_id)]
+
+
+def test_changes_published_by_another_worker_reach_subscribers(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        budget_live_updates,
+        "get_async_redis",
+        lambda url: fakeredis.FakeAsyncRedis(server=server),
+    )
+    # Idle waits end on the poll timeout without dropping the subscription
+    monkeypatch.setattr(budget_live_updates, "LISTEN_POLL_SECONDS", 0.02)
+    listener = LiveBudgetHub(redis_url="redis://live-budget-test")
+    publisher = LiveBudgetHub(redis_url="redis://live-budget-test")
+    user_id = uuid4()
+
+    async def run():
+        async with listener.subscribe(user_id) as queue:
+            while not listener._listening:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            await publisher.publish([user_id])
+            return await asyncio.wait_for(queue.get(), timeout=2)
+
+    assert asyncio.run(run()) is True
@@ -0,0 +1,163 @@
+"""
+Shared in-process cache engine
+
+caching.MemoryCache, advanced_cache_manager.MemoryCache and PerformanceCache
+all sit on CacheNamespace now; these tests pin the LRU/TTL semantics they
+rely on and the adapters' public behaviour.
+"""
+
+import asyncio
+
+from app.core.cache_engine import CacheEngine, CacheNamespace, estimate_size
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    ns = CacheNamespace("t", max_entries=2)
+    ns.set("a", 1)
+    ns.set("b", 2)
+    assert ns.get("a") == 1  # a is now most recent
+    ns.set("c", 3)
+
+    assert ns.get("b") is None
+    assert ns.get("a") == 1 and ns.get("c") == 3
+    assert ns.evictions == 1
+
+
+def test_fifo_mode_ignores_reads():
+    ns = CacheNamespace("t", max_entries=2, touch_on_get=False)
+    ns.set("a", 1)
+    ns.set("b", 2)
+    ns.get("a")
+    ns.set("c", 3)
+
+    assert ns.get("a") is None
+    assert ns.get("b") == 2
+
+
+def test_ttl_expires_lazily_and_via_timer_wheel():
+    clock = FakeClock()
+    ns = CacheNamespace("t", max_entries=100, default_ttl=10, clock=clock)
+    ns.set("lazy", 1)
+    ns.set("untouched", 2)
+    ns.set("forever", 3, ttl=0)
+
+    clock.now += 5
+    assert ns.get("lazy") == 1
+
+    clock.now += 6
+    assert ns.get("lazy") is None
+    # Never read again, but the wheel drops it on the next write
+    ns.set("other", 4)
+    assert len(ns) == 2
+    assert ns.get("forever") == 3
+    assert ns.expirations == 2
+
+
+def test_overwrite_reschedules_expiry():
+    clock = FakeClock()
+    ns = CacheNamespace("t", max_entries=10, clock=clock)
+    ns.set("k", "old", ttl=5)
+    ns.set("k", "new", ttl=60)
+
+    clock.now += 10
+    assert ns.expire_due() == 0
+    assert ns.get("k") == "new"
+
+
+def test_byte_limit_evicts_and_rejects_oversized():
+    ns = CacheNamespace("t", max_entries=100, max_bytes=1000)
+    ns.set("a", "x", size=400)
+    ns.set("b", "y", size=400)
+    ns.set("c", "z", size=400)
+
+    assert ns.get("a") is None
+    assert ns.total_bytes == 800
+    assert ns.set("huge", "v", size=5000) is False
+    ns.delete("b")
+    assert ns.total_bytes == 400
+
+
+def test_tags_invalidate_entries():
+    ns = CacheNamespace("t", max_entries=10)
+    ns.set("u1", 1, tags=["user:1"])
+    ns.set("u1b", 2, tags=["user:1", "budget"])
+    ns.set("u2", 3, tags=["user:2"])
+
+    assert ns.delete_by_tags(["user:1"]) == 2
+    assert ns.get("u2") == 3
+    assert ns.delete_by_tags(["budget"]) == 0
+
+
+def test_stats_and_engine_registry():
+    engine = CacheEngine()
+    ns = engine.namespace("users", max_entries=5)
+    assert engine.namespace("users") is ns
+
+    ns.set("a", 1)
+    ns.get("a")
+    ns.get("missing")
+    stats = engine.stats()["users"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 50.0
+
+
+def test_estimate_size_scales_with_containers():
+    small = estimate_size([1] * 10)
+    large = estimate_size([1] * 10_000)
+    assert large > small * 100
+    assert estimate_size({"k": "v" * 1000}) > 1000
+
+
+def test_performance_cache_adapter():
+    from app.core.performance_cache import PerformanceCache
+
+    cache = PerformanceCache(max_size=2, default_ttl=60)
+    cache.set("a", {"id": 1})
+    cache.set("b", {"id": 2})
+    cache.get("a")
+    cache.set("c", {"id": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1}
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+
+
+def test_multi_tier_memory_cache_adapter():
+    from app.core.caching import MemoryCache
+
+    async def run():
+        cache = MemoryCache(max_size=10, default_ttl=60)
+        await cache.set("k", [1, 2, 3], tags=["t"])
+        assert await cache.get("k") == [1, 2, 3]
+        [entry] = cache.entries()
+        assert entry.key == "k" and entry.access_count == 1 and entry.tags == ["t"]
+        assert cache.get_stats()["total_size_bytes"] > 0
+        await cache.clear_by_tags(["t"])
+        assert await cache.get("k") is None
+
+    asyncio.run(run())
+
+
+def test_advanced_memory_cache_adapter():
+    from app.services.advanced_cache_manager import EvictionPolicy, MemoryCache
+
+    async def run():
+        cache = MemoryCache(max_size=2, eviction_policy=EvictionPolicy.FIFO)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        assert not await cache.exists("a")
+        stats = cache.get_stats()
+        assert stats.entry_count == 2 and stats.evictions == 1
+
+    asyncio.run(run())
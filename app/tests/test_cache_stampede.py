@@ -0,0 +1,179 @@
+"""
+Stampede protection in the caching decorators
+
+When a popular key expired every concurrent request recomputed it. `cached`
+now coalesces concurrent misses, refreshes ahead of expiry and can serve
+stale values while one call revalidates.
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import caching
+from app.core.caching import CachedResult, cached, get_decorator_stats
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    """Fresh multi-tier cache with the Redis tier disabled"""
+    manager = caching.MultiTierCache()
+    manager.redis_cache.redis_client = None
+    manager.memory_cache.clear()  # the namespace is shared process-wide
+    monkeypatch.setattr(caching, "cache_manager", manager)
+    for counter in caching._decorator_stats:
+        caching._decorator_stats[counter] = 0
+    yield manager
+
+
+def test_concurrent_misses_share_one_call():
+    calls = 0
+
+    @cached(ttl=60, key_prefix="stampede")
+    async def load_dashboard(user_id):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"user": user_id}
+
+    async def run():
+        return await asyncio.gather(*(load_dashboard("u1") for _ in range(20)))
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(r == {"user": "u1"} for r in results)
+    stats = get_decorator_stats()
+    assert stats["misses"] == 20 and stats["coalesced"] == 19
+    assert stats["in_flight"] == 0
+
+
+def test_failure_propagates_to_all_waiters_and_is_not_cached():
+    calls = 0
+
+    @cached(ttl=60, key_prefix="failing")
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise RuntimeError("db down")
+        return "ok"
+
+    async def run():
+        first = await asyncio.gather(flaky(), flaky(), return_exceptions=True)
+        return first, await flaky()
+
+    first, second = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in first)
+    assert second == "ok"
+    assert calls == 2
+
+
+def test_stale_value_served_while_refreshing(memory_only_cache):
+    calls = 0
+
+    @cached(ttl=60, key_prefix="stale", stale_ttl=120, early_refresh_beta=0)
+    async def balance():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        assert await balance() == 1
+        # Age the stored entry past its fresh window
+        [entry] = memory_only_cache.memory_cache.entries()
+        entry.value.fresh_until = time.time() - 1
+        served = await balance()
+        await asyncio.sleep(0.01)  # let the background refresh finish
+        return served, await balance()
+
+    served, refreshed = asyncio.run(run())
+    assert served == 1
+    assert refreshed == 2
+    assert get_decorator_stats()["stale_served"] == 1
+
+
+def test_early_refresh_near_expiry(memory_only_cache):
+    calls = 0
+
+    @cached(ttl=60, key_prefix="early", early_refresh_beta=1.0)
+    async def report():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        await report()
+        [entry] = memory_only_cache.memory_cache.entries()
+        # Slow to compute and about to expire: XFetch refreshes ahead
+        entry.value.compute_seconds = 1000.0
+        entry.value.fresh_until = time.time() + 0.001
+        assert await report() == 1
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert calls == 2
+    assert get_decorator_stats()["early_refreshes"] == 1
+
+
+def test_calls_with_a_db_session_are_not_refreshed_in_the_background(
+    memory_only_cache,
+):
+    calls = 0
+
+    @cached(ttl=60, key_prefix="scoped", stale_ttl=120, early_refresh_beta=1.0)
+    async def totals(db, user_id):
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        db = Session()
+        await totals(db, "u1")
+        [entry] = memory_only_cache.memory_cache.entries()
+        entry.value.compute_seconds = 1000.0
+        entry.value.fresh_until = time.time() + 0.001
+        assert await totals(db, "u1") == 1  # no early refresh
+        entry.value.fresh_until = time.time() - 1
+        return await totals(db, "u1")  # stale: recomputed in the request
+
+    assert asyncio.run(run()) == 2
+    stats = get_decorator_stats()
+    assert stats["early_refreshes"] == stats["stale_served"] == 0
+
+
+def test_sub_second_lock_timeout_still_expires(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    manager = caching.MultiTierCache()
+    manager.redis_cache.redis_client = client
+    monkeypatch.setattr(caching, "cache_manager", manager)
+    ttls = []
+
+    async def produce():
+        ttls.append(await client.pttl("lock:k"))
+        return CachedResult(value=1, fresh_until=time.time() + 60, compute_seconds=0)
+
+    async def run():
+        await caching._produce("k", produce, None, True, lock_timeout=0.5)
+
+    asyncio.run(run())
+    assert 0 < ttls[0] <= 500
+
+
+def test_cache_statistics_include_decorator_counters():
+    async def run():
+        return await caching.get_cache_statistics()
+
+    stats = asyncio.run(run())
+    assert set(stats["decorators"]) >= {"hits", "coalesced", "stale_served"}
+
+
+def test_cached_result_is_picklable_for_redis():
+    import pickle
+
+    entry = CachedResult(value={"a": 1}, fresh_until=1.0, compute_seconds=0.1)
+    assert pickle.loads(pickle.dumps(entry)) == entry
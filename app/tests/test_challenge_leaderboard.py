@@ -0,0 +1,203 @@
+"""
+Challenge leaderboard on sorted sets
+
+/challenge/leaderboard grouped every completed participation per request
+and only knew the caller's rank when they were in the top 10. Boards are now
+sorted sets kept in step by a commit listener; ranks come from score counts.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models import ChallengeParticipation
+from app.services import challenge_leaderboard
+from app.services.challenge_leaderboard import (
+    ALL_TIME,
+    ChallengeLeaderboard,
+    InMemoryLeaderboardStore,
+    RedisLeaderboardStore,
+)
+
+
+class RebuildDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def execute(self, stmt):
+        self.calls += 1
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def _expected(scores, member):
+    mine = scores[member]
+    higher = sum(1 for s in scores.values() if s > mine)
+    lower = sum(1 for s in scores.values() if s < mine)
+    return higher + 1, round(100.0 * lower / (len(scores) - 1), 1)
+
+
+def test_rank_and_percentile_for_users_outside_the_top(store_backend):
+    store = store_backend(
+        InMemoryLeaderboardStore, lambda client, _: RedisLeaderboardStore(client)
+    )
+    rng = random.Random(5)
+    users = [str(uuid4()) for _ in range(300)]
+    rows, totals = [], {}
+    for user_id in users:
+        for month in ("2026-09", "2026-10"):
+            count = rng.randint(0, 6)
+            if count:
+                rows.append((user_id, month, count))
+                totals[user_id] = totals.get(user_id, 0) + count
+
+    board = ChallengeLeaderboard(store=store)
+    db = RebuildDB(rows)
+    caller = min(totals, key=totals.get)
+
+    result = asyncio.run(board.standings(db, caller, limit=5))
+
+    assert (result["user_rank"], result["percentile"]) == _expected(totals, caller)
+    assert result["user_completed_challenges"] == totals[caller]
+    assert result["total_participants"] == len(totals)
+    assert [u["completed_challenges"] for u in result["top_users"]] == sorted(
+        totals.values(), reverse=True
+    )[:5]
+    assert result["top_users"][0]["rank"] == 1
+
+    # Later reads are served without going back to the database
+    board.apply({(caller, "2026-10"): 50})
+    after = asyncio.run(board.standings(db, caller, period="2026-10", limit=5))
+    assert db.calls == 1
+    assert after["user_rank"] == 1
+    assert after["top_users"][0]["user_id"] == caller
+
+
+def test_ties_share_rank_and_unranked_users_get_none():
+    store = InMemoryLeaderboardStore()
+    store.replace({ALL_TIME: {"a": 3, "b": 3, "c": 1}})
+    board = ChallengeLeaderboard(store=store)
+
+    result = asyncio.run(board.standings(None, "c"))
+    outsider = asyncio.run(board.standings(None, "nobody"))
+
+    assert [u["rank"] for u in result["top_users"]] == [1, 1, 3]
+    assert (result["user_rank"], result["percentile"]) == (3, 0.0)
+    assert outsider["user_rank"] is None and outsider["total_participants"] == 3
+
+
+def test_commits_move_scores_and_rollbacks_do_not(monkeypatch):
+    store = InMemoryLeaderboardStore()
+    store.replace({ALL_TIME: {}})
+    leaderboard = ChallengeLeaderboard(store=store)
+    monkeypatch.setattr(
+        challenge_leaderboard.get_challenge_leaderboard, "instance", leaderboard
+    )
+    user_id = uuid4()
+
+    reverted = ChallengeParticipation(user_id=user_id, month="2026-10")
+    set_committed_value(reverted, "status", "completed")
+    reverted.status = "active"
+    committed = SimpleNamespace(
+        new=[
+            ChallengeParticipation(user_id=user_id, month="2026-10", status=s)
+            for s in ("completed", "completed", "active")
+        ],
+        dirty=[reverted],
+        deleted=[],
+        info={},
+    )
+    rolled_back = SimpleNamespace(
+        new=[
+            ChallengeParticipation(user_id=user_id, month="2026-10", status="completed")
+        ],
+        dirty=[],
+        deleted=[],
+        info={},
+    )
+
+    challenge_leaderboard._collect_leaderboard_changes(committed, None)
+    challenge_leaderboard._apply_leaderboard_changes(committed)
+    challenge_leaderboard._collect_leaderboard_changes(rolled_back, None)
+    challenge_leaderboard._discard_leaderboard_changes(rolled_back)
+    challenge_leaderboard._apply_leaderboard_changes(rolled_back)
+    leaderboard._outbox.join()
+
+    assert store.standing(ALL_TIME, str(user_id)).score == 1
+    assert store.standing("2026-10", str(user_id)).score == 1
+    assert committed.info == {}
+
+
+def test_completions_before_the_first_read_do_not_skip_the_rebuild():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    board = ChallengeLeaderboard(store=RedisLeaderboardStore(client))
+    veteran, newcomer = str(uuid4()), str(uuid4())
+    client.zadd(challenge_leaderboard.KEY_PREFIX + "2026-01", {"left-over": 9})
+
+    board.apply({(newcomer, "2026-10"): 1})
+    db = RebuildDB([(veteran, "2026-09", 40), (newcomer, "2026-10", 1)])
+    result = asyncio.run(board.standings(db, veteran))
+
+    assert db.calls == 1
+    assert result["user_rank"] == 1 and result["user_completed_challenges"] == 40
+    assert result["total_participants"] == 2
+    assert not client.exists(challenge_leaderboard.KEY_PREFIX + "2026-01")
+    assert not client.keys(challenge_leaderboard._TEMP_PREFIX + "*")
+
+
+def test_redis_errors_back_off_to_the_database_then_rebuild(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    store = RedisLeaderboardStore(fakeredis.FakeRedis(server=server))
+    board = ChallengeLeaderboard(store=store)
+    db = RebuildDB([("a", "2026-10", 3), ("b", "2026-10", 1)])
+    asyncio.run(board.standings(db, "a"))
+
+    clock = [1000.0]
+    monkeypatch.setattr(challenge_leaderboard.time, "monotonic", lambda: clock[0])
+    server.connected = False
+    with pytest.raises(RedisError):
+        board.apply({("b", "2026-10"): 5})  # lost while Redis is down
+    board.apply({("a", "2026-10"): 1})  # backing off: dropped without a call
+    down = asyncio.run(board.standings(db, "b"))
+    server.connected = True
+    backing_off = asyncio.run(board.standings(db, "b"))
+
+    assert board.store is store
+    assert down["user_rank"] == backing_off["user_rank"] == 2
+    assert db.calls == 3  # first build, then the database for both reads
+
+    db.rows = [("a", "2026-10", 3), ("b", "2026-10", 6)]
+    clock[0] += challenge_leaderboard.RETRY_BACKOFF_SECONDS
+    recovered = asyncio.run(board.standings(db, "b"))
+    assert recovered["user_rank"] == 1
+    assert store.standing(ALL_TIME, "b").score == 6
+
+
+def test_commit_hook_does_not_wait_for_the_store():
+    release = threading.Event()
+
+    class SlowStore(InMemoryLeaderboardStore):
+        def increment(self, board, member, delta):
+            release.wait(5)
+            super().increment(board, member, delta)
+
+    store = SlowStore()
+    board = ChallengeLeaderboard(store=store)
+
+    started = time.monotonic()
+    board.apply_from_sync({("u", "2026-10"): 1})
+    board.apply_from_sync({("u", "2026-10"): 1})
+    assert time.monotonic() - started < 1
+
+    release.set()
+    board._outbox.join()
+    assert store.standing(ALL_TIME, "u").score == 2
@@ -0,0 +1,198 @@
+"""
+Persisted cohort model
+
+The cohort engine kept labels in process memory and refit KMeans over every
+user on each fit. The model now lives in cohort_centroids and
+user_cohort_labels: later runs partial_fit only new and changed users and
+rewrite only the labels that moved. Runs on in-memory SQLite.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import MetaData, create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    ChallengeParticipation,
+    CohortCentroid,
+    DailyPlan,
+    Mood,
+    RedistributionEvent,
+    User,
+    UserCohortLabel,
+)
+from app.services.core.cohort.cohort_model import (
+    CohortModel,
+    feature_fingerprints,
+    update_centroids,
+)
+
+pytest.importorskip("sklearn.cluster")
+
+TODAY = date(2026, 10, 18)
+MODELS = [
+    User,
+    Mood,
+    ChallengeParticipation,
+    DailyPlan,
+    RedistributionEvent,
+    CohortCentroid,
+    UserCohortLabel,
+]
+
+
+@pytest.fixture
+def db(sqlite_table):
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for model in MODELS:
+        sqlite_table(model, metadata)
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _user(db, income, moods=0, spend=0):
+    user = User(
+        id=uuid4(),
+        email=f"{uuid4().hex}@example.com",
+        password_hash="x",
+        monthly_income=Decimal(income),
+    )
+    db.add(user)
+    for k in range(moods):
+        db.add(Mood(user_id=user.id, date=TODAY - timedelta(k), mood=f"m{k % 4}"))
+    if spend:
+        day = datetime(2026, 10, 10, tzinfo=timezone.utc)
+        db.add(
+            DailyPlan(user_id=user.id, date=day, category="food", spent_amount=spend)
+        )
+    return user.id
+
+
+def _two_groups(db):
+    """Savers: high income, no moods. Trackers: low income, logging daily."""
+    savers = [_user(db, 9000 + i) for i in range(10)]
+    trackers = [_user(db, 1500 + i, moods=30, spend=40) for i in range(10)]
+    db.commit()
+    return savers, trackers
+
+
+def _labels(db):
+    rows = db.execute(select(UserCohortLabel.user_id, UserCohortLabel.cluster_id))
+    return dict(rows.all())
+
+
+def test_first_run_fits_everyone_and_persists_labels(db):
+    savers, trackers = _two_groups(db)
+
+    result = CohortModel(n_clusters=2).train(db, today=TODAY)
+
+    assert (result.users, result.updated, result.written) == (20, 20, 20)
+    assert result.cold_start
+    labels = _labels(db)
+    assert len({labels[u] for u in savers}) == 1
+    assert len({labels[u] for u in trackers}) == 1
+    assert labels[savers[0]] != labels[trackers[0]]
+    centroids = db.execute(select(CohortCentroid)).scalars().all()
+    assert sorted(c.member_count for c in centroids) == [10, 10]
+
+
+def test_later_runs_only_touch_new_and_changed_users(db):
+    savers, trackers = _two_groups(db)
+    model = CohortModel(n_clusters=2)
+    model.train(db, today=TODAY)
+    before = _labels(db)
+
+    assert model.train(db, today=TODAY).updated == 0
+
+    # One saver starts logging moods and spending; one new tracker signs up
+    for k in range(30):
+        db.add(Mood(user_id=savers[0], date=TODAY - timedelta(k), mood="calm"))
+    db.add(
+        DailyPlan(
+            user_id=savers[0],
+            date=datetime(2026, 10, 10, tzinfo=timezone.utc),
+            category="food",
+            spent_amount=40,
+        )
+    )
+    newcomer = _user(db, 1400, moods=30, spend=40)
+    db.commit()
+
+    result = model.train(db, today=TODAY)
+
+    assert not result.cold_start
+    assert (result.updated, result.written) == (2, 2)
+    after = _labels(db)
+    assert after[newcomer] == before[trackers[0]]
+    assert after[savers[0]] == before[trackers[0]]
+    assert {u: after[u] for u in savers[1:]} == {u: before[u] for u in savers[1:]}
+
+
+def test_assign_places_a_new_user_by_nearest_centroid(db):
+    savers, trackers = _two_groups(db)
+    model = CohortModel(n_clusters=2)
+    model.train(db, today=TODAY)
+    newcomer = _user(db, 9500)
+    db.commit()
+
+    label = model.get_label(db, newcomer)
+
+    assert label == _labels(db)[savers[0]]
+    assert _labels(db)[newcomer] == label  # persisted for every worker
+
+
+def test_assign_upserts_over_a_label_written_meanwhile(db):
+    savers, _ = _two_groups(db)
+    model = CohortModel(n_clusters=2)
+    model.train(db, today=TODAY)
+    newcomer = _user(db, 9500)
+    # Another worker's first request labelled the user since we looked
+    db.add(UserCohortLabel(user_id=newcomer, cluster_id=-5, feature_hash=0))
+    db.commit()
+    statements = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    label = model.assign(db, newcomer, today=TODAY)
+
+    assert label == _labels(db)[savers[0]] == _labels(db)[newcomer]
+    writes = [s for s in statements if "user_cohort_labels" in s and "SELECT" not in s]
+    assert len(writes) == 1 and "ON CONFLICT" in writes[0]
+
+
+def test_untrained_model_labels_nobody(db):
+    user_id = _user(db, 3000)
+    db.commit()
+
+    assert CohortModel(n_clusters=2).get_label(db, user_id) == -1
+    assert _labels(db) == {}
+
+
+def test_restored_centroids_stay_put_without_new_users():
+    centroids = np.array([[0.0, 1.0], [5.0, 5.0], [9.0, 0.5]])
+    weights = np.array([120.0, 0.0, 7.0])
+
+    restored = update_centroids(centroids, weights, np.empty((0, 2)))
+
+    np.testing.assert_allclose(restored, centroids)
+
+
+def test_fingerprints_change_with_the_features_only():
+    raw = np.array([[5000.0, 3, 2, 1, 40.25, 0], [5000.0, 3, 2, 1, 40.25, 0]])
+    moved = raw.copy()
+    moved[1, 4] = 40.26
+
+    same, changed = feature_fingerprints(raw), feature_fingerprints(moved)
+
+    assert same[0] == same[1] == changed[0]
+    assert changed[1] != same[1]
+    assert same.dtype == np.int64
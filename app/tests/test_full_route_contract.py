@@ -816,6 +816,16 @@ SPECS = {
         "files": _upload,
         "expect": (200, 201, 202, 400, 402, 422, 503),
     },
+    ("POST", "/api/transactions/import"): {
+        "files": lambda: {
+            "file": (
+                "statement.csv",
+                io.BytesIO(b"date,amount,description\n2026-10-01,-4.50,Coffee\n"),
+                "text/csv",
+            )
+        },
+        "expect": (200, 201, 202, 400, 402, 422, 503),
+    },
     ("POST", "/api/transactions/receipt/advanced"): {
         "files": _upload,
         "expect": (200, 201, 202, 400, 402, 422, 503),
@@ -1173,6 +1183,11 @@ SPECS = {
         "expect": (200, 201),
     },
     ("GET", "/api/mood/"): {},
+    # ---- sync -------------------------------------------------------------------------
+    ("GET", "/api/sync/"): {
+        "query": {"since": 0},
+        "check": lambda body, ctx: _wrapped(body)["cursor"],
+    },
     # ---- insights ---------------------------------------------------------------------
     ("GET", "/api/insights/"): {},
     ("GET", "/api/insights/history"): {},
@@ -1212,6 +1227,17 @@ SPECS = {
             "monthly_income": "6000.00",
         },
     },
+    ("POST", "/api/installments/calculator/compare"): {
+        "json": {
+            "category": "electronics",
+            "monthly_income": "6000.00",
+            "scenarios": [
+                {"purchase_amount": "600.00", "num_payments": n, "interest_rate": r}
+                for n in (3, 6, 12, 24)
+                for r in ("0", "19.99")
+            ],
+        },
+    },
     ("GET", "/api/installments/profile"): {"expect": (200, 404)},
     ("POST", "/api/installments/profile"): {
         "json": {
@@ -1372,14 +1398,16 @@ SPECS = {
         ],
         "expect": (200, 404),
     },
-    # Cluster fit/centroids were never functional (the mounted request schema
-    # does not match the in-memory KMeans engine input) — deprecated to 501
-    # instead of shipping a permanent 500 (TASK-15 policy).
+    # Cluster fit was never functional (the mounted request schema does not
+    # match any training input) — deprecated to 501 instead of shipping a
+    # permanent 500 (TASK-15 policy). Training runs on a schedule.
     ("POST", "/api/cluster/fit"): {
         "json": {"user_data": [{"income": 6000.0}]},
         "expect": (501,),
     },
-    ("GET", "/api/cluster/centroids"): {"expect": (501,)},
+    ("GET", "/api/cluster/centroids"): {
+        "check": lambda body, ctx: _wrapped(body),
+    },
     ("POST", "/api/cluster/label"): {
         "check": lambda body, ctx: _wrapped(body),
     },
@@ -1559,6 +1587,11 @@ SPECS = {
         "query": {"limit": 5},
         "expect": (200, 403),
     },
+    ("GET", "/api/database/queries/by-route"): {
+        "actor": "admin",
+        "query": {"limit": 5},
+        "expect": (200, 403),
+    },
     ("GET", "/api/cache/health"): {"actor": "admin", "expect": (200, 403, 503)},
     ("GET", "/api/cache/statistics"): {"actor": "admin", "expect": (200, 403)},
     ("GET", "/api/cache/performance"): {"actor": "admin", "expect": (200, 403)},
@@ -1603,7 +1636,12 @@ SPECS = {
 }
 
 # Routes that cannot be meaningfully exercised in-process. Each needs a reason.
-EXCLUDED = {}
+EXCLUDED = {
+    ("GET", "/api/budget/live_status/stream"): (
+        "Server-Sent Events stream stays open until the client disconnects; "
+        "covered by app/tests/test_budget_live_updates.py"
+    ),
+}
 
 
 # ---------------------------------------------------------------------------
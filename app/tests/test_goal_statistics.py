@@ -0,0 +1,226 @@
+"""
+Single-statement goal statistics
+
+/goals/statistics made nine round trips, one count, sum or average per
+figure. They now come from one conditional-aggregate statement, cached per
+user and invalidated by the goal write handlers. Runs on in-memory SQLite.
+"""
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.shared_store import InMemoryKeyValueStore, RedisKeyValueStore
+from app.db.models import Goal, Transaction
+from app.services import goal_transaction_service
+from app.services.goal_statistics import (
+    KEY_PREFIX,
+    GoalStatisticsCache,
+    goal_statistics_query,
+)
+
+TODAY = date(2026, 10, 18)
+
+
+def _goal(user_id, status, target, saved, progress, target_date=None):
+    return Goal(
+        id=uuid4(),
+        user_id=user_id,
+        title=f"{status} goal",
+        status=status,
+        target_amount=Decimal(target),
+        saved_amount=Decimal(saved),
+        progress=Decimal(progress),
+        target_date=target_date,
+    )
+
+
+def _run(sqlite_table, cache, days=(TODAY,), write_between=False):
+    """Statistics per day in `days`, and the number of statements issued"""
+    user_id, other = uuid4(), uuid4()
+    statements = []
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        metadata = MetaData()
+        sqlite_table(Goal, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            db.add_all(
+                [
+                    _goal(user_id, "active", 1000, 250, 25, TODAY - timedelta(1)),
+                    _goal(user_id, "active", 500, 400, 80, TODAY + timedelta(7)),
+                    _goal(user_id, "active", 300, 0, 0, TODAY + timedelta(30)),
+                    _goal(user_id, "completed", 200, 200, 100, TODAY - timedelta(5)),
+                    _goal(user_id, "paused", 800, 100, 12.5),
+                    _goal(other, "active", 9999, 0, 0, TODAY),
+                ]
+            )
+            await db.commit()
+            statements.clear()
+
+            results = []
+            for day in days:
+                results.append(await cache.get(db, user_id, today=day))
+                if write_between:
+                    db.add(_goal(user_id, "active", 100, 100, 100))
+                    await db.commit()
+                    await cache.ainvalidate(user_id)
+                    statements.clear()
+        await engine.dispose()
+        return results
+
+    return asyncio.run(run()), statements
+
+
+def test_all_statistics_come_from_one_statement(sqlite_table):
+    [stats], statements = _run(
+        sqlite_table, GoalStatisticsCache(store=InMemoryKeyValueStore())
+    )
+
+    assert len(statements) == 1
+    assert stats == {
+        "total_goals": 5,
+        "active_goals": 3,
+        "completed_goals": 1,
+        "paused_goals": 1,
+        "completion_rate": 20.0,
+        "average_progress": 35.0,
+        "total_target_amount": 1800.0,
+        "total_saved_amount": 650.0,
+        "overdue_goals": 1,
+        "due_soon": 1,
+    }
+
+    sql = str(
+        goal_statistics_query(uuid4(), TODAY).compile(dialect=postgresql.dialect())
+    )
+    assert sql.count("FILTER (WHERE") == 8
+
+
+def test_cached_until_a_write_or_the_next_day(sqlite_table, store_backend):
+    store = store_backend(
+        InMemoryKeyValueStore,
+        lambda client, async_client: RedisKeyValueStore(
+            KEY_PREFIX, client=client, async_client=async_client
+        ),
+    )
+    cache = GoalStatisticsCache(store=store)
+
+    # Same day twice: the second read is served from the cache
+    (first, again), statements = _run(sqlite_table, cache, days=(TODAY, TODAY))
+    assert again == first and len(statements) == 1
+
+    # An invalidating write is visible on the next read
+    (before, after), _ = _run(
+        sqlite_table, cache, days=(TODAY, TODAY), write_between=True
+    )
+    assert after["total_goals"] == before["total_goals"] + 1
+
+    # Overdue and due-soon move with the date
+    (today, tomorrow), statements = _run(
+        sqlite_table, cache, days=(TODAY, TODAY + timedelta(1))
+    )
+    assert len(statements) == 2
+    assert (today["overdue_goals"], tomorrow["overdue_goals"]) == (1, 1)
+    assert (today["due_soon"], tomorrow["due_soon"]) == (1, 1)
+    (_, later), _ = _run(sqlite_table, cache, days=(TODAY, TODAY + timedelta(8)))
+    assert later["overdue_goals"] == 2
+
+
+def test_goal_progress_from_transactions_invalidates_the_cache(
+    monkeypatch, sqlite_table
+):
+    invalidated = []
+    monkeypatch.setattr(
+        goal_transaction_service,
+        "get_goal_statistics_cache",
+        lambda: GoalStatisticsCache(store=_RecordingStore(invalidated)),
+    )
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for model in (Goal, Transaction):
+        sqlite_table(model, metadata)
+    metadata.create_all(engine)
+    user_id = uuid4()
+    service = goal_transaction_service.GoalTransactionService
+
+    with Session(engine) as db:
+        goal = _goal(user_id, "active", "500", "0", "0")
+        txn = Transaction(
+            id=uuid4(), user_id=user_id, category="savings", amount=Decimal("40")
+        )
+        db.add_all([goal, txn])
+        db.commit()
+
+        assert service.link_transaction_to_goal(db, txn.id, goal.id, user_id)
+        assert service.unlink_transaction_from_goal(db, txn.id, user_id)
+
+    assert invalidated == [str(user_id), str(user_id)]
+
+
+def test_services_on_the_event_loop_invalidate_without_blocking(
+    monkeypatch, sqlite_table
+):
+    deleted, adeleted = [], []
+    cache = GoalStatisticsCache(store=_RecordingStore(deleted, adeleted))
+    monkeypatch.setattr(
+        goal_transaction_service, "get_goal_statistics_cache", lambda: cache
+    )
+    user_id = uuid4()
+    service = goal_transaction_service.GoalTransactionService
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        metadata = MetaData()
+        for model in (Goal, Transaction):
+            sqlite_table(model, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            goal = _goal(user_id, "active", "500", "0", "0")
+            txn = Transaction(
+                id=uuid4(), user_id=user_id, category="savings", amount=Decimal("40")
+            )
+            db.add_all([goal, txn])
+            await db.commit()
+
+            # How the transaction routes bridge into the sync service
+            await db.run_sync(
+                lambda s: service.process_transaction_for_goal(s, txn, goal.id)
+            )
+            await asyncio.sleep(0)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+    assert deleted == [] and adeleted == [str(user_id)]
+
+
+class _RecordingStore(InMemoryKeyValueStore):
+    def __init__(self, deleted, adeleted=None):
+        super().__init__()
+        self.deleted = deleted
+        self.adeleted = adeleted if adeleted is not None else []
+
+    def delete(self, key):
+        self.deleted.append(key)
+        super().delete(key)
+
+    async def adelete(self, key):
+        self.adeleted.append(key)
+        super().delete(key)
@@ -0,0 +1,171 @@
+"""
+Background health collector
+
+Every hit on the health endpoints used to ping the database, Redis, the task
+queue and external APIs in turn. Probes now run on their own interval with a
+timeout and the endpoints read the latest results, with how fresh they are.
+"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import health_collector
+from app.core.health_collector import HealthCollector, HealthProbe
+
+
+def test_probes_run_concurrently_and_share_in_flight_runs():
+    collector = HealthCollector()
+    calls = []
+
+    def slow(name):
+        async def check():
+            calls.append(name)
+            await asyncio.sleep(0.1)
+            return name
+
+        return check
+
+    collector.register(HealthProbe("a", slow("a"), interval=60, timeout=1))
+    collector.register(HealthProbe("b", slow("b"), interval=60, timeout=1))
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            collector.get("a"), collector.get("a"), collector.get("b")
+        )
+        elapsed = time.perf_counter() - started
+        await collector.stop()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+
+    assert [r.value for r in results] == ["a", "a", "b"]
+    assert sorted(calls) == ["a", "b"]  # the second get("a") joined the first
+    assert elapsed < 0.19
+
+
+def test_timeout_and_errors_are_recorded_not_raised():
+    collector = HealthCollector()
+
+    async def hangs():
+        await asyncio.sleep(5)
+
+    async def fails():
+        raise ConnectionError("refused")
+
+    collector.register(HealthProbe("hangs", hangs, interval=60, timeout=0.05))
+    collector.register(HealthProbe("fails", fails, interval=60, timeout=1))
+
+    async def run():
+        return await asyncio.gather(collector.probe("hangs"), collector.probe("fails"))
+
+    hung, failed = asyncio.run(run())
+
+    assert (hung.ok, hung.error) == (False, "timeout")
+    assert hung.duration_ms < 1000
+    assert (failed.ok, failed.error) == (False, "refused")
+    assert collector.snapshot(["fails"])["fails"]["error"] == "refused"
+
+
+def test_get_serves_the_snapshot_without_probing_again():
+    collector = HealthCollector()
+    calls = []
+
+    async def check():
+        calls.append(1)
+        return len(calls)
+
+    collector.register(HealthProbe("db", check, interval=60, timeout=1))
+
+    async def run():
+        first = await collector.get("db")
+        second = await collector.get("db")
+        await asyncio.sleep(0.01)  # let the background loop run if it would
+        await collector.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first is second
+    assert calls == [1]
+
+
+def test_background_loop_refreshes_on_interval():
+    collector = HealthCollector()
+    calls = []
+
+    async def check():
+        calls.append(1)
+        return len(calls)
+
+    collector.register(HealthProbe("db", check, interval=0.02, timeout=1))
+
+    async def run():
+        collector.start(["db"])
+        await asyncio.sleep(0.1)
+        await collector.stop()
+
+    asyncio.run(run())
+
+    assert len(calls) >= 3
+    assert collector.result("db").value == len(calls)
+
+
+def test_freshness_reports_age_and_staleness():
+    collector = HealthCollector()
+
+    async def check():
+        return True
+
+    collector.register(HealthProbe("db", check, interval=10, timeout=1))
+    result = asyncio.run(collector.probe("db"))
+
+    fresh = collector.snapshot()["db"]
+    assert fresh["ok"] is True and fresh["stale"] is False
+    assert fresh["age_seconds"] < 1
+
+    result.checked_at -= 31  # three intervals and a bit
+    assert collector.snapshot()["db"]["stale"] is True
+    assert collector.snapshot(["missing"]) == {}
+
+
+def test_health_endpoint_reads_the_collector(monkeypatch):
+    from app import main
+    from app.main import app
+
+    monkeypatch.setattr(main, "_firebase_initialized", True)
+
+    collector = HealthCollector()
+    calls = []
+
+    def probe(name, value):
+        async def check():
+            calls.append(name)
+            return value
+
+        return HealthProbe(name, check, interval=60, timeout=1)
+
+    collector.register(probe("database", True))
+    collector.register(probe("alembic_revision", "abc123"))
+    collector.register(probe("redis", "not_configured"))
+    monkeypatch.setattr(health_collector.get_health_collector, "instance", collector)
+
+    client = TestClient(app)
+    first = client.get("/health").json()
+    second = client.get("/health").json()
+
+    assert first["database"] == "connected"
+    assert first["alembic_revision"] == "abc123"
+    assert first["redis"] == "not_configured"
+    assert set(second["checks"]) == {"database", "alembic_revision", "redis"}
+    # Each probe ran once; the second request was served from the snapshot
+    assert sorted(calls) == ["alembic_revision", "database", "redis"]
+
+    # A snapshot the collector stopped refreshing no longer counts as healthy
+    assert first["status"] == "healthy"
+    collector.result("database").checked_at -= 200
+    stale = client.get("/health").json()
+    assert stale["status"] == "degraded"
+    assert stale["checks"]["database"]["stale"] is True
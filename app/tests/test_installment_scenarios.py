@@ -0,0 +1,202 @@
+"""
+Vectorized installment scenario comparison
+
+The mobile UI used to call /installments/calculator once per term option.
+InstallmentScenarioEngine evaluates the whole grid in one numpy pass; these
+tests pin it to the scalar Decimal implementation so both stay in agreement.
+"""
+
+import asyncio
+import itertools
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.api.installments import services
+from app.api.installments.schemas import InstallmentScenarioBatchInput
+from app.api.installments.services import (
+    InstallmentRiskEngine,
+    InstallmentScenarioEngine,
+    compare_installment_scenarios,
+)
+from app.core.shared_store import InMemoryKeyValueStore, RedisKeyValueStore
+from app.db.models.installment import AgeGroup, InstallmentCategory, RiskLevel
+
+AMOUNTS = [Decimal("120.00"), Decimal("600.00"), Decimal("2499.99")]
+TERMS = [3, 6, 12, 24]
+RATES = [Decimal("0"), Decimal("9.5"), Decimal("19.99")]
+GRID = list(itertools.product(AMOUNTS, TERMS, RATES))
+
+
+def _redis_snapshot_store(client, async_client):
+    return RedisKeyValueStore(
+        services.PROFILE_SNAPSHOT_PREFIX, client=client, async_client=async_client
+    )
+
+
+def test_schedules_match_scalar_amortization():
+    principal = np.array([float(a) for a, _, _ in GRID])
+    terms = np.array([n for _, n, _ in GRID])
+    rates = np.array([float(r) for _, _, r in GRID])
+
+    vector = InstallmentScenarioEngine.calculate_schedules(principal, terms, rates)
+
+    for index, (amount, n, rate) in enumerate(GRID):
+        payment, interest, schedule = InstallmentRiskEngine.calculate_payment_schedule(
+            amount, n, rate
+        )
+        assert vector["payment"][index] == pytest.approx(float(payment), abs=0.005)
+        assert vector["total_interest"][index] == pytest.approx(
+            float(interest), abs=0.01
+        )
+        assert vector["interest"][index, : n - 1].round(2).tolist() == pytest.approx(
+            [row["interest"] for row in schedule[:-1]], abs=0.011
+        )
+
+
+@pytest.mark.parametrize(
+    "income,balance,age,active",
+    [
+        (6000, 8000, AgeGroup.AGE_35_44, 0),
+        (2500, 3000, AgeGroup.AGE_18_24, 1),
+        (1500, 900, AgeGroup.AGE_25_34, 2),
+    ],
+)
+def test_risk_matches_scalar_assessment(income, balance, age, active):
+    principal = np.array([float(a) for a, _, _ in GRID])
+    terms = np.array([n for _, n, _ in GRID])
+    rates = np.array([float(r) for _, _, r in GRID])
+    payments = InstallmentScenarioEngine.calculate_schedules(principal, terms, rates)[
+        "payment"
+    ]
+
+    risk = InstallmentScenarioEngine.assess_risk(
+        monthly_payment=payments,
+        num_payments=terms,
+        interest_rate=rates,
+        monthly_income=float(income),
+        current_balance=float(balance),
+        category=InstallmentCategory.ELECTRONICS,
+        age_group=age,
+        credit_card_debt=False,
+        active_installments_count=active,
+        active_installments_monthly=50.0 * active,
+        other_monthly_obligations=400.0,
+        planning_mortgage=False,
+    )
+    levels, scores = InstallmentScenarioEngine.score(
+        risk["red_flags"], risk["orange_flags"], risk["yellow_flags"]
+    )
+
+    for index, (amount, n, rate) in enumerate(GRID):
+        payment, _, _ = InstallmentRiskEngine.calculate_payment_schedule(
+            amount, n, rate
+        )
+        level, score, factors = InstallmentRiskEngine.assess_risk(
+            monthly_payment=payment,
+            monthly_income=Decimal(income),
+            current_balance=Decimal(balance),
+            category=InstallmentCategory.ELECTRONICS,
+            age_group=age,
+            credit_card_debt=False,
+            active_installments_count=active,
+            active_installments_monthly=Decimal(50 * active),
+            other_monthly_obligations=Decimal(400),
+            planning_mortgage=False,
+            interest_rate=rate,
+            num_payments=n,
+        )
+        vector_factors = [
+            name
+            for group in ("red", "orange", "yellow")
+            for name, flag in risk[group]
+            if flag[index]
+        ]
+        assert [f.factor for f in factors] == vector_factors
+        assert int(scores[index]) == score
+        assert int(levels[index]) == [
+            RiskLevel.GREEN,
+            RiskLevel.YELLOW,
+            RiskLevel.ORANGE,
+            RiskLevel.RED,
+        ].index(level)
+
+
+def test_compare_ranks_scenarios_and_caches_profile(monkeypatch, store_backend):
+    user_id = uuid4()
+    store = store_backend(InMemoryKeyValueStore, _redis_snapshot_store)
+    monkeypatch.setattr(services.get_profile_snapshot_store, "instance", store)
+    snapshot = (
+        '{"monthly_income": "6000.00", "current_balance": "9000.00", '
+        '"age_group": "35-44"}'
+    )
+    asyncio.run(store.aset(str(user_id), snapshot, services.PROFILE_SNAPSHOT_TTL))
+
+    class NoDatabase:
+        async def execute(self, *args, **kwargs):
+            raise AssertionError("profile should come from the session cache")
+
+    batch = InstallmentScenarioBatchInput(
+        category=InstallmentCategory.ELECTRONICS,
+        include_schedules=True,
+        scenarios=[
+            {"purchase_amount": "1200.00", "num_payments": n, "interest_rate": r}
+            for n in (3, 6, 12, 24)
+            for r in ("0", "24.99")
+        ],
+    )
+
+    result = asyncio.run(compare_installment_scenarios(NoDatabase(), user_id, batch))
+
+    assert [s.rank for s in result.scenarios] == list(range(1, 9))
+    ordering = [(s.risk_score, s.total_cost) for s in result.scenarios]
+    assert ordering == sorted(ordering)
+    assert result.recommended.rank == 1
+    longest = next(
+        s
+        for s in result.scenarios
+        if s.num_payments == 24 and s.interest_rate == Decimal("24.99")
+    )
+    assert len(longest.payment_schedule) == 24
+    assert longest.payment_schedule[-1]["remaining_balance"] == 0.0
+    assert "long_term_interest" in longest.risk_factors
+
+
+def test_profile_update_invalidates_the_shared_snapshot(monkeypatch, store_backend):
+    user_id = uuid4()
+    store = store_backend(InMemoryKeyValueStore, _redis_snapshot_store)
+    monkeypatch.setattr(services.get_profile_snapshot_store, "instance", store)
+    profiles = [
+        SimpleNamespace(
+            monthly_income=Decimal(income),
+            current_balance=Decimal("3000.00"),
+            age_group=AgeGroup.AGE_25_34,
+        )
+        for income in ("4000.00", "5500.00")
+    ]
+
+    class ProfileTable:
+        queries = 0
+
+        async def execute(self, *args, **kwargs):
+            profile = profiles[self.queries]
+            self.queries += 1
+            return SimpleNamespace(scalar_one_or_none=lambda: profile)
+
+    async def run():
+        db = ProfileTable()
+        first = await services.get_financial_snapshot(db, user_id)
+        cached = await services.get_financial_snapshot(db, user_id)
+        await services.invalidate_financial_snapshot(user_id)
+        updated = await services.get_financial_snapshot(db, user_id)
+        return db.queries, first, cached, updated
+
+    queries, first, cached, updated = asyncio.run(run())
+
+    assert queries == 2
+    assert cached == first
+    assert cached["age_group"] is AgeGroup.AGE_25_34
+    assert updated["monthly_income"] == Decimal("5500.00")
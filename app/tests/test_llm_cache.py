@@ -0,0 +1,174 @@
+"""
+Content-addressed LLM response cache
+
+Every categorize_expense/analyze_budget/ask_financial_advice call and every
+GPTAgentService.ask sent its own OpenAI request, even for prompts answered a
+moment earlier. Completions are now cached by a hash of the normalized
+request, identical requests in flight are coalesced and categorizations are
+micro-batched into one prompt. Runs against the offline stub client.
+"""
+
+import asyncio
+import json
+import threading
+
+from app.agent.gpt_agent_service import GPTAgentService
+from app.core.shared_store import InMemoryKeyValueStore, RedisKeyValueStore
+from app.services.llm_cache import KEY_PREFIX, LLMResponseCache, cache_key
+from app.services.resilient_gpt_service import ResilientGPTService
+from app.tests.llm_stub_client import StubChatClient, stub_reply
+
+
+def _service(client, store=None):
+    cache = LLMResponseCache(store=store or InMemoryKeyValueStore())
+    return ResilientGPTService("sk-test", "gpt-4", client=client, cache=cache)
+
+
+def test_key_ignores_whitespace_but_not_sampling():
+    messages = [{"role": "user", "content": "How can I  save\nmoney?"}]
+    same = [{"role": "user", "content": " How can I save money? "}]
+
+    assert cache_key("gpt-4", messages, 0.3, 600) == cache_key("gpt-4", same, 0.3, 600)
+    assert cache_key("gpt-4", messages, 0.3, 600) != cache_key(
+        "gpt-4", messages, 0.7, 600
+    )
+    assert cache_key("gpt-4", messages, 0.3, 600) != cache_key(
+        "gpt-4o", messages, 0.3, 600
+    )
+
+
+def test_identical_requests_share_one_completion(store_backend):
+    client = StubChatClient(latency=0.05)
+    store = store_backend(
+        InMemoryKeyValueStore,
+        lambda client, async_client: RedisKeyValueStore(
+            KEY_PREFIX, client=client, async_client=async_client
+        ),
+    )
+    service = _service(client, store)
+    messages = [{"role": "user", "content": "How can I save money?"}]
+
+    async def run():
+        first = await asyncio.gather(
+            *(service.ask_financial_advice(messages) for _ in range(10))
+        )
+        again = await service.ask_financial_advice(messages)
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert len(client.calls) == 1
+    assert set(first) == {again}
+    stats = service.llm_cache.stats()["financial_advice"]
+    assert (stats["miss"], stats["coalesced"], stats["hit"]) == (1, 9, 1)
+    assert stats["prompt_tokens"] > 0 and stats["completion_tokens"] > 0
+
+
+def test_cancelled_leader_does_not_cancel_its_waiters():
+    client = StubChatClient(latency=0.05)
+    service = _service(client)
+    messages = [{"role": "user", "content": "How can I save money?"}]
+
+    async def run():
+        leader = asyncio.create_task(service.ask_financial_advice(messages))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(service.ask_financial_advice(messages))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        answer = await follower
+        return leader, follower, answer
+
+    leader, follower, answer = asyncio.run(run())
+
+    assert leader.cancelled() and not follower.cancelled()
+    assert answer == stub_reply(messages)
+    assert len(client.calls) == 1
+
+
+def test_failures_are_not_cached():
+    replies = iter([RuntimeError("boom"), "Spend less on takeout."])
+
+    def flaky(messages):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    client = StubChatClient(responder=flaky)
+    service = _service(client)
+    messages = [{"role": "user", "content": "Tips?"}]
+
+    fallback = asyncio.run(service.ask_financial_advice(messages))
+    answer = asyncio.run(service.ask_financial_advice(messages))
+
+    assert fallback in service.fallback_responses["financial_advice"]
+    assert answer == "Spend less on takeout."
+    assert len(client.calls) == 2
+
+
+def test_categorizations_are_batched_and_shared_across_users():
+    client = StubChatClient(latency=0.02)
+    service = _service(client)
+    merchants = [f"Starbucks {i}" for i in range(8)] + [f"Uber {i}" for i in range(7)]
+
+    async def categorize_all(amount):
+        return await asyncio.gather(
+            *(
+                service.categorize_expense("card payment", amount, merchant)
+                for merchant in merchants * 2
+            )
+        )
+
+    results = asyncio.run(categorize_all(4.50))
+    assert len(client.calls) == 1  # 15 distinct expenses, one prompt
+    assert not service._categorizer._tasks  # batch tasks drop out when done
+    assert {r["category"] for r in results[:8]} == {"Food"}
+    assert {r["category"] for r in results[8:15]} == {"Transportation"}
+
+    # Same merchants, another amount in the same band: all cached
+    asyncio.run(categorize_all(5.20))
+    assert len(client.calls) == 1
+
+
+def test_an_item_missing_from_a_batch_fails_alone():
+    def skips_second(messages):
+        return json.dumps(json.loads(stub_reply(messages))[:1])
+
+    service = _service(StubChatClient(responder=skips_second))
+
+    async def run():
+        return await asyncio.gather(
+            service.categorize_expense("latte", 4.0, "Starbucks"),
+            service.categorize_expense("ride", 14.0, "Uber"),
+        )
+
+    found, missing = asyncio.run(run())
+
+    assert found["category"] == "Food"
+    assert missing["reasoning"] == "Automatic categorization unavailable"
+    assert service.llm_cache.stats()["categorization"]["miss"] == 2
+
+
+def test_agent_coalesces_concurrent_threads():
+    client = StubChatClient(latency=0.05, asynchronous=False)
+    agent = GPTAgentService(
+        api_key="sk-test",
+        client=client,
+        cache=LLMResponseCache(store=InMemoryKeyValueStore()),
+    )
+    answers = []
+    threads = [
+        threading.Thread(
+            target=lambda: answers.append(
+                agent.ask([{"role": "user", "content": "Rate my month"}])
+            )
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert len(set(answers)) == 1 and len(answers) == 5
@@ -0,0 +1,178 @@
+"""
+Indexed merchant autocomplete
+
+/transactions/merchants/suggestions ran `description ILIKE '%q%'` with a
+GROUP BY over the whole ledger on every keystroke. Suggestions now come from
+a per-user in-memory prefix index, built with one aggregate query, ranked by
+frequency and recency and updated in place when a transaction is created.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.models import Transaction
+from app.services.merchant_autocomplete import (
+    MAX_PREFIX_CHARS,
+    MerchantAutocomplete,
+    UserMerchantIndex,
+)
+
+NOW = datetime.now(timezone.utc)
+
+
+def _names(entries):
+    return [entry.name for entry in entries]
+
+
+def test_prefix_of_any_word_ranked_by_frequency_and_recency():
+    index = UserMerchantIndex(as_of=NOW)
+    index.load(
+        [
+            ("Starbucks", "coffee", 20, NOW - timedelta(days=200)),
+            ("Lucky Star  Diner", "dining_out", 3, NOW - timedelta(days=1)),
+            ("Star Market", "groceries", 8, NOW - timedelta(days=2)),
+            ("Shell", "gas", 40, NOW),
+        ]
+    )
+
+    # Recent visits outrank a favourite nobody has used in months
+    assert _names(index.search("STAR")) == [
+        "Star Market",
+        "Lucky Star Diner",
+        "Starbucks",
+    ]
+    assert _names(index.search("din")) == ["Lucky Star Diner"]
+    assert index.search("bucks") == []  # word prefixes only
+    assert _names(index.search(""))[0] == "Shell"
+
+    long_name = "Neighbourhood Pharmacy on Main"
+    index.load([(long_name, "health", 1, NOW)])
+    assert len("neighbourhood pharm") > MAX_PREFIX_CHARS
+    assert _names(index.search("Neighbourhood pharm")) == [long_name]
+    assert index.search("Neighbourhood pharx") == []
+
+
+def test_new_uses_move_an_entry_up_without_a_rebuild():
+    index = UserMerchantIndex(limit=2, as_of=NOW)
+    index.load(
+        [
+            ("Cafe Uno", "coffee", 9, NOW - timedelta(days=90)),
+            ("Cafe Duo", "coffee", 8, NOW - timedelta(days=90)),
+            ("Cafe Tre", "coffee", 1, NOW - timedelta(days=90)),
+        ]
+    )
+    assert _names(index.search("cafe")) == ["Cafe Uno", "Cafe Duo"]
+
+    for _ in range(20):
+        index.add("Cafe Tre", "coffee", last_used=NOW)
+
+    assert _names(index.search("ca")) == ["Cafe Tre", "Cafe Uno"]
+    assert index.entries[("Cafe Tre", "coffee")].frequency == 21
+
+
+def test_index_is_built_from_the_ledger_once_and_kept_current(sqlite_table):
+    user_id = uuid4()
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        metadata = MetaData()
+        sqlite_table(Transaction, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            for description, deleted in [
+                ("Uber trip", None),
+                ("Uber trip", None),
+                ("Uber Eats", NOW),
+            ]:
+                db.add(
+                    Transaction(
+                        id=uuid4(),
+                        user_id=user_id,
+                        category="transportation",
+                        amount=12,
+                        description=description,
+                        spent_at=NOW,
+                        deleted_at=deleted,
+                    )
+                )
+            await db.commit()
+
+            autocomplete = MerchantAutocomplete()
+            first = await autocomplete.suggest(db, user_id, "ub")
+            index = autocomplete._cached(user_id)
+
+            created = Transaction(
+                user_id=user_id,
+                category="dining_out",
+                description="Ubuntu Cafe",
+                spent_at=NOW,
+            )
+            autocomplete.record(created)
+            second = await autocomplete.suggest(db, user_id, "ub")
+            same_index = autocomplete._cached(user_id) is index
+
+            autocomplete.invalidate(user_id)
+            rebuilt = await autocomplete.suggest(db, user_id, "ub")
+        await engine.dispose()
+        return first, second, same_index, rebuilt
+
+    first, second, same_index, rebuilt = asyncio.run(run())
+
+    assert [(e.name, e.frequency) for e in first] == [("Uber trip", 2)]
+    assert _names(second) == ["Uber trip", "Ubuntu Cafe"]
+    assert same_index
+    assert _names(rebuilt) == ["Uber trip"]  # the recorded row was never saved
+
+
+def test_cache_is_bounded_by_estimated_size_not_user_count(sqlite_table):
+    users = [uuid4() for _ in range(4)]
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        metadata = MetaData()
+        sqlite_table(Transaction, metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            for user_id in users:
+                for i in range(30):
+                    db.add(
+                        Transaction(
+                            id=uuid4(),
+                            user_id=user_id,
+                            category="shopping",
+                            amount=5,
+                            description=f"Corner Shop {i:02d} and Sons",
+                            spent_at=NOW,
+                        )
+                    )
+            await db.commit()
+
+            probe = MerchantAutocomplete(max_entries=20)
+            await probe.suggest(db, users[0])
+            one_index = probe.cached_bytes
+
+            autocomplete = MerchantAutocomplete(
+                max_bytes=int(one_index * 2.5), max_entries=20
+            )
+            for user_id in users:
+                await autocomplete.suggest(db, user_id, "corner")
+            cached = [autocomplete._cached(u) is not None for u in users]
+        await engine.dispose()
+        return probe, autocomplete, one_index, cached
+
+    probe, autocomplete, one_index, cached = asyncio.run(run())
+
+    assert len(probe._cached(users[0]).entries) == 20
+    assert cached == [False, False, True, True]
+    assert autocomplete.cached_bytes == 2 * one_index <= autocomplete.max_bytes
+
+    autocomplete.invalidate(users[3])
+    assert autocomplete.cached_bytes == one_index
@@ -0,0 +1,138 @@
+"""
+Single-pass merchant classifier
+
+parse_receipt_text and ReceiptCategorizationService.categorize each looped
+over every category and keyword with `keyword in text`, line by line. Both
+now share one Aho-Corasick automaton compiled from all keyword dictionaries,
+and consult a merchant→category map learned from the ledger first.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+
+import app.services.merchant_classifier as merchant_classifier
+from app.categorization.receipt_categorization_service import (
+    ReceiptCategorizationService,
+)
+from app.core.shared_store import InMemoryKeyValueStore, RedisKeyValueStore
+from app.db.models import Transaction
+from app.ocr.ocr_parser import parse_receipt_text
+from app.services.merchant_classifier import (
+    KeywordAutomaton,
+    MerchantClassifier,
+    build_learned_map,
+    normalize_merchant,
+)
+
+
+@pytest.fixture
+def ledger(sqlite_table):
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    sqlite_table(Transaction, metadata)
+    metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def _spend(db, merchant, category, times, days_ago=1):
+    now = datetime.now(timezone.utc)
+    for _ in range(times):
+        db.add(
+            Transaction(
+                id=uuid4(),
+                user_id=uuid4(),
+                category=category,
+                amount=10,
+                merchant=merchant,
+                spent_at=now - timedelta(days=days_ago),
+            )
+        )
+    db.commit()
+
+
+def test_automaton_finds_what_substring_search_finds():
+    groups = {
+        "a": {"x": ["he", "she", "hers"], "y": ["his", "s"]},
+        "b": {"z": ["hers", "rs h", "ss"]},
+    }
+    automaton = KeywordAutomaton(groups)
+    rng = random.Random(3)
+
+    for _ in range(500):
+        text = "".join(rng.choice("hers i") for _ in range(rng.randint(0, 30)))
+        found = {(group, category) for _, group, category in automaton.scan(text)}
+        expected = {
+            (group, category)
+            for group, dictionary in groups.items()
+            for category, keywords in dictionary.items()
+            if any(keyword in text for keyword in keywords)
+        }
+        assert found == expected, text
+
+
+def test_receipt_category_comes_from_first_matching_line():
+    # "netflix" is both entertainment and subscriptions: dictionary order wins
+    assert parse_receipt_text("Netflix\nTotal $15.49")["category"] == "entertainment"
+    assert (
+        parse_receipt_text("Thanks for visiting\nCVS Pharmacy\nUber voucher")[
+            "category"
+        ]
+        == "health"
+    )
+    assert parse_receipt_text("Corner Stand\nTotal $3.00")["category"] == "other"
+
+
+def test_learned_map_takes_the_usual_category_per_merchant(ledger):
+    _spend(ledger, "ACME ROASTERS #0412", "coffee", 4)
+    _spend(ledger, "Acme Roasters 17", "groceries", 2)
+    _spend(ledger, "Rare Shop", "clothing", 2)  # not enough evidence
+    _spend(ledger, "Misc Place", "other", 5)
+    _spend(ledger, "Old Gym", "gym", 5, days_ago=500)  # outside the window
+
+    learned = build_learned_map(ledger)
+
+    assert normalize_merchant("ACME ROASTERS #0412") == "acme roasters"
+    assert learned == {"acme roasters": "coffee"}
+
+
+def test_categorization_prefers_the_learned_map(ledger, monkeypatch):
+    _spend(ledger, "Metro Deli", "dining", 3)
+    _spend(ledger, "Dr Patel", "healthcare", 3)
+    _spend(ledger, "Uber", "rent", 3)  # no counterpart in either dictionary
+    classifier = MerchantClassifier(store=InMemoryKeyValueStore())
+    monkeypatch.setattr(
+        merchant_classifier.get_merchant_classifier, "instance", classifier
+    )
+    service = ReceiptCategorizationService()
+
+    assert service.categorize(merchant="Metro Deli") != "restaurants"
+    assert classifier.rebuild(ledger) == 3
+    assert service.categorize(merchant="METRO DELI #88") == "restaurants"
+    assert parse_receipt_text("Metro Deli\nTotal $6.10")["category"] == ("restaurants")
+
+    # Ledger names come back in each dictionary's own vocabulary
+    assert service.categorize(merchant="Dr Patel") == "healthcare"
+    assert parse_receipt_text("Dr Patel\nTotal $80.00")["category"] == "health"
+    assert service.categorize(merchant="Uber") == "transport"
+    assert parse_receipt_text("Uber\nTotal $12.00")["category"] == "transport"
+
+
+def test_published_map_reaches_other_processes(ledger):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    _spend(ledger, "City Metro", "transportation", 3)
+
+    reader = MerchantClassifier(
+        store=RedisKeyValueStore("", client=client), reload_seconds=0
+    )
+    assert reader.learned_category("City Metro") is None
+
+    MerchantClassifier(store=RedisKeyValueStore("", client=client)).rebuild(ledger)
+
+    assert reader.learned_category("city metro") == "transportation"
@@ -0,0 +1,227 @@
+"""
+Bulk scheduled-notification dispatch
+
+send_scheduled_notifications loaded every due notification with .all() and
+delivered them one at a time, committing per notification. Due rows are now
+claimed in chunks with FOR UPDATE SKIP LOCKED and committed as DISPATCHING,
+delivered per channel in bulk outside any transaction and written back with
+one UPDATE per chunk. Runs on in-memory SQLite; the
+SKIP LOCKED clause itself is checked on the PostgreSQL compilation.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models import Notification, NotificationLog, PushToken, User
+from app.services import notification_dispatcher
+from app.services.notification_dispatcher import (
+    CLAIM_LEASE,
+    ScheduledNotificationDispatcher,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (User, Notification, NotificationLog, PushToken):
+        model.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _user(db, token=None, email=True):
+    user = User(
+        id=uuid4(),
+        email=f"{uuid4().hex}@example.com" if email else "",
+        password_hash="x",
+    )
+    db.add(user)
+    if token:
+        db.add(PushToken(user_id=user.id, token=token, platform="fcm"))
+    return user
+
+
+def _due(db, user, minutes_ago=5, status="pending"):
+    notification = Notification(
+        user_id=user.id,
+        title="Bill due",
+        message="Rent is due tomorrow",
+        status=status,
+        scheduled_for=NOW - timedelta(minutes=minutes_ago),
+    )
+    db.add(notification)
+    return notification
+
+
+def test_claim_skips_rows_locked_by_other_workers(db):
+    sql = str(
+        ScheduledNotificationDispatcher(db, chunk_size=50)
+        .claim_query(NOW)
+        .compile(dialect=postgresql.dialect())
+    )
+
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
+    assert "LIMIT" in sql
+
+
+def test_chunk_is_delivered_per_channel_and_recorded_in_one_update(db):
+    pushed = _user(db, token="tok-ok")
+    push_fails = _user(db, token="tok-bad")
+    mail_only = _user(db)
+    unreachable = _user(db, email=False)
+    notifications = [
+        _due(db, pushed),
+        _due(db, push_fails),
+        _due(db, mail_only),
+        _due(db, unreachable),
+    ]
+    not_due = _due(db, pushed, minutes_ago=-60)
+    db.commit()
+
+    push_batches, email_batches, updates, open_transactions = [], [], [], []
+
+    def push_sender(messages):
+        open_transactions.append(db.in_transaction())
+        push_batches.append(messages)
+        return [token == "tok-ok" for _, token in messages]
+
+    def email_sender(jobs):
+        open_transactions.append(db.in_transaction())
+        email_batches.append(jobs)
+        return [True] * len(jobs)
+
+    dispatcher = ScheduledNotificationDispatcher(
+        db,
+        chunk_size=10,
+        push_sender=push_sender,
+        email_sender=email_sender,
+        build_message=lambda notification, token: (notification.id, token),
+    )
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def count_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE notifications"):
+            updates.append(statement)
+
+    result = dispatcher.dispatch_chunk(NOW)
+
+    assert result.claimed == 4
+    assert result.delivered == {"push": 1, "email": 2}
+    assert result.failed == 1
+    assert len(push_batches) == 1 and len(push_batches[0]) == 2
+    assert len(email_batches) == 1 and len(email_batches[0]) == 2
+    # The claim is committed before delivery, the outcome in one UPDATE after
+    assert open_transactions == [False, False]
+    assert len(updates) == 2 and updates[0].startswith(
+        "UPDATE notifications SET status=?, updated_at=?"
+    )
+
+    db.expire_all()
+    states = {n.id: (n.status, n.channel) for n in db.query(Notification)}
+    assert states[notifications[0].id] == ("delivered", "push")
+    assert states[notifications[1].id] == ("delivered", "email")
+    assert states[notifications[2].id] == ("delivered", "email")
+    assert states[notifications[3].id] == ("failed", None)
+    assert states[not_due.id] == ("pending", None)
+    assert db.query(NotificationLog).count() == 3
+
+
+def test_push_stops_at_the_first_token_that_works(db):
+    first_works = _user(db, token="tok-ok-1")
+    db.add(PushToken(user_id=first_works.id, token="tok-ok-2", platform="fcm"))
+    second_works = _user(db, token="tok-bad")
+    db.add(PushToken(user_id=second_works.id, token="tok-ok-3", platform="fcm"))
+    for user in (first_works, second_works):
+        _due(db, user)
+    db.commit()
+
+    push_batches = []
+    dispatcher = ScheduledNotificationDispatcher(
+        db,
+        push_sender=lambda messages: push_batches.append(messages)
+        or [token.startswith("tok-ok") for token in messages],
+        email_sender=lambda jobs: [],
+        build_message=lambda notification, token: token,
+    )
+    result = dispatcher.dispatch_chunk(NOW)
+
+    assert result.delivered == {"push": 2}
+    assert [sorted(batch) for batch in push_batches] == [
+        ["tok-bad", "tok-ok-1"],
+        ["tok-ok-3"],
+    ]
+
+
+def test_abandoned_claims_are_taken_again_after_the_lease(db):
+    user = _user(db, token="tok")
+    abandoned = _due(db, user, minutes_ago=60, status="dispatching")
+    in_flight = _due(db, user, minutes_ago=60, status="dispatching")
+    db.flush()
+    abandoned.updated_at = NOW - CLAIM_LEASE - timedelta(seconds=1)
+    in_flight.updated_at = NOW - timedelta(minutes=1)
+    db.commit()
+
+    dispatcher = ScheduledNotificationDispatcher(
+        db,
+        push_sender=lambda messages: [True] * len(messages),
+        email_sender=lambda jobs: [],
+        build_message=lambda notification, token: token,
+    )
+    result = dispatcher.dispatch_chunk(NOW)
+
+    assert result.claimed == 1
+    db.expire_all()
+    assert db.get(Notification, abandoned.id).status == "delivered"
+    assert db.get(Notification, in_flight.id).status == "dispatching"
+
+
+def test_run_drains_the_backlog_in_chunks(db):
+    users = [_user(db, token=f"tok-{i}") for i in range(7)]
+    for user in users:
+        _due(db, user)
+    db.commit()
+
+    dispatcher = ScheduledNotificationDispatcher(
+        db,
+        chunk_size=3,
+        push_sender=lambda messages: [True] * len(messages),
+        email_sender=lambda jobs: [],
+        build_message=lambda notification, token: token,
+    )
+    result = dispatcher.run()
+
+    assert (result.claimed, result.chunks) == (7, 3)
+    assert db.query(Notification).filter_by(status="pending").count() == 0
+
+
+def test_batched_emails_are_logged_through_their_own_sessions(monkeypatch):
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.services import email_service
+
+    sessions = []
+
+    class RecordingEmailService:
+        async def send_email(self, to_email, db=None, **kwargs):
+            sessions.append(db)
+            return SimpleNamespace(success=to_email != "bounce@example.com")
+
+    monkeypatch.setattr(email_service, "EmailService", RecordingEmailService)
+    monkeypatch.setattr(
+        notification_dispatcher,
+        "email_log_engine",
+        lambda: create_async_engine("sqlite+aiosqlite://"),
+    )
+    jobs = [{"to_email": f"{name}@example.com"} for name in ("a", "bounce", "c")]
+
+    assert notification_dispatcher.send_emails(jobs) == [True, False, True]
+    assert all(isinstance(session, AsyncSession) for session in sessions)
+    assert len(set(map(id, sessions))) == 3
@@ -0,0 +1,109 @@
+"""
+Partitioned log retention
+
+cleanup_old_notifications loaded every expired notification into the ORM and
+deleted them one by one, and the log tables were never trimmed at all. Log
+tables are now partitioned by month and retention drops whole partitions;
+everything else is deleted in short ctid-keyed batches.
+"""
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from app.services.notification_service import NotificationService
+from app.services.partition_maintenance import (
+    PARTITIONED_TABLES,
+    PartitionedTable,
+    add_months,
+    batched_delete,
+    partition_month,
+    plan_partitions,
+)
+
+AUDIT = PartitionedTable("audit_logs", "timestamp", retention_days=90)
+
+
+class BatchDB:
+    """Reports a fixed number of matching rows, deleted batch by batch"""
+
+    def __init__(self, matching):
+        self.matching = matching
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, params):
+        self.statements.append((str(statement), params))
+        deleted = min(self.matching, params["batch_size"])
+        self.matching -= deleted
+        return SimpleNamespace(rowcount=deleted)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_plan_creates_upcoming_months_and_drops_only_fully_expired_ones():
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    existing = [
+        "audit_logs_default",
+        "audit_logs_p202606",  # ends 2026-07-01, cutoff is 2026-07-20
+        "audit_logs_p202607",  # still holds rows inside retention
+        "audit_logs_p202610",
+        "audit_logs_p202611",
+    ]
+
+    to_create, to_drop = plan_partitions(AUDIT, existing, now, months_ahead=3)
+
+    assert to_create == [date(2026, 12, 1), date(2027, 1, 1)]
+    assert to_drop == ["audit_logs_p202606"]
+
+
+def test_audit_logs_keep_the_compliance_retention_period():
+    [audit] = [t for t in PARTITIONED_TABLES if t.name == "audit_logs"]
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    seven_years_old = ["audit_logs_p201910", "audit_logs_p201909"]
+
+    _, to_drop = plan_partitions(audit, seven_years_old, now, months_ahead=0)
+
+    assert audit.retention_days >= 7 * 365 + 2
+    assert to_drop == ["audit_logs_p201909"]
+
+
+def test_partition_names_round_trip():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_month("audit_logs", "audit_logs_p202702") == date(2027, 2, 1)
+    assert partition_month("audit_logs", "audit_logs_default") is None
+    assert partition_month("audit_logs", "other_logs_p202702") is None
+
+
+def test_batched_delete_commits_each_batch_and_reports_throughput():
+    db = BatchDB(matching=12)
+
+    report = batched_delete(
+        db, "notifications", "created_at < :cutoff", {"cutoff": 1}, batch_size=5
+    )
+
+    assert (report.rows, report.batches, db.commits) == (12, 3, 3)
+    assert report.rows_per_second > 0
+    sql, params = db.statements[0]
+    assert sql == (
+        "DELETE FROM notifications WHERE ctid IN "
+        "(SELECT ctid FROM notifications WHERE created_at < :cutoff "
+        "LIMIT :batch_size)"
+    )
+    assert params == {"cutoff": 1, "batch_size": 5}
+
+
+def test_cleanup_old_notifications_deletes_in_batches_without_loading_rows():
+    db = BatchDB(matching=7)
+
+    removed = NotificationService(db).cleanup_old_notifications(days=30, batch_size=3)
+
+    assert removed == 7
+    assert len(db.statements) == 3
+    sql, params = db.statements[0]
+    assert "expires_at < :now" in sql
+    assert (params["now"] - params["cutoff"]).days == 30
@@ -0,0 +1,237 @@
+"""Per-request SQL query budget and N+1 detection.
+
+The global slow-query monitors could not say which route issued a query,
+which is how /api/dashboard and POST /api/transactions/ became chatty
+without any single query looking slow. HTTPObservabilityMiddleware attributes
+queries to the matched route template via a contextvar set around the
+request and cursor hooks installed on both engines.
+
+The unit tests run against an in-memory SQLite engine. The key-endpoint
+budgets at the bottom require PostgreSQL at DATABASE_URL like the other
+route integration tests.
+"""
+
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.query_budget import (
+    RequestQueryStats,
+    current_route,
+    evaluate_query_budget,
+    install_query_instrumentation,
+    normalize_statement,
+    route_query_stats,
+    track_queries,
+)
+from app.middleware.http_observability_middleware import HTTPObservabilityMiddleware
+
+
+@pytest.fixture
+def sqlite_engine():
+    # One shared connection: TestClient serves requests on another thread
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    install_query_instrumentation(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(5):
+            conn.execute(text(f"INSERT INTO items (id, name) VALUES ({i}, 'n{i}')"))
+    yield engine
+    engine.dispose()
+
+
+def test_normalize_statement_collapses_literals_and_params():
+    a = normalize_statement("SELECT * FROM t WHERE id = 5 AND name = 'x'")
+    b = normalize_statement("select *  from t where id = 77 and name = 'other'")
+    assert a == b
+    assert normalize_statement("SELECT 1 WHERE x IN ($1, $2, $3)") == (
+        normalize_statement("SELECT 1 WHERE x IN ($1)")
+    )
+
+
+def test_queries_outside_a_request_are_not_counted(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert current_route() is None
+
+
+def test_track_queries_counts_and_detects_repeats(sqlite_engine):
+    with track_queries(route="/api/items") as stats:
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT count(*) FROM items"))
+            for i in range(5):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i})
+
+    assert stats.query_count == 6
+    assert stats.db_time >= 0
+    repeated = stats.repeated_shapes(threshold=5)
+    assert len(repeated) == 1
+    assert repeated[0]["count"] == 5
+
+
+def test_failed_statements_do_not_leave_starts_on_the_connection(sqlite_engine):
+    with track_queries() as stats:
+        with sqlite_engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info.get("mita_query_start") == []
+
+    assert stats.query_count == 2
+
+
+def test_install_is_idempotent(sqlite_engine):
+    install_query_instrumentation(sqlite_engine)
+    with track_queries() as stats:
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert stats.query_count == 1
+
+
+def test_evaluate_query_budget_flags_over_budget_and_n_plus_one(caplog, monkeypatch):
+    # setup_logging() (run by other tests) stops "app" records propagating
+    # to the root logger, where caplog listens
+    monkeypatch.setattr(logging.getLogger("app"), "propagate", True)
+    stats = RequestQueryStats(route="/api/dashboard")
+    for i in range(12):
+        stats.record(f"SELECT * FROM goals WHERE id = {i}", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_budget"):
+        verdict = evaluate_query_budget(stats, budget=10, repeat_threshold=8)
+
+    assert verdict["over_budget"] is True
+    assert verdict["repeated_statements"][0]["count"] == 12
+    assert "Query budget exceeded on /api/dashboard" in caplog.text
+
+
+def test_evaluate_query_budget_within_limits():
+    stats = RequestQueryStats(route="/api/ok")
+    stats.record("SELECT 1", 0.001)
+    verdict = evaluate_query_budget(stats, budget=10, repeat_threshold=3)
+    assert verdict == {"over_budget": False, "repeated_statements": []}
+
+
+def test_middleware_attributes_queries_to_route_template(sqlite_engine, query_budget):
+    app = FastAPI()
+    app.add_middleware(HTTPObservabilityMiddleware)
+
+    seen_routes = []
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        seen_routes.append(current_route())
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+            conn.execute(text("SELECT count(*) FROM items"))
+        return {"ok": True}
+
+    route_query_stats.reset()
+    with query_budget(max_queries=2) as requests:
+        assert TestClient(app).get("/items/3").status_code == 200
+
+    assert seen_routes == ["/items/{item_id}"]
+    assert [(s.route, s.query_count) for s in requests] == [("/items/{item_id}", 2)]
+    summary = route_query_stats.summary()
+    assert summary[0]["route"] == "/items/{item_id}"
+    assert summary[0]["queries_max"] == 2
+
+
+def test_query_budget_fixture_fails_over_budget(sqlite_engine, query_budget):
+    app = FastAPI()
+    app.add_middleware(HTTPObservabilityMiddleware)
+
+    @app.get("/chatty")
+    def chatty():
+        with sqlite_engine.connect() as conn:
+            for i in range(4):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i})
+        return {}
+
+    with pytest.raises(AssertionError, match="ran 4 queries"):
+        with query_budget(max_queries=3):
+            TestClient(app).get("/chatty")
+
+
+# ---------------------------------------------------------------------------
+# Key endpoint budgets (PostgreSQL)
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    with TestClient(app, raise_server_exceptions=False) as c:
+        yield c
+
+
+@pytest.fixture
+def db_session():
+    import app.core.session as session_module
+
+    gen = session_module.get_db()
+    db = next(gen)
+    try:
+        yield db
+    finally:
+        gen.close()
+
+
+@pytest.fixture
+def as_user(client, db_session):
+    from app.api.dependencies import get_current_user
+    from app.db.models import DailyPlan, Transaction, User
+    from app.main import app
+
+    user = User(
+        id=uuid4(),
+        email=f"query_budget_{uuid4().hex[:10]}@mita.app",
+        password_hash="hashed_password_123",
+        has_onboarded=True,
+        timezone="UTC",
+        monthly_income=Decimal("5000.00"),
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        db_session.query(Transaction).filter_by(user_id=user.id).delete()
+        db_session.query(DailyPlan).filter_by(user_id=user.id).delete()
+        db_session.query(User).filter_by(id=user.id).delete()
+        db_session.commit()
+
+
+def test_dashboard_query_budget(as_user, query_budget):
+    with query_budget(max_queries=25, max_repeats=6):
+        resp = as_user.get("/api/dashboard")
+    assert resp.status_code == 200, resp.text
+
+
+def test_transaction_create_query_budget(as_user, query_budget):
+    with query_budget(max_queries=30, max_repeats=6):
+        resp = as_user.post(
+            "/api/transactions/",
+            json={
+                "amount": 12.5,
+                "category": "food",
+                "description": "query budget",
+                "spent_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+    assert resp.status_code in (200, 201), resp.text
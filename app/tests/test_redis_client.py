@@ -0,0 +1,34 @@
+"""
+Shared Redis clients
+
+A redis.asyncio client is tied to the event loop it first connects on.
+get_async_redis shares one per loop, so code that runs its own loop with
+asyncio.run never receives a client bound to a loop that has closed.
+"""
+
+import asyncio
+
+from app.core import redis_client
+from app.core.redis_client import get_async_redis, get_sync_redis
+
+URL = "redis://shared-client-test"
+
+
+def test_sync_client_is_shared_per_url():
+    assert get_sync_redis(URL) is get_sync_redis(URL)
+    assert get_sync_redis(URL) is not get_sync_redis(URL + "/1")
+
+
+def test_async_clients_are_shared_within_a_loop_only():
+    async def clients():
+        first = get_async_redis(URL)
+        await asyncio.sleep(0)
+        return first, get_async_redis(URL), asyncio.get_running_loop()
+
+    first_run = asyncio.run(clients())
+    second_run = asyncio.run(clients())
+
+    assert first_run[0] is first_run[1]
+    assert second_run[0] is not first_run[0]
+    # The first loop's clients went when the second loop asked for one
+    assert first_run[2] not in redis_client._async_clients
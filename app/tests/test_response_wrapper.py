@@ -11,6 +11,8 @@ from datetime import date, datetime, timezone
 from decimal import Decimal
 from uuid import uuid4
 
+import pytest
+
 from app.utils.response_wrapper import StandardizedResponse, success_response
 
 
@@ -63,3 +65,101 @@ def test_created_response_serializes_decimal():
     resp = StandardizedResponse.created(data={"amount": Decimal("15.75")})
     assert resp.status_code == 201
     assert _body(resp)["data"]["amount"] == 15.75
+
+
+# orjson fast path: same body as the jsonable_encoder + json path it replaced
+
+
+def _payload():
+    from app.api.transactions.schemas import TxnOut
+    from app.db.models import Transaction
+
+    spent = datetime(2026, 7, 5, 9, 30, tzinfo=timezone.utc)
+    txn = Transaction(
+        id=uuid4(),
+        user_id=uuid4(),
+        category="food",
+        amount=Decimal("12.50"),
+        currency="USD",
+        spent_at=spent,
+        created_at=spent,
+    )
+    out = TxnOut(
+        id=str(uuid4()),
+        category="rent",
+        amount=Decimal("900.00"),
+        spent_at=spent,
+        created_at=spent,
+        tags=["home"],
+    )
+    return {"rows": [txn, txn], "models": [out, out], "total": Decimal("25")}
+
+
+def test_fast_encoding_matches_jsonable_encoder():
+    from fastapi.encoders import jsonable_encoder
+
+    from app.utils.json_encoding import dumps, encode_models
+
+    payload = _payload()
+    models = payload["models"]
+
+    assert json.loads(dumps(payload)) == jsonable_encoder(payload)
+    assert json.loads(dumps(encode_models(models))) == jsonable_encoder(models)
+
+
+def test_fast_encoding_falls_back_without_orjson(monkeypatch):
+    from app.utils import json_encoding
+
+    payload = _payload()
+    fast = json_encoding.dumps(payload)
+    monkeypatch.setattr(json_encoding, "ORJSON_AVAILABLE", False)
+
+    assert json_encoding.dumps(payload) == fast
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_non_finite_floats_raise_instead_of_becoming_null(
+    monkeypatch, orjson_available
+):
+    from app.utils import json_encoding
+
+    monkeypatch.setattr(
+        json_encoding,
+        "ORJSON_AVAILABLE",
+        orjson_available and json_encoding.ORJSON_AVAILABLE,
+    )
+    for bad in (
+        {"ratio": float("nan"), "note": None},
+        {"rows": [{"score": float("-inf")}]},
+        {"pair": (1.0, float("nan"))},
+        {"tags": {float("inf")}},  # converted by the default hook
+    ):
+        with pytest.raises(ValueError):
+            json_encoding.dumps(bad)
+    assert (
+        json_encoding.dumps({"ratio": 0.5, "note": None})
+        == b'{"ratio":0.5,"note":null}'
+    )
+
+
+def test_streamed_envelope_matches_success():
+    import asyncio
+
+    rows = [{"n": i, "amount": Decimal(i) / 4} for i in range(1234)]
+    meta = {"total": Decimal("9.99")}
+
+    async def collect(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    streamed = StandardizedResponse.stream(
+        {"items": iter(rows), "count": len(rows)}, meta=meta, chunk_size=100
+    )
+    body = json.loads(asyncio.run(collect(streamed)))
+    whole = _body(
+        StandardizedResponse.success({"items": rows, "count": len(rows)}, meta=meta)
+    )
+
+    assert streamed.media_type == "application/json"
+    assert list(body) == list(whole)
+    for key in ("success", "message", "data", "meta"):
+        assert body[key] == whole[key]
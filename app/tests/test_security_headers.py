@@ -1,7 +1,9 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from starlette.middleware.cors import CORSMiddleware
 
+from app.middleware.http_observability_middleware import HTTPObservabilityMiddleware
+
 app = FastAPI()
 
 app.add_middleware(
@@ -11,44 +13,51 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(HTTPObservabilityMiddleware)
 
 
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["Strict-Transport-Security"] = (
-        "max-age=63072000; includeSubDomains"
-    )
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    if request.url.path.startswith("/docs") or request.url.path.startswith(
-        "/redoc"
-    ):  # noqa: E501
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net"
-        )
-    else:
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net"
-        )
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=()"
-    response.headers["Referrer-Policy"] = "same-origin"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    return response
+@app.get("/boom")
+async def boom():
+    raise RuntimeError("boom")
 
 
 client = TestClient(app)
 
 
-def test_security_headers_present():
-    r = client.get("/docs")
+def _assert_security_headers(r):
     assert r.headers.get("Strict-Transport-Security")
     assert r.headers.get("X-Content-Type-Options") == "nosniff"
     assert r.headers.get("X-Frame-Options") == "DENY"
     csp = r.headers.get("Content-Security-Policy", "")
     assert "default-src" in csp
     assert "cdn.jsdelivr.net" in csp
+    assert r.headers.get("Permissions-Policy") == "geolocation=(), microphone=()"
+    assert r.headers.get("Referrer-Policy") == "same-origin"
+    assert r.headers.get("X-XSS-Protection") == "1; mode=block"
+
+
+def test_security_headers_present():
+    r = client.get("/docs")
+    _assert_security_headers(r)
+
+
+def test_security_headers_on_404_and_preflight():
+    _assert_security_headers(client.get("/no-such-route"))
+    preflight = client.options(
+        "/docs",
+        headers={
+            "Origin": "https://app.mita.finance",
+            "Access-Control-Request-Method": "GET",
+        },
+    )
+    _assert_security_headers(preflight)
+
+
+def test_security_headers_not_duplicated():
+    r = client.get("/docs")
+    assert r.headers.get_list("X-Frame-Options") == ["DENY"]
+
+
+def test_unhandled_exception_propagates():
+    strict = TestClient(app, raise_server_exceptions=False)
+    assert strict.get("/boom").status_code == 500
@@ -0,0 +1,82 @@
+"""
+Shared Redis-or-memory stores and process singletons
+
+key_value_store() backs every service that keeps string values per key;
+both variants must behave alike for the services built on them.
+"""
+
+import asyncio
+import threading
+
+from app.core import shared_store
+from app.core.shared_store import (
+    InMemoryKeyValueStore,
+    RedisKeyValueStore,
+    key_value_store,
+    process_singleton,
+)
+
+
+def test_key_value_stores_agree(store_backend):
+    store = store_backend(
+        InMemoryKeyValueStore,
+        lambda client, async_client: RedisKeyValueStore(
+            "test:", client=client, async_client=async_client
+        ),
+    )
+
+    store.set("a", "1")
+    store.set("b", "2", ttl=60)
+    store.delete("a")
+
+    async def run():
+        await store.aset("c", "3", ttl=60)
+        values = [await store.aget(key) for key in ("a", "b", "c")]
+        await store.adelete("c")
+        return values, await store.aget("c")
+
+    assert asyncio.run(run()) == ([None, "2", "3"], None)
+
+
+def test_memory_store_expires_and_evicts(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(shared_store.time, "monotonic", lambda: clock[0])
+    store = InMemoryKeyValueStore(max_entries=2)
+
+    store.set("old", "1", ttl=10)
+    store.set("kept", "2")
+    clock[0] += 11
+    assert store.get("old") is None
+
+    store.set("x", "3")
+    store.get("kept")
+    store.set("y", "4")
+    assert (store.get("kept"), store.get("x"), store.get("y")) == ("2", None, "4")
+
+
+def test_store_follows_the_redis_configuration():
+    assert isinstance(key_value_store("p:", redis_url=""), InMemoryKeyValueStore)
+    store = key_value_store("p:", redis_url="redis://shared-store-test")
+    assert isinstance(store, RedisKeyValueStore) and store.prefix == "p:"
+
+
+def test_singleton_is_built_once_across_threads():
+    built = []
+
+    @process_singleton
+    def get_service():
+        """The service"""
+        built.append(object())
+        return built[-1]
+
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(get_service())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1 and all(item is built[0] for item in seen)
+    assert get_service.__doc__ == "The service"
@@ -0,0 +1,84 @@
+"""
+Startup imports
+
+Importing app.main used to pull in scikit-learn, the OpenAI, Google Vision
+and Firestore SDKs, pytesseract and Pillow, and ran a bcrypt benchmark, on
+every worker start. Those now load on first use, and LAZY_ROUTERS defers the
+rarely used routers until a request reaches them.
+"""
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.lazy_routers import (
+    LazyRouterPlaceholder,
+    LazyRouterSpec,
+    mount_lazy_routers,
+)
+from scripts.profile_startup import parse_importtime, profile_startup
+
+HEAVY_MODULES = [
+    "sklearn",
+    "openai",
+    "google.cloud.vision",
+    "google.cloud.firestore",
+    "pytesseract",
+    "PIL",
+]
+
+router = APIRouter(prefix="/demo")
+
+
+@router.get("/ping")
+def ping():
+    return {"pong": True}
+
+
+def test_importtime_output_becomes_a_tree():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:        10 |         10 |     pkg.a.inner",
+            "import time:        20 |         30 |   pkg.a",
+            "import time:         5 |          5 |   pkg.b",
+            "import time:       100 |        135 | pkg",
+            "import time:         7 |          7 | other",
+        ]
+    )
+
+    tree = parse_importtime(stderr)
+
+    assert [node.name for node in tree] == ["pkg", "other"]
+    assert [child.name for child in tree[0].children] == ["pkg.a", "pkg.b"]
+    assert tree[0].children[0].children[0].name == "pkg.a.inner"
+    assert tree[0].cumulative_us == 135
+
+
+def test_app_import_leaves_heavy_sdks_unloaded():
+    stats = profile_startup("app.main", importtime=False)
+
+    loaded = set(stats["loaded"])
+    assert "app.main" in loaded
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
+
+
+def test_lazy_router_loads_on_first_request():
+    calls = []
+    app = FastAPI()
+    spec = LazyRouterSpec(__name__, "/api", "/demo", ["Demo"])
+    [placeholder] = mount_lazy_routers(
+        app, [spec], dependencies=[Depends(lambda: calls.append(1))]
+    )
+    client = TestClient(app)
+
+    assert "/api/demo/ping" not in app.openapi()["paths"]
+    assert client.get("/api/demox").status_code == 404
+    assert not placeholder.loaded
+
+    assert client.get("/api/demo/ping").json() == {"pong": True}
+    assert client.get("/api/demo/ping").status_code == 200
+
+    assert placeholder.loaded
+    assert len(calls) == 2  # the mount's dependencies still apply
+    assert not any(isinstance(r, LazyRouterPlaceholder) for r in app.router.routes)
+    assert app.openapi()["paths"]["/api/demo/ping"]["get"]["tags"] == ["Demo"]
@@ -0,0 +1,226 @@
+"""
+Delta sync feed and sync-version ETags
+
+Rows get their change_seq from Postgres triggers; here the numbers are set
+by hand on in-memory SQLite, which is what the feed and the ETags read.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import (
+    DailyPlan,
+    Goal,
+    Notification,
+    SyncTombstone,
+    Transaction,
+    UserSyncState,
+)
+from app.services.sync_feed import etag_by_sync_version, get_changes, prune_tombstones
+from app.utils.response_wrapper import success_response
+
+MODELS = [Transaction, DailyPlan, Goal, Notification, UserSyncState, SyncTombstone]
+NOW = datetime(2026, 10, 18, 9, 0, tzinfo=timezone.utc)
+USER = SimpleNamespace(id=uuid4(), timezone="UTC")
+
+
+@pytest.fixture
+def db(sqlite_table):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    metadata = MetaData()
+    for model in MODELS:
+        sqlite_table(model, metadata)
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _bump(db, user_id=USER.id):
+    """What the triggers do: take the user's next sequence number"""
+    state = db.get(UserSyncState, user_id)
+    if state is None:
+        state = UserSyncState(user_id=user_id, last_seq=0)
+        db.add(state)
+    state.last_seq += 1
+    return state.last_seq
+
+
+def _txn(db, user_id=USER.id, **fields):
+    txn = Transaction(
+        id=uuid4(),
+        user_id=user_id,
+        category="food",
+        amount=Decimal("10.00"),
+        spent_at=NOW,
+        created_at=NOW,
+        change_seq=_bump(db, user_id),
+        **fields,
+    )
+    db.add(txn)
+    return txn
+
+
+def _goal(db):
+    goal = Goal(
+        id=uuid4(),
+        user_id=USER.id,
+        title="Trip",
+        target_amount=Decimal("500"),
+        saved_amount=Decimal("0"),
+        created_at=NOW,
+        last_updated=NOW,
+        change_seq=_bump(db),
+    )
+    db.add(goal)
+    return goal
+
+
+def _notification(db):
+    note = Notification(
+        id=uuid4(),
+        user_id=USER.id,
+        title="Budget",
+        message="You are on track",
+        created_at=NOW,
+        change_seq=_bump(db),
+    )
+    db.add(note)
+    return note
+
+
+def test_feed_pages_changes_across_sources_in_sequence_order(db):
+    first = _txn(db)  # 1
+    goal = _goal(db)  # 2
+    note = _notification(db)  # 3
+    gone = _txn(db, deleted_at=NOW)  # 4: soft delete
+    db.add(
+        SyncTombstone(
+            user_id=USER.id,
+            change_seq=_bump(db),  # 5: hard delete
+            entity="daily_plan",
+            entity_id=(plan_id := uuid4()),
+        )
+    )
+    _txn(db, user_id=uuid4())  # someone else's change
+    db.commit()
+
+    page = get_changes(db, USER.id, since=0, limit=2)
+    assert [t.id for t in page.changes["transactions"]] == [first.id]
+    assert [g.id for g in page.changes["goals"]] == [goal.id]
+    assert (page.cursor, page.version, page.has_more) == (2, 5, True)
+
+    page = get_changes(db, USER.id, since=page.cursor, limit=2)
+    assert [n.id for n in page.changes["notifications"]] == [note.id]
+    assert page.deleted["transactions"] == [gone.id]
+    assert page.changes["transactions"] == []
+    assert (page.cursor, page.has_more) == (4, True)
+
+    page = get_changes(db, USER.id, since=page.cursor, limit=2)
+    assert page.deleted["daily_plan"] == [plan_id]
+    assert (page.cursor, page.has_more) == (5, False)
+
+    caught_up = get_changes(db, USER.id, since=5).to_dict()
+    assert caught_up["cursor"] == "5"
+    assert not caught_up["reset"]
+    assert all(rows == [] for rows in caught_up["changes"].values())
+
+
+def test_cursor_from_another_history_asks_for_a_reset(db):
+    _txn(db)
+    db.commit()
+
+    page = get_changes(db, USER.id, since=40)
+
+    assert page.reset
+    assert page.cursor == 0
+
+
+def _tombstone(db, deleted_at, user_id=USER.id):
+    db.add(
+        SyncTombstone(
+            user_id=user_id,
+            change_seq=_bump(db, user_id),
+            entity="notifications",
+            entity_id=uuid4(),
+            deleted_at=deleted_at,
+        )
+    )
+
+
+def test_pruned_tombstones_reset_older_cursors_only(db):
+    _tombstone(db, NOW - timedelta(days=120))  # 1
+    _tombstone(db, NOW - timedelta(days=100))  # 2
+    _tombstone(db, NOW - timedelta(days=5))  # 3
+    _tombstone(db, NOW - timedelta(days=120), user_id=(other := uuid4()))
+    db.commit()
+
+    assert prune_tombstones(db, now=NOW, retention_days=90, batch_users=1) == 3
+    assert [t.change_seq for t in db.query(SyncTombstone).all()] == [3]
+    assert db.get(UserSyncState, USER.id).pruned_seq == 2
+    assert db.get(UserSyncState, other).pruned_seq == 1
+
+    stale = get_changes(db, USER.id, since=1)
+    assert stale.reset
+    assert stale.cursor == 0
+
+    for since in (0, 2):
+        page = get_changes(db, USER.id, since=since)
+        assert not page.reset
+        assert len(page.deleted["notifications"]) == 1
+        assert page.cursor == 3
+
+
+def _etag_client(db):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/api/things")
+    @etag_by_sync_version
+    def things(
+        request: Request,
+        user=Depends(lambda: USER),  # noqa: B008
+        db: Session = Depends(lambda: db),  # noqa: B008
+    ):
+        calls.append(request.url.path)
+        return success_response({"calls": len(calls)})
+
+    return TestClient(app), calls
+
+
+def test_unchanged_resource_returns_304_without_running_the_endpoint(db):
+    _txn(db)
+    db.commit()
+    client, calls = _etag_client(db)
+
+    first = client.get("/api/things")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    cached = client.get("/api/things", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert len(calls) == 1
+
+    other_query = client.get("/api/things?page=2", headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+
+    _txn(db)
+    db.commit()
+    changed = client.get("/api/things", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["data"]["calls"] == 3
@@ -0,0 +1,110 @@
+"""
+Single-pass input threat scanner
+
+SecurityConfig/InputSanitizer used to loop re.search over every pattern. The
+scanner must flag exactly the strings the loops flagged, including the
+strings its literal prefilter lets through to the regex.
+"""
+
+import random
+import re
+
+import pytest
+
+from app.core.security import SecureInputValidator, SecurityConfig
+from app.core.threat_scanner import (
+    TEMPLATE_INJECTION,
+    ThreatRule,
+    ThreatScanner,
+    free_text_scanner,
+    request_input_scanner,
+)
+from app.core.validators import InputSanitizer, ValidationError
+
+CORPUS = [
+    "Whole Foods Market #10234",
+    "Uber trip - airport",
+    "Rent for March; split with Sam",
+    "Deleted Netflix sub, contract create",
+    "coffee @ Blue Bottle (oat latte)",
+    "Refund 0x1F ref",
+    "Amazon order 114-2233 / gift",
+    "' OR '1'='1",
+    "1 or 1=1",
+    "admin'--",
+    "x; DROP TABLE users",
+    "UNION ALL SELECT card_number FROM cards",
+    "exec xp_cmdshell 'dir'",
+    "char(65)",
+    "<script>alert(1)</script>",
+    '<img src=x onerror="alert(1)">',
+    "JavaScript:alert(1)",
+    "<iframe src=evil></iframe>",
+    "data:text/html;base64,PHNjcmlwdD4=",
+    "${jndi:ldap://x}",
+    "#{7*7}",
+    "{{ config }}",
+    "Café crème ſelect",
+    "İnsert into",
+    "",
+]
+
+
+def _legacy(text, groups):
+    return any(
+        re.search(p, text, re.IGNORECASE) for patterns in groups for p in patterns
+    )
+
+
+def _mutations(seed=7, count=2000):
+    rng = random.Random(seed)
+    pieces = [s for s in CORPUS if s] + ["=", "--", ";", " ", "<", ">", "union", "é"]
+    for _ in range(count):
+        yield "".join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+
+
+@pytest.mark.parametrize("text", CORPUS + list(_mutations()))
+def test_scanners_flag_what_the_pattern_loops_flagged(text):
+    strict = (SecurityConfig.SQL_INJECTION_PATTERNS, SecurityConfig.XSS_PATTERNS)
+    free_text = (
+        InputSanitizer.SQL_INJECTION_PATTERNS,
+        InputSanitizer.XSS_PATTERNS,
+        InputSanitizer.FINANCIAL_INJECTION_PATTERNS,
+    )
+    assert request_input_scanner.matches(text) == _legacy(text, strict)
+    assert free_text_scanner.matches(text) == _legacy(text, free_text)
+
+
+def test_match_reports_rule_and_span():
+    match = free_text_scanner.scan("Lunch {{ user.password }}")
+
+    assert match.rule.name == "template_mustache"
+    assert match.category == TEMPLATE_INJECTION
+    assert (match.start, match.end) == (6, 25)
+    assert request_input_scanner.scan("Whole Foods Market") is None
+
+
+def test_prefilter_skips_regex_for_clean_ascii():
+    scanner = ThreatScanner(
+        [ThreatRule("numeric_tautology", "sql_injection", r"\d+\s*=\s*\d+", ("=",))]
+    )
+
+    assert scanner.candidates("Trader Joe's groceries") == ()
+    assert scanner.candidates("1 = 1") == (0,)
+    # Case folding beyond ASCII is left to the regex
+    assert scanner.candidates("naïve") == (0,)
+    with pytest.raises(ValueError):
+        ThreatScanner([ThreatRule("no_triggers", "xss", "x", ())])
+
+
+def test_validators_keep_their_errors():
+    with pytest.raises(Exception, match="SQL patterns"):
+        SecureInputValidator.validate_and_sanitize_input({"note": ["x' OR 1=1"]})
+    with pytest.raises(Exception, match="HTML/JavaScript"):
+        SecureInputValidator.validate_and_sanitize_input({"note": "javascript:x"})
+    with pytest.raises(ValidationError):
+        InputSanitizer.sanitize_string("Dinner ${7*7}")
+
+    assert InputSanitizer.sanitize_string("  Deleted Netflix sub  ") == (
+        "Deleted Netflix sub"
+    )
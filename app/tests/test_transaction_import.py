@@ -0,0 +1,196 @@
+"""
+Bulk statement import
+
+There was no way to bring a bank's history in other than one POST per
+transaction, each accruing into DailyPlan on its own. Statement files are now
+streamed through incremental CSV/OFX/QIF parsers, validated with the
+EnhancedTransactionValidator rules, deduplicated against the ledger and
+written in batches, with one DailyPlan recompute at the end. Runs on
+in-memory SQLite.
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyPlan, Transaction
+from app.services.transaction_import import (
+    DateParser,
+    TransactionImporter,
+    parse_amount,
+    parse_csv,
+    parse_ofx,
+    parse_qif,
+)
+
+
+@pytest.fixture
+def db(sqlite_table):
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    sqlite_table(Transaction, metadata)
+    sqlite_table(DailyPlan, metadata)
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_amounts_and_dates_in_statement_notations():
+    assert parse_amount("-1,234.56") == Decimal("-1234.56")
+    assert parse_amount("1.234,56 EUR") == Decimal("1234.56")
+    assert parse_amount("(12.00)") == Decimal("-12.00")
+    assert parse_amount("12,50") == Decimal("12.50")
+    with pytest.raises(ValueError):
+        parse_amount("n/a")
+
+    parse_date = DateParser()
+    assert parse_date("31/01/2026") == date(2026, 1, 31)
+    # Day-first is now tried before month-first
+    assert parse_date("02/03/2026") == date(2026, 3, 2)
+
+
+def test_parsers_stream_csv_ofx_and_qif():
+    csv_rows = list(
+        parse_csv(
+            iter(
+                [
+                    "Posted Date;Payee;Debit;Credit\n",
+                    "2026-10-01;Corner Cafe;4.50;\n",
+                    "2026-10-02;Employer;;2000.00\n",
+                    "bad-date;Shop;1.00;\n",
+                ]
+            )
+        )
+    )
+    assert [(r.day, r.amount, r.merchant) for r in csv_rows[:2]] == [
+        (date(2026, 10, 1), Decimal("-4.50"), "Corner Cafe"),
+        (date(2026, 10, 2), Decimal("2000.00"), "Employer"),
+    ]
+    assert csv_rows[2].error and csv_rows[2].line == 4
+
+    # SGML OFX written as one line
+    ofx = (
+        "<OFX><CURDEF>EUR<BANKTRANLIST>"
+        "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20261003120000[0:GMT]"
+        "<TRNAMT>-23.10<NAME>Fresh &amp; Co<MEMO>weekly shop</STMTTRN>"
+        "</BANKTRANLIST></OFX>"
+    )
+    (row,) = parse_ofx(iter([ofx]))
+    assert (row.day, row.amount, row.merchant, row.currency) == (
+        date(2026, 10, 3),
+        Decimal("-23.10"),
+        "Fresh & Co",
+        "EUR",
+    )
+
+    qif = [
+        "!Type:Bank\n",
+        "D10/ 4'26\n",
+        "T-9.99\n",
+        "PStreamCo\n",
+        "LSubscriptions:Video\n",
+        "^\n",
+    ]
+    (row,) = parse_qif(iter(qif))
+    assert (row.day, row.amount, row.merchant, row.category) == (
+        date(2026, 10, 4),
+        Decimal("-9.99"),
+        "StreamCo",
+        "Subscriptions",
+    )
+
+
+def test_import_dedups_against_the_ledger_and_recomputes_plans(db, tmp_path):
+    user_id = uuid4()
+    db.add_all(
+        [
+            # Already entered by hand
+            Transaction(
+                id=uuid4(),
+                user_id=user_id,
+                category="food",
+                amount=Decimal("4.50"),
+                merchant="Corner Cafe",
+                spent_at=datetime(2026, 10, 1, 8, 0),
+                created_at=datetime(2026, 10, 1, 8, 0, tzinfo=timezone.utc),
+            ),
+            DailyPlan(
+                id=uuid4(),
+                user_id=user_id,
+                date=datetime(2026, 10, 1),
+                category="food",
+                planned_amount=Decimal("10.00"),
+                spent_amount=Decimal("4.50"),
+                status="green",
+            ),
+        ]
+    )
+    db.commit()
+
+    path = _write(
+        tmp_path,
+        "statement.csv",
+        "Date,Amount,Payee,Category\n"
+        "2026-10-01,-4.50,Corner Cafe,Food\n"  # the hand-entered one
+        "2026-10-01,-4.50,Corner Cafe,Food\n"  # a second coffee
+        "2026-10-01,-9.00,Lunch Spot,food\n"
+        "2026-10-02,-30.00,Fuel Stop,Car\n"  # unknown category
+        "2026-10-02,1500.00,Employer,\n"  # credit
+        "2030-01-01,-5.00,Too Soon,food\n"  # validator: future date
+        "nope,-5.00,Broken,food\n",
+    )
+    progress = []
+    importer = TransactionImporter(
+        db,
+        user_id,
+        tz="UTC",
+        batch_size=2,
+        progress=lambda fraction, report: progress.append(fraction),
+    )
+    report = importer.run(path, "csv")
+
+    assert (report.rows, report.imported, report.duplicates) == (7, 3, 1)
+    assert (report.skipped_credits, report.invalid) == (1, 2)
+    assert [e["line"] for e in report.errors] == [7, 8]
+    assert report.days_recomputed == 2
+    assert progress and progress == sorted(progress)
+
+    ledger = db.query(Transaction.category, Transaction.amount).all()
+    assert len(ledger) == 4
+    assert ("other", Decimal("30.00")) in ledger
+
+    plans = {
+        (p.date.date(), p.category): p
+        for p in db.query(DailyPlan).filter(DailyPlan.user_id == user_id)
+    }
+    food = plans[(date(2026, 10, 1), "food")]
+    assert food.spent_amount == Decimal("18.00")
+    assert food.status == "red"
+    assert plans[(date(2026, 10, 2), "other")].spent_amount == Decimal("30.00")
+
+    # Importing the same file again adds nothing
+    again = TransactionImporter(db, user_id, tz="UTC").run(path, "csv")
+    assert (again.imported, again.duplicates) == (0, 4)
+    assert db.query(Transaction).count() == 4
+
+
+def test_all_positive_csv_is_read_as_an_expense_list(db, tmp_path):
+    path = _write(
+        tmp_path,
+        "expenses.csv",
+        "date,amount,description\n2026-10-05,12.00,Books\n2026-10-05,3.00,Bus\n",
+    )
+
+    report = TransactionImporter(db, uuid4(), tz="UTC").run(path, "csv")
+
+    assert (report.imported, report.skipped_credits) == (2, 0)
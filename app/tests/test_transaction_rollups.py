@@ -0,0 +1,97 @@
+"""
+Transaction rollup cube
+
+Analytics endpoints re-aggregated raw transactions on every request and
+filtered with extract(year/month) on spent_at, which the spent_at index
+cannot serve. They now read transaction_daily_rollups by a day range; the
+statistics derived from its sums must equal those over the raw amounts.
+"""
+
+import random
+import statistics
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.transaction_rollups import (
+    RollupStats,
+    category_totals_query,
+    daily_totals_query,
+    month_range,
+    stats_query,
+    trailing_days,
+)
+
+
+def _cells(amounts):
+    """Fold (day, category, amount) rows the way the triggers do"""
+    cells = defaultdict(lambda: [0, Decimal("0"), Decimal("0")])
+    for day, category, amount in amounts:
+        cell = cells[(day, category)]
+        cell[0] += 1
+        cell[1] += amount
+        cell[2] += amount * amount
+    return cells
+
+
+def test_stats_from_cells_match_raw_amounts():
+    rng = random.Random(11)
+    rows = [
+        (
+            date(2026, 3, rng.randint(1, 31)),
+            rng.choice(["food", "transport", "shopping"]),
+            Decimal(rng.randint(100, 250_000)) / 100,
+        )
+        for _ in range(400)
+    ]
+    amounts = [float(amount) for _, _, amount in rows]
+
+    stats = RollupStats()
+    for count, total, sum_squares in _cells(rows).values():
+        stats.count += count
+        stats.total += total
+        stats.sum_squares += sum_squares
+
+    assert stats.count == len(amounts)
+    assert stats.mean == pytest.approx(statistics.mean(amounts))
+    assert stats.variance == pytest.approx(statistics.pvariance(amounts))
+    assert stats.sample_stdev == pytest.approx(statistics.stdev(amounts))
+
+
+def test_stats_from_empty_row():
+    stats = RollupStats.from_row((None, None, None, None, None))
+
+    assert (stats.count, stats.mean, stats.variance, stats.sample_stdev) == (
+        0,
+        0.0,
+        0.0,
+        0.0,
+    )
+
+
+@pytest.mark.parametrize(
+    "build", [category_totals_query, daily_totals_query, stats_query]
+)
+def test_queries_use_sargable_day_ranges(build):
+    start, end = month_range(2026, 12)
+    sql = str(
+        build(uuid4(), start, end).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert "FROM transaction_daily_rollups" in sql
+    assert "transactions" not in sql.replace("transaction_daily_rollups", "")
+    assert "EXTRACT" not in sql
+    assert "transaction_daily_rollups.day >= '2026-12-01'" in sql
+    assert "transaction_daily_rollups.day < '2027-01-01'" in sql
+
+
+def test_trailing_days_spans_exactly_that_many_days():
+    start, end = trailing_days(30)
+
+    assert (end - start).days == 30
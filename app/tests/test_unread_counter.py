@@ -0,0 +1,162 @@
+"""
+Counter-cached unread counts and keyset notification listing
+
+/unread-count ran COUNT(*) over the user's notifications on every poll and
+/list paged with OFFSET. Counts now come from a per-user counter adjusted by
+NotificationService writes and reconciled from the database when stale;
+/list seeks with a (created_at, id) cursor. Runs on in-memory SQLite.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.models import Notification
+from app.services import notification_service as notification_module
+from app.services.notification_service import NotificationService, encode_cursor
+from app.services.unread_counter import (
+    KEY_PREFIX,
+    InMemoryUnreadStore,
+    RedisUnreadStore,
+    UnreadCounter,
+    unread_query,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Notification.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _db_count(db, user_id):
+    return db.execute(unread_query(user_id, datetime.now(timezone.utc))).one()[0]
+
+
+def test_counter_tracks_writes_without_recounting(db, store_backend, monkeypatch):
+    store = store_backend(
+        InMemoryUnreadStore, lambda client, _: RedisUnreadStore(client)
+    )
+    counter = UnreadCounter(store=store)
+    monkeypatch.setattr(notification_module, "get_unread_counter", lambda: counter)
+    service = NotificationService(db)
+    user_id = uuid4()
+
+    def create(**kwargs):
+        return service.create_notification(
+            user_id, "Heads up", "Body", send_immediately=False, **kwargs
+        )
+
+    first = create()
+    assert service.get_unread_count(user_id) == 1  # reconciled once
+
+    recounts = []
+    original = counter.reconcile
+    monkeypatch.setattr(
+        counter, "reconcile", lambda *a: recounts.append(a) or original(*a)
+    )
+
+    second, third = create(), create()
+    create(expires_at=datetime.now(timezone.utc) + timedelta(days=2))
+    assert service.get_unread_count(user_id) == 4
+
+    service.mark_as_read(first.id, user_id)
+    service.mark_as_read(first.id, user_id)  # already read: no double decrement
+    service.delete_notification(second.id, user_id)
+    assert service.get_unread_count(user_id) == 2 == _db_count(db, user_id)
+    assert recounts == []
+
+    service.mark_as_read(third.id, user_id)
+    service.mark_all_as_read(user_id)
+    assert service.get_unread_count(user_id) == 0 == _db_count(db, user_id)
+    assert len(recounts) == 1  # mark-all-read invalidates
+
+
+def test_count_goes_stale_when_a_counted_notification_expires(db):
+    store = InMemoryUnreadStore()
+    counter = UnreadCounter(store=store)
+    user_id = uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db.add_all(
+        [
+            Notification(user_id=user_id, title="a", message="a"),
+            Notification(
+                user_id=user_id, title="b", message="b", expires_at=expires_at
+            ),
+        ]
+    )
+    db.commit()
+
+    assert counter.count(db, user_id) == 2
+    # Cached only until the expiring one drops out (before the usual cap)
+    _, valid_until = store.get(str(user_id))
+    assert valid_until == pytest.approx(expires_at.timestamp())
+
+
+def test_redis_adjust_never_writes_into_a_hash_cleared_meanwhile(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    store = RedisUnreadStore(client)
+    user_id = str(uuid4())
+    valid_until = time.time() + 600
+    store.set(user_id, 1, valid_until)
+
+    store.adjust(user_id, -3, expires_at=valid_until - 60)
+    assert store.get(user_id) == (0, pytest.approx(valid_until - 60))
+
+    # A mark-all-read clears the hash between our read and our write
+    transaction = client.transaction
+
+    def racing(func, *watches, **kwargs):
+        def read_then_race(pipe):
+            func(pipe)
+            if client.exists(KEY_PREFIX + user_id):
+                store.clear(user_id)
+
+        return transaction(read_then_race, *watches, **kwargs)
+
+    monkeypatch.setattr(client, "transaction", racing)
+    store.adjust(user_id, 1)
+
+    assert not client.exists(KEY_PREFIX + user_id)
+
+
+def test_keyset_pages_walk_every_notification_once(db):
+    service = NotificationService(db)
+    user_id = uuid4()
+    base = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    for i in range(23):
+        # Pairs share a timestamp so the id tie-breaker matters
+        db.add(
+            Notification(
+                user_id=user_id,
+                title=f"n{i}",
+                message="m",
+                created_at=base + timedelta(minutes=i // 2),
+            )
+        )
+    db.add(Notification(user_id=uuid4(), title="other", message="m"))
+    db.commit()
+
+    expected = [n.id for n in service.get_user_notifications(user_id, limit=100)]
+    seen, cursor = [], None
+    while True:
+        page = service.get_user_notifications(user_id, limit=5, cursor=cursor)
+        seen.extend(n.id for n in page)
+        if len(page) < 5:
+            break
+        cursor = encode_cursor(page[-1])
+
+    assert len(expected) == 23
+    assert seen == expected
+
+
+def test_malformed_cursor_is_rejected(db):
+    with pytest.raises(ValueError):
+        NotificationService(db).get_user_notifications(uuid4(), cursor="not-a-cursor")
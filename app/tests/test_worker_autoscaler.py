@@ -0,0 +1,194 @@
+"""
+RQ worker autoscaler
+
+Worker pools were a fixed size, so nightly batches queued behind a few
+workers while daytime capacity idled. The autoscaler sizes each pool from
+queue depth, oldest-job age and recent job duration, with a scale-up
+cooldown and a slower, one-at-a-time scale-down.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import CollectorRegistry
+from rq import Queue
+from rq.utils import utcformat
+
+from app.core.config import settings
+from app.core.task_queue import MitaTaskQueue
+from app.core.worker_autoscaler import (
+    MAX_STEP_UP,
+    SCALE_DOWN_DELAY,
+    SCALE_UP_COOLDOWN,
+    AutoscalerMetrics,
+    PoolSample,
+    PoolState,
+    ProcessWorkerLauncher,
+    QueueAutoscaler,
+    decide,
+    pool_sample,
+)
+from app.core.worker_manager import STANDARD_POOLS, WorkerPool
+
+fakeredis = pytest.importorskip("fakeredis")
+
+POOL = WorkerPool(
+    name="batch",
+    queues=("default",),
+    initial_workers=1,
+    min_workers=1,
+    max_workers=10,
+    max_jobs=100,
+    job_timeout=300,
+    heartbeat_interval=30,
+    target_drain_seconds=60,
+    max_wait_seconds=120,
+)
+
+
+def _sample(depth=0, busy=0, age=0.0, duration=2.0):
+    return PoolSample(depth, busy, age, duration)
+
+
+def test_backlog_scales_up_by_drain_time_in_bounded_steps():
+    state = PoolState()
+
+    # 90 jobs x 2s to drain within 60s -> 3 workers
+    first = decide(POOL, _sample(depth=90), 1, state, now=0)
+    assert (first.desired, first.target, first.direction) == (3, 3, "up")
+
+    # A bigger backlog during the cooldown waits, then grows by MAX_STEP_UP
+    held = decide(POOL, _sample(depth=600), 3, state, now=SCALE_UP_COOLDOWN - 1)
+    assert held.target == 3
+    stepped = decide(POOL, _sample(depth=600), 3, state, now=SCALE_UP_COOLDOWN)
+    assert (stepped.desired, stepped.target) == (10, 3 + MAX_STEP_UP)
+
+
+def test_scale_down_waits_for_a_sustained_lull_and_steps_by_one():
+    state = PoolState()
+
+    assert decide(POOL, _sample(), 4, state, now=0).target == 4
+    # Demand comes back before the delay runs out: the timer resets
+    assert decide(POOL, _sample(depth=90, busy=1), 4, state, now=200).target == 4
+    assert decide(POOL, _sample(), 4, state, now=210).target == 4
+    assert decide(POOL, _sample(), 4, state, now=210 + SCALE_DOWN_DELAY - 1).target == 4
+
+    down = decide(POOL, _sample(), 4, state, now=210 + SCALE_DOWN_DELAY)
+    assert (down.desired, down.target, down.direction) == (1, 3, "down")
+    # The next step waits a full delay again
+    assert decide(POOL, _sample(), 3, state, now=220 + SCALE_DOWN_DELAY).target == 3
+
+
+def test_old_jobs_add_a_worker_and_bounds_hold():
+    aged = decide(POOL, _sample(depth=2, busy=1, age=300), 2, PoolState(), now=0)
+    assert aged.target == 3
+    assert "oldest job" in aged.reason
+
+    flooded = decide(POOL, _sample(depth=10_000), 10, PoolState(), now=0)
+    assert flooded.target == 10
+    idle = WorkerPool(**{**POOL.__dict__, "min_workers": 0})
+    assert decide(idle, _sample(), 0, PoolState(), now=0).desired == 0
+
+
+def test_pool_sample_aggregates_the_pools_queues():
+    stats = {
+        "critical": {"name": "critical", "length": 1, "started_job_count": 1,
+                     "oldest_job_age_seconds": 5.0, "avg_job_duration_seconds": 1.0},
+        "high": {"name": "high", "length": 3, "started_job_count": 2,
+                 "oldest_job_age_seconds": 40.0, "avg_job_duration_seconds": 3.0},
+        "default": {"name": "default", "length": 99, "started_job_count": 9,
+                    "oldest_job_age_seconds": 900.0, "avg_job_duration_seconds": 9.0},
+        "total_jobs": 103,
+    }  # fmt: skip
+
+    sample = pool_sample(STANDARD_POOLS[0], stats)
+
+    assert (sample.depth, sample.busy, sample.oldest_job_age) == (4, 3, 40.0)
+    assert sample.job_duration == pytest.approx((1.0 * 1 + 3.0 * 3) / 4)
+
+
+def test_queue_stats_report_job_age_and_duration():
+    conn = fakeredis.FakeRedis()
+    now = datetime(2026, 10, 18, 8, 0, tzinfo=timezone.utc)
+    queue = Queue("default", connection=conn)
+    waiting = queue.enqueue("builtins.len", "")
+    conn.hset(waiting.key, "enqueued_at", utcformat(now - timedelta(seconds=90)))
+    done = queue.enqueue("builtins.len", "")
+    queue.remove(done)
+    done.started_at = datetime(2026, 10, 18, 7, 0)
+    done.ended_at = datetime(2026, 10, 18, 7, 0, 4)
+    done.save()
+    queue.finished_job_registry.add(done, 3600)
+
+    stats = MitaTaskQueue(redis_conn=conn).get_queue_stats(now=now)
+
+    assert stats["normal"]["oldest_job_age_seconds"] == pytest.approx(90.0)
+    assert stats["normal"]["avg_job_duration_seconds"] == pytest.approx(4.0)
+    assert stats["high"]["oldest_job_age_seconds"] == 0.0
+    assert stats["high"]["avg_job_duration_seconds"] is None
+
+
+class _Launcher:
+    def __init__(self, sizes):
+        self.sizes = dict(sizes)
+
+    def running(self, pool):
+        return self.sizes[pool.name]
+
+    def start(self, pool):
+        self.sizes[pool.name] += 1
+
+    def stop(self, pool):
+        self.sizes[pool.name] -= 1
+
+
+def test_step_applies_decisions_and_exports_metrics():
+    registry = CollectorRegistry()
+    stats = {
+        "default": {"name": "default", "length": 300, "started_job_count": 1,
+                    "oldest_job_age_seconds": 10.0, "avg_job_duration_seconds": 2.0},
+    }  # fmt: skip
+    launcher = _Launcher({"batch": 1})
+    autoscaler = QueueAutoscaler(
+        launcher,
+        pools=[POOL],
+        queue_stats=lambda: stats,
+        clock=lambda: 0.0,
+        metrics=AutoscalerMetrics(registry),
+    )
+
+    (decision,) = autoscaler.step()
+
+    assert launcher.sizes["batch"] == decision.target == 1 + MAX_STEP_UP
+    value = registry.get_sample_value
+    assert value("rq_autoscaler_queue_depth", {"pool": "batch"}) == 300
+    assert value("rq_autoscaler_workers", {"pool": "batch", "kind": "desired"}) == 10
+    assert value("rq_autoscaler_workers", {"pool": "batch", "kind": "target"}) == 5
+    scaled_up = {"pool": "batch", "direction": "up"}
+    assert value("rq_autoscaler_scaling_events_total", scaled_up) == 1
+
+
+def test_simulated_batch_drains_faster_and_scales_back():
+    from scripts.simulate_worker_autoscaling import simulate
+
+    arrivals = [(60.0, "default", 1.5, 600, 0.0)]
+
+    static = simulate(arrivals, hours=0.75, autoscale=False, dt=2.0)
+    autoscaled = simulate(arrivals, hours=0.75, autoscale=True, dt=2.0)
+
+    normal = STANDARD_POOLS[1]
+    assert autoscaled.max_wait["normal_priority"] < static.max_wait["normal_priority"]
+    assert autoscaled.peak_workers["normal_priority"] <= normal.max_workers
+    assert (
+        autoscaled.final_workers["normal_priority"]
+        < autoscaled.peak_workers["normal_priority"]
+    )
+    assert autoscaled.final_workers["low_priority"] == 0
+
+
+def test_launcher_uses_the_configured_redis(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "")
+    monkeypatch.setattr(settings, "UPSTASH_REDIS_URL", "rediss://upstash:6379")
+
+    assert ProcessWorkerLauncher().redis_url == "rediss://upstash:6379"
+    assert ProcessWorkerLauncher("redis://other").redis_url == "redis://other"
@@ -0,0 +1,189 @@
+"""
+Fast JSON Encoding for MITA Finance
+orjson serialization for API response envelopes
+
+StandardizedResponse.success used to run jsonable_encoder over the whole
+payload, which rebuilds every dict and list in Python to turn Decimal, UUID
+and datetime values into JSON types, and then hand the copy to stdlib json.
+For a 1000-row transaction list that was most of the request's CPU time.
+
+dumps() writes the payload with orjson instead. UUID, datetime, date, enum
+and dataclass values are encoded natively; the default hook covers the rest
+with the same output jsonable_encoder gives them:
+
+- Decimal becomes an int or float (fastapi's decimal_encoder);
+- pydantic models go through a cached TypeAdapter (mode="json", by alias);
+- SQLAlchemy instances become their loaded attributes, minus _sa_* state;
+- anything else falls back to jsonable_encoder.
+
+The bytes match JSONResponse's compact format, so clients see the same
+body. Without orjson installed, or for values it rejects (integers beyond
+64 bits), dumps() uses the old jsonable_encoder + json path.
+
+NaN and Infinity still raise ValueError, as JSONResponse (allow_nan=False)
+did, instead of reaching clients as the null orjson writes for them. orjson
+cannot reject them itself, so floats are checked only when the output has
+a null in it; the default hook checks what it converts.
+
+iter_json() writes a document piece by piece for very large responses:
+iterators inside it become JSON arrays encoded a chunk of items at a time,
+so the full body is never built in memory.
+"""
+
+import json
+import math
+from collections.abc import Iterator
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, List
+
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+STREAM_CHUNK_ITEMS = 500  # items encoded per orjson call when streaming
+STREAM_FLUSH_BYTES = 64 * 1024  # smallest chunk handed to the ASGI server
+
+
+@lru_cache(maxsize=256)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """Cached TypeAdapter for a schema such as TxnOut or List[TxnOut]"""
+    return TypeAdapter(schema)
+
+
+def encode_models(data: Any) -> Any:
+    """JSON-ready form of a model or a list of one model type, else `data`
+
+    A list of same-type models is dumped by one List[Model] adapter call
+    rather than one call per item from the orjson default hook.
+    """
+    if isinstance(data, BaseModel):
+        return type_adapter(type(data)).dump_python(data, mode="json", by_alias=True)
+    if isinstance(data, list) and data and isinstance(data[0], BaseModel):
+        model = type(data[0])
+        if all(type(item) is model for item in data):
+            return type_adapter(List[model]).dump_python(
+                data, mode="json", by_alias=True
+            )
+    return data
+
+
+def _check_finite(obj: Any) -> None:
+    """ValueError on a NaN or Infinity float in plain dicts, lists and tuples"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise ValueError(
+                    f"Out of range float values are not JSON compliant: {value}"
+                )
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        encoded = decimal_encoder(obj)
+    elif isinstance(obj, BaseModel):
+        encoded = type_adapter(type(obj)).dump_python(obj, mode="json", by_alias=True)
+    elif hasattr(obj, "_sa_instance_state"):
+        encoded = {k: v for k, v in vars(obj).items() if not k.startswith("_sa")}
+    elif isinstance(obj, (set, frozenset)):
+        encoded = list(obj)
+    else:
+        encoded = jsonable_encoder(obj)
+    _check_finite(encoded)
+    return encoded
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # JSONResponse.render settings
+    return json.dumps(
+        jsonable_encoder(obj),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for an API payload
+
+    Raises ValueError for NaN or Infinity, like the stdlib path.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            encoded = orjson.dumps(
+                obj,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+            if b"null" in encoded:
+                _check_finite(obj)
+            return encoded
+        except (orjson.JSONEncodeError, ValueError):
+            # The stdlib path re-raises non-finite floats with its own message
+            pass
+    return _stdlib_dumps(obj)
+
+
+def iter_json_array(
+    items: Iterable[Any], chunk_size: int = STREAM_CHUNK_ITEMS
+) -> Iterator[bytes]:
+    """A JSON array, encoded `chunk_size` items per dumps call"""
+    yield b"["
+    first = True
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield (b"" if first else b",") + dumps(chunk)[1:-1]
+            first, chunk = False, []
+    if chunk:
+        yield (b"" if first else b",") + dumps(chunk)[1:-1]
+    yield b"]"
+
+
+def _pieces(obj: Any, chunk_size: int) -> Iterator[bytes]:
+    if isinstance(obj, dict):
+        yield b"{"
+        for i, (key, value) in enumerate(obj.items()):
+            yield (b"," if i else b"") + dumps(str(key)) + b":"
+            yield from _pieces(value, chunk_size)
+        yield b"}"
+    elif isinstance(obj, Iterator):
+        yield from iter_json_array(obj, chunk_size)
+    else:
+        yield dumps(obj)
+
+
+def iter_json(
+    obj: Any,
+    chunk_size: int = STREAM_CHUNK_ITEMS,
+    flush_bytes: int = STREAM_FLUSH_BYTES,
+) -> Iterator[bytes]:
+    """Stream `obj` as JSON; iterators in it are written as arrays
+
+    Only iterators (generators, iter(list)) are streamed - lists and other
+    values are encoded whole - and small pieces are buffered up to
+    `flush_bytes` so the server is not handed a message per key.
+    """
+    buffer = bytearray()
+    for piece in _pieces(obj, chunk_size):
+        buffer += piece
+        if len(buffer) >= flush_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
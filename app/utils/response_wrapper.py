@@ -10,13 +10,24 @@ from typing import Any, Dict, List, Optional, Union
 from uuid import uuid4
 
 from fastapi import Request, status
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.core.standardized_error_handler import (
     StandardizedAPIException,
     StandardizedErrorHandler,
 )
+from app.utils.json_encoding import STREAM_CHUNK_ITEMS, dumps, encode_models, iter_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by json_encoding.dumps (orjson)
+
+    Content may hold Decimal, UUID, datetime, pydantic and SQLAlchemy
+    values; they are encoded as jsonable_encoder would encode them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
 
 
 class StandardizedResponse:
@@ -30,22 +41,51 @@ class StandardizedResponse:
         status_code: int = status.HTTP_200_OK,
     ) -> JSONResponse:
         """Create standardized success response"""
+        # DB-derived payloads carry Decimal/date/UUID values that stdlib json
+        # cannot serialize; FastJSONResponse encodes them while rendering.
+        return FastJSONResponse(
+            status_code=status_code,
+            content=StandardizedResponse._envelope(encode_models(data), message, meta),
+        )
 
-        response_content = {
+    @staticmethod
+    def stream(
+        data: Any,
+        message: str = "Request completed successfully",
+        meta: Optional[Dict[str, Any]] = None,
+        status_code: int = status.HTTP_200_OK,
+        chunk_size: int = STREAM_CHUNK_ITEMS,
+    ) -> StreamingResponse:
+        """Success envelope streamed in chunks, for very large lists
+
+        Iterators in `data` (or `data` itself) are written as JSON arrays
+        `chunk_size` items at a time instead of being encoded in one piece.
+        The body is the same as success() would send.
+        """
+        content = StandardizedResponse._envelope(data, message, meta)
+        return StreamingResponse(
+            iter_json(content, chunk_size),
+            status_code=status_code,
+            media_type="application/json",
+        )
+
+    @staticmethod
+    def _envelope(
+        data: Any, message: str, meta: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        envelope = {
             "success": True,
             "message": message,
-            # DB-derived payloads carry Decimal/date/UUID values that stdlib
-            # json (used by JSONResponse) cannot serialize — encode them here.
-            "data": jsonable_encoder(data),
+            "data": data,
             "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
             "request_id": f"req_{uuid4().hex[:12]}",
         }
 
         # Add metadata if provided
         if meta:
-            response_content["meta"] = jsonable_encoder(meta)
+            envelope["meta"] = meta
 
-        return JSONResponse(status_code=status_code, content=response_content)
+        return envelope
 
     @staticmethod
     def error(
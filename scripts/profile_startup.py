@@ -0,0 +1,166 @@
+"""
+Startup profile for the MITA API
+
+Imports a module (app.main by default) in a fresh interpreter under
+`python -X importtime` and reports wall time, peak RSS and module count,
+then the import tree: every module that took at least --min-ms including
+its own imports, nested under whatever imported it, plus the modules with
+the most self time. Use it to find what a new dependency costs at start-up
+and to check that heavy SDKs stay behind first use.
+
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --lazy-routers --min-ms 20 --depth 4
+    python scripts/profile_startup.py --json > startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATS_MARKER = "STARTUP_STATS "
+
+_CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+wall = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print({marker!r} + json.dumps({{
+    "wall_ms": wall * 1000,
+    "max_rss_mb": rss_kb / 1024,
+    "modules": len(sys.modules),
+    "loaded": sorted(sys.modules),
+}}), flush=True)
+"""
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List["ImportNode"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "self_ms": round(self.self_us / 1000, 2),
+            "cumulative_ms": round(self.cumulative_us / 1000, 2),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+def parse_importtime(stderr: str) -> List[ImportNode]:
+    """Import tree from -X importtime output
+
+    CPython prints a module once it has finished importing, after all of the
+    modules it pulled in, indented two spaces per nesting level.
+    """
+    pending: Dict[int, List[ImportNode]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        node = ImportNode(name.strip(), int(parts[0]), int(parts[1]))
+        node.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(node)
+    if not pending:
+        return []
+    return pending[min(pending)]
+
+
+def profile_startup(
+    module: str = "app.main",
+    env: Optional[Dict[str, str]] = None,
+    importtime: bool = True,
+) -> Dict:
+    """Import module in a fresh interpreter; stats plus the import tree"""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _CHILD.format(module=module, marker=STATS_MARKER)]
+    result = subprocess.run(
+        command,
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    stats = None
+    for line in result.stdout.splitlines():
+        if line.startswith(STATS_MARKER):
+            stats = json.loads(line[len(STATS_MARKER) :])
+    if result.returncode != 0 or stats is None:
+        raise RuntimeError(
+            f"Importing {module} failed (exit {result.returncode}):\n"
+            f"{result.stderr[-2000:]}"
+        )
+    stats["tree"] = parse_importtime(result.stderr) if importtime else []
+    return stats
+
+
+def _flatten(nodes: List[ImportNode]) -> List[ImportNode]:
+    flat = []
+    for node in nodes:
+        flat.append(node)
+        flat.extend(_flatten(node.children))
+    return flat
+
+
+def _print_tree(nodes: List[ImportNode], min_ms: float, depth: int, level=0):
+    for node in sorted(nodes, key=lambda n: n.cumulative_us, reverse=True):
+        if node.cumulative_us / 1000 < min_ms:
+            continue
+        print(
+            f"{node.cumulative_us / 1000:9.1f} {node.self_us / 1000:8.1f}  "
+            f"{'  ' * level}{node.name}"
+        )
+        if level + 1 < depth:
+            _print_tree(node.children, min_ms, depth, level + 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--lazy-routers", action="store_true")
+    parser.add_argument("--min-ms", type=float, default=50.0)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    env = {"LAZY_ROUTERS": "true"} if args.lazy_routers else {}
+    stats = profile_startup(args.module, env=env)
+    tree = stats.pop("tree")
+    stats.pop("loaded")
+
+    if args.json:
+        stats["tree"] = [node.to_dict() for node in tree]
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(
+        f"import {args.module}: {stats['wall_ms']:.0f}ms, "
+        f"peak RSS {stats['max_rss_mb']:.0f}MB, {stats['modules']} modules"
+    )
+    print(f"\nImport tree (>= {args.min_ms:g}ms, {args.depth} levels)")
+    print(f"{'cum ms':>9} {'self ms':>8}  module")
+    _print_tree(tree, args.min_ms, args.depth)
+
+    print(f"\nTop {args.top} by self time")
+    flat = sorted(_flatten(tree), key=lambda n: n.self_us, reverse=True)
+    for node in flat[: args.top]:
+        print(f"{node.self_us / 1000:9.1f}  {node.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Rebuild the transaction rollup cube from the transactions table.
+
+Usage:
+    python scripts/rebuild_transaction_rollups.py              # every user
+    python scripts/rebuild_transaction_rollups.py --user <id>  # one user
+"""
+
+import argparse
+
+from app.core.session import get_db
+from app.services.transaction_rollups import rebuild_rollups
+
+
+def run(user_id=None) -> None:
+    db = next(get_db())
+    try:
+        written = rebuild_rollups(db, user_id)
+        scope = f"user {user_id}" if user_id else "all users"
+        print(f"Rebuilt {written} rollup cells for {scope}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", help="Only rebuild this user's rollups")
+    run(parser.parse_args().user)
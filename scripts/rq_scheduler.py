@@ -9,10 +9,19 @@ from app.legacy_tasks import (
     enqueue_monthly_redistribution,
     enqueue_subscription_refresh,
 )
+from app.services.core.engine.cron_task_ai_insights import run_ai_insight_snapshots
+from app.services.core.engine.cron_task_cohort_model import run_cohort_model_training
 from app.services.core.engine.cron_task_followup_reminder import run_followup_reminders
+from app.services.core.engine.cron_task_merchant_map import run_merchant_map_rebuild
+from app.services.core.engine.cron_task_partition_maintenance import (
+    run_partition_maintenance,
+)
 from app.services.core.engine.cron_task_scheduled_expenses import (
     run_scheduled_expenses_daily,
 )
+from app.services.core.engine.cron_task_scheduled_notifications import (
+    run_scheduled_notifications,
+)
 from app.services.core.engine.cron_task_streak_wins import run_streak_win_check
 from app.services.core.engine.cron_task_velocity_alerts import run_velocity_alerts_daily
 
@@ -88,5 +97,45 @@ scheduler.cron(
     queue_name="default",
 )
 
+# Scheduled notifications every minute; runs may overlap safely (SKIP LOCKED)
+scheduler.cron(
+    "* * * * *",
+    func=run_scheduled_notifications,
+    repeat=None,
+    queue_name="default",
+)
+
+# Log table partitions and notification retention at 03:15 UTC (quiet hours)
+scheduler.cron(
+    "15 3 * * *",
+    func=run_partition_maintenance,
+    repeat=None,
+    queue_name="default",
+)
+
+# Learned merchant→category map at 04:00 UTC, after partition maintenance
+scheduler.cron(
+    "0 4 * * *",
+    func=run_merchant_map_rebuild,
+    repeat=None,
+    queue_name="default",
+)
+
+# Cohort clusters at 04:30 UTC, once the merchant map rebuild is done
+scheduler.cron(
+    "30 4 * * *",
+    func=run_cohort_model_training,
+    repeat=None,
+    queue_name="default",
+)
+
+# AI insight snapshots at 05:00 UTC, chunks run in parallel on the workers
+scheduler.cron(
+    "0 5 * * *",
+    func=run_ai_insight_snapshots,
+    repeat=None,
+    queue_name="default",
+)
+
 if __name__ == "__main__":
     scheduler.run()
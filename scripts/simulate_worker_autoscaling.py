@@ -0,0 +1,282 @@
+"""
+Worker autoscaling simulation
+
+Replays a night-and-morning workload against the RQ worker autoscaler on
+fakeredis, with simulated workers and a virtual clock: jobs are real RQ
+jobs in real queues, read back through MitaTaskQueue.get_queue_stats, but
+"running" one just holds a simulated worker for the job's duration. The
+same workload is replayed on the static standard layout for comparison.
+
+Default workload (times UTC): a steady daytime trickle on the high and
+default queues, plus the batches that pile up overnight - budget
+redistribution at 01:00, scheduled expenses at 06:00, velocity alerts at
+07:30 and AI advice at 08:00.
+
+    python scripts/simulate_worker_autoscaling.py
+    python scripts/simulate_worker_autoscaling.py --scale 2 --hours 10
+"""
+
+import argparse
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rq import Queue
+from rq.job import Job
+from rq.utils import utcformat
+
+# Add app to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.task_queue import MitaTaskQueue
+from app.core.worker_autoscaler import DEFAULT_INTERVAL, QueueAutoscaler
+from app.core.worker_manager import STANDARD_POOLS, WorkerPool
+
+START = datetime(2026, 10, 18, 0, 30, tzinfo=timezone.utc)
+REGISTRY_TTL = 24 * 3600
+
+# (offset seconds from START, queue, job seconds, count, spacing seconds)
+Arrivals = List[Tuple[float, str, float, int, float]]
+
+
+def default_workload(hours: float = 9.0, scale: float = 1.0) -> Arrivals:
+    def at(hour: int, minute: int) -> float:
+        return (START.replace(hour=hour, minute=minute) - START).total_seconds()
+
+    horizon = hours * 3600
+    arrivals = [
+        (0.0, "high", 0.5, int(horizon // 20), 20.0),  # push notifications
+        (10.0, "default", 2.0, int(horizon // 30), 30.0),  # interactive work
+        (at(1, 0), "default", 1.5, int(3000 * scale), 0.0),  # redistribution
+        (at(6, 0), "default", 1.0, int(800 * scale), 0.0),  # scheduled expenses
+        (at(7, 30), "default", 0.8, int(1500 * scale), 0.0),  # velocity alerts
+        (at(8, 0), "low", 4.0, int(600 * scale), 0.0),  # AI advice
+    ]
+    return [a for a in arrivals if a[0] < horizon]
+
+
+class VirtualClock:
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self) -> float:
+        return self.seconds
+
+    @property
+    def now(self) -> datetime:
+        return START + timedelta(seconds=self.seconds)
+
+
+@dataclass
+class SimulatedWorker:
+    worker_id: str
+    pool: WorkerPool
+    job: Optional[Job] = None
+    remaining: float = 0.0
+    draining: bool = False
+
+
+@dataclass
+class SimulatedWorkerLauncher:
+    """Launcher whose workers take real jobs off fakeredis queues"""
+
+    conn: object
+    clock: VirtualClock
+    workers: List[SimulatedWorker] = field(default_factory=list)
+    waits: Dict[str, List[float]] = field(default_factory=dict)
+    worker_seconds: Dict[str, float] = field(default_factory=dict)
+    _serial: int = 0
+
+    def running(self, pool: WorkerPool) -> int:
+        return sum(1 for w in self.workers if w.pool is pool and not w.draining)
+
+    def start(self, pool: WorkerPool) -> str:
+        self._serial += 1
+        worker = SimulatedWorker(f"{pool.name}_sim_{self._serial}", pool)
+        self.workers.append(worker)
+        return worker.worker_id
+
+    def stop(self, pool: WorkerPool) -> Optional[str]:
+        for worker in reversed(self.workers):
+            if worker.pool is pool and not worker.draining:
+                worker.draining = True  # warm shutdown: finish the job first
+                return worker.worker_id
+        return None
+
+    def tick(self, dt: float) -> None:
+        waiting = {
+            name: Queue(name, connection=self.conn)
+            for name in {q for w in self.workers for q in w.pool.queues}
+        }
+        for worker in list(self.workers):
+            name = worker.pool.name
+            self.worker_seconds[name] = self.worker_seconds.get(name, 0.0) + dt
+            if worker.job is not None:
+                worker.remaining -= dt
+                if worker.remaining <= 0:
+                    self._finish(worker)
+            if worker.job is None:
+                if worker.draining:
+                    self.workers.remove(worker)
+                else:
+                    self._take(worker, waiting)
+
+    def _take(self, worker: SimulatedWorker, queues: Dict[str, Queue]) -> None:
+        for name in worker.pool.queues:
+            queue = queues[name]
+            job_id = self.conn.lpop(queue.key)  # Queue.pop_job_id fails when empty
+            if job_id is None:
+                continue
+            job = Job.fetch(job_id.decode(), connection=self.conn)
+            job.started_at = self.clock.now.replace(tzinfo=None)
+            job.save()
+            queue.started_job_registry.add(job, REGISTRY_TTL)
+            wait = self.clock.now - job.enqueued_at.replace(tzinfo=timezone.utc)
+            self.waits.setdefault(worker.pool.name, []).append(wait.total_seconds())
+            worker.job, worker.remaining = job, job.meta["sim_seconds"]
+            return
+
+    def _finish(self, worker: SimulatedWorker) -> None:
+        job = worker.job
+        job.ended_at = self.clock.now.replace(tzinfo=None)
+        job.save()
+        queue = Queue(job.origin, connection=self.conn)
+        queue.started_job_registry.remove(job)
+        queue.finished_job_registry.add(job, REGISTRY_TTL)
+        worker.job = None
+
+
+@dataclass
+class SimulationReport:
+    layout: str
+    worker_seconds: Dict[str, float]
+    max_wait: Dict[str, float]
+    p95_wait: Dict[str, float]
+    peak_workers: Dict[str, int]
+    final_workers: Dict[str, int]
+    scaling_events: int
+    timeline: List[Tuple[float, Dict[str, int], Dict[str, int]]]
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def simulate(
+    arrivals: Arrivals,
+    hours: float,
+    autoscale: bool = True,
+    pools: Sequence[WorkerPool] = STANDARD_POOLS,
+    interval: float = DEFAULT_INTERVAL,
+    dt: float = 1.0,
+) -> SimulationReport:
+    """Replay `arrivals` for `hours` of virtual time on fakeredis"""
+    import fakeredis
+
+    conn = fakeredis.FakeRedis()
+    clock = VirtualClock()
+    task_queue = MitaTaskQueue(redis_conn=conn)
+    launcher = SimulatedWorkerLauncher(conn, clock)
+    autoscaler = QueueAutoscaler(
+        launcher,
+        pools=pools,
+        queue_stats=lambda: task_queue.get_queue_stats(now=clock.now),
+        clock=clock,
+    )
+    for pool in pools:
+        for _ in range(pool.initial_workers):
+            launcher.start(pool)
+
+    schedule = sorted(
+        (offset + i * spacing, queue, seconds)
+        for offset, queue, seconds, count, spacing in arrivals
+        for i in range(count)
+    )
+    pending = iter(schedule)
+    upcoming = next(pending, None)
+    queues = {}
+    events = 0
+    timeline = []
+    peak = {pool.name: launcher.running(pool) for pool in pools}
+    next_step = 0.0
+
+    while clock.seconds < hours * 3600:
+        while upcoming is not None and upcoming[0] <= clock.seconds:
+            _, name, seconds = upcoming
+            queue = queues.setdefault(name, Queue(name, connection=conn))
+            job = queue.enqueue("builtins.len", "", meta={"sim_seconds": seconds})
+            conn.hset(job.key, "enqueued_at", utcformat(clock.now))
+            upcoming = next(pending, None)
+
+        if autoscale and clock.seconds >= next_step:
+            decisions = autoscaler.step()
+            events += sum(d.direction != "hold" for d in decisions)
+            next_step += interval
+            if clock.seconds % 600 < dt:
+                timeline.append(
+                    (
+                        clock.seconds,
+                        {d.pool: d.target for d in decisions},
+                        {d.pool: d.sample.depth for d in decisions},
+                    )
+                )
+
+        launcher.tick(dt)
+        for pool in pools:
+            peak[pool.name] = max(peak[pool.name], launcher.running(pool))
+        clock.seconds += dt
+
+    return SimulationReport(
+        layout="autoscaled" if autoscale else "static",
+        worker_seconds=dict(launcher.worker_seconds),
+        max_wait={name: max(w) for name, w in launcher.waits.items()},
+        p95_wait={name: _percentile(w, 0.95) for name, w in launcher.waits.items()},
+        peak_workers=peak,
+        final_workers={pool.name: launcher.running(pool) for pool in pools},
+        scaling_events=events,
+        timeline=timeline,
+    )
+
+
+def _print_report(report: SimulationReport) -> None:
+    print(f"\n{report.layout} layout ({report.scaling_events} scaling actions)")
+    print(
+        f"{'pool':<16} {'worker-h':>9} {'peak':>5} {'end':>4} "
+        f"{'p95 wait':>9} {'max wait':>9}"
+    )
+    for name in report.peak_workers:
+        print(
+            f"{name:<16} {report.worker_seconds.get(name, 0) / 3600:9.1f} "
+            f"{report.peak_workers[name]:5d} {report.final_workers[name]:4d} "
+            f"{report.p95_wait.get(name, 0):8.0f}s {report.max_wait.get(name, 0):8.0f}s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--hours", type=float, default=9.0)
+    parser.add_argument("--scale", type=float, default=1.0, help="batch size factor")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    args = parser.parse_args()
+
+    arrivals = default_workload(args.hours, args.scale)
+    autoscaled = simulate(arrivals, args.hours, True, interval=args.interval)
+    static = simulate(arrivals, args.hours, False)
+
+    print("Timeline (every 10 minutes): workers / queued per pool")
+    for seconds, workers, depth in autoscaled.timeline:
+        clock = (START + timedelta(seconds=seconds)).strftime("%H:%M")
+        cells = "  ".join(f"{name}={workers[name]}/{depth[name]}" for name in workers)
+        print(f"  {clock}  {cells}")
+    _print_report(static)
+    _print_report(autoscaled)
+
+
+if __name__ == "__main__":
+    main()